@@ -0,0 +1,89 @@
+"""Cold-start import budget of the combined service.
+
+Standalone script (not collected by pytest). Imports ``--module`` (the
+combined ``service`` by default) in fresh interpreters under
+``python -X importtime`` and fails (exit status 1) when the best of
+``--runs`` cumulative import times is over ``--budget-ms``, or when any module
+of the deferred solver stack (:data:`DEFERRED`) was imported at all: those are
+imported on first use, so a health check on a cold start never pays for them.
+
+Usage:
+    python benchmarks/bench_import.py                  # service, 5 runs
+    python benchmarks/bench_import.py --budget-ms 600
+    python benchmarks/bench_import.py --module sirom.api.app
+
+Run from the repository root. Prints the slowest direct imports.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+# Imported where first used (sirom.batch_solver, sirom.cluster_tree,
+# sirom.mini_ortools_solver, sirom.optimization_problem), never at import.
+DEFERRED = ("pandas", "sklearn", "scipy", "smt", "ortools", "threadpoolctl")
+
+
+def import_times(module: str) -> List[Tuple[str, int, int]]:
+    """(name, depth, cumulative µs) of every import ``module`` triggers, in a
+    fresh interpreter."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, "PYTHONPATH": root}
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=root,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((name.strip(), depth, int(cumulative)))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="service")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=900.0)
+    args = parser.parse_args()
+
+    best: Dict[str, int] = {}
+    runs = [import_times(args.module) for _ in range(args.runs)]
+    totals = []
+    for rows in runs:
+        totals.append(next(us for name, _, us in rows if name == args.module))
+        # Direct imports of the module; the fastest run is the least noisy.
+        for name, depth, us in rows:
+            if depth == 1:
+                best[name] = min(us, best.get(name, us))
+    total_ms = min(totals) / 1000
+
+    print(f"import {args.module}: {total_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+    for name, us in sorted(best.items(), key=lambda item: -item[1])[:10]:
+        print(f"  {us / 1000:8.1f} ms  {name}")
+
+    failures = []
+    imported = {name.split(".")[0] for name, _, _ in runs[0]}
+    eager = [name for name in DEFERRED if name in imported]
+    if eager:
+        failures.append("imported at startup: " + ", ".join(eager))
+    if total_ms > args.budget_ms:
+        failures.append(f"{total_ms:.0f} ms is over the {args.budget_ms:.0f} ms budget")
+    for failure in failures:
+        print("FAIL:", failure)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,137 @@
+"""Cost of a large result between a pool worker and the HTTP response.
+
+Standalone script (not collected by pytest). Builds a ``SolveResponse`` with
+``--solutions`` frontier solutions and ``--candidates`` pool candidates of
+``--variables`` variables each, the shape of a routing job's arc variables,
+and times each step of its way to the client two ways. ``dict`` is the
+``model_dump()`` a worker used to return: pickled as Python floats and
+validated into a ``SolveResponse`` again for each poll. ``packed`` is the
+:class:`~sirom.api.results.PackedResult` it returns now: arrays across the
+process boundary, encoded to JSON once.
+
+Usage:
+    python benchmarks/bench_results.py
+    python benchmarks/bench_results.py --variables 200 --polls 1
+
+Run from the repository root. Columns are milliseconds (best of ``--runs``),
+except ``pickled`` (MB crossing the process boundary); ``polls`` is the total
+for ``--polls`` polls.
+"""
+
+from __future__ import annotations
+
+import argparse
+import pickle
+import time
+from typing import Any, Callable, Dict
+
+import numpy as np
+from fastapi.responses import JSONResponse
+
+from sirom.api.app import _job_json
+from sirom.api.results import PackedResult
+from sirom.api.schemas import JobStatusResponse, RobustSolution, SolveResponse, SolveSummary
+
+
+def response(solutions: int, candidates: int, variables: int) -> SolveResponse:
+    rng = np.random.default_rng(0)
+    built = SolveResponse(
+        solutions=[
+            RobustSolution(
+                variables=rng.random(variables).tolist(),
+                objective_value=float(-k),
+                feasibility_probability=k / solutions,
+            )
+            for k in range(solutions)
+        ],
+        summary=SolveSummary(
+            scenarios_solved=candidates,
+            scenarios_optimal=candidates,
+            cluster_nodes=19,
+            candidate_solutions=solutions,
+            best_feasibility=1.0,
+            runtime_seconds=1.0,
+        ),
+    )
+    built.candidates = {
+        "variables": rng.random((candidates, variables)),
+        "objective_values": rng.random(candidates).tolist(),
+        "occurrences": [1] * candidates,
+    }
+    return built
+
+
+def dict_result(built: SolveResponse) -> Dict[str, Any]:
+    # What run_solve_job returned before results were packed.
+    pool = built.candidates or {}
+    return {
+        **built.model_dump(),
+        "candidates": {
+            **pool,
+            "variables": [[float(v) for v in row] for row in pool["variables"]],
+        },
+    }
+
+
+def dict_poll(result: Dict[str, Any]) -> bytes:
+    result = {k: v for k, v in result.items() if k != "candidates"}
+    body = JobStatusResponse(
+        job_id="j", status="succeeded", result=SolveResponse(**result)
+    ).model_dump(mode="json", exclude_none=True)
+    return JSONResponse(content=body).body
+
+
+def packed_poll(result: PackedResult) -> bytes:
+    record = {"status": "succeeded", "result": result, "errors": None}
+    return _job_json("j", record).encode()
+
+
+def best(runs: int, step: Callable[[], Any]) -> float:
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        step()
+        times.append(time.perf_counter() - started)
+    return min(times) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--solutions", type=int, default=40)
+    parser.add_argument("--candidates", type=int, default=300)
+    parser.add_argument("--variables", type=int, default=2000)
+    parser.add_argument("--polls", type=int, default=10)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    built = response(args.solutions, args.candidates, args.variables)
+    print(
+        f"{args.solutions} solutions, {args.candidates} candidates, "
+        f"{args.variables} variables, {args.polls} polls"
+    )
+    print("| result | worker | pickled | transfer | polls | total |")
+    print("|---|---|---|---|---|---|")
+    for name, pack, poll in (
+        ("dict", dict_result, dict_poll),
+        ("packed", PackedResult.of, packed_poll),
+    ):
+        worker = best(args.runs, lambda: pack(built))
+        result = pack(built)
+        payload = pickle.dumps(result)
+        transfer = best(args.runs, lambda: pickle.loads(pickle.dumps(result)))
+
+        def polls() -> None:
+            # A fresh copy each run: a packed result caches its encoding.
+            received = pickle.loads(payload)
+            for _ in range(args.polls):
+                poll(received)
+
+        polled = best(args.runs, polls) - best(args.runs, lambda: pickle.loads(payload))
+        print(
+            f"| {name} | {worker:.1f} | {len(payload) / 2**20:.1f} | "
+            f"{transfer:.1f} | {polled:.1f} | {worker + transfer + polled:.1f} |"
+        )
+
+
+if __name__ == "__main__":
+    main()
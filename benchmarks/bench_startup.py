@@ -0,0 +1,90 @@
+"""Time-to-first-result of a freshly started API worker.
+
+Standalone script (not collected by pytest). Each run is a new interpreter, as
+after a cold start or a scale-from-zero: it builds a process-mode
+``JobManager``, waits ``--arrival`` seconds for the first request (the
+platform's startup probe, the client's connect), submits the sample problem
+and waits for its result. Runs alternate between a warm pool (started and
+warmed up front, the default) and an on-demand one (``SIROM_WARM_POOL=0``).
+
+Usage:
+    python benchmarks/bench_startup.py                # 3 runs per mode
+    python benchmarks/bench_startup.py --arrival 0    # request at once
+
+Columns are seconds: ``startup`` (building the manager), ``first_result``
+(submit to result of the first job) and ``total`` (interpreter start to that
+result).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from sirom.api.examples import EXAMPLE_PROBLEM
+from sirom.api.jobs import InMemoryJobStore, JobManager
+
+manager = JobManager("process", store=InMemoryJobStore(), max_workers={workers})
+ready = time.perf_counter()
+time.sleep({arrival})
+submitted = time.perf_counter()
+job_id = manager.submit({{**EXAMPLE_PROBLEM, "options": {{"seed": 1}}}})
+while manager.get(job_id)["status"] not in ("succeeded", "failed"):
+    time.sleep(0.005)
+done = time.perf_counter()
+assert manager.get(job_id)["status"] == "succeeded"
+manager.shutdown()
+json.dump({{"startup": ready - started, "first_result": done - submitted,
+            "total": done - started - {arrival}}}, sys.stdout)
+"""
+
+
+def run_once(warm: bool, workers: int, arrival: float) -> dict:
+    env = {**os.environ, "SIROM_WARM_POOL": "1" if warm else "0"}
+    out = subprocess.run(
+        [sys.executable, "-c", _PROBE.format(workers=workers, arrival=arrival)],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument(
+        "--arrival",
+        type=float,
+        default=2.0,
+        help="Seconds between startup and the first request.",
+    )
+    args = parser.parse_args()
+
+    print("| pool | startup | first_result | total |")
+    print("|---|---|---|---|")
+    for warm in (False, True):
+        runs = [run_once(warm, args.workers, args.arrival) for _ in range(args.runs)]
+        best = {k: min(r[k] for r in runs) for k in runs[0]}
+        print(
+            "| {} | {:.3f} | {:.3f} | {:.3f} |".format(
+                "warm" if warm else "on demand",
+                best["startup"],
+                best["first_result"],
+                best["total"],
+            )
+        )
+        time.sleep(0.5)
+
+
+if __name__ == "__main__":
+    main()
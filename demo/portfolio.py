@@ -19,7 +19,7 @@ against the **probability of hitting the target return**.
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Dict, List
+from typing import Dict, List, Optional
 
 from sirom.api.schemas import SolveRequest
 from sirom.api.service import solve_problem
@@ -45,7 +45,10 @@ DEFAULT_ASSETS: List[Asset] = [
 
 
 def build_request(
-    assets: List[Asset], target_return: float, number_of_scenarios: int = 120
+    assets: List[Asset],
+    target_return: float,
+    number_of_scenarios: int = 120,
+    deadline_seconds: Optional[float] = None,
 ) -> SolveRequest:
     n = len(assets)
 
@@ -90,15 +93,25 @@ def build_request(
             "number_of_scenarios": number_of_scenarios,
             "quality_scenarios": number_of_scenarios,
             "clusters": 3,
+            "deadline_seconds": deadline_seconds,
         },
     )
 
 
 def optimize(
-    assets: List[Asset], target_return: float, number_of_scenarios: int = 120
+    assets: List[Asset],
+    target_return: float,
+    number_of_scenarios: int = 120,
+    deadline_seconds: Optional[float] = None,
 ) -> Dict:
-    """Return the risk/robustness frontier of candidate portfolios."""
-    request = build_request(assets, target_return, number_of_scenarios)
+    """Return the risk/robustness frontier of candidate portfolios.
+
+    ``deadline_seconds`` runs SIROM in anytime mode, so a slider move gets the
+    best frontier found within that budget.
+    """
+    request = build_request(
+        assets, target_return, number_of_scenarios, deadline_seconds
+    )
     response = solve_problem(request)
 
     mids = [(a.return_low + a.return_high) / 2 for a in assets]
@@ -3,7 +3,8 @@
 This is the heart of the demo. It builds an arc-based Capacitated Vehicle
 Routing MILP with Miller–Tucker–Zemlin (MTZ) subtour elimination, injects
 *interval uncertainty* into the constraints, submits the problem to the **SIROM
-HTTP API** (it never imports SIROM), polls the job to completion, and decodes
+HTTP API** (it never imports SIROM), follows the job's event stream to
+completion, and decodes
 each returned decision vector back into vehicle routes.
 
 Model (depot = node 0, customers 1..n, K vehicles, capacity Q):
@@ -32,6 +33,7 @@ README.
 
 from __future__ import annotations
 
+import json
 import math
 import os
 import random
@@ -48,7 +50,6 @@ except ImportError:  # pragma: no cover - standalone execution from this directo
 
 SIROM_API_URL = os.getenv("SIROM_API_URL", "http://sirom-api:8000").rstrip("/")
 SOLVE_TIMEOUT = float(os.getenv("VRP_SOLVE_TIMEOUT", "300"))
-POLL_INTERVAL = float(os.getenv("VRP_POLL_INTERVAL", "1.0"))
 
 # Mirrors sirom/api/schemas.py so we can fail fast with a friendly message
 # instead of bouncing off the API's 422.
@@ -301,13 +302,16 @@ def build_request(
 
 
 def solve_via_sirom(request: Dict) -> Dict:
-    """Submit to the SIROM HTTP API and poll the job to completion.
+    """Submit to the SIROM HTTP API and follow the job's event stream.
 
+    ``GET /jobs/{id}/events`` pushes every status change and ends with a
+    ``result`` event carrying the final job body, so there is nothing to poll.
     Returns the ``SolveResponse`` dict (``solutions``/``summary``/``warnings``).
     Raises :class:`SolveError` on rejection, failure, or timeout.
     """
     deadline = time.monotonic() + SOLVE_TIMEOUT
     try:
+        # The read timeout only has to outlast the stream's keep-alives.
         with httpx.Client(base_url=SIROM_API_URL, timeout=30.0) as client:
             resp = client.post("/solve", json=request)
             if resp.status_code == 422:
@@ -315,22 +319,29 @@ def solve_via_sirom(request: Dict) -> Dict:
             resp.raise_for_status()
             job_id = resp.json()["job_id"]
 
-            while True:
-                job = client.get(f"/jobs/{job_id}")
-                job.raise_for_status()
-                body = job.json()
-                state = body.get("status")
-                if state == "succeeded":
-                    return body["result"]
-                if state == "failed":
-                    errs = body.get("errors") or ["unknown error"]
-                    raise SolveError("SIROM solve failed: " + "; ".join(errs))
-                if time.monotonic() > deadline:
-                    raise SolveError(
-                        f"SIROM solve timed out after {SOLVE_TIMEOUT:.0f}s "
-                        f"(last status: {state})."
-                    )
-                time.sleep(POLL_INTERVAL)
+            state = "pending"
+            with client.stream("GET", f"/jobs/{job_id}/events") as events:
+                events.raise_for_status()
+                event = None
+                for line in events.iter_lines():
+                    if time.monotonic() > deadline:
+                        raise SolveError(
+                            f"SIROM solve timed out after {SOLVE_TIMEOUT:.0f}s "
+                            f"(last status: {state})."
+                        )
+                    if line.startswith("event: "):
+                        event = line[len("event: "):]
+                    elif line.startswith("data: ") and event == "status":
+                        state = json.loads(line[len("data: "):])["status"]
+                    elif line.startswith("data: ") and event == "result":
+                        body = json.loads(line[len("data: "):])
+                        if body["status"] == "succeeded":
+                            return body["result"]
+                        errs = body.get("errors") or ["unknown error"]
+                        raise SolveError(
+                            f"SIROM solve {body['status']}: " + "; ".join(errs)
+                        )
+            raise SolveError(f"SIROM event stream ended early (last status: {state}).")
     except httpx.HTTPError as exc:
         raise SolveError(
             f"Could not reach the SIROM API at {SIROM_API_URL} ({type(exc).__name__})."
@@ -22,7 +22,7 @@ import logging
 import os
 import time
 import uuid
-from typing import Any
+from typing import Any, Optional
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
@@ -49,6 +49,8 @@ LIMITS = {
     "max_variables": 200,
     "max_constraints": 500,
     "max_body_bytes": 4_000_000,
+    "max_batch": 50,
+    "max_sweep_variants": 20,
     "cell_budget": 5_000_000,
 }
 
@@ -91,7 +93,8 @@ app.add_middleware(
     allow_origins=ALLOWED_ORIGINS,
     allow_credentials=False,
     allow_methods=["GET", "POST", "OPTIONS"],
-    allow_headers=["Content-Type"],
+    allow_headers=["Content-Type", "If-None-Match"],
+    expose_headers=["ETag"],
     max_age=3600,
 )
 
@@ -113,6 +116,11 @@ def problem_violations(payload: Any) -> list[str]:
         if lb_A and isinstance(lb_A[0], list) and len(lb_A[0]) > LIMITS["max_variables"]:
             bad.append(f"at most {LIMITS['max_variables']} variables, got {len(lb_A[0])}")
 
+    # A public, unauthenticated service must not POST wherever it is told to.
+    if payload.get("callback_url") is not None:
+        bad.append("callback_url is not accepted by the public service; poll "
+                   "or stream /jobs/{id}/events instead")
+
     opts = payload.get("options")
     if isinstance(opts, dict):
         for key, cap in (
@@ -126,6 +134,45 @@ def problem_violations(payload: Any) -> list[str]:
     return bad
 
 
+def batch_violations(payload: Any) -> list[str]:
+    """:func:`problem_violations` for every problem of a /solve/batch body."""
+    problems = payload.get("problems") if isinstance(payload, dict) else None
+    if not isinstance(problems, list):
+        return ["body must be a JSON object with a 'problems' list"]
+    bad: list[str] = []
+    if len(problems) > LIMITS["max_batch"]:
+        bad.append(f"at most {LIMITS['max_batch']} problems per batch, got {len(problems)}")
+    for index, problem in enumerate(problems[: LIMITS["max_batch"]]):
+        bad.extend(f"problems[{index}]: {v}" for v in problem_violations(problem))
+    return bad
+
+
+def sweep_violations(payload: Any) -> list[str]:
+    """:func:`problem_violations` for a /sweep body's base and variants."""
+    if not isinstance(payload, dict) or not isinstance(payload.get("variants"), list):
+        return ["body must be a JSON object with 'base' and a 'variants' list"]
+    variants = payload["variants"]
+    bad = [f"base: {v}" for v in problem_violations(payload.get("base"))]
+    if payload.get("callback_url") is not None:
+        bad.append("callback_url is not accepted by the public service; poll "
+                   "or stream /jobs/{id}/events instead")
+    if len(variants) > LIMITS["max_sweep_variants"]:
+        bad.append(f"at most {LIMITS['max_sweep_variants']} variants per sweep, "
+                   f"got {len(variants)}")
+    for index, variant in enumerate(variants[: LIMITS["max_sweep_variants"]]):
+        if not isinstance(variant, dict):
+            continue
+        for key, cap in (
+            ("number_of_scenarios", LIMITS["max_scenarios"]),
+            ("quality_scenarios", LIMITS["max_scenarios"]),
+            ("clusters", LIMITS["max_clusters"]),
+        ):
+            v = variant.get(key)
+            if isinstance(v, (int, float)) and v > cap:
+                bad.append(f"variants[{index}].{key} must be at most {cap}, got {v}")
+    return bad
+
+
 @app.middleware("http")
 async def guard(request: Request, call_next):
     """Bound the request before anything expensive touches it."""
@@ -140,14 +187,19 @@ async def guard(request: Request, call_next):
 
     # Validate solve payloads here rather than inside the mounted app, so the
     # ceiling holds no matter which sub-application ends up serving the route.
-    if request.method == "POST" and request.url.path.rstrip("/").endswith("/solve"):
+    path = request.url.path.rstrip("/")
+    if request.method == "POST" and path.endswith(("/solve", "/solve/batch", "/sweep")):
         body = await request.body()
         try:
             payload = json.loads(body or b"{}")
         except json.JSONDecodeError as exc:
             return JSONResponse({"detail": f"invalid JSON: {exc.msg}"}, status_code=400)
 
-        violations = problem_violations(payload)
+        violations = (
+            batch_violations(payload) if path.endswith("/batch")
+            else sweep_violations(payload) if path.endswith("/sweep")
+            else problem_violations(payload)
+        )
         if violations:
             return JSONResponse(
                 {"detail": "request exceeds published limits",
@@ -195,6 +247,12 @@ def limits() -> dict[str, Any]:
             "the solver enforces this itself and it is stricter than the "
             "per-dimension caps for anything large."
         ),
+        # Live: what is queued now. POST /solve answers 429 with Retry-After
+        # once the queued work passes capacity_seconds per worker.
+        "queue": (
+            sirom_app.state.jobs.limits()
+            if hasattr(sirom_app.state, "jobs") else None
+        ),
     }
 
 
@@ -218,6 +276,11 @@ class AssetIn(BaseModel):
 class PortfolioRequest(BaseModel):
     target_return: float = Field(default=0.10, ge=0.0, le=1.0)
     number_of_scenarios: int = Field(default=120, ge=20, le=1000)
+    deadline_seconds: Optional[float] = Field(
+        default=None, gt=0, le=30,
+        description="Anytime budget: the best frontier found within this many "
+                    "seconds (see SolveOptions.deadline_seconds).",
+    )
     assets: list[AssetIn] = Field(default_factory=list, max_length=12)
     uncertainty_scale: float = Field(
         default=1.0, ge=0.25, le=3.0,
@@ -261,7 +324,8 @@ def portfolio_optimize(req: PortfolioRequest) -> dict[str, Any]:
         chosen = widened
 
     started = time.perf_counter()
-    out = optimize(chosen, req.target_return, req.number_of_scenarios)
+    out = optimize(chosen, req.target_return, req.number_of_scenarios,
+                   req.deadline_seconds)
     out["wall_seconds"] = round(time.perf_counter() - started, 4)
     out["uncertainty_scale"] = req.uncertainty_scale
     out["intervals"] = [
@@ -310,6 +374,10 @@ TOOLS = [
                 "clusters": {
                     "type": "integer", "minimum": 2,
                     "maximum": LIMITS["max_clusters"], "default": 5},
+                "deadline_seconds": {
+                    "type": "number", "exclusiveMinimum": 0,
+                    "description": "Return the best frontier found within this "
+                                   "many seconds instead of running to completion"},
             },
             "additionalProperties": False,
         },
@@ -338,6 +406,7 @@ def run_solver(args: dict[str, Any]) -> dict[str, Any]:
             "quality_scenarios": min(int(args.get("number_of_scenarios", 120)),
                                      LIMITS["max_scenarios"]),
             "clusters": min(int(args.get("clusters", 5)), LIMITS["max_clusters"]),
+            "deadline_seconds": args.get("deadline_seconds"),
             "include_log": False,
         },
     }
@@ -0,0 +1,265 @@
+"""Admission control: predict what a job costs and refuse what cannot be absorbed.
+
+The schema's ``CELL_BUDGET`` bounds the size of one request but says nothing
+about load, and cells are a poor proxy for work anyway: a MILP scenario costs
+orders of magnitude more than an LP of the same shape, and the quality phase
+grows with ``M``, which cells ignore. The :class:`CostModel` predicts a job's
+CPU-seconds phase by phase, as a coefficient times the phase's work units
+(:meth:`CostModel.units`), and its peak memory from the arrays the pipeline
+allocates. The coefficients start from priors measured on small problems and
+are recalibrated from the ``phase_seconds`` of every job this worker runs.
+
+The :class:`AdmissionController` keeps the predicted cost of every job
+admitted and not yet finished (the backlog). A new job whose CPU-seconds,
+added to the backlog and spread over the pool's workers, would keep the queue
+busy for longer than ``capacity_seconds`` is refused with :class:`QueueFull`,
+which carries the ``Retry-After`` until enough of the backlog should have
+drained. A job predicted to need more than ``max_job_memory_bytes`` can never
+run and is refused with :class:`JobTooLarge`. An idle worker admits any job
+that fits in memory, so a large job is never starved forever.
+"""
+
+from __future__ import annotations
+
+import math
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+# Seconds per work unit (see CostModel.units), measured on small LPs.
+PRIORS: Dict[str, float] = {
+    "scenario_solves": 0.75e-6,
+    "clustering": 1.5e-6,
+    "cluster_resolves": 1.5e-6,
+    "quality_scoring": 1.5e-9,
+}
+# Per-LP overhead (model building, solver start) in constraint-matrix cells.
+_LP_FIXED_CELLS = 700
+# KMeans overhead of building a cluster tree, in point-coordinate-clusters.
+_CLUSTERING_FIXED = 50_000
+# Each integer variable multiplies a scenario solve's cost about this much.
+_INTEGER_FACTOR = 5.0
+# A worker process with numpy, OR-Tools and scikit-learn imported.
+_PROCESS_BYTES = 150 * 2**20
+# Monte Carlo scoring's float blocks (sirom.scoring chunks to 4M cells).
+_SCORING_SCRATCH_BYTES = 2 * 4_000_000 * 8
+# A sweep variant's scenario LP re-solved from the previous variant's basis
+# costs about this fraction of a cold solve.
+_WARM_START_FACTOR = 0.3
+
+
+class QueueFull(Exception):
+    """The queue cannot absorb the job now; retry after ``retry_after`` seconds."""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class JobTooLarge(Exception):
+    """The job is predicted to need more memory than one worker may use."""
+
+
+@dataclass(frozen=True)
+class JobCost:
+    """Predicted cost of one job."""
+
+    cpu_seconds: float
+    memory_bytes: int
+    # Work units per phase, kept to recalibrate the model once it has run.
+    units: Dict[str, float]
+
+
+def _variant_payloads(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    # A sweep's variants as the solve payloads they amount to.
+    base = payload["base"]
+    variants = []
+    for variant in payload["variants"]:
+        changed = {k: v for k, v in variant.items() if v is not None and k != "label"}
+        options = dict(base.get("options") or {})
+        for key in ("number_of_scenarios", "quality_scenarios", "clusters", "scoring"):
+            if key in changed:
+                options[key] = changed.pop(key)
+        variants.append({**base, **changed, "options": options})
+    return variants
+
+
+class CostModel:
+    """Per-phase CPU-seconds as ``coefficient x units``, recalibrated online.
+
+    Args:
+        smoothing: Weight of each new observation in the coefficients'
+            exponential moving average.
+    """
+
+    def __init__(self, smoothing: float = 0.2):
+        self._smoothing = smoothing
+        self._lock = threading.Lock()
+        self.coefficients: Dict[str, float] = dict(PRIORS)
+        self.observations = 0
+
+    @staticmethod
+    def units(payload: Dict[str, Any]) -> Dict[str, float]:
+        """Work units of each phase for a validated solve or sweep payload."""
+        if "variants" in payload:
+            total: Dict[str, float] = {}
+            for index, variant in enumerate(_variant_payloads(payload)):
+                for phase, units in CostModel.units(variant).items():
+                    if phase == "scenario_solves" and index > 0:
+                        units *= _WARM_START_FACTOR
+                    total[phase] = total.get(phase, 0.0) + units
+            return total
+        options = payload.get("options") or {}
+        n_con, n_var = len(payload["lb_A"]), len(payload["objective"])
+        scenarios = int(options.get("number_of_scenarios", 100))
+        quality = int(options.get("quality_scenarios", 100))
+        clusters = int(options.get("clusters", 3))
+        integers = len(payload.get("integer_variables") or [])
+        lp = (n_con * n_var + _LP_FIXED_CELLS) * (1 + _INTEGER_FACTOR * integers)
+        return {
+            "scenario_solves": scenarios * lp,
+            "clustering": scenarios * (n_con + 1) * clusters + _CLUSTERING_FIXED,
+            # Every tree level re-solves each scenario once, stacked into its
+            # node's LP; a few levels deep in practice.
+            "cluster_resolves": scenarios * lp,
+            # At most one candidate per scenario, scored against M draws.
+            "quality_scoring": scenarios * quality * n_con * n_var,
+        }
+
+    @staticmethod
+    def memory_bytes(payload: Dict[str, Any]) -> int:
+        """Peak bytes of one job: scenario matrices, the root node's stacked
+        LP, quality strata and the scoring scratch, over a worker's baseline.
+
+        A sweep's variants run one after another: its largest variant's."""
+        if "variants" in payload:
+            return max(CostModel.memory_bytes(v) for v in _variant_payloads(payload))
+        options = payload.get("options") or {}
+        n_con, n_var = len(payload["lb_A"]), len(payload["objective"])
+        scenarios = int(options.get("number_of_scenarios", 100))
+        quality = int(options.get("quality_scenarios", 100))
+        cells = n_con * (n_var + 1)
+        return int(
+            _PROCESS_BYTES
+            + scenarios * cells * 8 * 2  # δ and the interpolated matrices
+            + scenarios * cells * 8 * 3  # the root node's LP, in the solver too
+            + quality * cells * 2  # uint16 strata
+            + _SCORING_SCRATCH_BYTES
+        )
+
+    def estimate(self, payload: Dict[str, Any]) -> JobCost:
+        units = self.units(payload)
+        with self._lock:
+            cpu = sum(self.coefficients[phase] * units[phase] for phase in units)
+        return JobCost(cpu, self.memory_bytes(payload), units)
+
+    def observe(self, cost: JobCost, phase_seconds: Dict[str, float]) -> None:
+        """Move the coefficients toward what a finished job measured."""
+        with self._lock:
+            for phase, seconds in phase_seconds.items():
+                units = cost.units.get(phase)
+                if not units or phase not in self.coefficients:
+                    continue
+                self.coefficients[phase] += self._smoothing * (
+                    seconds / units - self.coefficients[phase]
+                )
+            self.observations += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "seconds_per_unit": dict(self.coefficients),
+                "observations": self.observations,
+            }
+
+
+class AdmissionController:
+    """Admits jobs against the backlog's predicted CPU-seconds.
+
+    Args:
+        workers: Jobs the pool runs at once.
+        capacity_seconds: Most seconds of queued work (per worker) admitted.
+        max_job_memory_bytes: Largest predicted peak memory of one job.
+        model: Cost model (a fresh :class:`CostModel` by default).
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        capacity_seconds: float = 600.0,
+        max_job_memory_bytes: int = 4096 * 2**20,
+        model: Optional[CostModel] = None,
+    ):
+        self.workers = max(1, workers)
+        self.capacity_seconds = capacity_seconds
+        self.max_job_memory_bytes = max_job_memory_bytes
+        self.model = model if model is not None else CostModel()
+        self._lock = threading.Lock()
+        self._backlog: Dict[str, JobCost] = {}
+        self._calibrate: Dict[str, bool] = {}
+
+    def admit(
+        self,
+        job_id: str,
+        payload: Dict[str, Any],
+        enforce: bool = True,
+        calibrate: bool = True,
+    ) -> JobCost:
+        """Add a job to the backlog, or raise :class:`QueueFull` /
+        :class:`JobTooLarge` (only when ``enforce``).
+
+        ``calibrate=False`` keeps a job out of the model's calibration (e.g.
+        a sharded job, whose phase times are wall-clock over many workers).
+        """
+        cost = self.model.estimate(payload)
+        if enforce and cost.memory_bytes > self.max_job_memory_bytes:
+            raise JobTooLarge(
+                "This problem is predicted to need about {:,} MB of memory, more "
+                "than the {:,} MB a job may use. Use fewer scenarios or quality "
+                "scenarios.".format(
+                    cost.memory_bytes // 2**20, self.max_job_memory_bytes // 2**20
+                )
+            )
+        with self._lock:
+            backlog = sum(c.cpu_seconds for c in self._backlog.values())
+            wait = (backlog + cost.cpu_seconds) / self.workers
+            if enforce and self._backlog and wait > self.capacity_seconds:
+                raise QueueFull(
+                    "The solver queue is full (about {:.0f} s of queued work). "
+                    "Retry later.".format(backlog / self.workers),
+                    retry_after=min(
+                        3600, max(1, math.ceil(wait - self.capacity_seconds))
+                    ),
+                )
+            self._backlog[job_id] = cost
+            self._calibrate[job_id] = calibrate
+        return cost
+
+    def observe(self, job_id: str, phase_seconds: Dict[str, float]) -> None:
+        """Calibrate the model from a finished job's measured phases."""
+        with self._lock:
+            cost = self._backlog.get(job_id)
+            calibrate = self._calibrate.get(job_id, False)
+        if cost is not None and calibrate and phase_seconds:
+            self.model.observe(cost, phase_seconds)
+
+    def finished(self, job_id: str) -> None:
+        """Drop a job (finished, joined elsewhere, or refused) from the backlog."""
+        with self._lock:
+            self._backlog.pop(job_id, None)
+            self._calibrate.pop(job_id, None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """The backlog's size and predicted cost, and the model's state."""
+        with self._lock:
+            backlog = sum(c.cpu_seconds for c in self._backlog.values())
+            jobs = len(self._backlog)
+        return {
+            "workers": self.workers,
+            "queued_jobs": jobs,
+            "queue_cpu_seconds": round(backlog, 3),
+            "estimated_wait_seconds": round(backlog / self.workers, 3),
+            "capacity_seconds": self.capacity_seconds,
+            "max_job_memory_mb": self.max_job_memory_bytes // 2**20,
+            "cost_model": self.model.snapshot(),
+        }
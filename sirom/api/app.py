@@ -5,9 +5,24 @@ Endpoints:
 * ``GET  /``            -> redirect to the interactive docs
 * ``GET  /health``      -> liveness probe
 * ``GET  /example``     -> a ready-to-POST sample problem
-* ``POST /solve``       -> enqueue a solve, returns 202 + job id
-* ``GET  /jobs/{id}``   -> poll a job's status/result
+* ``POST /solve``       -> enqueue a solve, returns 202 + job id (identical
+                           problems and repeated ``Idempotency-Key`` headers
+                           return the existing job; 429 + ``Retry-After``
+                           while the queue is full; queued fairly per
+                           ``X-API-Key`` or client address)
+* ``POST /solve/batch`` -> enqueue many problems at once, one job id each
+* ``POST /sweep``       -> enqueue variants of one problem (objective, RHS or
+                           options) as one job with a frontier per variant
+* ``GET  /jobs/{id}``   -> poll a job's status, live progress and result
+                           (``?wait=N`` long-polls; ``ETag``/``If-None-Match``)
+* ``GET  /jobs/{id}/events`` -> the same as a server-sent event stream, with
+                           partial frontiers while candidates are scored
+* ``POST /jobs/{id}/rescore`` -> a finished job's candidates re-scored under
+                           new interval bounds, in milliseconds
+* ``DELETE /jobs/{id}`` -> cancel a pending or running job
 * ``GET  /jobs``        -> list submitted jobs
+* ``POST /jobs/status`` -> the status of many jobs in one request
+* ``GET  /limits``      -> admission state: queued work, capacity, cost model
 
 The interactive docs at ``/docs`` are the intended starting point: they render
 the request schema with field-level explanations and a prefilled working
@@ -16,20 +31,38 @@ example, so callers never need to read the algorithm's source.
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
+import time
+from collections import OrderedDict
 from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
 
-from fastapi import FastAPI, Request, status
-from fastapi.responses import JSONResponse, RedirectResponse
+from fastapi import FastAPI, Header, Query, Request, Response, status
+from fastapi.responses import JSONResponse, RedirectResponse, StreamingResponse
 
+from .admission import JobTooLarge, QueueFull
 from .examples import EXAMPLE_PROBLEM
-from .jobs import JobManager
+from .errors import SolveError
+from .jobs import IdempotencyConflict, JobManager, JobSubscription, RescoreUnavailable
+from .results import PackedResult, dumps
 from .schemas import (
+    BatchJobCreated,
+    BatchSolveRequest,
+    BatchSolveResponse,
     JobCreatedResponse,
     JobStatus,
     JobStatusResponse,
+    JobsStatusRequest,
+    JobsStatusResponse,
+    RescoreRequest,
     SolveRequest,
     SolveResponse,
+    SweepRequest,
+    SweepResponse,
 )
+from .webhooks import UnsafeCallback
 
 DESCRIPTION = """
 **SIROM** solves linear programs whose coefficients are *uncertain* — given as
@@ -50,6 +83,8 @@ out* below) → poll `GET /jobs/{job_id}` until `succeeded`.
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     app.state.jobs = JobManager()
+    # job id -> (ETag, serialized body) of finished jobs, which never change.
+    app.state.finished_bodies = OrderedDict()
     try:
         yield
     finally:
@@ -90,10 +125,76 @@ def example() -> dict:
     summary="Submit a problem to solve",
     status_code=status.HTTP_202_ACCEPTED,
     response_model=JobCreatedResponse,
+    responses={
+        422: {"description": "Invalid problem, an Idempotency-Key reused "
+              "with a different problem, or a problem predicted to need more "
+              "memory than a job may use"},
+        429: {"description": "The solver queue is full; retry after the "
+              "Retry-After header's seconds"},
+    },
 )
-def solve(problem: SolveRequest, request: Request) -> JobCreatedResponse:
+def solve(
+    problem: SolveRequest,
+    request: Request,
+    idempotency_key: Optional[str] = Header(
+        default=None,
+        max_length=255,
+        description="Retries carrying the same key return the job the first "
+        "request created instead of starting another solve.",
+    ),
+):
+    return _submitted(request, problem.model_dump(), idempotency_key)
+
+
+@app.post(
+    "/sweep",
+    tags=["solve"],
+    summary="Submit variants of one problem to solve together",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=JobCreatedResponse,
+    responses={
+        422: {"description": "Invalid sweep, an Idempotency-Key reused with "
+              "a different sweep, or one predicted to need more memory than "
+              "a job may use"},
+        429: {"description": "The solver queue is full; retry after the "
+              "Retry-After header's seconds"},
+    },
+)
+def sweep(
+    sweep: SweepRequest,
+    request: Request,
+    idempotency_key: Optional[str] = Header(default=None, max_length=255),
+):
+    """One job that solves every variant and returns one frontier each.
+
+    The variants share the sampled scenarios and quality draws and re-solve
+    each scenario LP from the previous variant's basis, so a sweep costs a
+    fraction of one job per variant. Poll ``result_url`` as for ``/solve``.
+    """
+    return _submitted(request, sweep.model_dump(), idempotency_key)
+
+
+def _submitted(
+    request: Request, payload: Dict[str, Any], idempotency_key: Optional[str]
+):
     jobs: JobManager = request.app.state.jobs
-    job_id = jobs.submit(problem.model_dump())
+    try:
+        job_id = jobs.submit(
+            payload,
+            idempotency_key=idempotency_key,
+            client=_client_id(request),
+        )
+    except (IdempotencyConflict, JobTooLarge, UnsafeCallback) as exc:
+        return JSONResponse(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            content={"detail": str(exc)},
+        )
+    except QueueFull as exc:
+        return JSONResponse(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            content={"detail": str(exc), "retry_after_seconds": exc.retry_after},
+            headers={"Retry-After": str(exc.retry_after)},
+        )
     current = jobs.get(job_id) or {"status": JobStatus.pending}
     return JobCreatedResponse(
         job_id=job_id,
@@ -102,32 +203,412 @@ def solve(problem: SolveRequest, request: Request) -> JobCreatedResponse:
     )
 
 
+@app.post(
+    "/solve/batch",
+    tags=["solve"],
+    summary="Submit many problems at once",
+    status_code=status.HTTP_202_ACCEPTED,
+    response_model=BatchSolveResponse,
+    response_model_exclude_none=True,
+)
+def solve_batch(batch: BatchSolveRequest, request: Request) -> BatchSolveResponse:
+    """One job per problem, as ``POST /solve`` would create, in one request.
+
+    Problems refused by admission control carry an ``error`` (and
+    ``retry_after_seconds`` when the queue is full) instead of a job id; the
+    others are accepted regardless. Small problems are run several to a
+    worker task. Poll the jobs together with ``POST /jobs/status``.
+    """
+    jobs: JobManager = request.app.state.jobs
+    outcomes = jobs.submit_many(
+        [problem.model_dump() for problem in batch.problems],
+        client=_client_id(request),
+    )
+    job_ids = list(dict.fromkeys(o["job_id"] for o in outcomes if "job_id" in o))
+    records = dict(zip(job_ids, jobs.get_many(job_ids)))
+    created = []
+    for outcome in outcomes:
+        job_id = outcome.get("job_id")
+        if job_id is None:
+            created.append(
+                BatchJobCreated(
+                    error=outcome["error"], retry_after_seconds=outcome["retry_after"]
+                )
+            )
+            continue
+        record = records.get(job_id) or {"status": JobStatus.pending}
+        created.append(
+            BatchJobCreated(
+                job_id=job_id,
+                status=record["status"],
+                result_url=str(request.url_for("get_job", job_id=job_id)),
+            )
+        )
+    return BatchSolveResponse(jobs=created)
+
+
+def _client_id(request: Request) -> str:
+    """Who a submission counts against in fair-share scheduling."""
+    api_key = request.headers.get("x-api-key")
+    if api_key:
+        # Job records are readable by anyone with the id; keep keys out.
+        return "key:" + hashlib.sha256(api_key.encode()).hexdigest()[:16]
+    # The proxy in front appends the address it saw, so the last hop is the
+    # one a caller cannot forge.
+    forwarded = request.headers.get("x-forwarded-for")
+    if forwarded:
+        return "ip:" + forwarded.split(",")[-1].strip()
+    return "ip:" + (request.client.host if request.client else "unknown")
+
+
+def _job_json(job_id: str, record: Dict[str, Any]) -> str:
+    """The ``JobStatusResponse`` body of a job record, as JSON.
+
+    A packed result (:mod:`sirom.api.results`) was validated when the job
+    built it: its JSON, encoded once per job, is spliced in as is.
+    """
+    result = record["result"]
+    if result is not None and not isinstance(result, PackedResult):
+        # Recorded as a plain dict (by an older version, in Redis).
+        result = PackedResult.of(
+            SweepResponse(**result) if "variants" in result else SolveResponse(**result)
+        )
+    body = JobStatusResponse(
+        job_id=job_id,
+        status=record["status"],
+        errors=record["errors"],
+        progress=record.get("progress"),
+        schedule=record.get("schedule"),
+    ).model_dump(mode="json", exclude_none=True)
+    if result is None:
+        return dumps(body)
+    head = dumps({"job_id": body.pop("job_id"), "status": body.pop("status")})
+    tail = f",{dumps(body)[1:]}" if body else "}"
+    return f'{head[:-1]},"result":{result.json()}{tail}'
+
+
+# How often an open stream or long poll checks its subscription, and how long
+# a stream may stay silent before a keep-alive comment (proxies drop idle
+# connections).
+_EVENTS_POLL_SECONDS = 0.05
+_KEEPALIVE_SECONDS = 15.0
+_FINISHED = {JobStatus.succeeded, JobStatus.failed, JobStatus.cancelled}
+MAX_WAIT_SECONDS = 30.0
+_FINISHED_BODIES_KEPT = 256
+
+
+def _etag(job_id: str, record: Dict[str, Any]) -> str:
+    # A finished job never changes again; a running one changes with every
+    # progress snapshot.
+    version = record["status"]
+    progress = record.get("progress")
+    if JobStatus(record["status"]) not in _FINISHED and progress:
+        version = f"{version}-{progress['elapsed_seconds']}"
+    return f'"{job_id}-{version}"'
+
+
+def _not_modified(if_none_match: Optional[str], etag: str) -> bool:
+    if if_none_match is None:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return "*" in tags or etag in tags
+
+
+def _conditional(if_none_match: Optional[str], etag: str, body: bytes) -> Response:
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _not_modified(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+async def _wait_for_transition(
+    subscription: JobSubscription, current: JobStatus, timeout: float
+) -> None:
+    deadline = time.monotonic() + timeout
+    while True:
+        for event in subscription.drain():
+            if event["event"] == "status" and event["data"]["status"] != current.value:
+                return
+            # The first snapshot is the job starting, wherever it runs.
+            if event["event"] == "progress" and current == JobStatus.pending:
+                return
+        left = deadline - time.monotonic()
+        if left <= 0:
+            return
+        await asyncio.sleep(min(_EVENTS_POLL_SECONDS, left))
+
+
 @app.get(
     "/jobs/{job_id}",
     tags=["solve"],
     summary="Poll a job's status and result",
     response_model=JobStatusResponse,
-    responses={404: {"description": "Unknown job id"}},
+    responses={
+        304: {"description": "Unchanged since the `If-None-Match` ETag"},
+        404: {"description": "Unknown job id"},
+    },
 )
-def get_job(job_id: str, request: Request) -> JSONResponse:
+async def get_job(
+    job_id: str,
+    request: Request,
+    wait: float = Query(
+        default=0.0,
+        ge=0.0,
+        le=MAX_WAIT_SECONDS,
+        description="Seconds to hold the request until the job changes status. "
+        "Returns at once if the job has finished or `If-None-Match` names an "
+        "older state than the current one.",
+    ),
+    if_none_match: Optional[str] = Header(
+        default=None,
+        description="The ETag of a previous response; answered with 304 while "
+        "the job is unchanged.",
+    ),
+) -> Response:
+    # Async, so a long poll waits on the event loop instead of holding a
+    # threadpool thread.
+    finished: "OrderedDict[str, Tuple[str, bytes]]" = request.app.state.finished_bodies
+    if job_id in finished:
+        finished.move_to_end(job_id)
+        etag, body = finished[job_id]
+        return _conditional(if_none_match, etag, body)
+
     jobs: JobManager = request.app.state.jobs
+    subscription = jobs.subscribe(job_id) if wait else None
+    try:
+        record = jobs.get(job_id)
+        if record is None:
+            return JSONResponse(
+                status_code=status.HTTP_404_NOT_FOUND,
+                content={"detail": f"No job with id {job_id!r}."},
+            )
+        # A caller whose ETag is already stale has news waiting: answer now.
+        stale = if_none_match is not None and not _not_modified(
+            if_none_match, _etag(job_id, record)
+        )
+        if (
+            subscription is not None
+            and not stale
+            and JobStatus(record["status"]) not in _FINISHED
+        ):
+            await _wait_for_transition(subscription, JobStatus(record["status"]), wait)
+            record = jobs.get(job_id) or record
+    finally:
+        if subscription is not None:
+            subscription.close()
+
+    etag = _etag(job_id, record)
+    if _not_modified(if_none_match, etag):
+        return _conditional(if_none_match, etag, b"")
+    body = _job_json(job_id, record).encode()
+    if JobStatus(record["status"]) in _FINISHED:
+        finished[job_id] = (etag, body)
+        while len(finished) > _FINISHED_BODIES_KEPT:
+            finished.popitem(last=False)
+    return _conditional(if_none_match, etag, body)
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
+
+
+async def _job_events(
+    request: Request,
+    jobs: JobManager,
+    job_id: str,
+    record: Dict[str, Any],
+    subscription: JobSubscription,
+) -> AsyncIterator[str]:
+    try:
+        current = JobStatus(record["status"])
+        yield _sse("status", {"job_id": job_id, "status": current.value})
+        events = (
+            [{"event": "progress", "data": record["progress"]}]
+            if record.get("progress")
+            else []
+        )
+        quiet_since = time.monotonic()
+        while current not in _FINISHED:
+            for event in events:
+                if event["event"] == "status":
+                    status_now = JobStatus(event["data"]["status"])
+                    if status_now == current:
+                        continue
+                    current = status_now
+                    yield _sse("status", {"job_id": job_id, "status": current.value})
+                    continue
+                if current == JobStatus.pending:
+                    # The first snapshot is the job starting, wherever it runs.
+                    current = JobStatus.running
+                    yield _sse("status", {"job_id": job_id, "status": current.value})
+                snapshot = dict(event["data"])
+                frontier = snapshot.pop("frontier", None)
+                yield _sse("progress", snapshot)
+                if frontier is not None:
+                    yield _sse("frontier", {"solutions": frontier})
+            if events:
+                quiet_since = time.monotonic()
+            elif time.monotonic() - quiet_since > _KEEPALIVE_SECONDS:
+                quiet_since = time.monotonic()
+                yield ": keep-alive\n\n"
+            if current in _FINISHED or await request.is_disconnected():
+                break
+            await asyncio.sleep(_EVENTS_POLL_SECONDS)
+            events = subscription.drain()
+        if current in _FINISHED:
+            final = jobs.get(job_id)
+            if final is not None:
+                yield f"event: result\ndata: {_job_json(job_id, final)}\n\n"
+    finally:
+        subscription.close()
+
+
+@app.get(
+    "/jobs/{job_id}/events",
+    tags=["solve"],
+    summary="Stream a job's status, progress and partial frontiers",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"text/event-stream": {}},
+            "description": "Server-sent events: `status` on every transition, "
+            "`progress` with the per-phase counters, `frontier` with the "
+            "Pareto frontier of the candidates scored so far, and a final "
+            "`result` carrying the same body as `GET /jobs/{id}`, after which "
+            "the stream ends.",
+        },
+        404: {"description": "Unknown job id"},
+    },
+)
+async def job_events(job_id: str, request: Request):
+    jobs: JobManager = request.app.state.jobs
+    # Subscribe before reading the record, so no transition falls in between.
+    subscription = jobs.subscribe(job_id)
     record = jobs.get(job_id)
     if record is None:
+        subscription.close()
         return JSONResponse(
             status_code=status.HTTP_404_NOT_FOUND,
             content={"detail": f"No job with id {job_id!r}."},
         )
-    result = record["result"]
-    response = JobStatusResponse(
-        job_id=job_id,
-        status=record["status"],
-        result=SolveResponse(**result) if result is not None else None,
-        errors=record["errors"],
+    return StreamingResponse(
+        _job_events(request, jobs, job_id, record, subscription),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
-    return JSONResponse(content=response.model_dump(exclude_none=True))
+
+
+@app.post(
+    "/jobs/{job_id}/rescore",
+    tags=["solve"],
+    summary="Re-score a finished job's candidates under new bounds",
+    response_model=SolveResponse,
+    response_model_exclude_none=True,
+    responses={
+        404: {"description": "Unknown job id"},
+        409: {"description": "The job has not succeeded, or is a sweep"},
+        422: {"description": "Invalid bounds, or not the job's shape"},
+    },
+)
+def rescore_job(job_id: str, bounds: RescoreRequest, request: Request):
+    """The frontier a succeeded job's candidates make under new interval bounds.
+
+    Nothing is solved again: every distinct candidate the job found is scored
+    against the new ``lb``/``ub`` with the job's quality settings and draws,
+    which takes milliseconds. The candidates stay those of the original
+    bounds, so for a large change of the intervals submit a new problem.
+    """
+    jobs: JobManager = request.app.state.jobs
+    try:
+        result = jobs.rescore(job_id, bounds.model_dump())
+    except RescoreUnavailable as exc:
+        return JSONResponse(
+            status_code=status.HTTP_409_CONFLICT, content={"detail": str(exc)}
+        )
+    except SolveError as exc:
+        return JSONResponse(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            content={"detail": exc.messages},
+        )
+    if result is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={"detail": f"No job with id {job_id!r}."},
+        )
+    return SolveResponse(**result)
+
+
+@app.delete(
+    "/jobs/{job_id}",
+    tags=["solve"],
+    summary="Cancel a pending or running job",
+    response_model=JobStatusResponse,
+    responses={
+        200: {"description": "The job had already finished; nothing changed"},
+        202: {"description": "Cancellation requested; the job stops at its "
+              "next checkpoint and ends `cancelled`"},
+        404: {"description": "Unknown job id"},
+    },
+)
+def cancel_job(job_id: str, request: Request) -> JSONResponse:
+    jobs: JobManager = request.app.state.jobs
+    before = jobs.get(job_id)
+    if before is None:
+        return JSONResponse(
+            status_code=status.HTTP_404_NOT_FOUND,
+            content={"detail": f"No job with id {job_id!r}."},
+        )
+    finished = before["status"] in (
+        JobStatus.succeeded,
+        JobStatus.failed,
+        JobStatus.cancelled,
+    )
+    current = jobs.cancel(job_id) or before["status"]
+    return JSONResponse(
+        status_code=status.HTTP_200_OK if finished else status.HTTP_202_ACCEPTED,
+        content={"job_id": job_id, "status": current},
+    )
+
+
+@app.post(
+    "/jobs/status",
+    tags=["solve"],
+    summary="The status of many jobs",
+    response_model=JobsStatusResponse,
+    response_model_exclude_none=True,
+)
+def jobs_status(query: JobsStatusRequest, request: Request) -> JobsStatusResponse:
+    """Status, errors, progress and schedule of each job, read from the store
+    in one round trip. Results are left out; fetch ``GET /jobs/{id}`` for the
+    jobs that have ``succeeded``."""
+    jobs: JobManager = request.app.state.jobs
+    found, unknown = [], []
+    for job_id, record in zip(query.job_ids, jobs.get_many(query.job_ids)):
+        if record is None:
+            unknown.append(job_id)
+            continue
+        found.append(
+            JobStatusResponse(
+                job_id=job_id,
+                status=record["status"],
+                errors=record["errors"],
+                progress=record.get("progress"),
+                schedule=record.get("schedule"),
+            )
+        )
+    return JobsStatusResponse(jobs=found, unknown=unknown)
 
 
 @app.get("/jobs", tags=["solve"], summary="List submitted jobs")
 def list_jobs(request: Request) -> list:
     jobs: JobManager = request.app.state.jobs
     return jobs.list_jobs()
+
+
+@app.get("/limits", tags=["meta"], summary="Queued work and admission capacity")
+def limits(request: Request) -> dict:
+    """Predicted CPU-seconds of the jobs queued or running on this worker,
+    the capacity beyond which ``POST /solve`` answers 429, and the cost model's
+    current calibration."""
+    jobs: JobManager = request.app.state.jobs
+    return jobs.limits()
@@ -45,6 +45,13 @@ class SolveError(Exception):
         return (SolveError, (self.messages,))
 
 
+class SolveCancelled(SolveError):
+    """Raised when a job stops because it was cancelled by request."""
+
+    def __reduce__(self):
+        return (SolveCancelled, (self.messages,))
+
+
 def has_errors(status: List[str]) -> bool:
     """True if any status entry signals a failure."""
     return any("[ERROR]" in entry for entry in status)
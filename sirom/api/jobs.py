@@ -6,8 +6,11 @@ returns immediately; clients poll ``GET /jobs/{id}``.
 Two things are configurable and independent:
 
 * **Executor** (``SIROM_EXECUTOR``) — how a job runs: ``process`` (default,
-  ``ProcessPoolExecutor``: CPU parallelism + crash isolation), ``thread``, or
-  ``inline`` (synchronous; used by tests and the simplest deployments).
+  ``ProcessPoolExecutor``: CPU parallelism + crash isolation; its workers are
+  started and warmed up front, and one that dies or is due for recycling is
+  replaced alone, see :mod:`sirom.api.pool`), ``thread``,
+  ``inline`` (synchronous; used by tests and the simplest deployments), or
+  ``queue`` (a Redis work queue any worker may claim from; see below).
 * **Store** (``SIROM_JOB_STORE``) — where job state lives: ``memory`` (default,
   process-local — run a single uvicorn worker) or ``redis`` (shared across
   workers and durable across restarts, so you can scale out).
@@ -15,27 +18,148 @@ Two things are configurable and independent:
 Job outcomes are always recorded by the **parent** process (via the future's
 done-callback for pool executors), so the same code path works for both stores:
 with Redis, a poll that lands on any worker reads the result the executing
-worker wrote. Execution stays local to the worker that received the request —
-Redis provides shared *state*, not a distributed task queue (a crashed worker
-won't hand its in-flight job to another). That is the documented boundary; a
-Celery/RQ-style queue would be the next step beyond it.
+worker wrote. With the pool executors, execution stays local to the worker
+that received the request, and a crashed worker takes its in-flight jobs with
+it.
+
+``SIROM_EXECUTOR=queue`` lifts that boundary (it requires the Redis store).
+``submit`` only appends the job to a :class:`~sirom.api.work_queue.RedisWorkQueue`;
+every manager consuming the queue (``SIROM_QUEUE_CONSUME``, on by default)
+claims jobs while it has a free process slot, runs them in its own process pool
+and heartbeats their claims. A claim that goes ``SIROM_QUEUE_VISIBILITY``
+seconds without a heartbeat is taken over by another worker, and a job whose
+workers keep dying is failed after ``SIROM_QUEUE_DELIVERIES`` deliveries.
+HTTP frontends can thus run with ``SIROM_QUEUE_CONSUME=0`` and solver capacity
+scale separately, as ``python -m sirom.api.worker`` processes.
+
+A large job (``SIROM_SHARD_SCENARIOS`` scenarios or more) would otherwise use
+one pool slot however idle the rest are. With a pool executor it is sharded
+instead: a parent thread runs the pipeline and dispatches the scenario solves
+and the Monte Carlo count, by scenario range, to the pool (see
+:mod:`sirom.sharding`), so it spreads over the free workers. It takes one
+scheduler slot per shard, as many as its size class may hold, so a large batch
+job does not fill the pool either. Anytime jobs are never sharded.
+
+New jobs pass admission control first (:mod:`sirom.api.admission`): a cost
+model predicts their CPU-seconds and memory, and a job that would push this
+worker's backlog past ``SIROM_QUEUE_SECONDS`` of work per pool slot is
+refused with :class:`~sirom.api.admission.QueueFull` (HTTP 429), one above
+``SIROM_JOB_MEMORY_MB`` with :class:`~sirom.api.admission.JobTooLarge`.
+Cached and joined submissions cost nothing and are always accepted.
+
+Admission goes by predictions; pool workers are held to limits as well
+(:class:`~sirom.api.pool.WorkerLimits`, all off by default). A worker is
+recycled after ``SIROM_WORKER_MAX_TASKS`` tasks, or once its resident set is
+over ``SIROM_WORKER_MAX_RSS_MB`` after one. Each task may grow its worker's
+address space by ``SIROM_JOB_RLIMIT_AS_MB`` and use
+``SIROM_JOB_RLIMIT_CPU_SECONDS`` of CPU time. A job stopped by a limit, or
+whose worker the kernel killed, fails with a message saying so, and only its
+worker is replaced.
+
+Admitted jobs then wait for a pool slot in a
+:class:`~sirom.api.scheduler.FairScheduler` (process and thread mode) rather
+than in the executor's FIFO queue: small jobs get free slots first, each size
+class has a bounded share of the slots, and clients (``X-API-Key`` or address)
+take turns by weighted fair queuing, weighted by ``SIROM_CLIENT_WEIGHTS``.
+Each job's record carries its ``schedule``: client, class and the seconds it
+waited for a slot.
+
+Submissions are content-addressed: a payload identical to one that already
+succeeded (same canonical JSON, options and seed included) returns that job
+instead of solving again, for as long as the store keeps it (LRU in memory,
+TTL in Redis). Identical payloads that arrive while an equivalent job is still
+pending or running join that job (single flight): the first submitter takes an
+``inflight:{fingerprint}`` lease with ``SET NX`` in the store, so with Redis
+the guarantee spans workers; ``SIROM_LEASE_SECONDS`` bounds how long a lease
+outlives a worker that died holding it. An ``Idempotency-Key`` maps client
+retries to the job the first attempt created.
+
+The manager also owns a :class:`~sirom.api.scenario_bank.ScenarioBank`: each
+job references the shared-memory quality-scenario bank for its shape, ``M`` and
+seed, so concurrent jobs on the same shape score against one copy of the draws
+(``SIROM_SCENARIO_BANK_MB`` bounds how much idle seeded banks may keep). It
+keeps the last run of each problem structure too, in shared memory as well
+(:class:`~sirom.api.prior_runs.PriorRuns`, ``SIROM_WARM_START_MB``): a job
+that may warm-start is handed the one for its structure, and its own run is
+kept when the job succeeds, whichever pool process ran it.
+
+While a job runs, the pipeline reports per-phase progress (see
+:meth:`~sirom.run_control.RunControl.report`) a few times per second. Thread
+and inline jobs write the snapshots straight to the store; a pool child puts
+them on a queue shared through the manager's ``multiprocessing.Manager`` and a
+parent thread writes them, so the store is only ever written from the process
+that owns it.
+
+Every status change and progress snapshot is also published as an event to
+subscribers of that job (:meth:`JobStore.subscribe`), which is what
+``GET /jobs/{id}/events`` streams. The memory store delivers to subscribers in
+the same process; the Redis store publishes on a pub/sub channel per job, so
+any worker can serve the stream of a job another worker runs.
+
+A payload may carry a ``callback_url``. It is not part of the job's identity
+(the fingerprint excludes it): the URL is registered on whichever job the
+submission maps to, new, joined or cached, and when that job finishes the
+manager of the worker that recorded the outcome hands it to a bounded
+:class:`~sirom.api.webhooks.WebhookSender`. Registrations live in the store,
+so with Redis a job joined on one worker notifies callbacks registered on
+another. ``SIROM_WEBHOOK_PENDING`` bounds the deliveries a worker keeps
+waiting and ``SIROM_WEBHOOK_ATTEMPTS`` how often each is tried.
+
+A succeeded solve also leaves its candidate pool in the store, every distinct
+decision vector rather than only the frontier, so :meth:`JobManager.rescore`
+can answer "what if the intervals were these?" by re-scoring it, in the
+calling thread, without solving anything.
 """
 
 from __future__ import annotations
 
+import hashlib
 import json
+import math
+import multiprocessing
 import os
+import queue
 import threading
+import time
 from abc import ABC, abstractmethod
-from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from collections import OrderedDict, deque
+from concurrent.futures import (
+    CancelledError,
+    Future,
+    ThreadPoolExecutor,
+)
+from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
-from .errors import SolveError
-from .schemas import JobStatus
-from .service import run_solve_job
+from ..sharding import executor_map
+from .admission import AdmissionController, JobTooLarge, QueueFull
+from .errors import SolveCancelled, SolveError
+from .pool import WorkerLimits, start_pool
+from .prior_runs import PriorRuns
+from .results import PackedResult, dumps
+from .scenario_bank import BankHandle, ScenarioBank
+from .scheduler import FairScheduler, parse_weights
+from .schemas import JobStatus, RescoreRequest
+from .service import rescore_candidates, run_solve_job, run_solve_jobs
+from .webhooks import UnsafeCallback, WebhookSender, notification
+from .work_queue import Claim, RedisWorkQueue
 
 _GENERIC_FAILURE = "The job failed unexpectedly."
+_CANCELLED = "The job was cancelled."
+_ABANDONED = (
+    "The job was given up on after {} workers stopped responding while "
+    "running it."
+)
+_TERMINAL = {
+    JobStatus.succeeded.value,
+    JobStatus.failed.value,
+    JobStatus.cancelled.value,
+}
+# Executor modes whose jobs run in pool children (cross-process flags/progress).
+_POOLED = ("process", "queue")
+# Most small jobs of one batch run back to back as one pool task.
+_PACK_JOBS = 16
 
 
 def _env_int(name: str, default: int) -> int:
@@ -54,12 +178,57 @@ def _max_workers() -> int:
     return _env_int("SIROM_WORKERS", min(os.cpu_count() or 2, 4))
 
 
+def payload_fingerprint(payload: Dict[str, Any]) -> str:
+    """Content address of a validated solve payload.
+
+    SHA-256 of its canonical JSON (sorted keys, no whitespace). The payload is
+    a dump of a validated ``SolveRequest``, so defaults are filled in and every
+    coefficient is already a float: equal problems hash equal however they
+    were written. Options (``seed`` included) are part of the address.
+    """
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class IdempotencyConflict(Exception):
+    """An ``Idempotency-Key`` was reused with a different payload."""
+
+
+class RescoreUnavailable(Exception):
+    """The job has no candidate pool to rescore (not succeeded, or a sweep)."""
+
+
 # ---------------------------------------------------------------------------
 # Job stores
 # ---------------------------------------------------------------------------
 
 # A stored record is a plain dict: {"status": str, "result": dict|None,
-# "errors": list[str]|None}, where status is one of the JobStatus values.
+# "errors": list[str]|None, "progress": dict|None}, where status is one of the
+# JobStatus values. Progress is kept apart from the rest of the record, so a
+# late snapshot can never overwrite an outcome.
+#
+# Stores also keep short string *aliases* next to the records, with the same
+# lifetime unless given their own: ``result:{fingerprint}`` -> id of a job that
+# solved that payload, ``inflight:{fingerprint}`` -> id of the job currently
+# solving it (a lease), ``idempotency:{key}`` -> ``{fingerprint}:{job_id}``, and
+# ``cancel:{job_id}`` -> set once cancellation of that job was requested.
+# Callback URLs waiting for a job to finish are kept per job as well, and so
+# is a succeeded solve's candidate pool (for rescoring), out of its record so
+# polls never carry it.
+#
+# Events are ``{"event": "status", "data": {"status": str}}`` on every record
+# write and ``{"event": "progress", "data": snapshot}`` on every progress write.
+
+
+class JobSubscription(ABC):
+    """Events published for one job since the subscription was made."""
+
+    @abstractmethod
+    def drain(self) -> List[Dict[str, Any]]:
+        """Return (without blocking) the events received since the last call."""
+
+    def close(self) -> None:  # pragma: no cover - default no-op
+        pass
 
 
 class JobStore(ABC):
@@ -75,38 +244,156 @@ class JobStore(ABC):
     @abstractmethod
     def record_failure(self, job_id: str, errors: List[str]) -> None: ...
 
+    @abstractmethod
+    def record_cancellation(self, job_id: str, errors: List[str]) -> None: ...
+
+    @abstractmethod
+    def record_progress(self, job_id: str, progress: Dict[str, Any]) -> None:
+        """Replace the job's latest progress snapshot."""
+
+    @abstractmethod
+    def record_schedule(self, job_id: str, schedule: Dict[str, Any]) -> None:
+        """Replace how the job was scheduled (client, class, queue wait)."""
+
+    @abstractmethod
+    def record_candidates(self, job_id: str, candidates: Dict[str, Any]) -> None:
+        """Keep a succeeded job's candidate pool (for rescoring), beside its
+        result rather than in it."""
+
+    @abstractmethod
+    def fetch_candidates(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return the job's candidate pool, or ``None`` if it has none."""
+
     @abstractmethod
     def fetch(self, job_id: str) -> Optional[Dict[str, Any]]:
-        """Return ``{status, result, errors}`` or ``None`` if unknown."""
+        """Return ``{status, result, errors, progress, schedule}`` or ``None``
+        if unknown."""
 
     @abstractmethod
     def list_ids(self) -> List[str]: ...
 
+    @abstractmethod
+    def get_alias(self, name: str) -> Optional[str]:
+        """Return the value stored under alias ``name``, or ``None``."""
+
+    @abstractmethod
+    def set_alias(
+        self,
+        name: str,
+        value: str,
+        only_if_absent: bool = False,
+        ttl_seconds: Optional[int] = None,
+    ) -> bool:
+        """Point ``name`` at ``value``; with ``only_if_absent``, atomically
+        refuse (returning ``False``) when the alias already exists.
+        ``ttl_seconds`` overrides the store's lifetime where it has one."""
+
+    @abstractmethod
+    def delete_alias(self, name: str, value: Optional[str] = None) -> None:
+        """Remove ``name`` (only while it still points at ``value``, if given)."""
+
+    @abstractmethod
+    def subscribe(self, job_id: str) -> JobSubscription:
+        """Start receiving the events published for ``job_id``."""
+
+    @abstractmethod
+    def add_callback(self, job_id: str, url: str) -> None:
+        """Register ``url`` to be notified when ``job_id`` finishes."""
+
+    @abstractmethod
+    def pop_callbacks(self, job_id: str) -> List[str]:
+        """Atomically take (and forget) the URLs registered for ``job_id``."""
+
+    # Batched forms for bulk endpoints. A shared store overrides them with one
+    # round trip each; these defaults only loop.
+
+    def fetch_many(self, job_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """:meth:`fetch` each of ``job_ids``, in order."""
+        return [self.fetch(job_id) for job_id in job_ids]
+
+    def get_aliases(self, names: List[str]) -> List[Optional[str]]:
+        """:meth:`get_alias` each of ``names``, in order."""
+        return [self.get_alias(name) for name in names]
+
+    def set_aliases(
+        self,
+        aliases: Dict[str, str],
+        only_if_absent: bool = False,
+        ttl_seconds: Optional[int] = None,
+    ) -> List[bool]:
+        """:meth:`set_alias` each item of ``aliases``; one result per item."""
+        return [
+            self.set_alias(name, value, only_if_absent, ttl_seconds)
+            for name, value in aliases.items()
+        ]
+
+    def create_many(self, schedules: Dict[str, Dict[str, Any]]) -> None:
+        """:meth:`create` each job and record its schedule."""
+        for job_id, schedule in schedules.items():
+            self.create(job_id)
+            self.record_schedule(job_id, schedule)
+
     def close(self) -> None:  # pragma: no cover - default no-op
         pass
 
 
+class _MemorySubscription(JobSubscription):
+    def __init__(self, store: "InMemoryJobStore", job_id: str):
+        self._store = store
+        self.job_id = job_id
+        # Appended to by writer threads; deque appends and pops are atomic.
+        self.events: "deque[Dict[str, Any]]" = deque()
+
+    def drain(self) -> List[Dict[str, Any]]:
+        drained = []
+        while self.events:
+            drained.append(self.events.popleft())
+        return drained
+
+    def close(self) -> None:
+        self._store._unsubscribe(self)
+
+
 class InMemoryJobStore(JobStore):
     """Process-local store. Fine for a single worker; lost on restart."""
 
     def __init__(self, max_jobs: int = 1000):
         self._lock = threading.Lock()
         self._data: "Dict[str, Dict[str, Any]]" = {}
+        self._progress: "Dict[str, Dict[str, Any]]" = {}
+        self._schedule: "Dict[str, Dict[str, Any]]" = {}
+        self._candidates: "Dict[str, Dict[str, Any]]" = {}
+        self._aliases: "OrderedDict[str, str]" = OrderedDict()
+        self._subscribers: "Dict[str, List[_MemorySubscription]]" = {}
+        self._callbacks: "Dict[str, List[str]]" = {}
         self._max_jobs = max_jobs
 
     def _set(self, job_id: str, record: Dict[str, Any]) -> None:
         with self._lock:
             self._data[job_id] = record
+        self._publish(job_id, "status", {"status": record["status"]})
+
+    def _publish(self, job_id: str, event: str, data: Dict[str, Any]) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(job_id, ()))
+        for subscription in subscribers:
+            subscription.events.append({"event": event, "data": data})
 
     def create(self, job_id: str) -> None:
         with self._lock:
             while len(self._data) >= self._max_jobs:
-                self._data.pop(next(iter(self._data)))
+                oldest = next(iter(self._data))
+                self._data.pop(oldest)
+                self._progress.pop(oldest, None)
+                self._schedule.pop(oldest, None)
+                self._candidates.pop(oldest, None)
+                self._callbacks.pop(oldest, None)
             self._data[job_id] = {
                 "status": JobStatus.pending.value,
                 "result": None,
                 "errors": None,
             }
+        self._publish(job_id, "status", {"status": JobStatus.pending.value})
 
     def record_success(self, job_id: str, result: Dict[str, Any]) -> None:
         self._set(job_id, {"status": JobStatus.succeeded.value, "result": result, "errors": None})
@@ -114,21 +401,127 @@ class InMemoryJobStore(JobStore):
     def record_failure(self, job_id: str, errors: List[str]) -> None:
         self._set(job_id, {"status": JobStatus.failed.value, "result": None, "errors": errors})
 
+    def record_cancellation(self, job_id: str, errors: List[str]) -> None:
+        self._set(job_id, {"status": JobStatus.cancelled.value, "result": None, "errors": errors})
+
+    def record_progress(self, job_id: str, progress: Dict[str, Any]) -> None:
+        with self._lock:
+            if job_id not in self._data:
+                return
+            self._progress[job_id] = progress
+        self._publish(job_id, "progress", progress)
+
+    def record_schedule(self, job_id: str, schedule: Dict[str, Any]) -> None:
+        with self._lock:
+            if job_id in self._data:
+                self._schedule[job_id] = schedule
+
+    def record_candidates(self, job_id: str, candidates: Dict[str, Any]) -> None:
+        with self._lock:
+            if job_id in self._data:
+                self._candidates[job_id] = candidates
+
+    def fetch_candidates(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._candidates.get(job_id)
+
     def fetch(self, job_id: str) -> Optional[Dict[str, Any]]:
         with self._lock:
             record = self._data.get(job_id)
-            return dict(record) if record is not None else None
+            if record is None:
+                return None
+            return {
+                **record,
+                "progress": self._progress.get(job_id),
+                "schedule": self._schedule.get(job_id),
+            }
 
     def list_ids(self) -> List[str]:
         with self._lock:
             return list(self._data.keys())
 
+    def get_alias(self, name: str) -> Optional[str]:
+        with self._lock:
+            value = self._aliases.get(name)
+            if value is not None:
+                self._aliases.move_to_end(name)
+            return value
+
+    def set_alias(
+        self,
+        name: str,
+        value: str,
+        only_if_absent: bool = False,
+        ttl_seconds: Optional[int] = None,
+    ) -> bool:
+        # No expiry here: the store dies with the process that holds leases.
+        with self._lock:
+            if only_if_absent and name in self._aliases:
+                return False
+            self._aliases[name] = value
+            self._aliases.move_to_end(name)
+            # LRU, bounded like the records it points at.
+            while len(self._aliases) > self._max_jobs:
+                self._aliases.popitem(last=False)
+            return True
+
+    def delete_alias(self, name: str, value: Optional[str] = None) -> None:
+        with self._lock:
+            if value is None or self._aliases.get(name) == value:
+                self._aliases.pop(name, None)
+
+    def subscribe(self, job_id: str) -> JobSubscription:
+        subscription = _MemorySubscription(self, job_id)
+        with self._lock:
+            self._subscribers.setdefault(job_id, []).append(subscription)
+        return subscription
+
+    def add_callback(self, job_id: str, url: str) -> None:
+        with self._lock:
+            self._callbacks.setdefault(job_id, []).append(url)
+
+    def pop_callbacks(self, job_id: str) -> List[str]:
+        with self._lock:
+            return self._callbacks.pop(job_id, [])
+
+    def _unsubscribe(self, subscription: _MemorySubscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.job_id, [])
+            if subscription in subscribers:
+                subscribers.remove(subscription)
+            if not subscribers:
+                self._subscribers.pop(subscription.job_id, None)
+
+
+class _RedisSubscription(JobSubscription):
+    def __init__(self, pubsub: Any):
+        self._pubsub = pubsub
+
+    def drain(self) -> List[Dict[str, Any]]:
+        drained = []
+        while True:
+            # Not ignore_subscribe_messages: it turns the subscribe
+            # confirmation into a None, indistinguishable from "no more".
+            message = self._pubsub.get_message(timeout=0.0)
+            if message is None:
+                return drained
+            if message["type"] == "message":
+                drained.append(json.loads(message["data"]))
+
+    def close(self) -> None:
+        try:
+            self._pubsub.close()
+        except Exception:  # pragma: no cover
+            pass
+
 
 class RedisJobStore(JobStore):
     """Shared store backed by Redis, so multiple workers see the same jobs.
 
     Each job is a JSON value under ``{key_prefix}{job_id}`` with a TTL, so old
-    jobs expire automatically. ``client`` can be injected (e.g. fakeredis) for
+    jobs expire automatically. A succeeded job's result is kept apart, as the
+    JSON it is served as (``{result_prefix}{job_id}``), and read back as a
+    :class:`~sirom.api.results.PackedResult` without being parsed. ``client`` can be injected (e.g. fakeredis) for
     tests; otherwise a client is created from ``url``.
     """
 
@@ -138,6 +531,13 @@ class RedisJobStore(JobStore):
         ttl_seconds: int = 86_400,
         client: Any = None,
         key_prefix: str = "sirom:job:",
+        alias_prefix: str = "sirom:alias:",
+        progress_prefix: str = "sirom:progress:",
+        schedule_prefix: str = "sirom:schedule:",
+        candidates_prefix: str = "sirom:candidates:",
+        events_prefix: str = "sirom:events:",
+        callbacks_prefix: str = "sirom:callbacks:",
+        result_prefix: str = "sirom:result:",
     ):
         if client is None:
             try:
@@ -151,12 +551,29 @@ class RedisJobStore(JobStore):
         self._redis = client
         self._ttl = ttl_seconds
         self._prefix = key_prefix
+        self._alias_prefix = alias_prefix
+        self._progress_prefix = progress_prefix
+        self._schedule_prefix = schedule_prefix
+        self._candidates_prefix = candidates_prefix
+        self._events_prefix = events_prefix
+        self._callbacks_prefix = callbacks_prefix
+        self._result_prefix = result_prefix
 
     def _key(self, job_id: str) -> str:
         return f"{self._prefix}{job_id}"
 
     def _write(self, job_id: str, record: Dict[str, Any]) -> None:
-        self._redis.set(self._key(job_id), json.dumps(record), ex=self._ttl)
+        pipe = self._redis.pipeline()
+        pipe.set(self._key(job_id), json.dumps(record), ex=self._ttl)
+        self._publish(pipe, job_id, "status", {"status": record["status"]})
+        pipe.execute()
+
+    def _publish(self, pipe: Any, job_id: str, event: str, data: Dict[str, Any]) -> None:
+        # Written before it is announced, so a subscriber that fetches on an
+        # event reads at least that state.
+        pipe.publish(
+            f"{self._events_prefix}{job_id}", json.dumps({"event": event, "data": data})
+        )
 
     def create(self, job_id: str) -> None:
         self._write(
@@ -165,19 +582,155 @@ class RedisJobStore(JobStore):
         )
 
     def record_success(self, job_id: str, result: Dict[str, Any]) -> None:
-        self._write(job_id, {"status": JobStatus.succeeded.value, "result": result, "errors": None})
+        encoded = result.json() if isinstance(result, PackedResult) else dumps(result)
+        pipe = self._redis.pipeline()
+        pipe.set(f"{self._result_prefix}{job_id}", encoded, ex=self._ttl)
+        record = {"status": JobStatus.succeeded.value, "result": None, "errors": None}
+        pipe.set(self._key(job_id), json.dumps(record), ex=self._ttl)
+        self._publish(pipe, job_id, "status", {"status": record["status"]})
+        pipe.execute()
 
     def record_failure(self, job_id: str, errors: List[str]) -> None:
         self._write(job_id, {"status": JobStatus.failed.value, "result": None, "errors": errors})
 
-    def fetch(self, job_id: str) -> Optional[Dict[str, Any]]:
-        raw = self._redis.get(self._key(job_id))
+    def record_cancellation(self, job_id: str, errors: List[str]) -> None:
+        self._write(job_id, {"status": JobStatus.cancelled.value, "result": None, "errors": errors})
+
+    def record_progress(self, job_id: str, progress: Dict[str, Any]) -> None:
+        pipe = self._redis.pipeline()
+        pipe.set(f"{self._progress_prefix}{job_id}", json.dumps(progress), ex=self._ttl)
+        self._publish(pipe, job_id, "progress", progress)
+        pipe.execute()
+
+    def record_schedule(self, job_id: str, schedule: Dict[str, Any]) -> None:
+        self._redis.set(
+            f"{self._schedule_prefix}{job_id}", json.dumps(schedule), ex=self._ttl
+        )
+
+    def record_candidates(self, job_id: str, candidates: Dict[str, Any]) -> None:
+        self._redis.set(
+            f"{self._candidates_prefix}{job_id}", dumps(candidates), ex=self._ttl
+        )
+
+    def fetch_candidates(self, job_id: str) -> Optional[Dict[str, Any]]:
+        raw = self._redis.get(f"{self._candidates_prefix}{job_id}")
         return json.loads(raw) if raw else None
 
+    def fetch(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.fetch_many([job_id])[0]
+
+    @staticmethod
+    def _record(
+        raw: Optional[str],
+        progress: Optional[str],
+        schedule: Optional[str],
+        result: Optional[str],
+    ) -> Optional[Dict[str, Any]]:
+        if not raw:
+            return None
+        record = {
+            **json.loads(raw),
+            "progress": json.loads(progress) if progress else None,
+            "schedule": json.loads(schedule) if schedule else None,
+        }
+        if result:
+            record["result"] = PackedResult.decoded(result)
+        return record
+
+    def fetch_many(self, job_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        if not job_ids:
+            return []
+        values = self._redis.mget(
+            [self._key(job_id) for job_id in job_ids]
+            + [f"{self._progress_prefix}{job_id}" for job_id in job_ids]
+            + [f"{self._schedule_prefix}{job_id}" for job_id in job_ids]
+            + [f"{self._result_prefix}{job_id}" for job_id in job_ids]
+        )
+        count = len(job_ids)
+        return [self._record(*values[index::count]) for index in range(count)]
+
+    def get_aliases(self, names: List[str]) -> List[Optional[str]]:
+        if not names:
+            return []
+        return self._redis.mget([f"{self._alias_prefix}{name}" for name in names])
+
+    def set_aliases(
+        self,
+        aliases: Dict[str, str],
+        only_if_absent: bool = False,
+        ttl_seconds: Optional[int] = None,
+    ) -> List[bool]:
+        pipe = self._redis.pipeline(transaction=False)
+        for name, value in aliases.items():
+            pipe.set(
+                f"{self._alias_prefix}{name}",
+                value,
+                ex=ttl_seconds or self._ttl,
+                nx=only_if_absent,
+            )
+        return [bool(stored) for stored in pipe.execute()]
+
+    def create_many(self, schedules: Dict[str, Dict[str, Any]]) -> None:
+        pipe = self._redis.pipeline(transaction=False)
+        pending = {"status": JobStatus.pending.value, "result": None, "errors": None}
+        for job_id, schedule in schedules.items():
+            pipe.set(self._key(job_id), json.dumps(pending), ex=self._ttl)
+            pipe.set(
+                f"{self._schedule_prefix}{job_id}", json.dumps(schedule), ex=self._ttl
+            )
+            self._publish(pipe, job_id, "status", {"status": pending["status"]})
+        pipe.execute()
+
     def list_ids(self) -> List[str]:
         start = len(self._prefix)
         return [key[start:] for key in self._redis.scan_iter(match=f"{self._prefix}*", count=100)]
 
+    def get_alias(self, name: str) -> Optional[str]:
+        return self._redis.get(f"{self._alias_prefix}{name}")
+
+    def set_alias(
+        self,
+        name: str,
+        value: str,
+        only_if_absent: bool = False,
+        ttl_seconds: Optional[int] = None,
+    ) -> bool:
+        stored = self._redis.set(
+            f"{self._alias_prefix}{name}",
+            value,
+            ex=ttl_seconds or self._ttl,
+            nx=only_if_absent,
+        )
+        return bool(stored)
+
+    def delete_alias(self, name: str, value: Optional[str] = None) -> None:
+        key = f"{self._alias_prefix}{name}"
+        # Check-then-delete is not atomic; losing the race only drops a lease
+        # early, which costs at most one duplicate solve.
+        if value is None or self._redis.get(key) == value:
+            self._redis.delete(key)
+
+    def add_callback(self, job_id: str, url: str) -> None:
+        key = f"{self._callbacks_prefix}{job_id}"
+        pipe = self._redis.pipeline()
+        pipe.rpush(key, url)
+        pipe.expire(key, self._ttl)
+        pipe.execute()
+
+    def pop_callbacks(self, job_id: str) -> List[str]:
+        key = f"{self._callbacks_prefix}{job_id}"
+        # MULTI/EXEC: two workers popping at once cannot both get the URLs.
+        pipe = self._redis.pipeline(transaction=True)
+        pipe.lrange(key, 0, -1)
+        pipe.delete(key)
+        urls, _ = pipe.execute()
+        return list(urls)
+
+    def subscribe(self, job_id: str) -> JobSubscription:
+        pubsub = self._redis.pubsub()
+        pubsub.subscribe(f"{self._events_prefix}{job_id}")
+        return _RedisSubscription(pubsub)
+
     def close(self) -> None:
         try:
             self._redis.close()
@@ -204,6 +757,48 @@ def build_store_from_env() -> JobStore:
 # ---------------------------------------------------------------------------
 
 
+class _StoreProgress:
+    """Progress sink for thread and inline jobs: writes to the store directly."""
+
+    def __init__(self, store: JobStore, job_id: str):
+        self._store = store
+        self._job_id = job_id
+
+    def __call__(self, snapshot: Dict[str, Any]) -> None:
+        try:
+            self._store.record_progress(self._job_id, snapshot)
+        except Exception:  # noqa: BLE001 - progress is best effort
+            pass
+
+
+class _QueuedProgress:
+    """Progress sink for a pool child: tags snapshots with the job id and
+    puts them on the parent's queue (a picklable Manager proxy)."""
+
+    def __init__(self, channel: Any, job_id: str):
+        self._channel = channel
+        self._job_id = job_id
+
+    def __call__(self, snapshot: Dict[str, Any]) -> None:
+        try:
+            self._channel.put((self._job_id, snapshot))
+        except Exception:  # noqa: BLE001 - never fail a solve over progress
+            pass
+
+
+@dataclass(frozen=True)
+class _PendingJob:
+    """A batch's job, set up and waiting to be launched."""
+
+    job_id: str
+    fingerprint: str
+    payload: Dict[str, Any]
+    bank: Optional[BankHandle]
+    flag: Any
+    progress: Any
+    schedule: Dict[str, Any]
+
+
 class JobManager:
     """Runs jobs on an executor and records their outcomes in a store."""
 
@@ -212,74 +807,1006 @@ class JobManager:
         executor_mode: Optional[str] = None,
         store: Optional[JobStore] = None,
         max_workers: Optional[int] = None,
+        scenario_bank: Optional[ScenarioBank] = None,
+        webhooks: Optional[WebhookSender] = None,
+        work_queue: Optional[RedisWorkQueue] = None,
+        consume: Optional[bool] = None,
+        admission: Optional[AdmissionController] = None,
+        scheduler: Optional[FairScheduler] = None,
     ):
         self.mode = (executor_mode or os.getenv("SIROM_EXECUTOR", "process")).lower()
         self._store = store if store is not None else build_store_from_env()
+        self.scenario_bank = (
+            scenario_bank
+            if scenario_bank is not None
+            else ScenarioBank(_env_int("SIROM_SCENARIO_BANK_MB", 256) * 2**20)
+        )
+        self.prior_runs = PriorRuns(_env_int("SIROM_WARM_START_MB", 256) * 2**20)
+        self.webhooks = (
+            webhooks
+            if webhooks is not None
+            else WebhookSender(
+                max_pending=_env_int("SIROM_WEBHOOK_PENDING", 1000),
+                max_attempts=_env_int("SIROM_WEBHOOK_ATTEMPTS", 6),
+                allowed_hosts=[
+                    host.strip()
+                    for host in os.getenv("SIROM_WEBHOOK_HOSTS", "").split(",")
+                    if host.strip()
+                ],
+                allow_private=os.getenv("SIROM_WEBHOOK_ALLOW_PRIVATE", "0") != "0",
+            )
+        )
         self._lock = threading.Lock()
         self._futures: "Dict[str, Future]" = {}
-        workers = max_workers or _max_workers()
+        # How long an in-flight lease outlives a worker that died holding it.
+        self._lease_seconds = _env_int("SIROM_LEASE_SECONDS", 900)
+        # One cancel flag per job this worker runs. Pool children need a flag
+        # they can read across the process boundary: Event proxies from a
+        # multiprocessing Manager, started on first use. The same Manager
+        # holds the queue pool children send progress snapshots on.
+        self._flags: "Dict[str, Any]" = {}
+        self._sync_manager: Optional[Any] = None
+        self._progress_channel: Optional[Any] = None
+        self._drainer: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._watcher: Optional[threading.Thread] = None
+        self._queue: Optional[RedisWorkQueue] = None
+        # job id -> stream entry of the queue claims this worker is running.
+        self._claims: Dict[str, str] = {}
+        self._workers = workers = max_workers or _max_workers()
+        # Threads running sharded jobs' pipelines, which fan out to the pool.
+        self._orchestrator: Optional[ThreadPoolExecutor] = None
+        self._shard_scenarios = _env_int("SIROM_SHARD_SCENARIOS", 400)
+        self.admission = (
+            admission
+            if admission is not None
+            else AdmissionController(
+                workers,
+                capacity_seconds=_env_int("SIROM_QUEUE_SECONDS", 600),
+                max_job_memory_bytes=_env_int("SIROM_JOB_MEMORY_MB", 4096) * 2**20,
+            )
+        )
+        # Classifies every job; orders launches onto the pool in process and
+        # thread mode (queue mode claims only as many jobs as it has slots).
+        self.scheduler = (
+            scheduler
+            if scheduler is not None
+            else FairScheduler(
+                workers, weights=parse_weights(os.getenv("SIROM_CLIENT_WEIGHTS"))
+            )
+        )
 
+        # Warm-up futures of the pool's workers (none for on-demand pools).
+        self._pool_ready: List[Future] = []
+        warm = os.getenv("SIROM_WARM_POOL", "1") != "0"
+        # What a pool worker may accumulate before it is replaced, and what
+        # one task may use (off unless set).
+        worker_limits = WorkerLimits(
+            max_tasks=_env_int("SIROM_WORKER_MAX_TASKS", 0),
+            max_rss_bytes=_env_int("SIROM_WORKER_MAX_RSS_MB", 0) * 2**20,
+            job_memory_bytes=_env_int("SIROM_JOB_RLIMIT_AS_MB", 0) * 2**20,
+            job_cpu_seconds=_env_int("SIROM_JOB_RLIMIT_CPU_SECONDS", 0),
+        )
         if self.mode == "process":
-            self._executor: Optional[Any] = ProcessPoolExecutor(max_workers=workers)
+            self._executor: Optional[Any]
+            self._executor, self._pool_ready = start_pool(
+                workers, warm, worker_limits
+            )
         elif self.mode == "thread":
             self._executor = ThreadPoolExecutor(max_workers=workers)
         elif self.mode == "inline":
             self._executor = None
+        elif self.mode == "queue":
+            if isinstance(self._store, InMemoryJobStore):
+                raise ValueError(
+                    "SIROM_EXECUTOR=queue needs a store every worker shares; "
+                    "set SIROM_JOB_STORE=redis."
+                )
+            self._queue = work_queue if work_queue is not None else RedisWorkQueue(
+                url=os.getenv("SIROM_REDIS_URL", "redis://localhost:6379/0"),
+                visibility_seconds=_env_int("SIROM_QUEUE_VISIBILITY", 60),
+                max_deliveries=_env_int("SIROM_QUEUE_DELIVERIES", 3),
+            )
+            if consume is None:
+                consume = os.getenv("SIROM_QUEUE_CONSUME", "1") != "0"
+            self._executor = None
+            if consume:
+                self._executor, self._pool_ready = start_pool(
+                    workers, warm, worker_limits
+                )
+                for target in (self._consume, self._heartbeat):
+                    threading.Thread(target=target, daemon=True).start()
         else:
             raise ValueError(
                 f"Unknown SIROM_EXECUTOR mode {self.mode!r}; expected "
-                "'process', 'thread', or 'inline'."
+                "'process', 'thread', 'inline', or 'queue'."
             )
+        if self._pool_ready:
+            # The first pooled job's cancel flag needs it: start it now too.
+            self._shared()
+
+    def submit(
+        self,
+        payload: Dict[str, Any],
+        idempotency_key: Optional[str] = None,
+        client: str = "anonymous",
+    ) -> str:
+        """Enqueue a solve and return its job id.
+
+        Identical payloads are content-addressed: if one already succeeded and
+        is still in the store, or is pending/running right now (on this or,
+        with Redis, any worker), its job id is returned without solving again.
+        A repeated ``idempotency_key`` returns the job it first created
+        (whatever its status) and raises :class:`IdempotencyConflict` if the
+        payload differs. A new job may be refused by admission control
+        (:class:`~sirom.api.admission.QueueFull`,
+        :class:`~sirom.api.admission.JobTooLarge`).
+
+        A ``callback_url`` in the payload is notified when the returned job
+        finishes (at once if it already has), except on an idempotent replay,
+        whose first attempt registered it already. One the webhook sender may
+        not call raises :class:`~sirom.api.webhooks.UnsafeCallback` first.
+
+        ``client`` (an API key digest or an IP address) is whose share of the
+        pool a new job is queued under (see :mod:`sirom.api.scheduler`).
+        """
+        payload = dict(payload)
+        callback_url = payload.pop("callback_url", None)
+        if callback_url is not None:
+            self.webhooks.check(callback_url)
+        fingerprint = payload_fingerprint(payload)
+        # An expired job frees its key for reuse.
+        replace = False
+        if idempotency_key is not None:
+            existing = self._idempotent_job(idempotency_key, fingerprint)
+            if existing is not None and self._store.fetch(existing) is not None:
+                return existing
+            replace = existing is not None
+
+        job_id = self._cached_job(fingerprint) or self._inflight_job(fingerprint)
+        if job_id is not None:
+            self._claim(idempotency_key, fingerprint, job_id, replace)
+            self._watch_for(job_id, callback_url)
+            return job_id
 
-    def submit(self, payload: Dict[str, Any]) -> str:
-        """Enqueue a solve and return its job id."""
         job_id = uuid4().hex
+        cost = self.admission.admit(
+            job_id, payload, calibrate=self._calibrates(payload)
+        )
+        lease = f"inflight:{fingerprint}"
+        if not self._store.set_alias(
+            lease, job_id, only_if_absent=True, ttl_seconds=self._lease_seconds
+        ):
+            # Someone else (maybe another worker) leased it since we looked.
+            holder = self._inflight_job(fingerprint)
+            if holder is not None:
+                self.admission.finished(job_id)
+                self._claim(idempotency_key, fingerprint, holder, replace)
+                self._watch_for(holder, callback_url)
+                return holder
+            # The holder failed or vanished without releasing: take over.
+            self._store.set_alias(lease, job_id, ttl_seconds=self._lease_seconds)
+        if not self._claim(idempotency_key, fingerprint, job_id, replace):
+            # A concurrent retry with the same key won the claim.
+            self.admission.finished(job_id)
+            self._store.delete_alias(lease, job_id)
+            assert idempotency_key is not None
+            return self._idempotent_job(idempotency_key, fingerprint) or job_id
         self._store.create(job_id)
+        if callback_url is not None:
+            self._store.add_callback(job_id, callback_url)
+        schedule = {
+            "client": client,
+            "priority": self.scheduler.classify(cost.cpu_seconds),
+            "estimated_cpu_seconds": round(cost.cpu_seconds, 3),
+        }
+        self._store.record_schedule(job_id, schedule)
+        if self._queue is not None:
+            self._queue.enqueue(job_id, fingerprint, payload)
+            return job_id
+        bank = self.scenario_bank.acquire(payload)
+        flag = self._new_flag()
+        progress = self._progress_sink(job_id)
+        with self._lock:
+            self._flags[job_id] = flag
+        if self.mode == "inline":
+            self._store.record_schedule(job_id, {**schedule, "wait_seconds": 0.0})
+            self._run_inline(job_id, fingerprint, payload, bank, flag, progress)
+        else:
+            self._launch(
+                job_id, fingerprint, payload, bank, flag, progress, schedule=schedule
+            )
+        return job_id
+
+    def submit_many(
+        self, payloads: List[Dict[str, Any]], client: str = "anonymous"
+    ) -> List[Dict[str, Any]]:
+        """Submit many problems at once; return one outcome per payload, in order.
+
+        An outcome is ``{"job_id": ...}``, or for a problem refused
+        ``{"error": ..., "retry_after": ...}``: by admission control, or
+        because its ``callback_url`` may not be called (``retry_after`` is
+        ``None`` unless a retry could succeed). Caching and single flight work
+        as in :meth:`submit`, and identical payloads in the batch share one
+        job, but the store is consulted and written in a few batched round
+        trips instead of several per problem. New jobs
+        small enough to be ``interactive`` are packed together, up to
+        ``_PACK_JOBS`` per pool task, so they pay for one dispatch per pack.
+        """
+        items = []
+        refused: Dict[int, Dict[str, Any]] = {}
+        for index, payload in enumerate(payloads):
+            payload = dict(payload)
+            callback_url = payload.pop("callback_url", None)
+            if callback_url is not None:
+                try:
+                    self.webhooks.check(callback_url)
+                except UnsafeCallback as exc:
+                    refused[index] = {"error": str(exc), "retry_after": None}
+                    continue
+            items.append((payload_fingerprint(payload), payload, callback_url))
+        fingerprints = list(dict.fromkeys(fingerprint for fingerprint, _, _ in items))
+        payload_of = {fingerprint: payload for fingerprint, payload, _ in items}
+
+        outcomes: Dict[str, Dict[str, Any]] = {}
+        for fingerprint, job_id in self._existing_jobs(fingerprints).items():
+            outcomes[fingerprint] = {"job_id": job_id}
+        fresh: Dict[str, Any] = {}
+        for fingerprint in fingerprints:
+            if fingerprint in outcomes:
+                continue
+            job_id = uuid4().hex
+            payload = payload_of[fingerprint]
+            try:
+                cost = self.admission.admit(
+                    job_id, payload, calibrate=self._calibrates(payload)
+                )
+            except QueueFull as exc:
+                outcomes[fingerprint] = {"error": str(exc), "retry_after": exc.retry_after}
+                continue
+            except JobTooLarge as exc:
+                outcomes[fingerprint] = {"error": str(exc), "retry_after": None}
+                continue
+            fresh[fingerprint] = (job_id, cost)
+        leased = self._store.set_aliases(
+            {f"inflight:{fp}": job_id for fp, (job_id, _) in fresh.items()},
+            only_if_absent=True,
+            ttl_seconds=self._lease_seconds,
+        )
+        for fingerprint, won in zip(list(fresh), leased):
+            if won:
+                continue
+            # Leased by someone else since we looked: the single-job path
+            # joins or takes over as it would for one submission.
+            self.admission.finished(fresh.pop(fingerprint)[0])
+            try:
+                outcomes[fingerprint] = {
+                    "job_id": self.submit(payload_of[fingerprint], client=client)
+                }
+            except QueueFull as exc:
+                outcomes[fingerprint] = {"error": str(exc), "retry_after": exc.retry_after}
+            except JobTooLarge as exc:
+                outcomes[fingerprint] = {"error": str(exc), "retry_after": None}
+
+        schedules = {
+            job_id: {
+                "client": client,
+                "priority": self.scheduler.classify(cost.cpu_seconds),
+                "estimated_cpu_seconds": round(cost.cpu_seconds, 3),
+            }
+            for job_id, cost in fresh.values()
+        }
+        self._store.create_many(schedules)
+        for fingerprint, (job_id, _) in fresh.items():
+            outcomes[fingerprint] = {"job_id": job_id}
+        for fingerprint, _, callback_url in items:
+            job_id = outcomes[fingerprint].get("job_id")
+            if job_id is not None:
+                self._watch_for(job_id, callback_url)
+        self._start_many(
+            [(job_id, fp, payload_of[fp], schedules[job_id]) for fp, (job_id, _) in fresh.items()],
+            client,
+        )
+        accepted = iter(outcomes[fingerprint] for fingerprint, _, _ in items)
+        return [
+            refused[index] if index in refused else next(accepted)
+            for index in range(len(payloads))
+        ]
+
+    def _existing_jobs(self, fingerprints: List[str]) -> Dict[str, str]:
+        """The cached or in-flight job of each fingerprint that has one, in
+        two store round trips (see :meth:`_cached_job`, :meth:`_inflight_job`)."""
+        aliases = self._store.get_aliases(
+            [f"result:{fp}" for fp in fingerprints]
+            + [f"inflight:{fp}" for fp in fingerprints]
+        )
+        job_ids = list(dict.fromkeys(job_id for job_id in aliases if job_id))
+        statuses = {
+            job_id: record["status"]
+            for job_id, record in zip(job_ids, self._store.fetch_many(job_ids))
+            if record is not None
+        }
+        existing = {}
+        for fingerprint, cached, inflight in zip(
+            fingerprints, aliases, aliases[len(fingerprints) :]
+        ):
+            if cached and statuses.get(cached) == JobStatus.succeeded.value:
+                existing[fingerprint] = cached
+            elif inflight and statuses.get(inflight) not in (
+                None,
+                JobStatus.failed.value,
+                JobStatus.cancelled.value,
+            ):
+                existing[fingerprint] = inflight
+        return existing
+
+    def _start_many(self, jobs: List[Any], client: str) -> None:
+        """Start new ``(job_id, fingerprint, payload, schedule)`` jobs of a batch."""
+        if not jobs:
+            return
+        if self._queue is not None:
+            self._queue.enqueue_many([(job_id, fp, payload) for job_id, fp, payload, _ in jobs])
+            return
+        started: List[_PendingJob] = []
+        for job_id, fingerprint, payload, schedule in jobs:
+            bank = self.scenario_bank.acquire(payload)
+            flag = self._new_flag()
+            with self._lock:
+                self._flags[job_id] = flag
+            started.append(
+                _PendingJob(
+                    job_id=job_id,
+                    fingerprint=fingerprint,
+                    payload=payload,
+                    bank=bank,
+                    flag=flag,
+                    progress=self._progress_sink(job_id),
+                    schedule=schedule,
+                )
+            )
         if self.mode == "inline":
-            self._run_inline(job_id, payload)
+            for job in started:
+                self._store.record_schedule(
+                    job.job_id, {**job.schedule, "wait_seconds": 0.0}
+                )
+                self._run_inline(
+                    job.job_id,
+                    job.fingerprint,
+                    job.payload,
+                    job.bank,
+                    job.flag,
+                    job.progress,
+                )
+            return
+        small = [
+            job
+            for job in started
+            if job.schedule["priority"] == "interactive"
+            and not self._sharded(job.payload)
+        ]
+        packed = {job.job_id for job in small}
+        for job in started:
+            if job.job_id not in packed:
+                self._launch_pending(job)
+        # Spread the small jobs over every worker, in packs that stay small.
+        per_pack = max(1, min(_PACK_JOBS, math.ceil(len(small) / self._workers)))
+        pack: List[_PendingJob] = []
+        for job in small:
+            seconds = sum(j.schedule["estimated_cpu_seconds"] for j in pack)
+            if pack and (
+                len(pack) >= per_pack
+                or seconds + job.schedule["estimated_cpu_seconds"]
+                > self.scheduler.interactive_seconds
+            ):
+                self._launch_pack(pack, client)
+                pack = []
+            pack.append(job)
+        if pack:
+            self._launch_pack(pack, client)
+
+    def _launch_pending(self, job: _PendingJob) -> None:
+        self._launch(
+            job_id=job.job_id,
+            fingerprint=job.fingerprint,
+            payload=job.payload,
+            bank=job.bank,
+            flag=job.flag,
+            progress=job.progress,
+            schedule=job.schedule,
+        )
+
+    def _launch_pack(self, pack: List[_PendingJob], client: str) -> None:
+        """Run small jobs back to back as one pool task; each keeps its own
+        future, recorder and cancel flag."""
+        if len(pack) == 1:
+            self._launch_pending(pack[0])
+            return
+        assert self._executor is not None
+        proxies: Dict[str, Future] = {}
+        for job in pack:
+            proxy: Future = Future()
+            proxy.add_done_callback(
+                self._make_recorder(job.job_id, job.fingerprint, job.bank)
+            )
+            proxies[job.job_id] = proxy
+        with self._lock:
+            self._futures.update(proxies)
+        self._ensure_watcher()
+        started: List[str] = []
+
+        def start(wait_seconds: float) -> Future:
+            work = []
+            for job in pack:
+                # A job cancelled while the pack waited is left out.
+                if proxies[job.job_id].set_running_or_notify_cancel():
+                    self._store.record_schedule(
+                        job.job_id,
+                        {**job.schedule, "wait_seconds": round(wait_seconds, 3)},
+                    )
+                    started.append(job.job_id)
+                    work.append(
+                        (
+                            job.payload,
+                            job.bank,
+                            job.flag,
+                            job.progress,
+                            self.prior_runs.lookup(job.payload),
+                        )
+                    )
+            return self._executor.submit(run_solve_jobs, work)
+
+        def settle(done: Future) -> None:
+            for job_id, proxy in proxies.items():
+                if proxy.done():
+                    continue
+                if done.cancelled():
+                    if not proxy.cancel():
+                        proxy.set_exception(CancelledError())
+                elif done.exception() is not None:
+                    proxy.set_exception(done.exception())  # type: ignore[arg-type]
+                else:
+                    outcome = done.result()[started.index(job_id)]
+                    if isinstance(outcome, BaseException):
+                        proxy.set_exception(outcome)
+                    else:
+                        proxy.set_result(outcome)
+
+        self.scheduler.submit(
+            client, sum(job.schedule["estimated_cpu_seconds"] for job in pack), start
+        ).add_done_callback(settle)
+
+    def _launch(
+        self,
+        job_id: str,
+        fingerprint: str,
+        payload: Dict[str, Any],
+        bank: Optional[BankHandle],
+        flag: Any,
+        progress: Any,
+        entry_id: Optional[str] = None,
+        schedule: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        """Start a job, through the fair-share scheduler when ``schedule``
+        (its client and class) is given."""
+        assert self._executor is not None
+        # A sharded job holds a scheduler slot per shard, as many as its
+        # class may; with one it runs unsharded on the pool like any other.
+        shards = self._workers if self._sharded(payload) else 1
+        if schedule is not None:
+            shards = self.scheduler.slots_for(schedule["estimated_cpu_seconds"], shards)
+
+        def start(wait_seconds: float) -> Future:
+            if schedule is not None:
+                self._store.record_schedule(
+                    job_id, {**schedule, "wait_seconds": round(wait_seconds, 3)}
+                )
+            if shards > 1:
+                with self._lock:
+                    if self._orchestrator is None:
+                        self._orchestrator = ThreadPoolExecutor(
+                            max_workers=self._workers,
+                            thread_name_prefix="sirom-shards",
+                        )
+                return self._orchestrator.submit(
+                    run_solve_job,
+                    payload,
+                    bank,
+                    flag,
+                    progress,
+                    executor_map(self._executor),
+                    shards,
+                )
+            return self._executor.submit(
+                run_solve_job,
+                payload,
+                bank,
+                flag,
+                progress,
+                prior=self.prior_runs.lookup(payload),
+            )
+
+        if schedule is not None:
+            future = self.scheduler.submit(
+                schedule["client"], schedule["estimated_cpu_seconds"], start, shards
+            )
         else:
-            assert self._executor is not None
-            future: Future = self._executor.submit(run_solve_job, payload)
+            future = start(0.0)
+        with self._lock:
+            self._futures[job_id] = future
+        future.add_done_callback(
+            self._make_recorder(job_id, fingerprint, bank, entry_id)
+        )
+        self._ensure_watcher()
+
+    def _calibrates(self, payload: Dict[str, Any]) -> bool:
+        # Sharded phases are wall-clock over many workers, and a sweep's are
+        # totals over its variants: neither measures the cost model's units.
+        return "variants" not in payload and not self._sharded(payload)
+
+    def _sharded(self, payload: Dict[str, Any]) -> bool:
+        options = payload.get("options") or {}
+        return (
+            self.mode in _POOLED
+            and self._workers > 1
+            and options.get("deadline_seconds") is None
+            and int(options.get("number_of_scenarios", 0)) >= self._shard_scenarios
+        )
+
+    def _consume(self) -> None:
+        """Claim queued jobs while this worker has free pool slots."""
+        assert self._queue is not None
+        while not self._stopping.is_set():
+            with self._lock:
+                free = self._workers - len(self._claims)
+            if free <= 0:
+                self._stopping.wait(0.05)
+                continue
+            try:
+                claims = self._queue.claim(free, block_ms=500)
+            except Exception:  # noqa: BLE001 - Redis hiccup; retry shortly
+                self._stopping.wait(1.0)
+                continue
+            for claim in claims:
+                try:
+                    self._run_claim(claim)
+                except Exception:  # noqa: BLE001 - left for redelivery
+                    with self._lock:
+                        self._claims.pop(claim.job_id, None)
+
+    def _run_claim(self, claim: Claim) -> None:
+        assert self._queue is not None
+        job_id, fingerprint = claim.job_id, claim.fingerprint
+        record = self._store.fetch(job_id)
+        if record is None or record["status"] in _TERMINAL:
+            # Expired, cancelled while queued, or recorded by a worker that
+            # died before acknowledging it.
+            self._queue.ack(claim.entry_id)
+            return
+        if claim.deliveries > self._queue.max_deliveries:
+            self._store.record_failure(
+                job_id, [_ABANDONED.format(claim.deliveries - 1)]
+            )
+            self._finish(job_id, fingerprint)
+            self._queue.ack(claim.entry_id)
+            return
+        if self._store.get_alias(f"cancel:{job_id}"):
+            self._store.record_cancellation(job_id, [_CANCELLED])
+            self._finish(job_id, fingerprint)
+            self._queue.ack(claim.entry_id)
+            return
+        # Admitted by the submitting frontend; tracked here to calibrate.
+        self.admission.admit(
+            job_id,
+            claim.payload,
+            enforce=False,
+            calibrate=self._calibrates(claim.payload),
+        )
+        # A stream entry id starts with the enqueue time in milliseconds.
+        enqueued = int(claim.entry_id.split("-")[0]) / 1000
+        self._store.record_schedule(
+            job_id,
+            {
+                **(record.get("schedule") or {}),
+                "wait_seconds": round(max(0.0, time.time() - enqueued), 3),
+            },
+        )
+        bank = self.scenario_bank.acquire(claim.payload)
+        try:
+            flag = self._new_flag()
+            progress = self._progress_sink(job_id)
+            with self._lock:
+                self._flags[job_id] = flag
+                self._claims[job_id] = claim.entry_id
+            self._launch(
+                job_id,
+                fingerprint,
+                claim.payload,
+                bank,
+                flag,
+                progress,
+                claim.entry_id,
+            )
+        except BaseException:
+            # Not launched (e.g. the pool is shut down): left for redelivery,
+            # holding nothing here. An unseeded bank is unlinked.
             with self._lock:
-                self._futures[job_id] = future
-            future.add_done_callback(self._make_recorder(job_id))
+                self._flags.pop(job_id, None)
+                self._claims.pop(job_id, None)
+            self.scenario_bank.release(bank)
+            self.admission.finished(job_id)
+            raise
+
+    def _heartbeat(self) -> None:
+        """Keep this worker's claims from being taken over while they run."""
+        assert self._queue is not None
+        interval = self._queue.visibility_seconds / 3
+        while not self._stopping.wait(interval):
+            with self._lock:
+                entries = list(self._claims.values())
+            try:
+                self._queue.heartbeat(entries)
+            except Exception:  # noqa: BLE001 - retry next tick
+                pass
+
+    def _watch_for(self, job_id: str, callback_url: Optional[str]) -> None:
+        if callback_url is None:
+            return
+        self._store.add_callback(job_id, callback_url)
+        # The job may have finished (and taken its callbacks) before we
+        # registered; then nobody else will send this one.
+        record = self._store.fetch(job_id)
+        if record is not None and record["status"] in _TERMINAL:
+            self._notify(job_id)
+
+    def _notify(self, job_id: str) -> None:
+        urls = self._store.pop_callbacks(job_id)
+        if not urls:
+            return
+        record = self._store.fetch(job_id)
+        if record is None:
+            return
+        body = notification(job_id, record)
+        for url in urls:
+            self.webhooks.send(url, job_id, body)
+
+    def _shared(self) -> Any:
+        with self._lock:
+            if self._sync_manager is None:
+                self._sync_manager = multiprocessing.Manager()
+            return self._sync_manager
+
+    def _new_flag(self) -> Any:
+        if self.mode not in _POOLED:
+            return threading.Event()
+        return self._shared().Event()
+
+    def _progress_sink(self, job_id: str) -> Any:
+        if self.mode not in _POOLED:
+            return _StoreProgress(self._store, job_id)
+        with self._lock:
+            start = self._drainer is None
+        if start:
+            channel = self._shared().Queue()
+            with self._lock:
+                if self._drainer is None:
+                    self._progress_channel = channel
+                    self._drainer = threading.Thread(
+                        target=self._drain_progress, args=(channel,), daemon=True
+                    )
+                    self._drainer.start()
+        return _QueuedProgress(self._progress_channel, job_id)
+
+    def _drain_progress(self, channel: Any) -> None:
+        while not self._stopping.is_set():
+            try:
+                job_id, snapshot = channel.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            except Exception:  # noqa: BLE001 - the Manager has shut down
+                return
+            try:
+                self._store.record_progress(job_id, snapshot)
+            except Exception:  # noqa: BLE001 - progress is best effort
+                pass
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        """Request that a job stop; return its status afterwards (``None`` if unknown).
+
+        A job still queued on this worker is dropped before it starts; a
+        running one stops at its next checkpoint and ends ``cancelled``. The
+        request is also recorded in the store, so with Redis the worker that
+        runs the job picks it up too. Finished jobs are left as they are.
+
+        In queue mode a job nobody has started yet is recorded ``cancelled``
+        at once; the worker that later claims it drops it.
+        """
+        record = self._store.fetch(job_id)
+        if record is None:
+            return None
+        if record["status"] in _TERMINAL:
+            return record["status"]
+        self._store.set_alias(f"cancel:{job_id}", "1")
+        self._cancel_local(job_id)
+        status = self.get(job_id)["status"]  # type: ignore[index]
+        if self._queue is not None and status == JobStatus.pending.value:
+            self._store.record_cancellation(job_id, [_CANCELLED])
+            self._notify(job_id)
+            self.admission.finished(job_id)
+            status = JobStatus.cancelled.value
+        return status
+
+    def _cancel_local(self, job_id: str) -> None:
+        with self._lock:
+            future, flag = self._futures.get(job_id), self._flags.get(job_id)
+        if flag is not None:
+            flag.set()
+        if future is not None:
+            # Frees the slot at once if the job never started.
+            future.cancel()
+
+    def _ensure_watcher(self) -> None:
+        # A process-local store can only be cancelled through this manager,
+        # so only shared stores need the flags polled.
+        if isinstance(self._store, InMemoryJobStore) or self._watcher is not None:
+            return
+        with self._lock:
+            if self._watcher is None:
+                self._watcher = threading.Thread(
+                    target=self._watch_cancellations, daemon=True
+                )
+                self._watcher.start()
+
+    def _watch_cancellations(self) -> None:
+        interval = _env_int("SIROM_CANCEL_POLL_MS", 500) / 1000
+        while not self._stopping.wait(interval):
+            with self._lock:
+                running = list(self._futures)
+            for job_id in running:
+                try:
+                    if self._store.get_alias(f"cancel:{job_id}"):
+                        self._cancel_local(job_id)
+                except Exception:  # noqa: BLE001 - store hiccup; retry next tick
+                    pass
+
+    def _idempotent_job(self, key: str, fingerprint: str) -> Optional[str]:
+        claimed = self._store.get_alias(f"idempotency:{key}")
+        if claimed is None:
+            return None
+        claimed_fingerprint, _, job_id = claimed.partition(":")
+        if claimed_fingerprint != fingerprint:
+            raise IdempotencyConflict(
+                "This Idempotency-Key was already used with a different "
+                "problem. Use a new key for a new problem."
+            )
+        return job_id
+
+    def _claim(
+        self, key: Optional[str], fingerprint: str, job_id: str, replace: bool
+    ) -> bool:
+        if key is None:
+            return True
+        return self._store.set_alias(
+            f"idempotency:{key}", f"{fingerprint}:{job_id}", only_if_absent=not replace
+        )
+
+    def _cached_job(self, fingerprint: str) -> Optional[str]:
+        job_id = self._store.get_alias(f"result:{fingerprint}")
+        if job_id is None:
+            return None
+        record = self._store.fetch(job_id)
+        if record is None or record["status"] != JobStatus.succeeded.value:
+            return None
+        return job_id
+
+    def _inflight_job(self, fingerprint: str) -> Optional[str]:
+        job_id = self._store.get_alias(f"inflight:{fingerprint}")
+        if job_id is None:
+            return None
+        record = self._store.fetch(job_id)
+        if record is None or record["status"] in (
+            JobStatus.failed.value,
+            JobStatus.cancelled.value,
+        ):
+            return None
         return job_id
 
-    def _run_inline(self, job_id: str, payload: Dict[str, Any]) -> None:
+    def _record_success(
+        self, job_id: str, fingerprint: str, result: PackedResult
+    ) -> None:
+        candidates, result.candidates = result.candidates, None
+        prior_run, result.prior_run = result.prior_run, None
+        if prior_run is not None:
+            self.prior_runs.remember(*prior_run)
+        summary = result.get("summary") or {}
+        # A warm-started run did less work than the model was asked to price.
+        # Calibrated before the outcome shows, as /limits then reflects it.
+        if not summary.get("reused_scenarios"):
+            self.admission.observe(job_id, summary.get("phase_seconds") or {})
+        if candidates is not None:
+            # Before the outcome, so a client that sees it can rescore.
+            self._store.record_candidates(job_id, candidates)
+        self._store.record_success(job_id, result)
+        self._store.set_alias(f"result:{fingerprint}", job_id)
+
+    def _finish(self, job_id: str, fingerprint: str) -> None:
+        # After the outcome is recorded, so a submit that no longer sees the
+        # lease finds the cached result instead.
         try:
-            self._store.record_success(job_id, run_solve_job(payload))
+            self._notify(job_id)
+        except Exception:  # noqa: BLE001 - never lose the lease over a webhook
+            pass
+        self._store.delete_alias(f"inflight:{fingerprint}", job_id)
+        self._store.delete_alias(f"cancel:{job_id}")
+        self.admission.finished(job_id)
+        with self._lock:
+            self._flags.pop(job_id, None)
+
+    def _run_inline(
+        self,
+        job_id: str,
+        fingerprint: str,
+        payload: Dict[str, Any],
+        bank: Optional[BankHandle],
+        flag: Any,
+        progress: Any,
+    ) -> None:
+        try:
+            result = run_solve_job(
+                payload, bank, flag, progress, prior=self.prior_runs.lookup(payload)
+            )
+            self._record_success(job_id, fingerprint, result)
+        except SolveCancelled as exc:
+            self._store.record_cancellation(job_id, exc.messages)
         except SolveError as exc:
             self._store.record_failure(job_id, exc.messages)
         except Exception:  # noqa: BLE001
             self._store.record_failure(job_id, [_GENERIC_FAILURE])
+        finally:
+            self._finish(job_id, fingerprint)
+            self.scenario_bank.release(bank)
 
-    def _make_recorder(self, job_id: str):
+    def _make_recorder(
+        self,
+        job_id: str,
+        fingerprint: str,
+        bank: Optional[BankHandle] = None,
+        entry_id: Optional[str] = None,
+    ):
         def _record(future: Future) -> None:
+            self.scenario_bank.release(bank)
+            if (
+                entry_id is not None
+                and self._stopping.is_set()
+                and (future.cancelled() or future.exception() is not None)
+            ):
+                # Interrupted by this worker shutting down: leave the claim
+                # unacknowledged for another worker to take over.
+                with self._lock:
+                    self._futures.pop(job_id, None)
+                    self._flags.pop(job_id, None)
+                    self._claims.pop(job_id, None)
+                return
             try:
-                self._store.record_success(job_id, future.result())
+                self._record_success(job_id, fingerprint, future.result())
+            except (SolveCancelled, CancelledError) as exc:
+                # Cancelled mid-run, before it started, or on shutdown.
+                messages = getattr(exc, "messages", [_CANCELLED])
+                self._store.record_cancellation(job_id, messages)
             except SolveError as exc:
                 self._store.record_failure(job_id, exc.messages)
-            except Exception:  # noqa: BLE001 (incl. CancelledError on shutdown)
+            except Exception:  # noqa: BLE001
                 self._store.record_failure(job_id, [_GENERIC_FAILURE])
             finally:
+                self._finish(job_id, fingerprint)
+                if entry_id is not None:
+                    assert self._queue is not None
+                    try:
+                        self._queue.ack(entry_id)
+                    except Exception:  # noqa: BLE001 - redelivered, then dropped
+                        pass
                 with self._lock:
                     self._futures.pop(job_id, None)
+                    self._claims.pop(job_id, None)
 
         return _record
 
     def get(self, job_id: str) -> Optional[Dict[str, Any]]:
-        """Return ``{status, result, errors}`` for a job, or ``None``."""
+        """Return ``{status, result, errors, progress, schedule}`` for a job,
+        or ``None``."""
+        return self._refine(job_id, self._store.fetch(job_id))
+
+    def rescore(
+        self, job_id: str, bounds: Dict[str, Any]
+    ) -> Optional[Dict[str, Any]]:
+        """The frontier of a succeeded job's candidates under new ``bounds``
+        (a validated ``RescoreRequest`` dump), or ``None`` for an unknown job.
+
+        Raises :class:`RescoreUnavailable` when the job kept no candidate pool
+        and :class:`SolveError` when the bounds do not fit it. Runs here, not
+        in the pool: it is only the vectorized quality phase. An unseeded job
+        is re-scored against draws seeded from its id, so repeated rescores
+        of one job share their draws and differ only by the bounds.
+        """
         record = self._store.fetch(job_id)
         if record is None:
             return None
-        # Refine pending -> running for jobs we're executing on this worker.
+        candidates = (
+            self._store.fetch_candidates(job_id)
+            if record["status"] == JobStatus.succeeded.value
+            else None
+        )
+        if candidates is None:
+            raise RescoreUnavailable(
+                f"Job {job_id} has no candidates to rescore; only succeeded "
+                "solve jobs (not sweeps) keep them."
+            )
+        if candidates["seed"] is None:
+            candidates = {**candidates, "seed": int(job_id[:7], 16)}
+        request = RescoreRequest(**bounds)
+        # The job's seeded draws, from a bank the job itself may have left.
+        bank = self.scenario_bank.acquire(
+            {
+                "lb_A": request.lb_A,
+                "objective": candidates["objective"],
+                "options": {
+                    "quality_scenarios": candidates["quality_scenarios"],
+                    "scoring": candidates["scoring"],
+                    "seed": candidates["seed"],
+                },
+            }
+        )
+        try:
+            return rescore_candidates(
+                candidates, request, record["result"]["summary"], bank
+            ).model_dump(mode="json", exclude_none=True)
+        finally:
+            self.scenario_bank.release(bank)
+
+    def get_many(self, job_ids: List[str]) -> List[Optional[Dict[str, Any]]]:
+        """:meth:`get` for many jobs, in one store round trip."""
+        return [
+            self._refine(job_id, record)
+            for job_id, record in zip(job_ids, self._store.fetch_many(job_ids))
+        ]
+
+    def _refine(
+        self, job_id: str, record: Optional[Dict[str, Any]]
+    ) -> Optional[Dict[str, Any]]:
+        if record is None:
+            return None
+        # Refine pending -> running for jobs that have reported progress (on
+        # any worker) or that we're executing on this worker.
         if record["status"] == JobStatus.pending.value:
             with self._lock:
                 future = self._futures.get(job_id)
-            if future is not None and future.running():
+            if record.get("progress") or (future is not None and future.running()):
                 record = {**record, "status": JobStatus.running.value}
         return record
 
+    def limits(self) -> Dict[str, Any]:
+        """Admission state: backlog cost, capacity and the cost model (and
+        the shared queue's depth in queue mode, or the fair-share scheduler's
+        queues otherwise)."""
+        limits = self.admission.snapshot()
+        if self._executor is not None and self.mode in _POOLED:
+            limits["pool"] = {
+                "workers": self._workers,
+                "warm_workers": sum(
+                    1 for f in self._pool_ready if f.done() and not f.exception()
+                ),
+                "recycled_workers": self._executor.recycled,
+                "replaced_workers": self._executor.replaced,
+            }
+        if self._queue is not None:
+            limits["work_queue"] = self._queue.stats()
+        elif self.mode != "inline":
+            limits["scheduler"] = self.scheduler.snapshot()
+        return limits
+
+    def subscribe(self, job_id: str) -> JobSubscription:
+        """Subscribe to a job's events (see :meth:`JobStore.subscribe`)."""
+        return self._store.subscribe(job_id)
+
     def list_jobs(self) -> List[Dict[str, Any]]:
         result = []
         for job_id in self._store.list_ids():
@@ -289,6 +1816,23 @@ class JobManager:
         return result
 
     def shutdown(self) -> None:
+        # Stopping first, so queue claims cut short here are left for others.
+        self._stopping.set()
+        # Jobs still waiting for a slot end cancelled, as a pool's would.
+        self.scheduler.close()
         if self._executor is not None:
             self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._orchestrator is not None:
+            self._orchestrator.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            for flag in self._flags.values():
+                flag.set()
+        if self._sync_manager is not None:
+            self._sync_manager.shutdown()
+        self.webhooks.close()
+        # Unlinking only drops the names; workers still mapping a bank keep it.
+        self.scenario_bank.close()
+        self.prior_runs.close()
+        if self._queue is not None:
+            self._queue.close()
         self._store.close()
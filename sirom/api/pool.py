@@ -0,0 +1,399 @@
+"""Process pools whose workers are warm before the first job arrives.
+
+A ``ProcessPoolExecutor`` starts its workers on demand, so the first jobs
+after a cold start pay for importing OR-Tools, scikit-learn, smt and pandas
+(about a second) and for their first-call setup (solver registration, the
+BLAS thread-pool probe KMeans does on its first fit) inside the job.
+:func:`start_pool` starts every worker at once instead, each running
+:func:`warm_worker` before taking work. On Linux the workers come from a
+``forkserver`` that has imported the stack already (:data:`PRELOAD`), so each
+new worker inherits it copy-on-write instead of importing it again, and no
+worker is forked from the threaded server process.
+
+The pool is a :class:`WorkerPool`: one single-process executor per slot, so a
+worker that dies (killed by the kernel, or by a limit below) fails only the
+task it was running and is replaced on its own, where a
+``ProcessPoolExecutor`` would be broken for good along with every task queued
+on it. :class:`WorkerLimits` bounds what a worker may accumulate (it is
+recycled after so many tasks, or once its resident set is over a size) and
+what one task may use (``RLIMIT_AS`` and ``RLIMIT_CPU``, set in the child
+around each task).
+"""
+
+from __future__ import annotations
+
+import importlib
+import math
+import multiprocessing
+import os
+import signal
+import sys
+import threading
+from collections import deque
+from concurrent.futures import (
+    CancelledError,
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+)
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, List, Optional, Tuple
+
+from .errors import SolveError
+
+# What every job needs, imported once in the forkserver.
+PRELOAD = (
+    "numpy",
+    "pandas",
+    "ortools.linear_solver.pywraplp",
+    "sklearn.cluster",
+    "smt.sampling_methods",
+    "sirom.api.service",
+)
+# Backends requests name most, looked up once per worker (creating a
+# commercial one checks its license).
+_WARM_SOLVERS = ("GLOP", "SCIP", "CBC", "CLP", "PDLP")
+
+_CPU_LIMIT = (
+    "The job was stopped after {:g} s of CPU time, the most one job may use."
+)
+_MEMORY_LIMIT = (
+    "The job was stopped when it needed more than {:g} MB of memory, the "
+    "most one job may use."
+)
+_WORKER_DIED = (
+    "The worker running the job died ({}), most likely out of memory. Try "
+    "fewer scenarios or quality scenarios."
+)
+
+
+@dataclass(frozen=True)
+class WorkerLimits:
+    """What a pool worker may accumulate and what one task may use (0 for
+    no limit).
+
+    Attributes:
+        max_tasks: Tasks a worker runs before it is replaced.
+        max_rss_bytes: Resident set a worker may keep after a task; over
+            it, the worker is replaced.
+        job_memory_bytes: Address space one task may add to its worker's
+            (``RLIMIT_AS``). A task over it fails, and its worker is
+            replaced.
+        job_cpu_seconds: CPU time one task may use (``RLIMIT_CPU``). A task
+            over it is killed with its worker.
+    """
+
+    max_tasks: int = 0
+    max_rss_bytes: int = 0
+    job_memory_bytes: int = 0
+    job_cpu_seconds: int = 0
+
+
+class ResourceLimitExceeded(SolveError):
+    """Raised in a worker when a task hits its :class:`WorkerLimits`."""
+
+    def __reduce__(self):
+        return (ResourceLimitExceeded, (self.messages,))
+
+
+def warm_worker() -> None:
+    """Pool initializer: import the solver stack and run it once on a toy
+    problem, and cache which backends this build can create."""
+    for module in PRELOAD:
+        importlib.import_module(module)
+    import numpy as np
+    from sklearn.cluster import KMeans  # type: ignore
+
+    from sirom.mini_ortools_solver import MiniOrtoolsSolver, solver_available
+    from sirom.optimization_problem import OptimizationProblem
+
+    MiniOrtoolsSolver(
+        OptimizationProblem(
+            np.array([-1.0, -1.0]), np.matrix([[1.0, 0.0], [0.0, 1.0]]), np.ones(2)
+        )
+    )
+    KMeans(n_clusters=2, random_state=0).fit(np.array([[0.0], [1.0], [2.0]]))
+    for name in _WARM_SOLVERS:
+        solver_available(name)
+
+
+def _ready() -> int:
+    return os.getpid()
+
+
+def _relay(source: Future, target: Future) -> None:
+    if source.cancelled():
+        target.cancel()
+    elif source.exception() is not None:
+        target.set_exception(source.exception())  # type: ignore[arg-type]
+    else:
+        target.set_result(source.result())
+
+
+def _statm(field: int) -> int:
+    # Linux only: /proc/self/statm is "size resident ..." in pages.
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[field]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _apply_limits(limits: WorkerLimits) -> Callable[[], None]:
+    """Set this task's rlimits, relative to what the worker already uses;
+    returns what restores the worker's own."""
+    try:
+        import resource
+    except ImportError:  # pragma: no cover - Windows
+        return lambda: None
+    saved = []
+
+    def lower(which: int, value: int) -> None:
+        soft, hard = resource.getrlimit(which)
+        if hard != resource.RLIM_INFINITY:
+            value = min(value, hard)
+        saved.append((which, soft, hard))
+        resource.setrlimit(which, (value, hard))
+
+    if limits.job_memory_bytes and _statm(0):
+        lower(resource.RLIMIT_AS, _statm(0) + limits.job_memory_bytes)
+    if limits.job_cpu_seconds:
+        usage = resource.getrusage(resource.RUSAGE_SELF)
+        used = math.ceil(usage.ru_utime + usage.ru_stime)
+        lower(resource.RLIMIT_CPU, used + limits.job_cpu_seconds)
+        # Past it the kernel sends SIGXCPU, which would also dump a core.
+        lower(resource.RLIMIT_CORE, 0)
+
+    def restore() -> None:
+        for which, soft, hard in reversed(saved):
+            resource.setrlimit(which, (soft, hard))
+
+    return restore
+
+
+def _run_task(
+    limits: WorkerLimits, fn: Callable[..., Any], args: tuple, kwargs: dict
+) -> Tuple[Any, int]:
+    """Worker side of :meth:`WorkerPool.submit`: ``fn``'s result under
+    ``limits``, and the worker's resident set after it."""
+    restore = _apply_limits(limits)
+    try:
+        result = fn(*args, **kwargs)
+    except MemoryError:
+        if not limits.job_memory_bytes:
+            raise
+        raise ResourceLimitExceeded(
+            [_MEMORY_LIMIT.format(limits.job_memory_bytes / 2**20)]
+        ) from None
+    finally:
+        restore()
+    return result, _statm(1)
+
+
+def _death(exitcode: Optional[int], limits: WorkerLimits) -> str:
+    """The client-safe message for a task whose worker died."""
+    if exitcode == -getattr(signal, "SIGXCPU", 0) and limits.job_cpu_seconds:
+        return _CPU_LIMIT.format(limits.job_cpu_seconds)
+    if exitcode == -signal.SIGABRT and limits.job_memory_bytes:
+        # A failed allocation in native code (OR-Tools) aborts.
+        return _MEMORY_LIMIT.format(limits.job_memory_bytes / 2**20)
+    if exitcode is not None and exitcode < 0:
+        try:
+            cause = signal.Signals(-exitcode).name
+        except ValueError:
+            cause = f"signal {-exitcode}"
+    else:
+        cause = f"exit code {exitcode}" if exitcode is not None else "unknown cause"
+    return _WORKER_DIED.format(cause)
+
+
+class _Slot:
+    """One worker: a single-process executor and what it has run."""
+
+    def __init__(self, executor: ProcessPoolExecutor):
+        self.executor = executor
+        self.tasks = 0
+        self.process: Optional[Any] = None
+
+    def submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        future = self.executor.submit(fn, *args)
+        if self.process is None:
+            # Started by the submit; its exit code says why it died.
+            processes = getattr(self.executor, "_processes", None) or {}
+            self.process = next(iter(processes.values()), None)
+        return future
+
+    def exitcode(self) -> Optional[int]:
+        if self.process is None:
+            return None
+        self.process.join(timeout=5)
+        return self.process.exitcode
+
+
+class WorkerPool(Executor):
+    """A process pool whose workers are replaced one at a time.
+
+    Each of the ``workers`` slots runs one task at a time in its own
+    single-process executor; tasks wait here, first come first served, for a
+    free slot. A slot is replaced, without touching the others, when its
+    worker dies (the task fails with a :class:`~sirom.api.errors.SolveError`
+    saying why), when a task hits its memory limit, and when ``limits`` says
+    the worker is due for recycling.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        mp_context: Any = None,
+        initializer: Optional[Callable[[], None]] = None,
+        limits: Optional[WorkerLimits] = None,
+    ):
+        self.limits = limits or WorkerLimits()
+        self._mp_context = mp_context
+        self._initializer = initializer
+        self._lock = threading.Lock()
+        self._pending: Deque[Tuple[Future, Callable[..., Any], tuple, dict]] = deque()
+        self._shutdown = False
+        self.slots = [self._new_slot() for _ in range(workers)]
+        self._idle = list(self.slots)
+        # Slots replaced after recycling a worker, and after one died.
+        self.recycled = 0
+        self.replaced = 0
+
+    def _new_slot(self) -> _Slot:
+        return _Slot(
+            ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=self._mp_context,
+                initializer=self._initializer,
+            )
+        )
+
+    def submit(self, fn: Callable[..., Any], /, *args: Any, **kwargs: Any) -> Future:
+        future: Future = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            self._pending.append((future, fn, args, kwargs))
+        self._dispatch()
+        return future
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._lock:
+                if not self._pending or not self._idle:
+                    return
+                slot = self._idle.pop()
+                future, fn, args, kwargs = self._pending.popleft()
+            if not future.set_running_or_notify_cancel():
+                with self._lock:
+                    self._idle.append(slot)
+                continue
+            try:
+                try:
+                    task = slot.submit(_run_task, self.limits, fn, args, kwargs)
+                except BrokenProcessPool:  # its worker died idle
+                    fresh = self._replace(slot, died=True)
+                    if fresh is None:
+                        raise
+                    slot = fresh
+                    task = slot.submit(_run_task, self.limits, fn, args, kwargs)
+            except RuntimeError as exc:  # shut down meanwhile
+                future.set_exception(exc)
+                continue
+            task.add_done_callback(
+                lambda task, slot=slot, future=future: self._settle(slot, future, task)
+            )
+
+    def _settle(self, slot: _Slot, future: Future, task: Future) -> None:
+        slot.tasks += 1
+        if task.cancelled():  # the pool shut down with it queued behind warm-up
+            future.set_exception(CancelledError())
+            return
+        error = task.exception()
+        if isinstance(error, BrokenProcessPool):
+            message = _death(slot.exitcode(), self.limits)
+            self._release(self._replace(slot, died=True))
+            future.set_exception(SolveError([message]))
+            self._dispatch()
+            return
+        resident = 0 if error is not None else task.result()[1]
+        limits = self.limits
+        if (
+            isinstance(error, ResourceLimitExceeded)
+            or (limits.max_tasks and slot.tasks >= limits.max_tasks)
+            or (limits.max_rss_bytes and resident > limits.max_rss_bytes)
+        ):
+            slot = self._replace(slot)  # type: ignore[assignment]
+        self._release(slot)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(task.result()[0])
+        self._dispatch()
+
+    def _replace(self, slot: _Slot, died: bool = False) -> Optional[_Slot]:
+        # Lets the old worker exit once idle, and starts the new one at once.
+        slot.executor.shutdown(wait=False)
+        with self._lock:
+            if self._shutdown:
+                return None
+            fresh = self._new_slot()
+            self.slots[self.slots.index(slot)] = fresh
+            if died:
+                self.replaced += 1
+            else:
+                self.recycled += 1
+        if self._initializer is not None:
+            fresh.submit(_ready)
+        return fresh
+
+    def _release(self, slot: Optional[_Slot]) -> None:
+        if slot is not None:
+            with self._lock:
+                self._idle.append(slot)
+
+    def shutdown(self, wait: bool = True, *, cancel_futures: bool = False) -> None:
+        """Stop the workers; tasks still waiting for a slot are cancelled
+        whatever ``cancel_futures`` says."""
+        with self._lock:
+            self._shutdown = True
+            pending = list(self._pending)
+            self._pending.clear()
+        for future, _, _, _ in pending:
+            future.cancel()
+        for slot in list(self.slots):
+            slot.executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+
+def start_pool(
+    workers: int, warm: bool = True, limits: Optional[WorkerLimits] = None
+) -> Tuple[WorkerPool, List[Future]]:
+    """A pool of ``workers`` processes and one future per worker that is done
+    once that worker is ready.
+
+    Returns at once: the workers are started from a background thread, since
+    the first start waits for the forkserver to import :data:`PRELOAD`. With
+    ``warm=False`` workers start on demand (no futures).
+    """
+    if not warm:
+        return WorkerPool(workers, limits=limits), []
+    context = None
+    if sys.platform.startswith("linux"):
+        context = multiprocessing.get_context("forkserver")
+        context.set_forkserver_preload(list(PRELOAD))
+    pool = WorkerPool(workers, context, warm_worker, limits)
+    ready: List[Future] = [Future() for _ in range(workers)]
+
+    def start() -> None:
+        for slot, future in zip(list(pool.slots), ready):
+            try:
+                started = slot.submit(_ready)
+            except RuntimeError as exc:  # shut down before it got going
+                future.set_exception(exc)
+                continue
+            started.add_done_callback(lambda done, future=future: _relay(done, future))
+
+    threading.Thread(target=start, name="sirom-pool-warmup", daemon=True).start()
+    return pool, ready
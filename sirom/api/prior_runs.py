@@ -0,0 +1,186 @@
+"""Warm-start runs kept by the parent process and shared with pool workers.
+
+A :class:`~sirom.warm_start.WarmStartIndex` in each pool worker would only
+know the runs that landed on that worker: an edited resubmission would find
+its prior run about one time in as many workers, and recycling a worker would
+forget them all. The job manager keeps the runs instead, in a
+:class:`PriorRuns`. Like the scenario banks (:mod:`sirom.api.scenario_bank`),
+a run's scenario arrays live in a shared-memory segment the parent owns: a job
+that may warm-start is shipped a small picklable :class:`PriorHandle` to the
+last run of its structure, and the worker copies the scenarios out with
+:func:`load`. The worker hands its own run back with its result (see
+:attr:`~sirom.api.results.PackedResult.prior_run`), and the parent remembers
+it when it records the job.
+
+Runs are kept least recently used out first, bounded by ``max_bytes``. A run
+unlinked before its worker loaded it is simply not reused.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from sirom.warm_start import PriorRun, structure_key
+
+
+@dataclass(frozen=True)
+class PriorHandle:
+    """A kept run, as a worker gets it: its structure key, its segment's name
+    and the run itself without its scenario arrays (those are in the segment).
+    """
+
+    key: str
+    name: str
+    number_of_scenarios: int
+    n_con: int
+    n_var: int
+    run: PriorRun
+
+    @property
+    def nbytes(self) -> int:
+        return self.number_of_scenarios * self.n_con * (self.n_var + 1) * 8
+
+
+def prior_key(payload: Dict[str, Any]) -> Optional[str]:
+    """Structure key of the run a validated solve payload may warm-start from.
+
+    ``None`` when it may not: sweeps, ``options.warm_start`` off, seeded or
+    anytime runs (see :class:`~sirom.batch_solver.ProblemsBucket`).
+    """
+    if "variants" in payload:
+        return None
+    options = payload.get("options") or {}
+    if (
+        not options.get("warm_start", True)
+        or options.get("seed") is not None
+        or options.get("deadline_seconds") is not None
+    ):
+        return None
+    return structure_key(
+        np.asarray(payload["lb_A"], dtype=float),
+        np.asarray(payload["ub_A"], dtype=float),
+        list(payload.get("integer_variables") or []),
+    )
+
+
+def _views(buffer: memoryview, handle: PriorHandle) -> Tuple[np.ndarray, np.ndarray]:
+    split = handle.number_of_scenarios * handle.n_con * handle.n_var
+    flat = np.ndarray((split + handle.number_of_scenarios * handle.n_con,), float, buffer)
+    return (
+        flat[:split].reshape(handle.number_of_scenarios, handle.n_con, handle.n_var),
+        flat[split:].reshape(handle.number_of_scenarios, handle.n_con, 1),
+    )
+
+
+def load(handle: Optional[PriorHandle]) -> Optional[PriorRun]:
+    """The kept run ``handle`` refers to, scenarios copied out of its segment.
+
+    ``None`` for a ``None`` handle, or when the parent has since dropped it.
+    """
+    if handle is None:
+        return None
+    try:
+        segment = shared_memory.SharedMemory(name=handle.name)
+    except FileNotFoundError:
+        return None
+    try:
+        constraint, rhs = _views(segment.buf, handle)
+        run = dataclasses.replace(
+            handle.run,
+            scenarios_constraint=constraint.copy(),
+            scenarios_rhs=rhs.copy(),
+        )
+        del constraint, rhs
+    finally:
+        segment.close()
+    return run
+
+
+class _Kept:
+    def __init__(self, handle: PriorHandle, segment: shared_memory.SharedMemory):
+        self.handle = handle
+        self.segment = segment
+
+    def destroy(self) -> None:
+        # Workers that loaded it hold copies; one mid-load keeps its mapping.
+        self.segment.close()
+        self.segment.unlink()
+
+
+class PriorRuns:
+    """Parent-owned last run of each problem structure, for warm starts."""
+
+    def __init__(self, max_bytes: int = 256 * 2**20):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._runs: "OrderedDict[str, _Kept]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._runs)
+
+    def lookup(self, payload: Dict[str, Any]) -> Optional[PriorHandle]:
+        """The handle of the run ``payload`` may warm-start from, if kept."""
+        key = prior_key(payload)
+        if key is None:
+            return None
+        with self._lock:
+            kept = self._runs.get(key)
+            if kept is None:
+                return None
+            self._runs.move_to_end(key)
+            return kept.handle
+
+    def remember(self, key: str, run: PriorRun) -> None:
+        """Keep ``run`` as the last of its structure, replacing the one kept.
+
+        A run larger than ``max_bytes``, or one shared memory cannot hold,
+        is not kept.
+        """
+        number_of_scenarios, n_con, n_var = run.scenarios_constraint.shape
+        handle = PriorHandle(
+            key,
+            "",
+            number_of_scenarios,
+            n_con,
+            n_var,
+            dataclasses.replace(
+                run,
+                scenarios_constraint=np.empty((0, n_con, n_var)),
+                scenarios_rhs=np.empty((0, n_con, 1)),
+            ),
+        )
+        kept: Optional[_Kept] = None
+        if 0 < handle.nbytes <= self.max_bytes:
+            try:
+                segment = shared_memory.SharedMemory(create=True, size=handle.nbytes)
+            except Exception:  # noqa: BLE001 - e.g. /dev/shm exhausted
+                segment = None
+            if segment is not None:
+                handle = dataclasses.replace(handle, name=segment.name)
+                constraint, rhs = _views(segment.buf, handle)
+                constraint[...] = run.scenarios_constraint
+                rhs[...] = run.scenarios_rhs
+                del constraint, rhs
+                kept = _Kept(handle, segment)
+        with self._lock:
+            dropped = [self._runs.pop(key)] if key in self._runs else []
+            if kept is not None:
+                self._runs[key] = kept
+            while sum(k.handle.nbytes for k in self._runs.values()) > self.max_bytes:
+                dropped.append(self._runs.popitem(last=False)[1])
+        for old in dropped:
+            old.destroy()
+
+    def close(self) -> None:
+        """Unlink every kept run (on shutdown)."""
+        with self._lock:
+            runs, self._runs = list(self._runs.values()), OrderedDict()
+        for kept in runs:
+            kept.destroy()
@@ -0,0 +1,172 @@
+"""Job results as they travel from pool workers to the HTTP edge.
+
+Most of a result is its decision vectors: one float per variable for every
+frontier solution. As ``model_dump()`` output they are lists of Python
+floats. Those are pickled one by one across the process boundary and
+validated back into a ``SolveResponse`` on every poll. A
+:class:`PackedResult` carries them as one float64 array per frontier instead,
+beside the rest of the response, which is small and already in its JSON
+form. It is encoded to JSON once, when first served
+(:meth:`PackedResult.json`). The Redis store keeps that encoding, so a poll
+on any worker splices it into the response body unparsed.
+
+A :class:`PackedResult` is a read-only mapping of the response's JSON form,
+for the callers that read a result rather than serve it.
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+
+# As the HTTP edge encodes JSON (starlette's JSONResponse).
+_ENCODING = {"ensure_ascii": False, "allow_nan": False, "separators": (",", ":")}
+
+
+def dumps(value: Any) -> str:
+    """``value`` as JSON, numpy arrays as lists, the way responses are
+    encoded."""
+    return json.dumps(value, default=_jsonable, **_ENCODING)
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, PackedResult):
+        return value.as_dict()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _frontier(solutions: List[Any]) -> np.ndarray:
+    if not solutions:
+        return np.empty((0, 0))
+    return np.asarray([solution.variables for solution in solutions], dtype=float)
+
+
+class PackedResult(Mapping):
+    """A :class:`~sirom.api.schemas.SolveResponse` or ``SweepResponse``,
+    with its decision vectors as arrays.
+
+    ``fields`` is the response's JSON form (``exclude_none``) without the
+    solutions' ``variables``. ``frontiers`` holds them: one ``(solutions,
+    variables)`` array, or one per variant for a sweep. ``candidates`` is a
+    solve's candidate pool, for the job store to keep apart, and
+    ``prior_run`` its run for warm starts, for the job manager to keep (see
+    :mod:`sirom.api.prior_runs`). Neither is part of the mapping, as they are
+    never serialized with the response.
+    """
+
+    __slots__ = ("fields", "frontiers", "candidates", "prior_run", "_encoded", "_dict")
+
+    def __init__(
+        self,
+        fields: Optional[Dict[str, Any]] = None,
+        frontiers: Optional[List[np.ndarray]] = None,
+        encoded: Optional[str] = None,
+        candidates: Optional[Dict[str, Any]] = None,
+        prior_run: Optional[Tuple[str, Any]] = None,
+    ):
+        self.fields = fields
+        self.frontiers = frontiers or []
+        self.candidates = candidates
+        self.prior_run = prior_run
+        self._encoded = encoded
+        self._dict: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def of(cls, response: BaseModel) -> "PackedResult":
+        """Pack a solve or sweep response (in the worker, before pickling)."""
+        without_variables = {"__all__": {"variables"}}
+        if hasattr(response, "variants"):
+            fields = response.model_dump(
+                mode="json",
+                exclude_none=True,
+                exclude={"variants": {"__all__": {"solutions": without_variables}}},
+            )
+            frontiers = [_frontier(variant.solutions) for variant in response.variants]
+        else:
+            fields = response.model_dump(
+                mode="json", exclude_none=True, exclude={"solutions": without_variables}
+            )
+            frontiers = [_frontier(response.solutions)]
+        return cls(
+            fields,
+            frontiers,
+            candidates=getattr(response, "candidates", None),
+            prior_run=getattr(response, "prior_run", None),
+        )
+
+    @classmethod
+    def decoded(cls, encoded: str) -> "PackedResult":
+        """A result as :meth:`json` encoded it (e.g. read back from Redis)."""
+        return cls(encoded=encoded)
+
+    def json(self) -> str:
+        """The response's JSON, encoded on first use."""
+        if self._encoded is None:
+            self._encoded = dumps(self.as_dict())
+        return self._encoded
+
+    def as_dict(self) -> Dict[str, Any]:
+        """The response's JSON form, as ``model_dump(mode="json",
+        exclude_none=True)`` would give it."""
+        if self._dict is None:
+            if self.fields is None:
+                self._dict = json.loads(self._encoded)  # type: ignore[arg-type]
+            elif "variants" in self.fields:
+                self._dict = {
+                    **self.fields,
+                    "variants": [
+                        {**variant, "solutions": _with_variables(variant["solutions"], frontier)}
+                        for variant, frontier in zip(self.fields["variants"], self.frontiers)
+                    ],
+                }
+            else:
+                self._dict = {
+                    **self.fields,
+                    "solutions": _with_variables(self.fields["solutions"], self.frontiers[0]),
+                }
+        return self._dict
+
+    def __getitem__(self, key: str) -> Any:
+        # Small fields need no decision vectors.
+        if self.fields is not None and key in self.fields and key not in (
+            "solutions",
+            "variants",
+        ):
+            return self.fields[key]
+        return self.as_dict()[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.fields if self.fields is not None else self.as_dict())
+
+    def __len__(self) -> int:
+        return len(self.fields if self.fields is not None else self.as_dict())
+
+    def __reduce__(self):
+        # The parsed or assembled dict is a cache; it never crosses processes.
+        return (
+            PackedResult,
+            (
+                self.fields,
+                self.frontiers,
+                self._encoded,
+                self.candidates,
+                self.prior_run,
+            ),
+        )
+
+
+def _with_variables(
+    solutions: List[Dict[str, Any]], frontier: np.ndarray
+) -> List[Dict[str, Any]]:
+    # ``variables`` first, where the schema declares it.
+    return [
+        {"variables": variables, **solution}
+        for solution, variables in zip(solutions, frontier.tolist())
+    ]
+
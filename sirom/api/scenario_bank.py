@@ -0,0 +1,243 @@
+"""Quality-scenario banks shared with pool workers through shared memory.
+
+The quality phase scores every candidate against ``M`` Latin-Hypercube draws.
+In the factored form (see :mod:`sirom.scoring`) those draws are just the
+``δ`` stratum indices — they do not depend on the interval bounds, only on the
+problem shape, ``M`` and the seed — so concurrent jobs on the same shape can
+score against one copy instead of each worker sampling its own.
+
+The parent process owns the banks. :meth:`ScenarioBank.acquire` returns a
+small picklable :class:`BankHandle` (creating the bank on first use) that is
+shipped to the worker with the payload; the worker maps it read-only with
+:func:`attach`. Banks are reference-counted: the job manager releases its
+handle when the job finishes. A bank for an explicit seed stays around while
+idle (LRU, bounded by ``max_idle_bytes``) because the same seed reproduces the
+same draws anyway; an unseeded bank is unlinked as soon as its last job ends,
+so unseeded traffic is shared between concurrent jobs only and successive runs
+still see fresh draws.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+
+from sirom.batch_solver import quality_draws, random_streams, sample_deltas
+
+# Stratum indices are uint16, so a bank can hold at most this many draws.
+MAX_BANK_DRAWS = int(np.iinfo(np.uint16).max)
+
+# (n_con, n_var, draws, seed)
+BankKey = Tuple[int, int, int, Optional[int]]
+
+
+@dataclass(frozen=True)
+class BankHandle:
+    """What a worker needs to map a bank: its segment name and shape."""
+
+    name: str
+    draws: int
+    n_con: int
+    n_var: int
+
+    @property
+    def nbytes(self) -> int:
+        return self.draws * self.n_con * (self.n_var + 1) * 2
+
+
+def bank_key(payload: Dict) -> Optional[BankKey]:
+    """Key of the bank a validated solve payload would score against.
+
+    ``None`` when the quality draws do not fit in uint16 strata, in which case
+    the worker samples its own. A sweep's variants share one bank, of its
+    base's shape and the most draws any variant needs.
+    """
+    if "variants" in payload:
+        draws = sweep_quality_draws(payload)
+        payload = payload["base"]
+    else:
+        options = payload.get("options") or {}
+        draws = quality_draws(
+            int(options.get("quality_scenarios", 100)),
+            options.get("scoring", "monte_carlo"),
+        )
+    if draws > MAX_BANK_DRAWS:
+        return None
+    seed = (payload.get("options") or {}).get("seed")
+    return (len(payload["lb_A"]), len(payload["objective"]), draws, seed)
+
+
+def sweep_quality_draws(payload: Dict) -> int:
+    """The most quality draws any variant of a validated sweep payload needs."""
+    options = payload["base"].get("options") or {}
+    return max(
+        quality_draws(
+            int(variant.get("quality_scenarios") or options.get("quality_scenarios", 100)),
+            variant.get("scoring") or options.get("scoring", "monte_carlo"),
+        )
+        for variant in payload["variants"]
+    )
+
+
+def _views(
+    buffer: memoryview, handle: BankHandle
+) -> Tuple[np.ndarray, np.ndarray]:
+    split = handle.draws * handle.n_con * handle.n_var
+    flat = np.ndarray((split + handle.draws * handle.n_con,), np.uint16, buffer)
+    return (
+        flat[:split].reshape(handle.draws, handle.n_con, handle.n_var),
+        flat[split:].reshape(handle.draws, handle.n_con, 1),
+    )
+
+
+@contextmanager
+def attach(
+    handle: Optional[BankHandle],
+) -> Iterator[Optional[Tuple[np.ndarray, np.ndarray]]]:
+    """Map a bank read-only as ``(strata_constraint, strata_rhs)``.
+
+    Yields ``None`` for a ``None`` handle, so callers need no special case.
+    The arrays are views on the shared segment and must not outlive the block.
+    """
+    if handle is None:
+        yield None
+        return
+    segment = shared_memory.SharedMemory(name=handle.name)
+    strata = _views(segment.buf, handle)
+    strata[0].flags.writeable = False
+    strata[1].flags.writeable = False
+    try:
+        yield strata
+    finally:
+        del strata
+        try:
+            segment.close()
+        except BufferError:  # pragma: no cover - a caller kept a view alive
+            pass
+
+
+class _Bank:
+    def __init__(self, key: BankKey):
+        self.key = key
+        self.refs = 0
+        self.lock = threading.Lock()
+        self.segment: Optional[shared_memory.SharedMemory] = None
+        self.handle: Optional[BankHandle] = None
+
+    def populate(self) -> None:
+        n_con, n_var, draws, seed = self.key
+        # Same stream the bucket would use on its own, so a seeded job scores
+        # against identical draws whether or not it went through a bank.
+        _, stream = random_streams(seed)
+        handle = BankHandle("", draws, n_con, n_var)
+        segment = shared_memory.SharedMemory(create=True, size=handle.nbytes)
+        try:
+            handle = BankHandle(segment.name, draws, n_con, n_var)
+            constraint, rhs = _views(segment.buf, handle)
+            constraint[...] = sample_deltas(draws, n_con, n_var, True, stream)
+            rhs[...] = sample_deltas(draws, n_con, 1, True, stream)
+            del constraint, rhs
+        except BaseException:
+            segment.close()
+            segment.unlink()
+            raise
+        self.segment, self.handle = segment, handle
+
+    def destroy(self) -> None:
+        if self.segment is not None:
+            self.segment.close()
+            self.segment.unlink()
+            self.segment = None
+
+
+class ScenarioBank:
+    """Parent-owned, reference-counted pool of shared quality-scenario banks."""
+
+    def __init__(self, max_idle_bytes: int = 256 * 2**20):
+        self._lock = threading.Lock()
+        self._banks: "OrderedDict[BankKey, _Bank]" = OrderedDict()
+        self._max_idle_bytes = max_idle_bytes
+
+    def acquire(self, payload: Dict) -> Optional[BankHandle]:
+        """Reference (creating if needed) the bank for ``payload``.
+
+        Returns ``None`` when the payload cannot use a bank or shared memory
+        is unavailable; the worker then samples its own draws.
+        """
+        key = bank_key(payload)
+        if key is None:
+            return None
+        with self._lock:
+            bank = self._banks.get(key)
+            if bank is None:
+                bank = self._banks[key] = _Bank(key)
+            bank.refs += 1
+            self._banks.move_to_end(key)
+        # Populate outside the pool lock so other shapes are not held up;
+        # concurrent acquires of the same key wait here for one copy.
+        with bank.lock:
+            if bank.handle is None:
+                try:
+                    bank.populate()
+                except Exception:  # noqa: BLE001 - e.g. /dev/shm exhausted
+                    self._drop(bank)
+                    return None
+            return bank.handle
+
+    def release(self, handle: Optional[BankHandle]) -> None:
+        """Drop one reference; unlink or keep idle as described above."""
+        if handle is None:
+            return
+        with self._lock:
+            bank = next(
+                (b for b in self._banks.values() if b.handle == handle), None
+            )
+            if bank is None:
+                return
+            bank.refs -= 1
+            if bank.refs == 0 and bank.key[3] is None:
+                self._banks.pop(bank.key)
+                bank.destroy()
+            self._evict_idle()
+
+    def _drop(self, bank: _Bank) -> None:
+        with self._lock:
+            bank.refs -= 1
+            if bank.refs == 0 and self._banks.get(bank.key) is bank:
+                self._banks.pop(bank.key)
+
+    def _evict_idle(self) -> None:
+        # Oldest idle banks go first until the idle set fits the budget.
+        idle = [b for b in self._banks.values() if b.refs == 0]
+        idle_bytes = sum(b.handle.nbytes for b in idle if b.handle is not None)
+        for bank in idle:
+            if idle_bytes <= self._max_idle_bytes:
+                break
+            self._banks.pop(bank.key)
+            if bank.handle is not None:
+                idle_bytes -= bank.handle.nbytes
+            bank.destroy()
+
+    def stats(self) -> Dict[str, int]:
+        """Bank count, live references and resident bytes."""
+        with self._lock:
+            return {
+                "banks": len(self._banks),
+                "references": sum(b.refs for b in self._banks.values()),
+                "bytes": sum(
+                    b.handle.nbytes for b in self._banks.values() if b.handle
+                ),
+            }
+
+    def close(self) -> None:
+        """Unlink every bank (on shutdown, after the pool has stopped)."""
+        with self._lock:
+            banks, self._banks = list(self._banks.values()), OrderedDict()
+        for bank in banks:
+            bank.destroy()
@@ -0,0 +1,268 @@
+"""Fair-share scheduling of jobs onto a worker's pool slots.
+
+A pool executor runs what it is given in submission order, so one client that
+submits two hundred large problems holds every slot until the last of them
+finishes, and a small job submitted after them waits behind all of it. The
+:class:`FairScheduler` sits in front of the executor and decides which job
+gets a slot when one frees:
+
+* Every job falls into a **priority class** by its predicted CPU-seconds
+  (:class:`~sirom.api.admission.CostModel`): ``interactive``, ``standard`` or
+  ``batch``. A free slot goes to the smallest class with a job waiting.
+* Each class has a **concurrency bound**, so ``batch`` jobs can never take
+  every slot and a small job arriving later still finds one free soon.
+* Within a class, clients (an API key or an IP address) take turns by
+  **weighted fair queuing**: each job is stamped with a virtual start time
+  that advances its client's clock by the job's predicted CPU-seconds over
+  the client's weight, and the earliest stamp runs first. A client's share of
+  the slots is thus proportional to its weight, measured in work rather than
+  in jobs, however many jobs it queues.
+* A job may hold several slots (a sharded job, whose shards run on as many
+  workers). It counts as that many against both bounds, and while it waits
+  for them to free, later classes do not take them.
+
+Jobs are handed back as :class:`~concurrent.futures.Future` objects before
+they start. Cancelling one that is still waiting frees its place at once.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import CancelledError, Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+PRIORITY_CLASSES = ("interactive", "standard", "batch")
+# Virtual length of a job predicted to cost nothing, so its stamp still moves
+# its client's clock.
+_MIN_COST_SECONDS = 0.01
+
+
+def parse_weights(raw: Optional[str]) -> Dict[str, float]:
+    """Parse ``"client=weight,client=weight"`` (``SIROM_CLIENT_WEIGHTS``).
+
+    Malformed or non-positive entries are ignored.
+    """
+    weights: Dict[str, float] = {}
+    for item in (raw or "").split(","):
+        client, _, value = item.strip().rpartition("=")
+        try:
+            weight = float(value)
+        except ValueError:
+            continue
+        if client and weight > 0:
+            weights[client] = weight
+    return weights
+
+
+@dataclass(order=True)
+class _Entry:
+    tag: float
+    sequence: int
+    client: str = field(compare=False)
+    priority: str = field(compare=False)
+    enqueued: float = field(compare=False)
+    slots: int = field(compare=False)
+    start: Callable[[float], Future] = field(compare=False)
+    future: Future = field(compare=False)
+
+
+class FairScheduler:
+    """Hands a worker's pool slots to queued jobs, fairly across clients.
+
+    Args:
+        slots: Jobs that may run at once (the pool's workers).
+        weights: Share weight per client id; unlisted clients weigh 1.
+        interactive_seconds: Jobs predicted to take at most this long are
+            ``interactive``.
+        batch_seconds: Jobs predicted to take at least this long are
+            ``batch``; the rest are ``standard``.
+        class_slots: Most slots each class may hold at once. By default
+            ``interactive`` may use every slot, ``standard`` all but one and
+            ``batch`` half of them (at least one each).
+    """
+
+    def __init__(
+        self,
+        slots: int,
+        weights: Optional[Dict[str, float]] = None,
+        interactive_seconds: float = 2.0,
+        batch_seconds: float = 60.0,
+        class_slots: Optional[Dict[str, int]] = None,
+    ):
+        self.slots = max(1, slots)
+        self.weights = dict(weights or {})
+        self.interactive_seconds = interactive_seconds
+        self.batch_seconds = batch_seconds
+        self.class_slots = {
+            "interactive": self.slots,
+            "standard": max(1, self.slots - 1),
+            "batch": max(1, self.slots // 2),
+            **(class_slots or {}),
+        }
+        self._lock = threading.Lock()
+        self._queues: Dict[str, List[_Entry]] = {p: [] for p in PRIORITY_CLASSES}
+        self._running: Dict[str, int] = {p: 0 for p in PRIORITY_CLASSES}
+        # Virtual time: the stamp of the job dispatched last. A client's clock
+        # is the virtual finish time of its latest queued job.
+        self._virtual_time = 0.0
+        self._clocks: Dict[str, float] = {}
+        self._sequence = itertools.count()
+        self._closed = False
+
+    def classify(self, cpu_seconds: float) -> str:
+        """The priority class of a job predicted to take ``cpu_seconds``."""
+        if cpu_seconds <= self.interactive_seconds:
+            return "interactive"
+        if cpu_seconds >= self.batch_seconds:
+            return "batch"
+        return "standard"
+
+    def slots_for(self, cpu_seconds: float, wanted: int) -> int:
+        """Slots a job predicted to take ``cpu_seconds`` may hold of ``wanted``:
+        at least one, and no more than its class may."""
+        bound = min(self.slots, self.class_slots[self.classify(cpu_seconds)])
+        return max(1, min(wanted, bound))
+
+    def submit(
+        self,
+        client: str,
+        cpu_seconds: float,
+        start: Callable[[float], Future],
+        slots: int = 1,
+    ) -> Future:
+        """Queue a job; ``start(wait_seconds)`` launches it once it gets a slot.
+
+        The job holds ``slots`` slots while it runs, capped by
+        :meth:`slots_for`. Returns a future that completes with the launched
+        job's outcome, or can be cancelled while the job still waits.
+        """
+        future: Future = Future()
+        cost = max(cpu_seconds, _MIN_COST_SECONDS) / self.weights.get(client, 1.0)
+        with self._lock:
+            if self._closed:
+                future.cancel()
+                return future
+            tag = max(self._virtual_time, self._clocks.get(client, 0.0))
+            self._clocks[client] = tag + cost
+            priority = self.classify(cpu_seconds)
+            heapq.heappush(
+                self._queues[priority],
+                _Entry(
+                    tag,
+                    next(self._sequence),
+                    client,
+                    priority,
+                    time.monotonic(),
+                    self.slots_for(cpu_seconds, slots),
+                    start,
+                    future,
+                ),
+            )
+        self._dispatch()
+        return future
+
+    def _next(self) -> Optional[_Entry]:
+        # Called with the lock held.
+        free = self.slots - sum(self._running.values())
+        if free <= 0:
+            return None
+        for priority in PRIORITY_CLASSES:
+            queue = self._queues[priority]
+            # Drop jobs cancelled while waiting.
+            while queue and queue[0].future.cancelled():
+                heapq.heappop(queue)
+            if not queue:
+                continue
+            if queue[0].slots > free:
+                # Hold the free slots for it, or smaller jobs could starve it.
+                return None
+            if self._running[priority] + queue[0].slots > self.class_slots[priority]:
+                continue
+            entry = heapq.heappop(queue)
+            self._running[priority] += entry.slots
+            self._virtual_time = max(self._virtual_time, entry.tag)
+            return entry
+        return None
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._lock:
+                if self._closed:
+                    return
+                entry = self._next()
+                if entry is None:
+                    self._forget_idle_clients()
+                    return
+            if not entry.future.set_running_or_notify_cancel():
+                self._release(entry)
+                continue
+            try:
+                launched = entry.start(time.monotonic() - entry.enqueued)
+            except BaseException as exc:  # noqa: BLE001 - surfaced on the future
+                entry.future.set_exception(exc)
+                self._release(entry)
+                continue
+            launched.add_done_callback(
+                lambda done, entry=entry: self._settle(entry, done)
+            )
+
+    def _settle(self, entry: _Entry, launched: Future) -> None:
+        # Free the slot first, so the next job starts while this one is
+        # being recorded.
+        self._release(entry)
+        self._dispatch()
+        if launched.cancelled():
+            entry.future.set_exception(CancelledError())
+        elif launched.exception() is not None:
+            entry.future.set_exception(launched.exception())
+        else:
+            entry.future.set_result(launched.result())
+
+    def _release(self, entry: _Entry) -> None:
+        with self._lock:
+            self._running[entry.priority] -= entry.slots
+
+    def _forget_idle_clients(self) -> None:
+        # Called with the lock held. A clock behind virtual time gives its
+        # client no head start, so it can go.
+        for client in [c for c, t in self._clocks.items() if t <= self._virtual_time]:
+            del self._clocks[client]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Waiting jobs and held slots per class, and waiting jobs per client."""
+        with self._lock:
+            waiting = {
+                p: [e for e in queue if not e.future.cancelled()]
+                for p, queue in self._queues.items()
+            }
+            running = dict(self._running)
+        clients: Dict[str, int] = {}
+        for entries in waiting.values():
+            for entry in entries:
+                clients[entry.client] = clients.get(entry.client, 0) + 1
+        return {
+            "slots": self.slots,
+            "classes": {
+                p: {
+                    "waiting": len(waiting[p]),
+                    "running": running[p],
+                    "max_running": self.class_slots[p],
+                }
+                for p in PRIORITY_CLASSES
+            },
+            "waiting_by_client": clients,
+        }
+
+    def close(self) -> None:
+        """Stop dispatching and cancel every job still waiting."""
+        with self._lock:
+            self._closed = True
+            entries = [e for queue in self._queues.values() for e in queue]
+            for queue in self._queues.values():
+                queue.clear()
+        for entry in entries:
+            entry.future.cancel()
@@ -11,7 +11,7 @@ from __future__ import annotations
 
 import os
 from enum import Enum
-from typing import Dict, List, Optional
+from typing import Any, Dict, List, Literal, Optional, Tuple, Union
 
 from pydantic import BaseModel, Field, model_validator
 
@@ -40,6 +40,10 @@ MAX_CLUSTERS = _env_int("SIROM_MAX_CLUSTERS", 50)
 # Multiplicative guard for problems that are individually within limits but
 # huge in combination (scenarios x variables x constraints).
 CELL_BUDGET = _env_int("SIROM_CELL_BUDGET", 5_000_000)
+# Problems per POST /solve/batch, and job ids per POST /jobs/status.
+MAX_BATCH = _env_int("SIROM_MAX_BATCH", 500)
+# Variants per POST /sweep.
+MAX_SWEEP_VARIANTS = _env_int("SIROM_MAX_SWEEP_VARIANTS", 50)
 
 
 class SolveOptions(BaseModel):
@@ -66,6 +70,44 @@ class SolveOptions(BaseModel):
         description="Branching factor of the internal clustering heuristic "
         "(advanced; the published default is 3).",
     )
+    scoring: Literal["monte_carlo", "importance", "control_variate"] = Field(
+        default="monte_carlo",
+        description="How quality_scenarios estimate each candidate's "
+        "feasibility probability. `monte_carlo` counts feasible draws; "
+        "`importance` shifts the draws toward the candidate's nearly-binding "
+        "constraints and reweights them, which separates probabilities such as "
+        "0.995 and 0.999 with far fewer scenarios. `control_variate` pairs "
+        "each draw with its antithetic mirror and corrects with the "
+        "nominal-midpoint slacks, cutting the scenarios needed for a given "
+        "error mostly away from the extreme tail. Candidates report "
+        "`effective_sample_size` or `variance_reduction` respectively.",
+    )
+    seed: Optional[int] = Field(
+        default=None,
+        ge=0,
+        description="Seed for the scenario and quality sampling. The same seed "
+        "on the same problem reproduces the same frontier; null draws fresh "
+        "scenarios on every run.",
+    )
+    time_limit_seconds: Optional[float] = Field(
+        default=None,
+        gt=0,
+        description="Wall-clock budget for the run, measured from when it "
+        "starts executing. Checked between scenario solves, clustering "
+        "splits, cluster re-solves and scoring chunks, and passed to OR-Tools "
+        "for each solve; a job that runs out fails with a message naming the "
+        "phase it reached. Null = no limit.",
+    )
+    deadline_seconds: Optional[float] = Field(
+        default=None,
+        gt=0,
+        description="Anytime mode: return the best frontier found within this "
+        "many seconds instead of running every phase to completion. Each phase "
+        "gets a share of the budget and stops early when it is spent (fewer "
+        "scenarios, a coarser cluster tree with the most promising nodes "
+        "re-solved first, fewer quality scenarios); `summary.truncated_phases` "
+        "says what was cut. Best effort: a minimum of work always runs.",
+    )
     solver: Optional[str] = Field(
         default=None,
         description="Override the solver backend. Default (null) auto-selects "
@@ -79,6 +121,17 @@ class SolveOptions(BaseModel):
         description="If true, the run's internal timing log is returned with "
         "the result.",
     )
+    warm_start: bool = Field(
+        default=True,
+        description="Reuse the last run of a problem with the same shape, "
+        "sparsity and integer variables when only its intervals were edited: "
+        "scenarios still inside the new intervals keep their solutions (in "
+        "proportion to how much of the new box the old one covers, so the "
+        "sample stays uniform), the others are solved warm from a neighbour, "
+        "and cluster nodes over unchanged scenarios are not re-solved. Only "
+        "for unseeded runs without a deadline, on the worker process that ran "
+        "the last one; `summary.reused_scenarios` says what was reused.",
+    )
 
 
 class SolveRequest(BaseModel):
@@ -118,6 +171,15 @@ class SolveRequest(BaseModel):
         "(empty = pure LP). Integer problems are solved with a MIP backend.",
     )
     options: SolveOptions = Field(default_factory=SolveOptions)
+    callback_url: Optional[str] = Field(
+        default=None,
+        max_length=2048,
+        pattern=r"^https?://",
+        description="Optional http(s) URL to POST the finished job to (its "
+        "id, status and result or errors), retried with backoff, so you do "
+        "not need to poll. Not part of the problem: identical problems with "
+        "different callbacks still share one solve.",
+    )
 
     model_config = {"json_schema_extra": {"examples": [EXAMPLE_PROBLEM]}}
 
@@ -201,6 +263,27 @@ class RobustSolution(BaseModel):
         "random realizations of the uncertain coefficients (the robustness "
         "score; higher is more robust).",
     )
+    effective_sample_size: Optional[float] = Field(
+        default=None,
+        description="Kish effective sample size of the importance-sampling "
+        "weights behind feasibility_probability (only with "
+        "`options.scoring = importance`). Far below quality_scenarios means the "
+        "estimate rests on few scenarios and should not be trusted.",
+    )
+    occurrences: int = Field(
+        default=1,
+        ge=1,
+        description="How many scenario solves and cluster re-solves produced "
+        "this exact decision vector — a rough 'how often does this plan come "
+        "out' signal.",
+    )
+    variance_reduction: Optional[float] = Field(
+        default=None,
+        description="Estimated variance of plain Monte Carlo over the same "
+        "quality_scenarios divided by the variance of this estimate (only "
+        "with `options.scoring = control_variate`). 4 means plain Monte Carlo "
+        "would need about four times the scenarios for the same error.",
+    )
 
 
 class SolveSummary(BaseModel):
@@ -224,6 +307,23 @@ class SolveSummary(BaseModel):
             "split is rarely where you would guess."
         ),
     )
+    truncated_phases: Dict[str, str] = Field(
+        default_factory=dict,
+        description="Phases an anytime deadline (options.deadline_seconds) cut "
+        "short, with what they left out, e.g. "
+        '`{"scenario_solves": "412 of 1000 scenarios"}`. Empty when every '
+        "phase ran to completion.",
+    )
+    reused_scenarios: int = Field(
+        default=0,
+        description="Scenario solutions reused from an earlier run of the "
+        "same problem with other intervals (options.warm_start).",
+    )
+    reused_cluster_nodes: int = Field(
+        default=0,
+        description="Cluster nodes whose solution was reused, their scenarios "
+        "unchanged since that run.",
+    )
 
 
 class SolveResponse(BaseModel):
@@ -239,13 +339,233 @@ class SolveResponse(BaseModel):
     log: Optional[List[str]] = Field(
         default=None, description="Internal run log (only if include_log was set)."
     )
+    # Every distinct candidate, not just the frontier, kept by the job store
+    # for POST /jobs/{id}/rescore; never serialized.
+    candidates: Optional[Dict[str, Any]] = Field(default=None, exclude=True)
+    # ``(structure key, PriorRun)`` of a run later edits may warm-start from,
+    # for the job manager to keep (see sirom.api.prior_runs); never serialized.
+    prior_run: Optional[Tuple[str, Any]] = Field(default=None, exclude=True)
+
+
+class SweepVariant(BaseModel):
+    """What one point of a sweep changes from the base problem.
+
+    Unset fields keep the base's value.
+    """
+
+    label: Optional[str] = Field(
+        default=None, max_length=200, description="Echoed back with its result."
+    )
+    objective: Optional[List[float]] = None
+    lb_b: Optional[List[float]] = None
+    ub_b: Optional[List[float]] = None
+    number_of_scenarios: Optional[int] = Field(
+        default=None,
+        ge=1,
+        le=MAX_SCENARIOS,
+        description="Fewer than the sweep's largest uses a prefix of the "
+        "shared scenarios.",
+    )
+    quality_scenarios: Optional[int] = Field(default=None, ge=1, le=MAX_SCENARIOS)
+    clusters: Optional[int] = Field(default=None, ge=2, le=MAX_CLUSTERS)
+    scoring: Optional[Literal["monte_carlo", "importance", "control_variate"]] = None
+
+
+class SweepRequest(BaseModel):
+    """Body of ``POST /sweep``: one base problem and the variants to run.
+
+    Every variant is solved over the same sampled scenarios and scored
+    against the same quality draws, and its scenario LPs are re-solved from
+    the previous variant's optimal bases, so a sweep costs far less than one
+    job per variant. The constraint-matrix intervals are the base's
+    throughout.
+    """
+
+    base: SolveRequest
+    variants: List[SweepVariant] = Field(
+        ..., min_length=1, max_length=MAX_SWEEP_VARIANTS
+    )
+    callback_url: Optional[str] = Field(
+        default=None,
+        max_length=2048,
+        pattern=r"^https?://",
+        description="As for `POST /solve` (a `base.callback_url` is taken as "
+        "this).",
+    )
+
+    @model_validator(mode="after")
+    def _check_variants(self) -> "SweepRequest":
+        base = self.base
+        # Not part of the problem, so kept out of the job's identity.
+        if base.callback_url is not None:
+            self.callback_url = self.callback_url or base.callback_url
+            base.callback_url = None
+        if base.options.deadline_seconds is not None:
+            raise ValueError(
+                "options.deadline_seconds is not supported for sweeps; use "
+                "options.time_limit_seconds."
+            )
+        n_vars, n_constraints = len(base.objective), len(base.lb_A)
+        for k, variant in enumerate(self.variants):
+            if variant.objective is not None and len(variant.objective) != n_vars:
+                raise ValueError(
+                    f"variants[{k}].objective has {len(variant.objective)} "
+                    f"entries; expected {n_vars} (one per variable)."
+                )
+            lb_b = variant.lb_b if variant.lb_b is not None else base.lb_b
+            ub_b = variant.ub_b if variant.ub_b is not None else base.ub_b
+            if not (len(lb_b) == len(ub_b) == n_constraints):
+                raise ValueError(
+                    f"variants[{k}] lb_b and ub_b must have one entry per "
+                    f"constraint row (expected {n_constraints})."
+                )
+            for i, (lo, hi) in enumerate(zip(lb_b, ub_b)):
+                if lo > hi:
+                    raise ValueError(
+                        f"variants[{k}] lb_b[{i}] ({lo}) exceeds ub_b[{i}] "
+                        f"({hi}); lower bounds must not exceed upper bounds."
+                    )
+            scenarios = variant.number_of_scenarios or base.options.number_of_scenarios
+            cells = scenarios * n_vars * n_constraints
+            if cells > CELL_BUDGET:
+                raise ValueError(
+                    f"variants[{k}] too large: number_of_scenarios x variables "
+                    f"x constraints = {cells} exceeds the budget of "
+                    f"{CELL_BUDGET} (SIROM_CELL_BUDGET)."
+                )
+        return self
+
+
+class SweepResult(SolveResponse):
+    """One variant's frontier."""
+
+    label: Optional[str] = None
+
+
+class SweepSummary(BaseModel):
+    """At-a-glance statistics of a whole sweep."""
+
+    runtime_seconds: float
+    phase_seconds: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Wall-clock seconds per phase, over every variant. "
+        "scenario_solves covers all variants at once.",
+    )
+    scenario_solves: int = Field(..., description="Scenario LPs solved in all.")
+    warm_starts: int = Field(
+        ...,
+        description="Of those, re-solved from the previous variant's basis "
+        "instead of from scratch.",
+    )
+
+
+class SweepResponse(BaseModel):
+    """The result of a sweep job: one frontier per variant, in request order."""
+
+    variants: List[SweepResult]
+    summary: SweepSummary
+    log: Optional[List[str]] = Field(
+        default=None, description="Internal run log (only if include_log was set)."
+    )
+
 
+class RescoreRequest(BaseModel):
+    """Body of ``POST /jobs/{id}/rescore``: new interval bounds, same shape.
+
+    The job's candidates are kept as they are and only re-scored, so the
+    objective and the problem's shape cannot change.
+    """
+
+    lb_A: List[List[float]] = Field(..., min_length=1)
+    ub_A: List[List[float]] = Field(..., min_length=1)
+    lb_b: List[float] = Field(..., min_length=1)
+    ub_b: List[float] = Field(..., min_length=1)
+
+    @model_validator(mode="after")
+    def _check_bounds(self) -> "RescoreRequest":
+        n_constraints = len(self.lb_A)
+        if len(self.ub_A) != n_constraints or not (
+            len(self.lb_b) == len(self.ub_b) == n_constraints
+        ):
+            raise ValueError(
+                "lb_A, ub_A, lb_b and ub_b must have one row or entry per "
+                "constraint."
+            )
+        n_vars = len(self.lb_A[0])
+        for i, (lo_row, hi_row) in enumerate(zip(self.lb_A, self.ub_A)):
+            if len(lo_row) != n_vars or len(hi_row) != n_vars:
+                raise ValueError(f"Row {i} of lb_A or ub_A has the wrong length.")
+            for j, (lo, hi) in enumerate(zip(lo_row, hi_row)):
+                if lo > hi:
+                    raise ValueError(
+                        f"lb_A[{i}][{j}] ({lo}) exceeds ub_A[{i}][{j}] ({hi})."
+                    )
+        for i, (lo, hi) in enumerate(zip(self.lb_b, self.ub_b)):
+            if lo > hi:
+                raise ValueError(f"lb_b[{i}] ({lo}) exceeds ub_b[{i}] ({hi}).")
+        return self
 
 class JobStatus(str, Enum):
     pending = "pending"
     running = "running"
     succeeded = "succeeded"
     failed = "failed"
+    cancelled = "cancelled"
+
+
+class PhaseProgress(BaseModel):
+    """How far one pipeline phase has got."""
+
+    done: int = Field(
+        ...,
+        description="Units finished: scenarios solved (scenario_solves), KMeans "
+        "splits (clustering), tree nodes re-solved (cluster_resolves) or "
+        "candidates scored (quality_scoring).",
+    )
+    total: Optional[int] = Field(
+        default=None,
+        description="Units this phase will do; absent while unknown (the "
+        "clustering split count is only known once the tree is built).",
+    )
+    elapsed_seconds: float
+    eta_seconds: Optional[float] = Field(
+        default=None,
+        description="Seconds until the phase finishes at its rate so far; 0 "
+        "once it has, absent before it has a rate.",
+    )
+
+
+class JobProgress(BaseModel):
+    """Live counters of a job, updated a few times per second while it runs."""
+
+    phase: str = Field(..., description="The phase of the latest update.")
+    elapsed_seconds: float = Field(..., description="Seconds since the run started.")
+    eta_seconds: Optional[float] = Field(
+        default=None, description="The current phase's `eta_seconds`."
+    )
+    phases: Dict[str, PhaseProgress] = Field(
+        default_factory=dict, description="Counters of every phase started so far."
+    )
+
+
+class JobSchedule(BaseModel):
+    """How a job was queued for a pool slot."""
+
+    client: str = Field(
+        ...,
+        description="Whose share of the pool the job ran under: `key:` and a "
+        "digest of the `X-API-Key` header, or `ip:` and the caller's address.",
+    )
+    priority: str = Field(
+        ...,
+        description="`interactive`, `standard` or `batch`, by the job's "
+        "predicted CPU-seconds. Smaller classes get free slots first.",
+    )
+    estimated_cpu_seconds: float
+    wait_seconds: Optional[float] = Field(
+        default=None,
+        description="Seconds the job waited for a slot; absent until it starts.",
+    )
 
 
 class JobCreatedResponse(BaseModel):
@@ -261,9 +581,69 @@ class JobStatusResponse(BaseModel):
 
     job_id: str
     status: JobStatus
-    result: Optional[SolveResponse] = Field(
-        default=None, description="Present once status is `succeeded`."
+    result: Optional[Union[SolveResponse, SweepResponse]] = Field(
+        default=None,
+        description="Present once status is `succeeded`: a frontier, or one "
+        "per variant for a sweep.",
     )
     errors: Optional[List[str]] = Field(
-        default=None, description="Present once status is `failed`."
+        default=None, description="Present once status is `failed` or `cancelled`."
+    )
+    progress: Optional[JobProgress] = Field(
+        default=None,
+        description="Per-phase counters and ETA, present once the job has "
+        "started. Stays at its last value after the job ends.",
+    )
+    schedule: Optional[JobSchedule] = None
+
+
+class BatchSolveRequest(BaseModel):
+    """Body of ``POST /solve/batch``: many problems, submitted at once."""
+
+    problems: List[SolveRequest] = Field(
+        ..., min_length=1, max_length=MAX_BATCH,
+        description="Each is a `POST /solve` body. Identical problems share "
+        "one job.",
+    )
+
+
+class BatchJobCreated(BaseModel):
+    """The outcome of one problem of a batch, in the order submitted."""
+
+    job_id: Optional[str] = Field(
+        default=None, description="Absent when the problem was refused."
+    )
+    status: Optional[JobStatus] = None
+    result_url: Optional[str] = None
+    error: Optional[str] = Field(
+        default=None,
+        description="Why admission control refused this problem: the queue "
+        "is full, or the problem would need more memory than a job may use.",
+    )
+    retry_after_seconds: Optional[int] = Field(
+        default=None, description="When a full queue refused it: when to retry."
     )
+
+
+class BatchSolveResponse(BaseModel):
+    """Returned by ``POST /solve/batch`` (HTTP 202)."""
+
+    jobs: List[BatchJobCreated]
+
+
+class JobsStatusRequest(BaseModel):
+    """Body of ``POST /jobs/status``."""
+
+    job_ids: List[str] = Field(..., min_length=1, max_length=MAX_BATCH)
+
+
+class JobsStatusResponse(BaseModel):
+    """Returned by ``POST /jobs/status``: no results, poll each job for those."""
+
+    jobs: List[JobStatusResponse] = Field(
+        ..., description="Known jobs, in request order, without `result`."
+    )
+    unknown: List[str] = Field(
+        default_factory=list, description="Ids never issued or already expired."
+    )
+
@@ -6,52 +6,80 @@ and post-processes the raw solution pool into a clean, non-dominated Pareto
 frontier (objective value vs. feasibility probability) — the meaningful answer
 a decision-maker wants. Keeping this self-contained means a job runner can call
 ``run_solve_job`` in a thread, a child process, or inline without changes.
+A sweep (:func:`solve_sweep`) goes through the same entry point and returns
+one such frontier per variant. A job that may warm-start is handed the last
+run of its structure by the job manager (:mod:`sirom.api.prior_runs`) and
+hands its own run back with its result, so an edited resubmission reuses what
+it can whichever process runs it.
 """
 
 from __future__ import annotations
 
 import contextlib
 import io
+import secrets
 import time
-from typing import Any, Dict, List, Tuple, cast
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, cast
 
-from sirom.batch_solver import ProblemsBucket
+import numpy as np
+
+from sirom.batch_solver import ProblemsBucket, random_streams, sample_deltas
 from sirom.mini_ortools_solver import (
     ScoredSolution,
+    decision_key,
     feasibility,
     is_optimal,
     solver_available,
 )
+from sirom.run_control import CancelFlag, ProgressSink, RunCancelled, RunControl
+from sirom.sharding import ShardMap
+from sirom.sweep import Sweep, Variant
+from sirom.warm_start import WarmStartIndex, structure_key
 
-from .errors import SolveError, friendly_messages, has_errors
+from .errors import SolveCancelled, SolveError, friendly_messages, has_errors
+from .prior_runs import PriorHandle, load
+from .results import PackedResult
+from .scenario_bank import MAX_BANK_DRAWS, BankHandle, attach, sweep_quality_draws
 from .schemas import (
+    RescoreRequest,
     RobustSolution,
     SolveRequest,
     SolveResponse,
     SolveSummary,
+    SweepRequest,
+    SweepResponse,
+    SweepResult,
+    SweepSummary,
 )
 
 
-def _pareto_front(
-    candidates: List[Tuple[float, float, List[float]]]
-) -> List[Tuple[float, float, List[float]]]:
-    """Return the non-dominated set from ``(objective, feasibility, vars)``.
+# Estimator-specific extras a Scored Solution may carry into the response.
+_SCORING_DIAGNOSTICS = ("effective_sample_size", "variance_reduction", "occurrences")
+
+# (objective, feasibility, variables, scoring diagnostics)
+Candidate = Tuple[float, float, List[float], Dict[str, float]]
+
+
+def _pareto_front(candidates: List[Candidate]) -> List[Candidate]:
+    """Return the non-dominated set from ``(objective, feasibility, vars, extra)``.
 
     Minimizes objective, maximizes feasibility. A point is dominated if another
     is at least as good on both axes and strictly better on one. Exact-duplicate
-    points are collapsed.
+    points are collapsed (the bucket already interns decision vectors, so this
+    only guards callers that pass raw results).
     """
-    # Deduplicate on a rounded key to avoid float noise producing near-copies.
-    unique: Dict[Tuple[float, float, Tuple[float, ...]], Tuple[float, float, List[float]]] = {}
-    for obj, feas, variables in candidates:
-        key = (round(obj, 9), round(feas, 9), tuple(round(v, 9) for v in variables))
-        unique.setdefault(key, (obj, feas, variables))
+    # Deduplicate on the quantized decision key to avoid float noise producing
+    # near-copies.
+    unique: Dict[Tuple[float, float, bytes], Candidate] = {}
+    for obj, feas, variables, extra in candidates:
+        key = (round(obj, 9), round(feas, 9), decision_key(variables))
+        unique.setdefault(key, (obj, feas, variables, extra))
     points = list(unique.values())
 
-    front: List[Tuple[float, float, List[float]]] = []
-    for i, (obj_i, feas_i, vars_i) in enumerate(points):
+    front: List[Candidate] = []
+    for i, (obj_i, feas_i, vars_i, extra_i) in enumerate(points):
         dominated = False
-        for j, (obj_j, feas_j, _) in enumerate(points):
+        for j, (obj_j, feas_j, _, _) in enumerate(points):
             if i == j:
                 continue
             if (
@@ -62,36 +90,184 @@ def _pareto_front(
                 dominated = True
                 break
         if not dominated:
-            front.append((obj_i, feas_i, vars_i))
+            front.append((obj_i, feas_i, vars_i, extra_i))
 
     # Most robust first, then cheapest objective.
     front.sort(key=lambda p: (-p[1], p[0]))
     return front
 
 
-def solve_problem(request: SolveRequest) -> SolveResponse:
+def _candidates(results: List[ScoredSolution]) -> List[Candidate]:
+    candidates: List[Candidate] = []
+    for r in results:
+        extra: Dict[str, float] = {
+            key: float(r[key])  # type: ignore[literal-required]
+            for key in _SCORING_DIAGNOSTICS
+            if key in r
+        }
+        candidates.append(
+            (
+                float(r["objective_value"]),
+                feasibility(r),
+                [float(v) for v in r["variable"]],
+                extra,
+            )
+        )
+    return candidates
+
+
+def _frontier_sink(
+    progress: ProgressSink, bucket: "Callable[[], Optional[ProblemsBucket]]"
+) -> ProgressSink:
+    # While candidates are being scored, snapshots also carry the frontier of
+    # those scored so far, so streaming clients can draw it as it fills in.
+    def publish(snapshot: Dict[str, Any]) -> None:
+        current = bucket()
+        if snapshot["phase"] == "quality_scoring" and current is not None:
+            snapshot = {
+                **snapshot,
+                "frontier": [
+                    {
+                        "variables": variables,
+                        "objective_value": obj,
+                        "feasibility_probability": feas,
+                        **extra,
+                    }
+                    for obj, feas, variables, extra in _pareto_front(
+                        _candidates(current.scored_so_far())
+                    )
+                ],
+            }
+        progress(snapshot)
+
+    return publish
+
+
+def _check_solver(solver: Optional[str]) -> None:
+    if solver is not None and not solver_available(solver):
+        raise SolveError(
+            [
+                f"Solver '{solver}' is not available in this "
+                "OR-Tools build. Open-source backends (GLOP, CLP, PDLP, "
+                "SCIP, CBC) ship by default; commercial solvers (GUROBI, "
+                "CPLEX, XPRESS) require an OR-Tools build linked against "
+                "them and a valid license."
+            ]
+        )
+
+
+@contextlib.contextmanager
+def _run_failures(time_limit_seconds: Optional[float]) -> Iterator[None]:
+    # Turns whatever stops a run into SolveError / SolveCancelled with
+    # client-safe messages.
+    try:
+        yield
+    except SolveError:
+        raise
+    except RunCancelled as stop:
+        if stop.reason == "cancelled":
+            raise SolveCancelled(["The job was cancelled."])
+        raise SolveError(
+            [
+                f"The time limit of {time_limit_seconds:g} s was reached "
+                f"during {stop.phase.replace('_', ' ')}. Raise "
+                "options.time_limit_seconds or use fewer scenarios."
+            ]
+        )
+    except Exception as exc:  # noqa: BLE001 - convert any run failure to safe text
+        raise SolveError(
+            [
+                "The solver could not complete this problem. It may be "
+                "infeasible, unbounded, or degenerate. Try tighter coefficient "
+                f"bounds or fewer scenarios. ({type(exc).__name__})"
+            ]
+        )
+
+
+def _run_after_solves(
+    bucket: ProblemsBucket,
+    phase_seconds: Dict[str, float],
+    quality_scenarios: int,
+    scoring: str,
+    strata: Optional[Tuple[Any, Any]],
+) -> None:
+    # The phases after the scenario solves, each timed into phase_seconds.
+    _t = time.perf_counter()
+    bucket.cluster_and_selection()
+    phase_seconds["clustering"] = time.perf_counter() - _t
+
+    _t = time.perf_counter()
+    bucket.solve_cluster_tree()
+    phase_seconds["cluster_resolves"] = time.perf_counter() - _t
+
+    _t = time.perf_counter()
+    bucket.apply_quality_measure(
+        number_of_scenarios=quality_scenarios, method=scoring, strata=strata
+    )
+    phase_seconds["quality_scoring"] = time.perf_counter() - _t
+
+
+def solve_problem(
+    request: SolveRequest,
+    bank: Optional[BankHandle] = None,
+    cancel_flag: Optional[CancelFlag] = None,
+    progress: Optional[ProgressSink] = None,
+    shard_map: Optional[ShardMap] = None,
+    shards: int = 1,
+    prior: Optional[PriorHandle] = None,
+) -> SolveResponse:
     """Run the full SIROM pipeline and return the robustness/cost frontier.
 
+    ``bank`` is a shared quality-scenario bank to score against instead of
+    sampling fresh draws (see :mod:`sirom.api.scenario_bank`). The run stops
+    at its next checkpoint once ``cancel_flag`` is set or
+    ``options.time_limit_seconds`` has passed. ``progress`` receives throttled
+    snapshots of the per-phase counters (see :meth:`RunControl.report`);
+    during quality scoring they also carry the partial ``frontier``.
+
+    With a ``shard_map`` the scenario solves and the Monte Carlo count run as
+    ``shards`` scenario ranges through it (see :mod:`sirom.sharding`). Shards
+    regenerate their scenarios from the seed, so an unseeded request is given
+    a random one.
+
+    With ``options.warm_start`` the run may reuse ``prior``, the last run of
+    its structure the job manager kept (see :mod:`sirom.api.prior_runs`), and
+    a whole unseeded run comes back as the response's ``prior_run``.
+
     Raises :class:`SolveError` with client-safe messages if the problem is
-    rejected by the algorithm or fails mid-run.
+    rejected by the algorithm, fails mid-run or runs out of time, and
+    :class:`SolveCancelled` if it was cancelled.
     """
     opts = request.options
+    bucket: Optional[ProblemsBucket] = None
+    control = RunControl(
+        opts.time_limit_seconds,
+        cancel_flag,
+        deadline_seconds=opts.deadline_seconds,
+        progress=(
+            _frontier_sink(progress, lambda: bucket) if progress is not None else None
+        ),
+    )
     started = time.time()
     phase_seconds: Dict[str, float] = {}
     log_buffer = io.StringIO()
+    warm_start: Optional[WarmStartIndex] = None
+    prior_run = None
+    if opts.warm_start:
+        # This job's own index: the shipped prior run, then this run if whole.
+        warm_start = WarmStartIndex()
+        key = structure_key(
+            np.asarray(request.lb_A, dtype=float),
+            np.asarray(request.ub_A, dtype=float),
+            request.integer_variables,
+        )
+        prior_run = load(prior)
+        if prior_run is not None:
+            warm_start.remember(key, prior_run)
 
-    try:
+    with _run_failures(opts.time_limit_seconds):
         with contextlib.redirect_stdout(log_buffer):
-            if opts.solver is not None and not solver_available(opts.solver):
-                raise SolveError(
-                    [
-                        f"Solver '{opts.solver}' is not available in this "
-                        "OR-Tools build. Open-source backends (GLOP, CLP, PDLP, "
-                        "SCIP, CBC) ship by default; commercial solvers (GUROBI, "
-                        "CPLEX, XPRESS) require an OR-Tools build linked against "
-                        "them and a valid license."
-                    ]
-                )
+            _check_solver(opts.solver)
             bucket = ProblemsBucket(
                 request.objective,
                 request.lb_A,
@@ -102,6 +278,15 @@ def solve_problem(request: SolveRequest) -> SolveResponse:
                 number_of_clusters=opts.clusters,
                 integer_variables=request.integer_variables,
                 solver_selection=opts.solver,
+                seed=(
+                    opts.seed
+                    if opts.seed is not None or shard_map is None
+                    else secrets.randbelow(2**31)
+                ),
+                control=control,
+                shard_map=shard_map,
+                shards=shards,
+                warm_start=warm_start,
             )
             if has_errors(bucket.status):
                 raise SolveError(friendly_messages(bucket.status))
@@ -113,57 +298,152 @@ def solve_problem(request: SolveRequest) -> SolveResponse:
             bucket.solve()
             phase_seconds["scenario_solves"] = time.perf_counter() - _t
 
-            _t = time.perf_counter()
-            bucket.cluster_and_selection()
-            phase_seconds["clustering"] = time.perf_counter() - _t
+            with attach(bank) as strata:
+                _run_after_solves(
+                    bucket, phase_seconds, opts.quality_scenarios, opts.scoring, strata
+                )
 
-            _t = time.perf_counter()
-            bucket.solve_cluster_tree()
-            phase_seconds["cluster_resolves"] = time.perf_counter() - _t
+    response = _response(bucket, control, phase_seconds, started)
+    if opts.include_log:
+        response.log = log_buffer.getvalue().splitlines()
+    response.candidates = _candidate_pool(bucket, request)
+    if warm_start is not None:
+        run = warm_start.lookup(key)
+        if run is not None and run is not prior_run:
+            response.prior_run = (key, run)
+    return response
 
-            _t = time.perf_counter()
-            bucket.apply_quality_measure(number_of_scenarios=opts.quality_scenarios)
-            phase_seconds["quality_scoring"] = time.perf_counter() - _t
-    except SolveError:
-        raise
-    except Exception as exc:  # noqa: BLE001 - convert any run failure to safe text
+
+def _candidate_pool(bucket: ProblemsBucket, request: SolveRequest) -> Dict[str, Any]:
+    # Everything a rescore needs: every distinct candidate, dominated or not
+    # (new bounds can reorder them), and how the run scored them.
+    unique = bucket.unique_results()
+    return {
+        "objective": list(request.objective),
+        "shape": [len(request.lb_A), len(request.objective)],
+        "variables": np.asarray(
+            [r["variable"] for r in unique], dtype=float
+        ).reshape(len(unique), len(request.objective)),
+        "objective_values": [float(r["objective_value"]) for r in unique],
+        "occurrences": [int(r.get("occurrences", 1)) for r in unique],
+        "quality_scenarios": request.options.quality_scenarios,
+        "scoring": request.options.scoring,
+        # The seed the run actually used (a sharded run draws one).
+        "seed": bucket.seed,
+    }
+
+
+def rescore_candidates(
+    candidates: Dict[str, Any],
+    request: RescoreRequest,
+    summary: Dict[str, Any],
+    bank: Optional[BankHandle] = None,
+) -> SolveResponse:
+    """Re-score a finished job's candidate pool under new interval bounds.
+
+    Runs only the quality phase, vectorized over the stored candidates, and
+    returns the new frontier; the scenario and cluster counts in ``summary``
+    (the job's) are carried over. Scored against ``bank`` when given, else
+    draws seeded from ``candidates["seed"]``. Raises :class:`SolveError` when
+    the bounds do not have the job's shape.
+    """
+    n_con, n_var = candidates["shape"]
+    if (len(request.lb_A), len(request.lb_A[0])) != (n_con, n_var):
         raise SolveError(
             [
-                "The solver could not complete this problem. It may be "
-                "infeasible, unbounded, or degenerate. Try tighter coefficient "
-                f"bounds or fewer scenarios. ({type(exc).__name__})"
+                f"The new bounds must keep the job's shape: {n_con} "
+                f"constraints by {n_var} variables."
             ]
         )
+    started = time.time()
+    with _run_failures(None):
+        with contextlib.redirect_stdout(io.StringIO()):
+            bucket = ProblemsBucket.of_candidates(
+                [
+                    {"solve_status": 0, "variable": variables, "objective_value": value}
+                    for variables, value in zip(
+                        candidates["variables"], candidates["objective_values"]
+                    )
+                ],
+                candidates["objective"],
+                request.lb_A,
+                request.ub_A,
+                request.lb_b,
+                request.ub_b,
+                seed=candidates["seed"],
+            )
+            if has_errors(bucket.status):
+                raise SolveError(friendly_messages(bucket.status))
+            _t = time.perf_counter()
+            with attach(bank) as strata:
+                bucket.apply_quality_measure(
+                    number_of_scenarios=candidates["quality_scenarios"],
+                    method=candidates["scoring"],
+                    strata=strata,
+                )
+            seconds = time.perf_counter() - _t
+
+    results = cast(List[ScoredSolution], bucket.results)
+    for result, occurrences in zip(results, candidates["occurrences"]):
+        result["occurrences"] = occurrences
+    front = _pareto_front(_candidates(results))
+    solutions = [
+        RobustSolution(
+            variables=variables,
+            objective_value=obj,
+            feasibility_probability=feas,
+            **extra,
+        )
+        for obj, feas, variables, extra in front
+    ]
+    warnings: List[str] = []
+    if not solutions:
+        warnings.append("The job has no candidates to re-score.")
+    return SolveResponse(
+        solutions=solutions,
+        summary=SolveSummary(
+            **{
+                **summary,
+                "candidate_solutions": len(solutions),
+                "best_feasibility": max(
+                    (s.feasibility_probability for s in solutions), default=0.0
+                ),
+                "phase_seconds": {"quality_scoring": round(seconds, 6)},
+                "truncated_phases": {},
+                "runtime_seconds": round(time.time() - started, 4),
+            }
+        ),
+        warnings=warnings,
+    )
+
 
+def _response(
+    bucket: ProblemsBucket,
+    control: RunControl,
+    phase_seconds: Dict[str, float],
+    started: float,
+) -> SolveResponse:
     # Every result is scored by this point (apply_quality_measure has run).
     results = cast(List[ScoredSolution], bucket.results)
-    n_scenarios = opts.number_of_scenarios
+    # Fewer than requested only when an anytime deadline cut the phase short.
+    n_scenarios = bucket.scenarios_solved
     # The first n_scenarios results are the scenario solves; the cluster
     # re-solves follow. Count optimal scenarios from the cheap order-stable
     # prefix; the cluster node count comes from the tree itself (below), not
     # from slicing the results list by append order.
     scenarios_optimal = sum(1 for r in results[:n_scenarios] if is_optimal(r))
 
-    candidates: List[Tuple[float, float, List[float]]] = []
-    for r in results:
-        # Every result is scored by this point; optimal ones carry the vector.
-        if is_optimal(r):
-            candidates.append(
-                (
-                    float(r["objective_value"]),
-                    feasibility(r),
-                    [float(v) for v in r["variable"]],
-                )
-            )
-
-    front = _pareto_front(candidates)
+    # The bucket interned decision vectors as they were produced, so each
+    # distinct plan is a single candidate that knows how often it came out.
+    front = _pareto_front(_candidates(bucket.unique_results()))
     solutions = [
         RobustSolution(
             variables=variables,
             objective_value=obj,
             feasibility_probability=feas,
+            **extra,
         )
-        for obj, feas, variables in front
+        for obj, feas, variables, extra in front
     ]
 
     warnings: List[str] = []
@@ -173,6 +453,15 @@ def solve_problem(request: SolveRequest) -> SolveResponse:
             "scenarios were not solved to optimality (likely infeasible) and "
             "were excluded from the frontier."
         )
+    if control.truncated:
+        warnings.append(
+            "The deadline cut short: "
+            + "; ".join(
+                f"{phase.replace('_', ' ')} ({detail})"
+                for phase, detail in control.truncated.items()
+            )
+            + ". The frontier is the best found in time."
+        )
     if not solutions:
         warnings.append(
             "No optimal solutions were found; the frontier is empty. The "
@@ -190,22 +479,180 @@ def solve_problem(request: SolveRequest) -> SolveResponse:
         candidate_solutions=len(solutions),
         best_feasibility=max((s.feasibility_probability for s in solutions), default=0.0),
         phase_seconds={k: round(v, 6) for k, v in phase_seconds.items()},
+        truncated_phases=dict(control.truncated),
+        reused_scenarios=bucket.reused_scenarios,
+        reused_cluster_nodes=bucket.reused_cluster_nodes,
         runtime_seconds=round(time.time() - started, 4),
     )
 
-    return SolveResponse(
-        solutions=solutions,
-        summary=summary,
-        warnings=warnings,
+    return SolveResponse(solutions=solutions, summary=summary, warnings=warnings)
+
+
+def solve_sweep(
+    request: SweepRequest,
+    bank: Optional[BankHandle] = None,
+    cancel_flag: Optional[CancelFlag] = None,
+    progress: Optional[ProgressSink] = None,
+) -> SweepResponse:
+    """Run every variant of a sweep and return one frontier per variant.
+
+    The variants share the sampled scenarios, warm-start each other's
+    scenario LPs (see :mod:`sirom.sweep`) and are scored against the same
+    quality draws: ``bank`` when given (acquired for the sweep's largest
+    draws, see :func:`~sirom.api.scenario_bank.bank_key`), else one sample
+    drawn here. ``options.time_limit_seconds`` bounds the whole sweep.
+    Raises as :func:`solve_problem` does.
+    """
+    base = request.base
+    opts = base.options
+    control = RunControl(opts.time_limit_seconds, cancel_flag, progress=progress)
+    started = time.time()
+    phase_seconds: Dict[str, float] = {}
+    log_buffer = io.StringIO()
+    results: List[SweepResult] = []
+
+    with _run_failures(opts.time_limit_seconds):
+        with contextlib.redirect_stdout(log_buffer):
+            _check_solver(opts.solver)
+            sweep = Sweep(
+                base.objective,
+                base.lb_A,
+                base.ub_A,
+                base.lb_b,
+                base.ub_b,
+                [
+                    Variant(
+                        objective=v.objective,
+                        lb_rhs=v.lb_b,
+                        ub_rhs=v.ub_b,
+                        number_of_scenarios=v.number_of_scenarios,
+                        number_of_clusters=v.clusters,
+                    )
+                    for v in request.variants
+                ],
+                number_of_scenarios=opts.number_of_scenarios,
+                number_of_clusters=opts.clusters,
+                integer_variables=base.integer_variables,
+                solver_selection=opts.solver,
+                seed=opts.seed,
+                control=control,
+            )
+            if has_errors(sweep.status):
+                raise SolveError(friendly_messages(sweep.status))
+
+            _t = time.perf_counter()
+            sweep.solve()
+            phase_seconds["scenario_solves"] = time.perf_counter() - _t
+
+            with attach(bank) as strata:
+                if strata is None:
+                    strata = _sweep_strata(request)
+                for variant, bucket in zip(request.variants, sweep.buckets):
+                    variant_started = time.time()
+                    variant_phases: Dict[str, float] = {}
+                    _run_after_solves(
+                        bucket,
+                        variant_phases,
+                        variant.quality_scenarios or opts.quality_scenarios,
+                        variant.scoring or opts.scoring,
+                        strata,
+                    )
+                    response = _response(
+                        bucket, control, variant_phases, variant_started
+                    )
+                    results.append(
+                        SweepResult(**dict(response), label=variant.label)
+                    )
+                    for phase, seconds in variant_phases.items():
+                        phase_seconds[phase] = phase_seconds.get(phase, 0.0) + seconds
+
+    return SweepResponse(
+        variants=results,
+        summary=SweepSummary(
+            runtime_seconds=round(time.time() - started, 4),
+            phase_seconds={k: round(v, 6) for k, v in phase_seconds.items()},
+            scenario_solves=sum(b.scenarios_solved for b in sweep.buckets),
+            warm_starts=sweep.warm_starts,
+        ),
         log=log_buffer.getvalue().splitlines() if opts.include_log else None,
     )
 
 
-def run_solve_job(payload: Dict[str, Any]) -> Dict[str, Any]:
-    """Process-pool entry point: take a plain dict, return a plain dict.
+def _sweep_strata(request: SweepRequest) -> Optional[Tuple[Any, Any]]:
+    # One quantized quality sample for every variant, at the largest draws
+    # any of them scores against (a variant needing fewer uses a prefix).
+    base = request.base
+    draws = sweep_quality_draws(
+        request.model_dump(include={"base": {"options"}, "variants": True})
+    )
+    if draws > MAX_BANK_DRAWS:
+        return None  # every variant samples its own
+    _, stream = random_streams(base.options.seed)
+    n_con, n_var = len(base.lb_A), len(base.objective)
+    return (
+        sample_deltas(draws, n_con, n_var, True, stream),
+        sample_deltas(draws, n_con, 1, True, stream),
+    )
+
+
+def run_solve_job(
+    payload: Dict[str, Any],
+    bank: Optional[BankHandle] = None,
+    cancel_flag: Optional[CancelFlag] = None,
+    progress: Optional[ProgressSink] = None,
+    shard_map: Optional[ShardMap] = None,
+    shards: int = 1,
+    prior: Optional[PriorHandle] = None,
+) -> PackedResult:
+    """Process-pool entry point: take a plain dict, return a packed result.
 
-    Kept picklable (dict in, dict out) so it can run in a ``ProcessPoolExecutor``
-    child. Re-validates the payload (cheap) to apply schema defaults.
+    Kept picklable (a dict in, a :class:`~sirom.api.results.PackedResult`
+    with its decision vectors as arrays out) so it can run in a pool
+    child. Re-validates the payload (cheap) to apply schema defaults. ``bank``
+    is the handle of a shared quality-scenario bank the parent acquired;
+    ``cancel_flag`` is the job's cancel flag (an Event or Event proxy) and
+    ``progress`` where its progress snapshots go (picklable for a pool child),
+    and ``prior`` the kept run it may warm-start from. A sharded job runs in the parent instead, with ``shard_map`` dispatching
+    its shards to the pool. A sweep payload (a :class:`SweepRequest`) runs as
+    :func:`solve_sweep`.
     """
+    if "variants" in payload:
+        return PackedResult.of(
+            solve_sweep(SweepRequest(**payload), bank, cancel_flag, progress)
+        )
     request = SolveRequest(**payload)
-    return solve_problem(request).model_dump()
+    # The candidate pool travels with the result for the job store to keep
+    # apart (see JobManager.rescore).
+    return PackedResult.of(
+        solve_problem(request, bank, cancel_flag, progress, shard_map, shards, prior)
+    )
+
+
+def run_solve_jobs(
+    jobs: List[
+        Tuple[
+            Dict[str, Any],
+            Optional[BankHandle],
+            Optional[CancelFlag],
+            Optional[ProgressSink],
+            Optional[PriorHandle],
+        ]
+    ],
+) -> List[Any]:
+    """Process-pool entry point for a pack of small jobs.
+
+    Runs them one after another in one child, so a batch of small problems
+    pays for one dispatch (and one result transfer) instead of one each. Each
+    job's entry is its :func:`run_solve_job` arguments; the result is, in the
+    same order, each job's packed result or the exception it raised, for the
+    parent to record per job.
+    """
+    outcomes: List[Any] = []
+    for payload, bank, cancel_flag, progress, prior in jobs:
+        try:
+            outcomes.append(
+                run_solve_job(payload, bank, cancel_flag, progress, prior=prior)
+            )
+        except Exception as exc:  # noqa: BLE001 - recorded per job by the parent
+            outcomes.append(exc)
+    return outcomes
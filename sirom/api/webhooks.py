@@ -0,0 +1,366 @@
+"""Completion webhooks: POST a job's outcome to the caller's ``callback_url``.
+
+Batch integrations submit many jobs and would otherwise keep a poller open per
+job. With a ``callback_url`` the job manager hands the finished job to a
+:class:`WebhookSender` instead, which delivers it from a few background
+threads. Deliveries that fail (connection error, timeout, 5xx, 408 or 429) are
+retried with capped, jittered exponential backoff; other 4xx answers mean the
+receiver rejected the body and are not retried. The sender is bounded: once
+``max_pending`` deliveries are waiting, new ones are dropped (and counted)
+rather than letting a dead receiver grow the worker's memory.
+
+Callback URLs come from callers, so the sender only calls public addresses:
+every address a host resolves to must be globally routable (no loopback,
+RFC 1918, link-local or cloud metadata addresses), checked when the
+connection is made so a DNS answer cannot change between check and use.
+Redirects are not followed and proxies from the environment are not used.
+``allowed_hosts`` narrows deliveries further to named hosts, and
+``allow_private`` lifts the address check for receivers on a private network
+(:func:`check_url`).
+
+The body is the finished job as ``GET /jobs/{id}`` shows it — ``job_id``,
+``status`` and the ``result`` or ``errors`` — compacted by dropping empty
+fields (:func:`notification`). Each request carries ``Idempotency-Key:
+{job_id}`` so a receiver can discard the duplicates retries may produce.
+"""
+
+from __future__ import annotations
+
+import functools
+import heapq
+import http.client
+import ipaddress
+import itertools
+import json
+import logging
+import random
+import socket
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+log = logging.getLogger("sirom.webhooks")
+
+# (url, body bytes, headers, timeout) -> HTTP status; raises OSError when the
+# receiver cannot be reached, UnsafeCallback when it may not be called.
+Poster = Callable[[str, bytes, Dict[str, str], float], int]
+
+
+class UnsafeCallback(ValueError):
+    """A callback URL the sender refuses to call."""
+
+
+def _public(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%", 1)[0])  # drop an IPv6 zone
+    return ip.is_global and not ip.is_multicast
+
+
+def _host_allowed(host: str, allowed_hosts: Sequence[str]) -> bool:
+    # "example.com" allows that host only, ".example.com" its subdomains too.
+    return any(
+        host == entry.lstrip(".") or (entry.startswith(".") and host.endswith(entry))
+        for entry in allowed_hosts
+    )
+
+
+def check_url(
+    url: str, allowed_hosts: Sequence[str] = (), allow_private: bool = False
+) -> None:
+    """Raise :class:`UnsafeCallback` unless ``url`` may be called.
+
+    It must be http(s), its host must be in ``allowed_hosts`` (when any are
+    given), and unless ``allow_private``, it must not name ``localhost`` or a
+    non-public address. Names are resolved only when delivering.
+    """
+    parts = urlsplit(url)
+    host = (parts.hostname or "").rstrip(".").lower()
+    if parts.scheme not in ("http", "https") or not host:
+        raise UnsafeCallback("The callback_url must be an http(s) URL with a host.")
+    if allowed_hosts and not _host_allowed(host, allowed_hosts):
+        raise UnsafeCallback(f"Callbacks to {host} are not allowed.")
+    if allow_private:
+        return
+    try:
+        public = _public(host)
+    except ValueError:  # a name, not an address
+        public = host != "localhost" and not host.endswith(".localhost")
+    if not public:
+        raise UnsafeCallback(f"Callbacks to {host} are not allowed.")
+
+
+def _guarded_connection(
+    address: Tuple[str, int],
+    timeout: Any = socket._GLOBAL_DEFAULT_TIMEOUT,  # type: ignore[attr-defined]
+    source_address: Optional[Tuple[str, int]] = None,
+) -> socket.socket:
+    # Resolve once, refuse if any answer is not public, and connect to one of
+    # those very answers (TLS still verifies the certificate for the name).
+    host, port = address
+    answers = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    for *_, sockaddr in answers:
+        if not _public(sockaddr[0]):
+            raise UnsafeCallback(
+                f"{host} resolves to {sockaddr[0]}, not a public address."
+            )
+    return socket.create_connection((answers[0][4][0], port), timeout, source_address)
+
+
+class _PublicHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _guarded_connection
+
+
+class _PublicHTTPSConnection(http.client.HTTPSConnection):
+    def __init__(self, *args: Any, **kwargs: Any):
+        super().__init__(*args, **kwargs)
+        self._create_connection = _guarded_connection
+
+
+class _PublicHTTPHandler(urllib.request.HTTPHandler):
+    def http_open(self, req: urllib.request.Request) -> http.client.HTTPResponse:
+        return self.do_open(_PublicHTTPConnection, req)
+
+
+class _PublicHTTPSHandler(urllib.request.HTTPSHandler):
+    def https_open(self, req: urllib.request.Request) -> http.client.HTTPResponse:
+        return self.do_open(
+            _PublicHTTPSConnection, req, context=self._context  # type: ignore[attr-defined]
+        )
+
+
+class _NoRedirects(urllib.request.HTTPRedirectHandler):
+    # A 3xx is the receiver's answer (a failed delivery), not a new target.
+    def redirect_request(self, *args: Any, **kwargs: Any) -> None:
+        return None
+
+
+def urllib_poster(allow_private: bool = False) -> Poster:
+    """The default transport: ``urllib``, without redirects or environment
+    proxies, and refusing non-public addresses unless ``allow_private``."""
+    handlers: List[urllib.request.BaseHandler] = [
+        urllib.request.ProxyHandler({}),
+        _NoRedirects(),
+    ]
+    if not allow_private:
+        handlers += [_PublicHTTPHandler(), _PublicHTTPSHandler()]
+    return functools.partial(_urllib_post, urllib.request.build_opener(*handlers))
+
+
+def _urllib_post(
+    opener: urllib.request.OpenerDirector,
+    url: str,
+    body: bytes,
+    headers: Dict[str, str],
+    timeout: float,
+) -> int:
+    request = urllib.request.Request(url, data=body, headers=headers, method="POST")
+    try:
+        with opener.open(request, timeout=timeout) as response:
+            return response.status
+    except urllib.error.HTTPError as exc:
+        return exc.code
+
+
+def _compact(value: Any) -> Any:
+    # A mapping: a dict, or a job's packed result (sirom.api.results).
+    if isinstance(value, Mapping):
+        return {k: _compact(v) for k, v in value.items() if v is not None}
+    if isinstance(value, list):
+        return [_compact(v) for v in value]
+    return value
+
+
+def notification(job_id: str, record: Dict[str, Any]) -> Dict[str, Any]:
+    """Webhook body for a finished job record (progress is left out)."""
+    return _compact(
+        {
+            "job_id": job_id,
+            "status": record["status"],
+            "result": record.get("result"),
+            "errors": record.get("errors"),
+        }
+    )
+
+
+def _retryable(status: int) -> bool:
+    return status >= 500 or status in (408, 429)
+
+
+@dataclass
+class _Delivery:
+    url: str
+    body: bytes
+    job_id: str
+    attempt: int = 0
+
+
+class WebhookSender:
+    """Bounded background sender with retry and backoff.
+
+    Args:
+        max_pending: Deliveries that may wait (including ones backing off
+            between retries) before new ones are dropped.
+        max_attempts: Tries per delivery, the first one included.
+        backoff_seconds: Delay before the first retry; doubles per retry.
+        max_backoff_seconds: Cap on the delay between retries.
+        timeout_seconds: Per-request timeout.
+        threads: Concurrent deliveries, so one slow receiver cannot hold up
+            every other.
+        allowed_hosts: Hosts callbacks may go to (all public ones when
+            empty); a leading ``.`` allows subdomains too.
+        allow_private: Also call loopback and private-network addresses.
+        post: Transport override (tests); defaults to :func:`urllib_poster`.
+    """
+
+    def __init__(
+        self,
+        max_pending: int = 1000,
+        max_attempts: int = 6,
+        backoff_seconds: float = 1.0,
+        max_backoff_seconds: float = 60.0,
+        timeout_seconds: float = 10.0,
+        threads: int = 2,
+        allowed_hosts: Sequence[str] = (),
+        allow_private: bool = False,
+        post: Optional[Poster] = None,
+    ):
+        self._max_pending = max_pending
+        self._max_attempts = max_attempts
+        self._backoff = backoff_seconds
+        self._max_backoff = max_backoff_seconds
+        self._timeout = timeout_seconds
+        self._allowed_hosts = tuple(host.lower() for host in allowed_hosts)
+        self._allow_private = allow_private
+        self._post = post or urllib_poster(allow_private)
+        self._threads = threads
+        # (due, sequence, delivery): a single heap serves both new deliveries
+        # (due now) and retries (due after their backoff).
+        self._heap: List[Tuple[float, int, _Delivery]] = []
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._counts = {"delivered": 0, "failed": 0, "dropped": 0}
+        self._cond = threading.Condition()
+        self._workers: List[threading.Thread] = []
+        self._closed = False
+
+    def check(self, url: str) -> None:
+        """Raise :class:`UnsafeCallback` unless ``url`` may be called (see
+        :func:`check_url`); submissions check their ``callback_url`` first."""
+        check_url(url, self._allowed_hosts, self._allow_private)
+
+    def send(self, url: str, job_id: str, body: Dict[str, Any]) -> bool:
+        """Queue ``body`` for ``url``; ``False`` if it was dropped (full or
+        closed) or ``url`` may not be called."""
+        try:
+            self.check(url)
+        except UnsafeCallback as exc:
+            with self._cond:
+                self._counts["failed"] += 1
+            log.warning("Refused the webhook for job %s: %s", job_id, exc)
+            return False
+        payload = json.dumps(body, separators=(",", ":")).encode()
+        with self._cond:
+            if self._closed or len(self._heap) + self._in_flight >= self._max_pending:
+                self._counts["dropped"] += 1
+                log.warning(
+                    "Dropped the webhook for job %s: sender full or closed", job_id
+                )
+                return False
+            self._push(time.monotonic(), _Delivery(url, payload, job_id))
+            if not self._workers:
+                for _ in range(self._threads):
+                    worker = threading.Thread(target=self._run, daemon=True)
+                    worker.start()
+                    self._workers.append(worker)
+        return True
+
+    def _push(self, due: float, delivery: _Delivery) -> None:
+        heapq.heappush(self._heap, (due, next(self._sequence), delivery))
+        self._cond.notify()
+
+    def _next(self) -> Optional[_Delivery]:
+        with self._cond:
+            while not self._closed:
+                if self._heap and self._heap[0][0] <= time.monotonic():
+                    self._in_flight += 1
+                    return heapq.heappop(self._heap)[2]
+                wait = self._heap[0][0] - time.monotonic() if self._heap else None
+                self._cond.wait(wait)
+            return None
+
+    def _run(self) -> None:
+        while True:
+            delivery = self._next()
+            if delivery is None:
+                return
+            delivery.attempt += 1
+            try:
+                status: Optional[int] = self._post(
+                    delivery.url,
+                    delivery.body,
+                    {
+                        "Content-Type": "application/json",
+                        "Idempotency-Key": delivery.job_id,
+                        "User-Agent": "sirom-webhooks",
+                    },
+                    self._timeout,
+                )
+            except UnsafeCallback as exc:
+                # Resolved to a non-public address: no retry will change that.
+                log.warning("Refused the webhook for job %s: %s", delivery.job_id, exc)
+                delivery.attempt = self._max_attempts
+                status = None
+            except Exception as exc:  # noqa: BLE001 - unreachable, timeout, ...
+                log.info("Webhook for job %s failed: %s", delivery.job_id, exc)
+                status = None
+            with self._cond:
+                self._in_flight -= 1
+                if status is not None and 200 <= status < 300:
+                    self._counts["delivered"] += 1
+                elif (
+                    status is None or _retryable(status)
+                ) and delivery.attempt < self._max_attempts:
+                    delay = min(
+                        self._max_backoff, self._backoff * 2 ** (delivery.attempt - 1)
+                    )
+                    # Jitter spreads the retries of a burst over a receiver's outage.
+                    self._push(
+                        time.monotonic() + delay * random.uniform(0.5, 1.0), delivery
+                    )
+                else:
+                    self._counts["failed"] += 1
+                    log.warning(
+                        "Gave up on the webhook for job %s after %d attempt(s) (%s)",
+                        delivery.job_id,
+                        delivery.attempt,
+                        status if status is not None else "unreachable",
+                    )
+                self._cond.notify_all()
+
+    def stats(self) -> Dict[str, int]:
+        """Waiting and in-flight deliveries, and outcome counters."""
+        with self._cond:
+            return {"pending": len(self._heap) + self._in_flight, **self._counts}
+
+    def join(self, timeout: float) -> bool:
+        """Wait until nothing is pending; ``False`` if ``timeout`` passed first."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._heap or self._in_flight:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return False
+                self._cond.wait(left)
+            return True
+
+    def close(self) -> None:
+        """Stop the threads; deliveries still waiting are abandoned."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
@@ -0,0 +1,192 @@
+"""Durable work queue for ``SIROM_EXECUTOR=queue``, on a Redis stream.
+
+Without it a job runs on the worker that received the HTTP request, and dies
+with it. In queue mode the receiving worker only appends the job to a stream;
+any worker process consuming the stream (HTTP frontends, or dedicated
+``python -m sirom.api.worker`` processes) claims it through a consumer group.
+
+A claim is held, not taken: the entry stays in the group's pending list until
+the worker acknowledges it after recording the outcome. While it runs the job
+the worker *heartbeats* the claim, which resets its idle time. A claim idle for
+longer than the visibility timeout belongs to a worker that stopped
+heartbeating (crashed, killed, partitioned), and the next worker with a free
+slot takes it over (``XAUTOCLAIM``) and runs the job again. Delivery is thus at
+least once; a job that keeps killing its workers is given up on after
+``max_deliveries``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+
+@dataclass(frozen=True)
+class Claim:
+    """One job a worker claimed from the queue."""
+
+    entry_id: str
+    job_id: str
+    fingerprint: str
+    payload: Dict[str, Any]
+    # 1 for a first delivery; more when taken over from a silent worker.
+    deliveries: int
+
+
+class RedisWorkQueue:
+    """Job queue on a Redis stream with a consumer group.
+
+    Args:
+        client: Redis client (``decode_responses=True``); fakeredis in tests.
+        url: Used to create a client when none is given.
+        stream: Stream key.
+        group: Consumer group every SIROM worker joins.
+        visibility_seconds: How long a claim may go without a heartbeat
+            before another worker takes it over.
+        max_deliveries: Deliveries after which a job is failed instead of run
+            again.
+        consumer: This worker's name in the group (unique per process).
+    """
+
+    def __init__(
+        self,
+        client: Any = None,
+        url: str = "redis://localhost:6379/0",
+        stream: str = "sirom:queue",
+        group: str = "sirom-workers",
+        visibility_seconds: float = 60.0,
+        max_deliveries: int = 3,
+        consumer: Optional[str] = None,
+    ):
+        if client is None:
+            try:
+                import redis  # type: ignore
+            except ImportError as exc:  # pragma: no cover
+                raise RuntimeError(
+                    "The queue executor requires the 'redis' package "
+                    "(install sirom[api])."
+                ) from exc
+            client = redis.Redis.from_url(url, decode_responses=True)
+        self._redis = client
+        self._stream = stream
+        self._group = group
+        self.visibility_seconds = visibility_seconds
+        self.max_deliveries = max_deliveries
+        self.consumer = consumer or "{}-{}-{}".format(
+            socket.gethostname(), os.getpid(), uuid4().hex[:6]
+        )
+        try:
+            self._redis.xgroup_create(stream, group, id="0", mkstream=True)
+        except Exception as exc:  # noqa: BLE001 - the group already exists
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+    def enqueue(self, job_id: str, fingerprint: str, payload: Dict[str, Any]) -> str:
+        """Append a job; returns its stream entry id."""
+        return self._redis.xadd(
+            self._stream,
+            {"job_id": job_id, "fingerprint": fingerprint, "payload": json.dumps(payload)},
+        )
+
+    def enqueue_many(self, jobs: List[Tuple[str, str, Dict[str, Any]]]) -> List[str]:
+        """Append ``(job_id, fingerprint, payload)`` jobs in one round trip."""
+        pipe = self._redis.pipeline(transaction=False)
+        for job_id, fingerprint, payload in jobs:
+            pipe.xadd(
+                self._stream,
+                {"job_id": job_id, "fingerprint": fingerprint, "payload": json.dumps(payload)},
+            )
+        return pipe.execute()
+
+    def claim(self, count: int, block_ms: int = 0) -> List[Claim]:
+        """Claim up to ``count`` jobs, waiting up to ``block_ms`` for new ones.
+
+        Claims abandoned by silent workers are taken over before new entries
+        are read, so a crashed worker's jobs do not wait behind fresh ones.
+        """
+        claims: List[Claim] = []
+        _, taken, *_ = self._redis.xautoclaim(
+            self._stream,
+            self._group,
+            self.consumer,
+            int(self.visibility_seconds * 1000),
+            "0-0",
+            count=count,
+        )
+        for entry_id, fields in taken:
+            if fields:  # None for an entry deleted while still pending
+                claims.append(self._claim(entry_id, fields, self._deliveries(entry_id)))
+        if len(claims) < count:
+            read = self._redis.xreadgroup(
+                self._group,
+                self.consumer,
+                {self._stream: ">"},
+                count=count - len(claims),
+                block=block_ms or None,
+            )
+            for _, entries in read or []:
+                for entry_id, fields in entries:
+                    claims.append(self._claim(entry_id, fields, 1))
+        return claims
+
+    def _claim(self, entry_id: str, fields: Dict[str, str], deliveries: int) -> Claim:
+        return Claim(
+            entry_id=entry_id,
+            job_id=fields["job_id"],
+            fingerprint=fields["fingerprint"],
+            payload=json.loads(fields["payload"]),
+            deliveries=deliveries,
+        )
+
+    def _deliveries(self, entry_id: str) -> int:
+        pending = self._redis.xpending_range(
+            self._stream, self._group, entry_id, entry_id, 1
+        )
+        return int(pending[0]["times_delivered"]) if pending else 1
+
+    def heartbeat(self, entry_ids: List[str]) -> None:
+        """Reset the idle time of claims this worker still holds."""
+        if not entry_ids:
+            return
+        # Only claims still ours: XCLAIM does not check the owner, and must not
+        # take back a job another worker already took over.
+        owned = {
+            p["message_id"]
+            for p in self._redis.xpending_range(
+                self._stream,
+                self._group,
+                "-",
+                "+",
+                max(len(entry_ids), 100),
+                consumername=self.consumer,
+            )
+        }
+        mine = [entry_id for entry_id in entry_ids if entry_id in owned]
+        if mine:
+            self._redis.xclaim(
+                self._stream, self._group, self.consumer, 0, mine, justid=True
+            )
+
+    def ack(self, entry_id: str) -> None:
+        """Acknowledge (and drop) a finished job's entry."""
+        pipe = self._redis.pipeline()
+        pipe.xack(self._stream, self._group, entry_id)
+        pipe.xdel(self._stream, entry_id)
+        pipe.execute()
+
+    def stats(self) -> Dict[str, int]:
+        """Jobs waiting to be claimed and jobs claimed but not yet acknowledged."""
+        # Acknowledged entries are deleted, so the stream holds exactly the
+        # waiting and the claimed ones.
+        claimed = int(self._redis.xpending(self._stream, self._group)["pending"])
+        return {"waiting": int(self._redis.xlen(self._stream)) - claimed, "claimed": claimed}
+
+    def close(self) -> None:
+        try:
+            self._redis.close()
+        except Exception:  # pragma: no cover
+            pass
@@ -0,0 +1,37 @@
+"""Standalone queue worker: ``python -m sirom.api.worker``.
+
+Consumes the work queue of ``SIROM_EXECUTOR=queue`` without serving HTTP, so
+solver capacity can be scaled apart from the frontends (which then run with
+``SIROM_QUEUE_CONSUME=0``). Configured by the same environment as the API:
+``SIROM_REDIS_URL``, ``SIROM_WORKERS``, ``SIROM_QUEUE_VISIBILITY``, ... On
+SIGTERM or SIGINT it stops claiming; jobs it is still running are left for
+another worker to take over.
+"""
+
+from __future__ import annotations
+
+import logging
+import signal
+import threading
+
+from .jobs import JobManager, build_store_from_env
+
+log = logging.getLogger("sirom.worker")
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    manager = JobManager(
+        executor_mode="queue", store=build_store_from_env(), consume=True
+    )
+    stop = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT):
+        signal.signal(signum, lambda *_: stop.set())
+    log.info("SIROM queue worker started")
+    stop.wait()
+    log.info("SIROM queue worker stopping")
+    manager.shutdown()
+
+
+if __name__ == "__main__":
+    main()
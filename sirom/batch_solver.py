@@ -1,25 +1,119 @@
+from __future__ import annotations
+
 from numbers import Number
-from typing import TypedDict
+from typing import TYPE_CHECKING, Callable, TypedDict
 
 import numpy as np
-import pandas as pd
-from smt.sampling_methods import LHS  # type: ignore
-from threadpoolctl import threadpool_limits  # type: ignore
 
 from concurrent.futures import ThreadPoolExecutor
 from datetime import date
+import itertools
 import os
 import time
 
 from .cluster_tree import ClusterTree
 from .mini_ortools_solver import (
     MiniOrtoolsSolver,
+    ScoredSolution,
     UnscoredSolution,
+    decision_key,
     is_optimal,
     score,
 )
 from .optimization_problem import OptimizationProblem
+from .run_control import RunControl
+from .scoring import (
+    SCORING_METHODS,
+    control_variate,
+    dequantize,
+    importance_sampling,
+    monte_carlo,
+)
 from .status_checks import has_errors
+from .warm_start import (
+    PriorRun,
+    ScenarioPlan,
+    WarmStartIndex,
+    cell_bounds,
+    chain_order,
+    plan_scenarios,
+    structure_key,
+)
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from .sharding import ShardMap, ShardSpec
+
+# pandas, smt (with scipy) and threadpoolctl are imported where first used,
+# so importing the package (the API's health check on a cold start) does not
+# pay for them; benchmarks/bench_import.py keeps it that way.
+
+
+# LHS columns drawn per block when sampling δ (bounds the float scratch), and
+# the most scenarios a uint16 stratum index can address.
+_SCORING_BLOCK_CELLS = 4_000_000
+_MAX_STRATA = np.iinfo(np.uint16).max
+
+
+def random_streams(
+    seed: "int | None",
+) -> tuple["np.random.RandomState | None", "np.random.RandomState | None"]:
+    """Independent (scenario, quality) LHS streams for ``seed`` (``None`` = fresh)."""
+    if seed is None:
+        return None, None
+    return np.random.RandomState([seed, 0]), np.random.RandomState([seed, 1])
+
+
+def quality_draws(number_of_scenarios: int, method: str) -> int:
+    """Base δ draws ``apply_quality_measure`` takes for ``number_of_scenarios``.
+
+    Control variates score every draw together with its mirror ``1 - δ``, so
+    they need half as many base draws for the same ``M``.
+    """
+    if method == "control_variate":
+        return max(1, number_of_scenarios // 2)
+    return number_of_scenarios
+
+
+def sample_deltas(
+    number_of_scenarios: int,
+    rows: int,
+    columns: int,
+    quantized: bool = False,
+    random_state: "np.random.RandomState | None" = None,
+) -> np.ndarray:
+    """Latin-Hypercube δ on the unit cube, one (rows, columns) block per scenario.
+
+    Returns an (N, rows, columns) array. Scenario ``i`` is row ``i`` of the
+    design, so each cell is stratified across the scenarios (the baseline's
+    transpose before the reshape mixed draws of different cells into one
+    scenario and lost that). ``quantized=True`` keeps only the uint16 stratum
+    index of each draw (see :func:`sirom.scoring.dequantize`): the centered
+    LHS puts every draw at a stratum centre, so nothing is lost. It falls back
+    to floats when N exceeds what uint16 can index. The columns of a centered
+    LHS are independent permutations, so they are drawn in blocks and
+    quantized as they come, never holding the whole float design.
+    """
+    from smt.sampling_methods import LHS  # type: ignore
+
+    dimensions = rows * columns
+    quantized = quantized and number_of_scenarios <= _MAX_STRATA
+    block = max(1, _SCORING_BLOCK_CELLS // max(1, number_of_scenarios))
+    scenarios_delta = np.empty(
+        (number_of_scenarios, dimensions),
+        dtype=np.uint16 if quantized else float,
+    )
+    for first in range(0, dimensions, block):
+        width = min(block, dimensions - first)
+        sampling = LHS(
+            xlimits=np.array([[0.0, 1.0]] * width), random_state=random_state
+        )
+        drawn = sampling(number_of_scenarios)
+        if quantized:
+            drawn = np.floor(drawn * number_of_scenarios)
+        scenarios_delta[:, first : first + width] = drawn
+    return scenarios_delta.reshape(number_of_scenarios, rows, columns)
 
 
 class Coefficients:
@@ -117,10 +211,28 @@ class ProblemsBucket:
         integer_variables: "list[int] | None" = None,
         solver_selection: "str | None" = None,
         n_jobs: int = 1,
+        seed: "int | None" = None,
+        control: "RunControl | None" = None,
+        shard_map: "ShardMap | None" = None,
+        shards: int = 1,
+        scenarios: "tuple[np.ndarray, np.ndarray] | None" = None,
+        warm_start: "WarmStartIndex | None" = None,
     ):
         self.status: list[str] = []
-        self.results: list[UnscoredSolution] = []
+        # Decision vectors are interned as results are produced: each distinct
+        # (quantized) vector gets one slot, so Scoring runs once per slot and
+        # fans the score out. result_slots[i] is result i's slot (-1 when it
+        # has no vector); decision_counts[slot] is how often it came out.
+        self.decision_slots: dict[bytes, int] = {}
+        self.decision_counts: list[int] = []
+        self.result_slots: list[int] = []
+        self.results = []
         self.number_of_scenarios: int = -1
+        # Scenario solves actually run (fewer than number_of_scenarios only
+        # when an anytime deadline cut the phase short).
+        self.scenarios_solved: int = 0
+        # Slot scores of the quality phase in progress, in slot order.
+        self.__partial_scores: list[tuple[float, dict[str, float]]] = []
         self.number_of_clusters: int = number_of_clusters
         # Integer-variable indices (empty = pure LP) and an optional solver
         # override; by default the solver is auto-selected per problem.
@@ -130,6 +242,34 @@ class ProblemsBucket:
         # the API's process pool owns parallelism; standalone callers can raise
         # it (e.g. n_jobs=-1 for all cores).
         self.n_jobs: int = n_jobs
+        # Seeds the scenario and quality LHS independently (None = fresh draws
+        # every run); the same seed reproduces both.
+        self.seed: "int | None" = seed
+        self.__scenario_stream, self.__quality_stream = random_streams(seed)
+        # Cancellation / time budget, checked between solves, tree splits and
+        # scoring chunks (RunCancelled propagates out of the phase methods).
+        self.control: RunControl = control if control is not None else RunControl()
+        # Splits the scenario solves and the Monte Carlo count into ``shards``
+        # scenario ranges run through ``shard_map`` (see sirom.sharding).
+        # Needs a seed, for the shards to regenerate their scenarios from.
+        self.shard_map: "ShardMap | None" = shard_map
+        self.shards: int = shards
+        # Scenario matrices (N', n_con, n_var) and (N', n_con, 1) drawn
+        # elsewhere, N' >= number_of_scenarios, used instead of sampling (the
+        # variants of a sweep share one draw; see sirom.sweep). Only the
+        # first number_of_scenarios are used, as views.
+        self.__given_scenarios = scenarios
+        # Recent runs to reuse scenario and tree-node solutions from when this
+        # is an edit of one of them (see sirom.warm_start). Unseeded runs
+        # without an anytime deadline only; this one is remembered in turn.
+        self.warm_start: "WarmStartIndex | None" = warm_start
+        self.__plan: "ScenarioPlan | None" = None
+        self.__node_solutions: dict[frozenset[int], UnscoredSolution] = {}
+        # Scenario and tree-node solutions taken from a prior run, and
+        # scenarios solved warm from the previous one's basis.
+        self.reused_scenarios: int = 0
+        self.reused_cluster_nodes: int = 0
+        self.warm_starts: int = 0
         c_validated = self.__coefficient_validation(c_value, "objective")
         lb_A_validated = self.__coefficient_validation(lb_A_value, "lb_constraint")
         ub_A_validated = self.__coefficient_validation(ub_A_value, "ub_constraint")
@@ -142,6 +282,48 @@ class ProblemsBucket:
         self.__dimension_validation()
         self.__problem_integrity_validation()
 
+    @property
+    def results(self) -> "list[UnscoredSolution]":
+        """Scenario solutions (scored in place by :meth:`apply_quality_measure`)."""
+        return self._results
+
+    @results.setter
+    def results(self, value: "list[UnscoredSolution]") -> None:
+        """Replace the results; they are interned afresh before Scoring."""
+        self._results = value
+        self.decision_slots, self.decision_counts, self.result_slots = {}, [], []
+
+    @classmethod
+    def of_candidates(
+        cls,
+        candidates: "list[UnscoredSolution]",
+        c_value: list[Number],
+        lb_A_value: list[list[Number]],
+        ub_A_value: list[list[Number]],
+        lb_b_value: list[Number],
+        ub_b_value: list[Number],
+        seed: "int | None" = None,
+        control: "RunControl | None" = None,
+    ) -> "ProblemsBucket":
+        """A bucket holding only ``candidates``, for :meth:`apply_quality_measure`
+        to score under these bounds (e.g. a finished run's candidates under
+        edited intervals). No scenarios are drawn or solved.
+        """
+        n_con, n_var = np.shape(lb_A_value)
+        bucket = cls(
+            c_value,
+            lb_A_value,
+            ub_A_value,
+            lb_b_value,
+            ub_b_value,
+            number_of_scenarios=1,
+            seed=seed,
+            control=control,
+            scenarios=(np.empty((0, n_con, n_var)), np.empty((0, n_con, 1))),
+        )
+        bucket.results = list(candidates)
+        return bucket
+
     def __set_coefficient(
         self,
         c_validated,
@@ -153,6 +335,8 @@ class ProblemsBucket:
         if has_errors(self.status):
             self.status.append("[ERROR] Coefficient cannot be defined")
             return
+        import pandas as pd
+
         self.coefficient = Coefficients(
             c_validated,
             lb_A_validated,
@@ -166,6 +350,8 @@ class ProblemsBucket:
     def __coefficient_validation(
         self, coefficient: list[Number] | list[list[Number]], identification: str
     ) -> pd.DataFrame:
+        import pandas as pd
+
         if not coefficient:
             self.status.append(
                 "[ERROR] Undefined {} coefficient".format(identification)
@@ -228,75 +414,251 @@ class ProblemsBucket:
         self.__generate_all_coefficients()
         self.status.append("[OK] Optimization batch creation succeeded")
 
-    def __generate_coefficients(
-        self, number_of_scenarios: int
+    def __generate_deltas(
+        self,
+        number_of_scenarios: int,
+        quantized: bool = False,
+        random_state: "np.random.RandomState | None" = None,
     ) -> tuple[np.ndarray, np.ndarray]:
-        def generate_constraint_coefficient() -> np.ndarray:
-            (
-                lb_constraint_equations,
-                lb_constraint_coefficients,
-            ) = self.coefficient.lb_constraint.shape
-            xlimits = np.array(
-                [[0.0, 1.0]] * (lb_constraint_equations * lb_constraint_coefficients)
-            )
-            sampling = LHS(xlimits=xlimits)
-            print("[{}] Coefficient generation".format(date.today()))
+        n_con, n_var = self.coefficient.lb_constraint.shape
+        rhs_rows, rhs_columns = self.coefficient.lb_rhs.shape
+        deltas = []
+        for label, rows, columns in (
+            ("Coefficient", n_con, n_var),
+            ("RHS", rhs_rows, rhs_columns),
+        ):
+            print("[{}] {} generation".format(date.today(), label))
             tic = time.time()
-            scenarios_delta = sampling(number_of_scenarios)
-            toc = time.time()
-            print("[{}] Duration: {}".format(date.today(), toc - tic))
-            scenarios_delta_reshaped = np.array(scenarios_delta.transpose())
-            scenarios_delta_reshaped = scenarios_delta_reshaped.reshape(
-                number_of_scenarios, lb_constraint_equations, lb_constraint_coefficients
+            deltas.append(
+                sample_deltas(
+                    number_of_scenarios, rows, columns, quantized, random_state
+                )
             )
-            # lb + (ub - lb) * delta, broadcast across all scenarios at once
-            # -> (N, n_con, n_var). len() and [scenario] indexing are preserved.
-            lower = np.asarray(self.coefficient.lb_constraint, dtype=float)
-            upper = np.asarray(self.coefficient.ub_constraint, dtype=float)
-            return lower[None, :, :] + (upper - lower)[None, :, :] * scenarios_delta_reshaped
-
-        def generate_rhs_coefficient() -> np.ndarray:
-            lb_rhs_equations, lb_rhs_coefficients = self.coefficient.lb_rhs.shape
-            xlimits = np.array([[0.0, 1.0]] * (lb_rhs_equations * lb_rhs_coefficients))
-            sampling = LHS(xlimits=xlimits)
-            print("[{}] RHS generation".format(date.today()))
-            tic = time.time()
-            scenarios_delta = sampling(number_of_scenarios)
             toc = time.time()
             print("[{}] Duration: {}".format(date.today(), toc - tic))
-            scenarios_delta_reshaped = np.array(scenarios_delta.transpose())
-            scenarios_delta_reshaped = scenarios_delta_reshaped.reshape(
-                number_of_scenarios, lb_rhs_equations, lb_rhs_coefficients
-            )
-            lower = np.asarray(self.coefficient.lb_rhs, dtype=float)
-            upper = np.asarray(self.coefficient.ub_rhs, dtype=float)
-            return lower[None, :, :] + (upper - lower)[None, :, :] * scenarios_delta_reshaped
+        return deltas[0], deltas[1]
 
+    def __generate_coefficients(
+        self, number_of_scenarios: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        delta_constraint, delta_rhs = self.__generate_deltas(
+            number_of_scenarios, random_state=self.__scenario_stream
+        )
+        # lb + (ub - lb) * delta, broadcast across all scenarios at once
+        # -> (N, n_con, n_var) and (N, n_con, 1). len() and [scenario] indexing
+        # are preserved.
+        lower = np.asarray(self.coefficient.lb_constraint, dtype=float)
+        upper = np.asarray(self.coefficient.ub_constraint, dtype=float)
+        lower_rhs = np.asarray(self.coefficient.lb_rhs, dtype=float)
+        upper_rhs = np.asarray(self.coefficient.ub_rhs, dtype=float)
         coefficients: tuple[np.ndarray, np.ndarray] = (
-            generate_constraint_coefficient(),
-            generate_rhs_coefficient(),
+            lower[None, :, :] + (upper - lower)[None, :, :] * delta_constraint,
+            lower_rhs[None, :, :] + (upper_rhs - lower_rhs)[None, :, :] * delta_rhs,
         )
         return coefficients
 
     def __generate_all_coefficients(self):
+        if self.__given_scenarios is not None:
+            constraint, rhs = self.__given_scenarios
+            self.coefficient.scenarios_constraint = constraint[: self.number_of_scenarios]
+            self.coefficient.scenarios_rhs = rhs[: self.number_of_scenarios]
+            return
+        if self.__warm_startable():
+            self.__plan = self.__plan_from_prior_run()
+            if self.__plan is not None:
+                self.coefficient.scenarios_constraint = self.__plan.scenarios_constraint
+                self.coefficient.scenarios_rhs = self.__plan.scenarios_rhs
+                return
         (
             self.coefficient.scenarios_constraint,
             self.coefficient.scenarios_rhs,
         ) = self.__generate_coefficients(self.number_of_scenarios)
 
-    def solve(self):
+    def __warm_startable(self) -> bool:
+        # A seed promises the same draws; an anytime run may stop anywhere.
+        return (
+            self.warm_start is not None
+            and self.seed is None
+            and self.__given_scenarios is None
+            and not self.control.anytime
+        )
+
+    def __structure_key(self) -> str:
+        return structure_key(
+            np.asarray(self.coefficient.lb_constraint, dtype=float),
+            np.asarray(self.coefficient.ub_constraint, dtype=float),
+            self.integer_variables,
+        )
+
+    def __cell_bounds(self) -> tuple[np.ndarray, np.ndarray]:
+        return cell_bounds(
+            self.coefficient.lb_constraint,
+            self.coefficient.ub_constraint,
+            self.coefficient.lb_rhs,
+            self.coefficient.ub_rhs,
+        )
+
+    def __plan_from_prior_run(self) -> "ScenarioPlan | None":
+        assert self.warm_start is not None
+        prior = self.warm_start.lookup(self.__structure_key())
+        objective = np.asarray(self.coefficient.objective, dtype=float).reshape(-1)
+        if (
+            prior is None
+            or prior.solver_selection != self.solver_selection
+            or not np.array_equal(prior.objective, objective)
+        ):
+            return None
+        lower, upper = self.__cell_bounds()
+        return plan_scenarios(prior, lower, upper, self.number_of_scenarios)
+
+    def __remember(self):
+        # Only whole runs: a later edit reuses scenarios by their index.
+        if not self.__warm_startable() or self.scenarios_solved < self.number_of_scenarios:
+            return
+        assert self.warm_start is not None
+        lower, upper = self.__cell_bounds()
+        self.warm_start.remember(
+            self.__structure_key(),
+            PriorRun(
+                objective=np.asarray(self.coefficient.objective, dtype=float).reshape(-1),
+                lower=lower,
+                upper=upper,
+                solver_selection=self.solver_selection,
+                scenarios_constraint=np.asarray(self.coefficient.scenarios_constraint),
+                scenarios_rhs=np.asarray(self.coefficient.scenarios_rhs),
+                solutions=self.results[: self.number_of_scenarios],
+                nodes=dict(self.__node_solutions),
+            ),
+        )
+
+    def __solve_from_plan(self):
+        # Reuse the prior run's solutions of the kept scenarios and solve the
+        # rest on one live model, each warm from its chain predecessor.
+        assert self.__plan is not None
+        plan = self.__plan
+        solutions: "list[UnscoredSolution | None]" = [
+            None if prior is None else plan.prior.solutions[prior]
+            for prior in plan.reused
+        ]
+        pending = [scenario for scenario, s in enumerate(solutions) if s is None]
+        self.reused_scenarios = self.number_of_scenarios - len(pending)
+        self.control.report(
+            "scenario_solves", self.reused_scenarios, self.number_of_scenarios
+        )
         c_value = np.array(self.coefficient.objective)
+        solver: "MiniOrtoolsSolver | None" = None
+        order = chain_order(plan.scenarios_constraint, plan.scenarios_rhs, pending)
+        for done, scenario in enumerate(order, start=self.reused_scenarios + 1):
+            self.control.checkpoint("scenario_solves")
+            A_value = self.coefficient.scenarios_constraint[scenario]
+            b_value = np.array(self.coefficient.scenarios_rhs[scenario])
+            if solver is None:
+                solver = MiniOrtoolsSolver(
+                    OptimizationProblem(
+                        c_value,
+                        np.matrix(A_value),
+                        b_value,
+                        integer_variables=self.integer_variables,
+                    ),
+                    self.solver_selection,
+                    time_limit_seconds=self.control.remaining(),
+                )
+                solutions[scenario] = solver.solution
+            else:
+                solver.time_limit_seconds = self.control.remaining()
+                solutions[scenario] = solver.resolve(constraint=A_value, rhs=b_value)
+                self.warm_starts += 1
+            self.control.report("scenario_solves", done, self.number_of_scenarios)
+        self.scenarios_solved = self.number_of_scenarios
+        for solution in solutions:
+            assert solution is not None
+            self.__record(solution)
+
+    def __sharded(self) -> bool:
+        # Anytime phases stop early and must leave a prefix of the scenarios,
+        # which independent shards cannot promise; they run unsharded.
+        return (
+            self.shard_map is not None
+            and self.shards > 1
+            and self.seed is not None
+            and not self.control.anytime
+        )
+
+    def __shard_spec(self) -> "ShardSpec":
+        from .sharding import ShardSpec  # sharding builds on this module
+
+        assert self.seed is not None
+        return ShardSpec(
+            objective=np.array(self.coefficient.objective),
+            lb_constraint=np.asarray(self.coefficient.lb_constraint, dtype=float),
+            ub_constraint=np.asarray(self.coefficient.ub_constraint, dtype=float),
+            lb_rhs=np.asarray(self.coefficient.lb_rhs, dtype=float),
+            ub_rhs=np.asarray(self.coefficient.ub_rhs, dtype=float),
+            integer_variables=self.integer_variables,
+            solver_selection=self.solver_selection,
+            number_of_scenarios=self.number_of_scenarios,
+            seed=self.seed,
+        )
+
+    def __solve_sharded(self) -> "list[UnscoredSolution]":
+        from contextlib import closing
+
+        from .sharding import scenario_ranges, solve_scenarios
+
+        assert self.shard_map is not None
+        spec = self.__shard_spec()
+        calls = [
+            (spec, scenarios.start, scenarios.stop, self.control.remaining())
+            for scenarios in scenario_ranges(self.number_of_scenarios, self.shards)
+        ]
+        solutions: list[UnscoredSolution] = []
+        with closing(self.shard_map(solve_scenarios, calls)) as shards:
+            for shard in shards:
+                self.control.checkpoint("scenario_solves")
+                solutions.extend(shard)
+                self.control.report(
+                    "scenario_solves", len(solutions), self.number_of_scenarios
+                )
+        return solutions
+
+    def solve(self):
         print("[{}] Solve process started".format(date.today()))
+        if self.__plan is not None:
+            self.__solve_from_plan()
+            return
+        if self.__sharded():
+            self.control.report("scenario_solves", 0, self.number_of_scenarios)
+            solved_shards = self.__solve_sharded()
+            self.scenarios_solved = len(solved_shards)
+            for solution in solved_shards:
+                self.__record(solution)
+            return
+        c_value = np.array(self.coefficient.objective)
+        # Under an anytime deadline, stop starting scenario solves once the
+        # phase's share is spent, but always solve enough to cluster.
+        minimum = min(self.number_of_scenarios, self.number_of_clusters + 1)
+        # next() on a count is atomic, so worker threads can share it.
+        solved_count = itertools.count(1)
+        self.control.report("scenario_solves", 0, self.number_of_scenarios)
 
-        def solve_scenario(scenario: int) -> UnscoredSolution:
+        def solve_scenario(scenario: int) -> "UnscoredSolution | None":
+            self.control.checkpoint("scenario_solves")
+            if scenario >= minimum and self.control.phase_expired("scenario_solves"):
+                return None
             A_value = np.matrix(self.coefficient.scenarios_constraint[scenario])
             b_value = np.array(self.coefficient.scenarios_rhs[scenario])
             optimization_problem = OptimizationProblem(
                 c_value, A_value, b_value, integer_variables=self.integer_variables
             )
-            return MiniOrtoolsSolver(
-                optimization_problem, self.solver_selection
+            solution = MiniOrtoolsSolver(
+                optimization_problem,
+                self.solver_selection,
+                time_limit_seconds=self.control.remaining(),
             ).solution
+            self.control.report(
+                "scenario_solves", next(solved_count), self.number_of_scenarios
+            )
+            return solution
 
         scenarios = range(self.number_of_scenarios)
         workers = self.__resolve_workers(self.number_of_scenarios)
@@ -306,10 +668,91 @@ class ProblemsBucket:
             # Scenario solves are independent; OR-Tools releases the GIL during
             # Solve(). Pin BLAS to 1 thread so per-thread numpy work doesn't
             # oversubscribe cores. executor.map keeps results in scenario order.
+            from threadpoolctl import threadpool_limits  # type: ignore
+
             with threadpool_limits(limits=1):
                 with ThreadPoolExecutor(max_workers=workers) as executor:
                     solutions = list(executor.map(solve_scenario, scenarios))
-        self.results.extend(solutions)
+        # Tasks start in scenario order and the deadline only moves forward,
+        # so skipped scenarios form a suffix: result i is still scenario i.
+        solved = [solution for solution in solutions if solution is not None]
+        self.scenarios_solved = len(solved)
+        if self.scenarios_solved < self.number_of_scenarios:
+            self.control.truncate(
+                "scenario_solves",
+                "{} of {} scenarios".format(
+                    self.scenarios_solved, self.number_of_scenarios
+                ),
+            )
+        for solution in solved:
+            self.__record(solution)
+
+    def record_solutions(self, solutions: "list[UnscoredSolution]"):
+        """Take scenario solutions solved elsewhere in place of :meth:`solve`.
+
+        ``solutions[i]`` must be the solve of scenario ``i`` of this bucket's
+        scenarios (e.g. a sweep's warm-started re-solves).
+        """
+        self.scenarios_solved = len(solutions)
+        for solution in solutions:
+            self.__record(solution)
+
+    def __record(self, solution: UnscoredSolution):
+        self.results.append(solution)
+        self.__intern(solution)
+
+    def __intern(self, solution: UnscoredSolution):
+        if not is_optimal(solution):
+            self.result_slots.append(-1)
+            return
+        key = decision_key(solution["variable"])
+        slot = self.decision_slots.setdefault(key, len(self.decision_counts))
+        if slot == len(self.decision_counts):
+            self.decision_counts.append(0)
+        self.decision_counts[slot] += 1
+        self.result_slots.append(slot)
+
+    def __sync_interned(self):
+        # Results assigned or appended directly (rather than produced by the
+        # solve phases) are interned on demand before Scoring. Assigning a new
+        # list already dropped the slots; a list shrunk in place drops them here.
+        if len(self.result_slots) > len(self.results):
+            self.decision_slots, self.decision_counts, self.result_slots = {}, [], []
+        for solution in self.results[len(self.result_slots):]:
+            self.__intern(solution)
+
+    def unique_results(self) -> list[ScoredSolution]:
+        """One scored result per distinct decision vector, in first-seen order.
+
+        Each carries ``occurrences``; call after :meth:`apply_quality_measure`.
+        """
+        seen: set[int] = set()
+        unique: list[ScoredSolution] = []
+        for slot, result in zip(self.result_slots, self.results):
+            if slot >= 0 and slot not in seen:
+                seen.add(slot)
+                unique.append(result)  # type: ignore[arg-type]
+        return unique
+
+    def scored_so_far(self) -> list[ScoredSolution]:
+        """Like :meth:`unique_results`, for the candidates the running
+        :meth:`apply_quality_measure` has scored so far (partial frontiers)."""
+        partial = self.__partial_scores
+        seen: set[int] = set()
+        scored: list[ScoredSolution] = []
+        for slot, result in zip(self.result_slots, self.results):
+            if 0 <= slot < len(partial) and slot not in seen:
+                seen.add(slot)
+                probability, diagnostics = partial[slot]
+                scored.append(
+                    score(
+                        result,
+                        probability,
+                        occurrences=self.decision_counts[slot],
+                        **diagnostics,
+                    )
+                )
+        return scored
 
     def __resolve_workers(self, n_tasks: int) -> int:
         if self.n_jobs in (None, 0, 1):
@@ -321,6 +764,7 @@ class ProblemsBucket:
     def cluster_and_selection(self):
         if not self.results:
             return
+        self.control.checkpoint("clustering")
 
         # Each optimal scenario solution becomes a clustering point:
         # [objective_value] + constraint slacks.
@@ -334,9 +778,30 @@ class ProblemsBucket:
             return
 
         print("[{}] Cluser and Selection started".format(date.today()))
+        # How many KMeans splits the tree needs is only known once it is built.
+        splits = itertools.count()
+
+        def split_checkpoint():
+            self.control.checkpoint("clustering")
+            self.control.report("clustering", next(splits))
+
         # The tree owns the split/select/terminate algorithm; the orchestrator
         # only hands it the root points.
-        self.cluster_tree = ClusterTree.build(root_node, self.number_of_clusters)
+        self.cluster_tree = ClusterTree.build(
+            root_node,
+            self.number_of_clusters,
+            checkpoint=split_checkpoint,
+            should_stop=lambda: self.control.phase_expired("clustering"),
+        )
+        done = next(splits)
+        self.control.report("clustering", done, done)
+        if self.cluster_tree is not None and self.cluster_tree._nodes_can_be_divided():
+            self.control.truncate(
+                "clustering",
+                "stopped splitting at {} tree nodes".format(
+                    len(self.cluster_tree.get_all_nodes())
+                ),
+            )
 
     def solve_cluster_tree(self):
         def solve_optimization_problem(scenarios: list[int]):
@@ -377,7 +842,9 @@ class ProblemsBucket:
                 c_value, A_value, b_value, integer_variables=self.integer_variables
             )
             mini_ortool = MiniOrtoolsSolver(
-                optimization_problem, self.solver_selection
+                optimization_problem,
+                self.solver_selection,
+                time_limit_seconds=self.control.remaining(),
             )
             toc = time.time()
             print("[{}] Duration: {}".format(date.today(), toc - tic))
@@ -385,48 +852,337 @@ class ProblemsBucket:
 
         if not hasattr(self, "cluster_tree"):
             # No cluster tree was built (no optimal scenarios); nothing to solve.
+            self.__remember()
             return
         all_nodes = self.cluster_tree.get_all_nodes()
-        for node in all_nodes:
+        if self.control.anytime:
+            # Most promising first: nodes covering the most scenarios (the
+            # most robust plans), then the cheapest mean objective.
+            def priority(node):
+                data = self.cluster_tree.tree_nodes[node]["data"]
+                return (
+                    -data["number_of_points"],
+                    float(np.mean(data["points_coordinates"][:, 0])),
+                )
+
+            all_nodes = sorted(all_nodes, key=priority)
+        self.control.report("cluster_resolves", 0, len(all_nodes))
+        for done, node in enumerate(all_nodes):
+            self.control.checkpoint("cluster_resolves")
+            if done and self.control.phase_expired("cluster_resolves"):
+                self.control.truncate(
+                    "cluster_resolves",
+                    "{} of {} tree nodes".format(done, len(all_nodes)),
+                )
+                break
             leaf = self.cluster_tree.tree_nodes[node]
             data = leaf["data"]
             selected_scenarios = data["points_ids"]
-            self.cluster_tree.tree_nodes[node]["problem"] = solve_optimization_problem(
-                selected_scenarios
+            # A node over the same unchanged scenarios as one of the prior
+            # run's is the same stacked LP: keep its solution.
+            problem = (
+                self.__plan.reused_node(selected_scenarios)
+                if self.__plan is not None
+                else None
             )
-            self.results.append(self.cluster_tree.tree_nodes[node]["problem"])
+            if problem is None:
+                problem = solve_optimization_problem(selected_scenarios)
+            else:
+                self.reused_cluster_nodes += 1
+            self.cluster_tree.tree_nodes[node]["problem"] = problem
+            self.__node_solutions[frozenset(selected_scenarios)] = problem
+            self.__record(problem)
+            self.control.report("cluster_resolves", done + 1, len(all_nodes))
+        self.__remember()
 
-    def apply_quality_measure(self, number_of_scenarios: int):
-        scenarios_constraint, scenarios_rhs = self.__generate_coefficients(
-            number_of_scenarios
-        )
-        print("[{}] Quality measure application started".format(date.today()))
-        # Stack the scenarios once: constraint tensor (M, n_con, n_var) and RHS
-        # matrix (M, n_con). Scoring each candidate is then a single batched
-        # matrix-vector product instead of a Python loop over scenarios.
-        constraint_tensor = np.array(
-            [np.asarray(scenario, dtype=float) for scenario in scenarios_constraint]
-        )
-        rhs_matrix = np.array(
-            [np.asarray(rhs, dtype=float).reshape(-1) for rhs in scenarios_rhs]
+    def apply_quality_measure(
+        self,
+        number_of_scenarios: int,
+        method: str = "monte_carlo",
+        strata: "tuple[np.ndarray, np.ndarray] | None" = None,
+    ):
+        """Score every result with its feasibility probability.
+
+        ``method`` picks the estimator: ``"monte_carlo"`` counts feasible
+        scenarios among ``number_of_scenarios`` fresh draws; ``"importance"``
+        tilts the draws toward each candidate's nearly-binding rows and
+        reweights (see :mod:`sirom.scoring`), which resolves probabilities near
+        1 with far fewer scenarios and records an ``effective_sample_size``;
+        ``"control_variate"`` pairs every draw with its antithetic mirror and
+        corrects with nominal-midpoint slack controls, recording the estimated
+        ``variance_reduction`` over plain Monte Carlo.
+
+        Each distinct decision vector is scored once and the score is fanned
+        out to every result sharing it, together with its ``occurrences``.
+
+        ``strata`` supplies the quality draws instead of sampling them: uint16
+        stratum indices shaped (D, n_con, n_var) and (D, n_con, 1), where D is
+        :func:`quality_draws` for this ``method`` (e.g. a shared scenario bank
+        attached by an API worker). They are only read, never written.
+
+        Under an anytime deadline (``RunControl(deadline_seconds=...)``) a
+        short pilot sizes ``number_of_scenarios`` down to what fits the
+        phase's share, falling back to Monte Carlo when even that does not.
+        """
+        if method not in SCORING_METHODS:
+            self.status.append("[ERROR] Unknown scoring method {}".format(method))
+            return
+        self.__sync_interned()
+        # One decision vector per interned slot, in slot order.
+        variables = np.zeros((len(self.decision_counts), self.coefficient.objective.shape[0]))
+        for slot, result in zip(self.result_slots, self.results):
+            if slot >= 0:
+                variables[slot] = np.asarray(result["variable"], dtype=float)
+        number_of_scenarios, fitted_method = self.__fit_quality_scenarios(
+            variables, number_of_scenarios, method
         )
-        for index, result in enumerate(self.results):
-            tic = time.time()
-            if not is_optimal(result):
+        if fitted_method != method:
+            # The supplied strata were sized for the other estimator.
+            method, strata = fitted_method, None
+        self.__partial_scores = []
+        self.control.report("quality_scoring", 0, len(variables))
+
+        def scored(partial: list[tuple[float, dict[str, float]]]):
+            self.__partial_scores = partial
+            self.control.report("quality_scoring", len(partial), len(variables))
+
+        if method == "monte_carlo" and self.__sharded() and len(variables):
+            scores = self.__score_sharded(variables, number_of_scenarios)
+        else:
+            scores = self.__score(
+                variables,
+                method,
+                self.__quality_deltas(
+                    quality_draws(number_of_scenarios, method),
+                    method == "monte_carlo",
+                    strata,
+                    self.__quality_stream,
+                ),
+                progress=scored,
+            )
+        for index, (slot, result) in enumerate(zip(self.result_slots, self.results)):
+            if slot < 0:
                 # Non-optimal sub-problems (e.g. infeasible scenarios) have no
                 # decision vector to score; treat them as never feasible instead
                 # of crashing the whole run.
                 self.results[index] = score(result, 0.0)
                 continue
-            variable = np.asarray(result["variable"], dtype=float)
-            # Per scenario, the constraint set is violated iff the max of
-            # (A @ x - b) is strictly positive (matches the original > 0 test).
-            max_violation = (constraint_tensor @ variable - rhs_matrix).max(axis=1)
-            mean_result_feasibility = float(np.mean(max_violation <= 0.0))
-            toc = time.time()
+            probability, diagnostics = scores[slot]
+            self.results[index] = score(
+                result,
+                probability,
+                occurrences=self.decision_counts[slot],
+                **diagnostics,
+            )
+
+    def __score_sharded(
+        self, variables: np.ndarray, number_of_scenarios: int
+    ) -> list[tuple[float, dict[str, float]]]:
+        # Each shard counts feasible draws over its range of the seeded
+        # quality blocks; the counts add up over the ranges.
+        from contextlib import closing
+
+        from .sharding import count_feasible, scenario_ranges
+
+        assert self.shard_map is not None
+        spec = self.__shard_spec()
+        ranges = scenario_ranges(number_of_scenarios, self.shards)
+        calls = [(spec, variables, draws.start, draws.stop) for draws in ranges]
+        print(
+            "[{}] Quality measure application started ({} shards)".format(
+                date.today(), len(ranges)
+            )
+        )
+        feasible = np.zeros(len(variables))
+        with closing(self.shard_map(count_feasible, calls)) as shards:
+            for done, counts in enumerate(shards, start=1):
+                self.control.checkpoint("quality_scoring")
+                feasible += counts
+                # Scores are only known once every range is counted, so the
+                # phase reports the share of the count done.
+                self.control.report(
+                    "quality_scoring",
+                    len(variables) * done // len(ranges),
+                    len(variables),
+                )
+        return [(float(p), {}) for p in feasible / number_of_scenarios]
+
+    def __fit_quality_scenarios(
+        self,
+        variables: np.ndarray,
+        number_of_scenarios: int,
+        method: str,
+    ) -> tuple[int, str]:
+        # Anytime: time the estimator on a few candidates at two pilot sizes,
+        # fit cost ≈ U·(fixed + per_scenario·M), and keep the largest M that
+        # fits what is left of the phase. When even the smallest M does not
+        # fit (the δ estimators pay a per-candidate setup), fall back to the
+        # vectorized Monte Carlo count. Pilot draws are fresh and unseeded:
+        # their scores are thrown away and a seeded run's stream is untouched.
+        remaining = self.control.phase_remaining("quality_scoring")
+        if remaining is None or not len(variables):
+            return number_of_scenarios, method
+        sizes = (min(number_of_scenarios, 16), min(number_of_scenarios, 64))
+        for candidate_method in dict.fromkeys((method, "monte_carlo")):
+            fixed, per_scenario = self.__pilot_cost(variables[:8], sizes, candidate_method)
+            affordable = (remaining / len(variables) - fixed) / per_scenario
+            if affordable >= sizes[0] or candidate_method == "monte_carlo":
+                break
+        fitted = int(max(sizes[0], min(number_of_scenarios, affordable)))
+        if candidate_method != method:
+            self.control.truncate(
+                "quality_scoring",
+                "monte_carlo instead of {}, {} of {} quality scenarios".format(
+                    method, fitted, number_of_scenarios
+                ),
+            )
+        elif fitted < number_of_scenarios:
+            self.control.truncate(
+                "quality_scoring",
+                "{} of {} quality scenarios".format(fitted, number_of_scenarios),
+            )
+        return fitted, candidate_method
+
+    def __pilot_cost(
+        self, sample: np.ndarray, sizes: tuple[int, int], method: str
+    ) -> tuple[float, float]:
+        # -> (seconds per candidate, seconds per candidate per scenario)
+        timings = []
+        for size in sizes:
+            tic = time.perf_counter()
+            self.__score(
+                sample,
+                method,
+                self.__quality_deltas(
+                    quality_draws(size, method), method == "monte_carlo", None, None
+                ),
+            )
+            timings.append((time.perf_counter() - tic) / len(sample))
+        per_scenario = max(
+            (timings[1] - timings[0]) / max(1, sizes[1] - sizes[0]), 1e-9
+        )
+        return max(0.0, timings[0] - per_scenario * sizes[0]), per_scenario
+
+    def __quality_deltas(
+        self,
+        draws: int,
+        quantized: bool,
+        strata: "tuple[np.ndarray, np.ndarray] | None",
+        random_state: "np.random.RandomState | None",
+    ) -> tuple[np.ndarray, np.ndarray, "int | None"]:
+        # -> (δ for A, δ for b as (draws, n_con), strata count or None when
+        # the δ are floats). Supplied strata may hold more draws than needed
+        # (an anytime run scoring fewer); any prefix of an LHS design is still
+        # a uniform sample, indexed against the full design's strata.
+        if strata is None:
+            deltas_constraint, deltas_rhs = self.__generate_deltas(
+                draws, quantized, random_state
+            )
+            n_strata = draws if deltas_constraint.dtype == np.uint16 else None
+        else:
+            n_strata = strata[0].shape[0]
+            deltas_constraint, deltas_rhs = strata[0][:draws], strata[1][:draws]
+            if not quantized:
+                deltas_constraint = dequantize(deltas_constraint, n_strata)
+                deltas_rhs = dequantize(deltas_rhs, n_strata)
+                n_strata = None
+        return deltas_constraint, deltas_rhs.reshape(draws, -1), n_strata
+
+    def __score(
+        self,
+        variables: np.ndarray,
+        method: str,
+        deltas: tuple[np.ndarray, np.ndarray, "int | None"],
+        progress: "Callable[[list], None] | None" = None,
+    ) -> list[tuple[float, dict[str, float]]]:
+        # ``progress`` is handed the scores of the candidates (slots) done so
+        # far; the anytime pilot scores without reporting.
+        if method == "monte_carlo":
+            return self.__score_with_monte_carlo(variables, deltas, progress)
+        return self.__score_with_delta_estimator(variables, method, deltas, progress)
+
+    def __score_with_monte_carlo(
+        self,
+        variables: np.ndarray,
+        deltas: tuple[np.ndarray, np.ndarray, "int | None"],
+        progress: "Callable[[list], None] | None" = None,
+    ) -> list[tuple[float, dict[str, float]]]:
+        # Keep only the δ draws (as uint16 strata) and score in the factored
+        # form lb·x + ((ub - lb) ⊙ δ)·x, rather than materializing an
+        # (M, n_con, n_var) float copy of every scenario matrix.
+        deltas_constraint, deltas_rhs, n_strata = deltas
+        print("[{}] Quality measure application started".format(date.today()))
+        tic = time.time()
+        feasibility = monte_carlo(
+            variables,
+            np.asarray(self.coefficient.lb_constraint, dtype=float),
+            np.asarray(self.coefficient.ub_constraint, dtype=float),
+            np.asarray(self.coefficient.lb_rhs, dtype=float).reshape(-1),
+            np.asarray(self.coefficient.ub_rhs, dtype=float).reshape(-1),
+            deltas_constraint,
+            deltas_rhs,
+            n_strata=n_strata,
+            checkpoint=lambda: self.control.checkpoint("quality_scoring"),
+            progress=(
+                None
+                if progress is None
+                else lambda partial: progress([(float(p), {}) for p in partial])
+            ),
+        )
+        toc = time.time()
+        scores: list[tuple[float, dict[str, float]]] = []
+        for probability in feasibility:
             print(
                 "[{}] Quality measurement evaluated: {} - Elapsed time: {}".format(
-                    date.today(), mean_result_feasibility, toc - tic
+                    date.today(), float(probability), (toc - tic) / len(feasibility)
+                )
+            )
+            scores.append((float(probability), {}))
+        return scores
+
+    def __score_with_delta_estimator(
+        self,
+        variables: np.ndarray,
+        method: str,
+        deltas: tuple[np.ndarray, np.ndarray, "int | None"],
+        progress: "Callable[[list], None] | None" = None,
+    ) -> list[tuple[float, dict[str, float]]]:
+        # Both estimators work in δ space (likelihood ratios, antithetic
+        # mirrors), so keep the unit-cube draws rather than interpolated
+        # matrices. Every candidate sees the same base draws (common random
+        # numbers), which keeps neighbouring frontier points comparable.
+        # Control variates score each draw with its mirror 1 - δ (see
+        # quality_draws: half the draws, same M).
+        if method == "control_variate":
+            estimator, diagnostic = control_variate, "variance_reduction"
+        else:
+            estimator, diagnostic = importance_sampling, "effective_sample_size"
+        uniforms_constraint, uniforms_rhs, _ = deltas
+        lower = np.asarray(self.coefficient.lb_constraint, dtype=float)
+        upper = np.asarray(self.coefficient.ub_constraint, dtype=float)
+        lower_rhs = np.asarray(self.coefficient.lb_rhs, dtype=float).reshape(-1)
+        upper_rhs = np.asarray(self.coefficient.ub_rhs, dtype=float).reshape(-1)
+        print("[{}] Quality measure ({}) started".format(date.today(), method))
+        scores: list[tuple[float, dict[str, float]]] = []
+        for variable in variables:
+            self.control.checkpoint("quality_scoring")
+            tic = time.time()
+            probability, value = estimator(
+                variable,
+                lower,
+                upper,
+                lower_rhs,
+                upper_rhs,
+                uniforms_constraint,
+                uniforms_rhs,
+            )
+            toc = time.time()
+            print(
+                "[{}] Quality measurement evaluated: {} ({} {:.2f}) - Elapsed time: {}".format(
+                    date.today(), probability, diagnostic, value, toc - tic
                 )
             )
-            self.results[index] = score(result, mean_result_feasibility)
+            scores.append((probability, {diagnostic: value}))
+            if progress is not None:
+                progress(list(scores))
+        return scores
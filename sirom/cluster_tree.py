@@ -1,10 +1,9 @@
 from __future__ import annotations
 
-from typing import Dict, List, Optional, TypedDict
+from typing import Callable, Dict, List, Optional, TypedDict
 import uuid
 
 import numpy as np
-from sklearn.cluster import KMeans  # type: ignore
 
 from sirom.mini_ortools_solver import UnscoredSolution
 
@@ -44,7 +43,11 @@ class ClusterTree:
 
     @classmethod
     def build(
-        cls, root_points, number_of_clusters: int
+        cls,
+        root_points,
+        number_of_clusters: int,
+        checkpoint: Optional[Callable[[], None]] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
     ) -> Optional["ClusterTree"]:
         """Build a cluster tree from the root point set and subdivide it.
 
@@ -52,7 +55,10 @@ class ClusterTree:
         ``root_points`` (one point per optimal scenario solution), then
         repeatedly splits the splittable nodes (KMeans into
         ``number_of_clusters``) until none remain. Returns ``None`` when there
-        are no points to cluster.
+        are no points to cluster. ``checkpoint`` is called before every KMeans
+        split and may raise to abandon the build; once ``should_stop`` returns
+        True the tree stops deepening and is returned as built so far (every
+        node is still a valid cluster, just a coarser one).
         """
         points = np.asarray(root_points)
         if points.size == 0:
@@ -67,7 +73,9 @@ class ClusterTree:
             }
         )
         while tree._nodes_can_be_divided():
-            tree._divide_nodes(number_of_clusters)
+            if should_stop is not None and should_stop():
+                break
+            tree._divide_nodes(number_of_clusters, checkpoint)
         return tree
 
     def create_leaf(self, leaf: Node):
@@ -105,6 +113,10 @@ class ClusterTree:
 
     @staticmethod
     def _calculate_wcss(points_coordinates) -> float:
+        # scikit-learn (and scipy with it) loads on first use, not with the
+        # package.
+        from sklearn.cluster import KMeans  # type: ignore
+
         kmeans = KMeans(n_clusters=1, random_state=0).fit(points_coordinates)
         return kmeans.inertia_
 
@@ -134,11 +146,19 @@ class ClusterTree:
                 return True
         return False
 
-    def _divide_nodes(self, number_of_clusters: int) -> None:
+    def _divide_nodes(
+        self,
+        number_of_clusters: int,
+        checkpoint: Optional[Callable[[], None]] = None,
+    ) -> None:
+        from sklearn.cluster import KMeans  # type: ignore
+
         for parent_node_id in self.get_all_nodes():
             parent_node: RootData = self.tree_nodes[parent_node_id]["data"]
             if not parent_node["replicate"]:
                 continue
+            if checkpoint is not None:
+                checkpoint()
             parent_count = parent_node["number_of_points"]
             nodes: List[RootData] = []
             kmeans = KMeans(n_clusters=number_of_clusters, random_state=0).fit(
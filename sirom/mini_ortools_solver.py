@@ -1,7 +1,7 @@
 from __future__ import print_function
-from typing import List, TypedDict
+from functools import lru_cache
+from typing import List, TypedDict, cast
 import numpy as np
-from ortools.linear_solver import pywraplp  # type: ignore
 from .optimization_problem import OptimizationProblem
 from .status_checks import has_errors
 
@@ -24,7 +24,15 @@ class UnscoredSolution(_OptionalSolutionKeys):
     solve_status: int
 
 
-class ScoredSolution(UnscoredSolution):
+class _ScoringDiagnostics(TypedDict, total=False):
+    # Present only when the scoring estimator reports it.
+    effective_sample_size: float
+    variance_reduction: float
+    # How many results produced this exact decision vector.
+    occurrences: int
+
+
+class ScoredSolution(UnscoredSolution, _ScoringDiagnostics):
     """An Unscored Solution after the Scoring stage has added its feasibility."""
 
     feasibility_probability: float
@@ -35,14 +43,34 @@ def is_optimal(solution: "UnscoredSolution") -> bool:
     return solution["solve_status"] == 0
 
 
+def decision_key(variable: "List[float] | np.ndarray", decimals: int = 9) -> bytes:
+    """Hashable identity of a decision vector, quantized to ``decimals``.
+
+    Solves that land on the same vertex differ only by float noise; rounding
+    (and normalizing ``-0.0``) before taking the raw bytes makes them intern to
+    one key.
+    """
+    quantized = np.round(np.asarray(variable, dtype=float), decimals) + 0.0
+    return quantized.tobytes()
+
+
 def feasibility(solution: "ScoredSolution") -> float:
     """The feasibility probability of a scored solution."""
     return solution["feasibility_probability"]
 
 
-def score(solution: "UnscoredSolution", probability: float) -> "ScoredSolution":
-    """The one transform that turns an Unscored Solution into a Scored one."""
-    return {**solution, "feasibility_probability": probability}
+def score(
+    solution: "UnscoredSolution", probability: float, **diagnostics: float
+) -> "ScoredSolution":
+    """The one transform that turns an Unscored Solution into a Scored one.
+
+    ``diagnostics`` carries estimator-specific extras (e.g.
+    ``effective_sample_size``) alongside the probability.
+    """
+    return cast(
+        ScoredSolution,
+        {**solution, **diagnostics, "feasibility_probability": probability},
+    )
 
 
 def select_solver(optimization_problem: OptimizationProblem) -> str:
@@ -56,12 +84,16 @@ def select_solver(optimization_problem: OptimizationProblem) -> str:
     return "GLOP"
 
 
+@lru_cache(maxsize=None)
 def solver_available(name: str) -> bool:
     """Whether an OR-Tools backend can be created in this build.
 
     Any name OR-Tools recognizes works, including commercial solvers (GUROBI,
     CPLEX, XPRESS) when OR-Tools is built against them and a license is present.
+    Cached per process: neither changes while it runs.
     """
+    from ortools.linear_solver import pywraplp  # type: ignore
+
     return pywraplp.Solver.CreateSolver(name) is not None
 
 
@@ -73,6 +105,7 @@ class MiniOrtoolsSolver:
         optimization_problem: OptimizationProblem,
         solver_selection: "str | None" = None,
         print_log: bool = False,
+        time_limit_seconds: "float | None" = None,
     ):
         self.status: List[str] = []
         self.problem: OptimizationProblem = optimization_problem
@@ -80,8 +113,54 @@ class MiniOrtoolsSolver:
         # used verbatim, so an unknown name still surfaces a solver-creation error.
         self.solver_selected: "str | None" = solver_selection
         self.print_log: bool = print_log
+        # Wall-clock cap handed to OR-Tools (None = unlimited); a solve cut
+        # short comes back with a non-OPTIMAL solve_status.
+        self.time_limit_seconds: "float | None" = time_limit_seconds
         self.__validate_optimization_problem()
 
+    def resolve(
+        self,
+        objective: "np.ndarray | None" = None,
+        rhs: "np.ndarray | None" = None,
+        constraint: "np.ndarray | None" = None,
+    ) -> UnscoredSolution:
+        """Change the objective, right-hand side and/or constraint matrix in
+        place and solve again.
+
+        The backend keeps its model and last basis, so GLOP re-solves from the
+        previous optimum instead of from scratch: a few simplex iterations
+        when the change is small (a sweep over ``c`` or ``b``, a neighbouring
+        scenario), none when the basis stays optimal. MIP backends re-solve
+        without a warm start.
+        """
+        coefficient = self.problem.coefficient
+        current = np.asarray(coefficient.constraint, dtype=float)
+        if constraint is not None:
+            constraint = np.asarray(constraint, dtype=float)
+            # Only the coefficients that differ; zeros too, to clear old ones.
+            for i, j in zip(*np.nonzero(constraint != current)):
+                self.constraints[i].SetCoefficient(
+                    self.variables[j], float(constraint[i, j])
+                )
+        self.problem = OptimizationProblem(
+            np.asarray(coefficient.objective if objective is None else objective, dtype=float),
+            current if constraint is None else constraint,
+            np.asarray(coefficient.rhs if rhs is None else rhs, dtype=float),
+            integer_variables=self.problem.integer_variables,
+        )
+        if objective is not None:
+            coefficients = np.asarray(objective, dtype=float).reshape(-1)
+            for j, coefficient_value in enumerate(coefficients):
+                # Zeros too: the previous objective may have set this one.
+                self.objective.SetCoefficient(self.variables[j], float(coefficient_value))
+        if rhs is not None:
+            for row, bound in zip(
+                self.constraints, np.asarray(rhs, dtype=float).reshape(-1)
+            ):
+                row.SetUb(float(bound))
+        self.__solve()
+        return self.solution
+
     def __validate_optimization_problem(self):
         if not isinstance(self.problem, OptimizationProblem):
             self.status.append("[ERROR] Optimization problem validation failed")
@@ -100,6 +179,9 @@ class MiniOrtoolsSolver:
     def __create_solver(self):
         if self.solver_selected is None:
             self.solver_selected = select_solver(self.problem)
+        # OR-Tools is imported with the first solver, not with the package.
+        from ortools.linear_solver import pywraplp  # type: ignore
+
         self.solver = pywraplp.Solver.CreateSolver(self.solver_selected)
         if self.solver is None:
             self.status.append("[ERROR] Solver creation failed")
@@ -157,6 +239,8 @@ class MiniOrtoolsSolver:
         if has_errors(self.status):
             self.status.append("[ERROR] Solving process failed")
             return
+        if self.time_limit_seconds is not None:
+            self.solver.SetTimeLimit(max(1, int(self.time_limit_seconds * 1000)))
         self.solve_status = self.solver.Solve()
         self.status.append("[OK] Solving process succeeded")
         self.__retrieve_solution()
@@ -1,9 +1,13 @@
-from typing import List
-import pandas as pd
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, List
 import numpy as np
 
 from .status_checks import has_errors
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 
 class Coefficient:
     def __init__(self, c, A, b):
@@ -55,6 +59,8 @@ class OptimizationProblem:
     def __coefficient_validation(
         self, coefficient: np.ndarray | np.matrix | list, identification: str
     ) -> pd.DataFrame:
+        import pandas as pd  # deferred: see sirom.batch_solver
+
         if not isinstance(coefficient, (np.matrix, np.ndarray, list)):
             self.status.append(
                 "[ERROR] Undefined {} coefficient".format(identification)
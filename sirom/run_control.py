@@ -0,0 +1,194 @@
+"""Cooperative cancellation and time budgets for one pipeline run.
+
+A SIROM run is a long sequence of short steps (scenario solves, KMeans splits,
+cluster re-solves, scoring chunks). :class:`RunControl` is handed to
+:class:`~sirom.batch_solver.ProblemsBucket` and checked between those steps: a
+:meth:`~RunControl.checkpoint` raises :class:`RunCancelled` once the run was
+cancelled or its time budget is spent. Steps that can block for long on their
+own (an OR-Tools ``Solve``) are additionally bounded with
+:meth:`~RunControl.remaining`.
+
+The cancel flag is anything with an ``is_set()`` method — a
+``threading.Event`` in-process, a ``multiprocessing.Manager().Event()`` proxy
+across processes — so the pipeline never needs to know where the request to
+stop came from.
+
+A run can also be given an *anytime* deadline. Instead of failing when time
+runs out, each phase gets a share of the budget (:data:`ANYTIME_SHARES`) and
+wraps up early when its share is spent — fewer scenarios solved, a shallower
+cluster tree, fewer tree nodes re-solved, fewer quality scenarios — recording
+what it cut in :attr:`RunControl.truncated`.
+
+Phases also :meth:`~RunControl.report` how far along they are. A run given a
+``progress`` sink receives throttled snapshots of every phase's counters with
+a rate-based ETA; the job manager forwards them to the job store.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Protocol
+
+# Cumulative fraction of an anytime deadline by which each phase should be
+# done. The last 5 % is left for building the frontier and the response.
+ANYTIME_SHARES: Dict[str, float] = {
+    "scenario_solves": 0.40,
+    "clustering": 0.55,
+    "cluster_resolves": 0.75,
+    "quality_scoring": 0.95,
+}
+
+
+class CancelFlag(Protocol):
+    def is_set(self) -> bool: ...
+
+
+# Receives progress snapshots (see RunControl.report); must be cheap.
+ProgressSink = Callable[[Dict[str, Any]], None]
+
+
+class RunCancelled(Exception):
+    """Raised at a checkpoint; ``reason`` is ``"cancelled"`` or ``"time_limit"``."""
+
+    def __init__(self, reason: str, phase: str):
+        self.reason = reason
+        self.phase = phase
+        super().__init__("{} during {}".format(reason, phase))
+
+    def __reduce__(self):
+        return (RunCancelled, (self.reason, self.phase))
+
+
+class RunControl:
+    """Deadline and cancel flag for one run.
+
+    Args:
+        time_limit_seconds: Wall-clock budget from construction (``None`` = no
+            limit).
+        cancel_flag: Set by whoever wants the run to stop.
+        poll_interval: Minimum seconds between reads of ``cancel_flag``; a
+            cross-process flag costs a round trip per read.
+        deadline_seconds: Anytime budget from construction (``None`` = run
+            every phase to completion).
+        progress: Called with a snapshot of the phase counters as phases
+            advance.
+        progress_interval: Minimum seconds between snapshots, except that the
+            first report and a phase's last are always delivered.
+    """
+
+    def __init__(
+        self,
+        time_limit_seconds: Optional[float] = None,
+        cancel_flag: Optional[CancelFlag] = None,
+        poll_interval: float = 0.05,
+        deadline_seconds: Optional[float] = None,
+        progress: Optional[ProgressSink] = None,
+        progress_interval: float = 0.25,
+    ):
+        started = time.monotonic()
+        self.time_limit_seconds = time_limit_seconds
+        self.deadline: Optional[float] = (
+            started + time_limit_seconds if time_limit_seconds is not None else None
+        )
+        self.deadline_seconds = deadline_seconds
+        self._started = started
+        # phase -> what was cut, e.g. {"scenario_solves": "40 of 100 scenarios"}
+        self.truncated: Dict[str, str] = {}
+        self._flag = cancel_flag
+        self._poll_interval = poll_interval
+        self._next_poll = 0.0
+        self._cancelled = False
+        self._progress = progress
+        self._progress_interval = progress_interval
+        self._next_report = 0.0
+        # phase -> {"done", "total", "started", "at"}
+        self._phases: Dict[str, Dict[str, Any]] = {}
+        self._progress_lock = threading.Lock()
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left in the budget (never negative), or ``None``."""
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    @property
+    def anytime(self) -> bool:
+        return self.deadline_seconds is not None
+
+    def phase_remaining(self, phase: str) -> Optional[float]:
+        """Seconds left in ``phase``'s share of the anytime budget, or ``None``."""
+        if self.deadline_seconds is None:
+            return None
+        end = self._started + self.deadline_seconds * ANYTIME_SHARES[phase]
+        return max(0.0, end - time.monotonic())
+
+    def phase_expired(self, phase: str) -> bool:
+        """True once ``phase`` has used up its share of the anytime budget."""
+        return self.phase_remaining(phase) == 0.0
+
+    def truncate(self, phase: str, detail: str) -> None:
+        """Record that ``phase`` stopped early and what it left out."""
+        self.truncated[phase] = detail
+
+    def stop_reason(self) -> Optional[str]:
+        """``"cancelled"``, ``"time_limit"`` or ``None`` if the run may go on."""
+        now = time.monotonic()
+        if not self._cancelled and self._flag is not None and now >= self._next_poll:
+            self._next_poll = now + self._poll_interval
+            self._cancelled = bool(self._flag.is_set())
+        if self._cancelled:
+            return "cancelled"
+        if self.deadline is not None and now >= self.deadline:
+            return "time_limit"
+        return None
+
+    def checkpoint(self, phase: str) -> None:
+        """Raise :class:`RunCancelled` if the run should stop now."""
+        reason = self.stop_reason()
+        if reason is not None:
+            raise RunCancelled(reason, phase)
+
+    def report(self, phase: str, done: int, total: Optional[int] = None) -> None:
+        """Record that ``phase`` has finished ``done`` of ``total`` units.
+
+        ``total`` is ``None`` while unknown. Safe to call from worker threads.
+        """
+        if self._progress is None:
+            return
+        now = time.monotonic()
+        with self._progress_lock:
+            entry = self._phases.setdefault(phase, {"started": now})
+            entry.update(done=done, total=total, at=now)
+            if now < self._next_report and done != total:
+                return
+            self._next_report = now + self._progress_interval
+            # Delivered under the lock so snapshots arrive in order.
+            self._progress(self._snapshot(phase, now))
+
+    def _snapshot(self, current: str, now: float) -> Dict[str, Any]:
+        phases = {}
+        for phase, entry in self._phases.items():
+            done, total = entry["done"], entry["total"]
+            elapsed = entry["at"] - entry["started"]
+            eta: Optional[float] = None
+            if total is not None and done >= total:
+                eta = 0.0
+            elif total is not None and done > 0:
+                eta = elapsed / done * (total - done)
+                # An anytime phase wraps up when its share runs out anyway.
+                share = self.phase_remaining(phase) if phase in ANYTIME_SHARES else None
+                if share is not None:
+                    eta = min(eta, share)
+            phases[phase] = {
+                "done": done,
+                "total": total,
+                "elapsed_seconds": round(elapsed, 3),
+                "eta_seconds": round(eta, 3) if eta is not None else None,
+            }
+        return {
+            "phase": current,
+            "elapsed_seconds": round(now - self._started, 3),
+            "eta_seconds": phases[current]["eta_seconds"],
+            "phases": phases,
+        }
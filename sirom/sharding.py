@@ -0,0 +1,172 @@
+"""Scenario-range shards, for spreading one run's heavy phases over processes.
+
+The scenario solves and the Monte Carlo quality count are both independent
+per scenario, so a :class:`~sirom.batch_solver.ProblemsBucket` given a
+:data:`ShardMap` splits them into contiguous scenario ranges and maps the
+module-level functions below over the ranges, possibly in other processes
+(:func:`executor_map`). A shard is sent only a :class:`ShardSpec` — the interval
+bounds and the seed — and draws its own scenarios, so no scenario matrices
+cross the process boundary. The bucket concatenates the solves in range order
+and sums the feasible counts before going on.
+
+A sharded run's designs are drawn in blocks of :data:`SHARD_BLOCK`
+scenarios, each its own Latin Hypercube from a stream of the seed and the
+block's index (:func:`block_deltas`), and shards are made of whole blocks. A
+shard thus samples only its own scenarios, and the draws depend on the seed
+and the scenario count, not on how many shards there are. They are not the
+draws of an unsharded run with the same seed: that is one LHS over every
+scenario, whose rows cannot be drawn without drawing all of it.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator, Sequence
+
+import numpy as np
+
+from .batch_solver import sample_deltas
+from .mini_ortools_solver import MiniOrtoolsSolver, UnscoredSolution
+from .optimization_problem import OptimizationProblem
+from .scoring import monte_carlo
+
+# Applies a function to each argument tuple (maybe elsewhere) and yields the
+# results in call order. Closing the iterator abandons calls not yet started.
+ShardMap = Callable[[Callable[..., Any], Sequence[tuple]], Iterator[Any]]
+
+SHARD_BLOCK = 64
+"""Scenarios per independently drawn block of a sharded run's designs."""
+
+
+@dataclass(frozen=True)
+class ShardSpec:
+    """What a shard needs to regenerate its scenarios and solve or score them."""
+
+    objective: np.ndarray  # (n_var, 1)
+    lb_constraint: np.ndarray  # (n_con, n_var)
+    ub_constraint: np.ndarray
+    lb_rhs: np.ndarray  # (n_con, 1)
+    ub_rhs: np.ndarray
+    integer_variables: "list[int]"
+    solver_selection: "str | None"
+    number_of_scenarios: int
+    seed: int
+
+
+def scenario_ranges(total: int, shards: int) -> "list[range]":
+    """Split ``range(total)`` into at most ``shards`` contiguous ranges of
+    whole :data:`SHARD_BLOCK` blocks, as even as the blocks allow."""
+    blocks = -(-total // SHARD_BLOCK)
+    shards = max(1, min(shards, blocks))
+    bounds = [
+        min(total, SHARD_BLOCK * (blocks * i // shards)) for i in range(shards + 1)
+    ]
+    return [range(bounds[i], bounds[i + 1]) for i in range(shards)]
+
+
+def block_deltas(
+    seed: int,
+    phase: int,
+    first: int,
+    stop: int,
+    shape: "tuple[int, ...]",
+    quantized: bool = False,
+) -> "Iterator[tuple[int, np.ndarray, np.ndarray]]":
+    """``(size, δ of A, δ of b)`` of each block of scenarios ``first``..``stop - 1``.
+
+    ``phase`` is 0 for the scenario solves and 1 for the quality draws, as in
+    :func:`~sirom.batch_solver.random_streams`. Block ``k`` is an LHS of its
+    own size from a stream of ``(seed, phase, k)``; quantized strata index
+    that size.
+    """
+    n_con, n_var = shape
+    for start in range(first, stop, SHARD_BLOCK):
+        size = min(SHARD_BLOCK, stop - start)
+        stream = np.random.RandomState([seed, phase, start // SHARD_BLOCK])
+        yield (
+            size,
+            sample_deltas(size, n_con, n_var, quantized, stream),
+            sample_deltas(size, n_con, 1, quantized, stream),
+        )
+
+
+def solve_scenarios(
+    spec: ShardSpec,
+    first: int,
+    stop: int,
+    time_limit_seconds: "float | None" = None,
+) -> "list[UnscoredSolution]":
+    """Solve scenarios ``first``..``stop - 1`` of ``spec``'s seeded blocks."""
+    solutions: "list[UnscoredSolution]" = []
+    width_A = spec.ub_constraint - spec.lb_constraint
+    width_b = spec.ub_rhs - spec.lb_rhs
+    for _, delta_constraint, delta_rhs in block_deltas(
+        spec.seed, 0, first, stop, spec.lb_constraint.shape
+    ):
+        constraints = spec.lb_constraint + width_A * delta_constraint
+        rhs = spec.lb_rhs + width_b * delta_rhs
+        solutions.extend(
+            MiniOrtoolsSolver(
+                OptimizationProblem(
+                    spec.objective,
+                    A_value,
+                    b_value,
+                    integer_variables=spec.integer_variables,
+                ),
+                spec.solver_selection,
+                time_limit_seconds=time_limit_seconds,
+            ).solution
+            for A_value, b_value in zip(constraints, rhs)
+        )
+    return solutions
+
+
+def count_feasible(
+    spec: ShardSpec, variables: np.ndarray, first: int, stop: int
+) -> np.ndarray:
+    """Feasible counts of each candidate over quality draws ``first``..``stop - 1``.
+
+    The draws are ``spec``'s seeded quality blocks, quantized as the unsharded
+    Monte Carlo phase samples its design.
+    """
+    counts = np.zeros(len(variables))
+    for size, deltas_constraint, deltas_rhs in block_deltas(
+        spec.seed, 1, first, stop, spec.lb_constraint.shape, quantized=True
+    ):
+        probabilities = monte_carlo(
+            variables,
+            spec.lb_constraint,
+            spec.ub_constraint,
+            spec.lb_rhs.reshape(-1),
+            spec.ub_rhs.reshape(-1),
+            deltas_constraint,
+            deltas_rhs.reshape(size, -1),
+            n_strata=size,
+        )
+        counts += np.rint(probabilities * size)
+    return counts
+
+
+def executor_map(executor: Executor) -> ShardMap:
+    """A :data:`ShardMap` that submits every call to ``executor`` at once."""
+
+    def shard_map(
+        function: Callable[..., Any], calls: Sequence[tuple]
+    ) -> Iterator[Any]:
+        futures = [executor.submit(function, *args) for args in calls]
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            # Cancelled or failed run: free the slots of shards not started.
+            for future in futures:
+                future.cancel()
+
+    return shard_map
+
+
+def serial_map(function: Callable[..., Any], calls: Sequence[tuple]) -> Iterator[Any]:
+    """In-process :data:`ShardMap` (tests, and a reference for the others)."""
+    for args in calls:
+        yield function(*args)
@@ -0,0 +1,175 @@
+"""Parameter sweeps: variants of one interval LP over shared scenarios.
+
+A what-if study solves the same problem many times with a different
+objective, right-hand-side interval or option each time. Run as separate
+jobs, every variant draws its own ``δ`` scenarios, builds and solves every
+scenario LP from scratch and samples its own quality draws, although the
+constraint matrix intervals are the same throughout. A :class:`Sweep` draws
+the scenario design once, at the largest ``number_of_scenarios`` of any
+variant. A variant with fewer uses a prefix of it, which is uniform but not
+stratified: its draws of a cell need not fall one in each of its strata, so
+it loses the variance reduction of a Latin Hypercube of its own. The sweep
+solves scenario-major: each scenario's LP is built once, solved for the
+first variant, then changed in place and re-solved for each next one (:meth:`~sirom.mini_ortools_solver.MiniOrtoolsSolver.resolve`),
+so GLOP starts every variant from the previous variant's optimal basis. Each
+variant then gets its own :class:`~sirom.batch_solver.ProblemsBucket` over the
+shared scenarios for the clustering, cluster tree and quality phases; score
+every variant against one set of quality strata to share those draws too.
+
+A single-variant sweep with the base's seed reproduces the plain run.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+
+from .batch_solver import ProblemsBucket, random_streams, sample_deltas
+from .mini_ortools_solver import MiniOrtoolsSolver, UnscoredSolution
+from .optimization_problem import OptimizationProblem
+from .run_control import RunControl
+from .status_checks import has_errors
+
+
+@dataclass(frozen=True)
+class Variant:
+    """What one point of a sweep changes; ``None`` keeps the base's value."""
+
+    objective: "np.ndarray | list[float] | None" = None
+    lb_rhs: "np.ndarray | list[float] | None" = None
+    ub_rhs: "np.ndarray | list[float] | None" = None
+    number_of_scenarios: "int | None" = None
+    number_of_clusters: "int | None" = None
+
+
+class Sweep:
+    """The variants of one interval LP, solved over one scenario design.
+
+    ``buckets[i]`` is variant ``i``'s bucket over the shared scenarios;
+    ``status`` is the first one's with an error, if any.
+
+    Args:
+        c_value, lb_A_value, ub_A_value, lb_b_value, ub_b_value: The base
+            problem, as for :class:`~sirom.batch_solver.ProblemsBucket`.
+        variants: What each variant changes from the base.
+        number_of_scenarios, number_of_clusters: The base's settings.
+        control: Shared by the scenario solves and every variant's bucket.
+    """
+
+    def __init__(
+        self,
+        c_value,
+        lb_A_value,
+        ub_A_value,
+        lb_b_value,
+        ub_b_value,
+        variants: "list[Variant]",
+        number_of_scenarios: int = 100,
+        number_of_clusters: int = 3,
+        integer_variables: "list[int] | None" = None,
+        solver_selection: "str | None" = None,
+        seed: "int | None" = None,
+        control: "RunControl | None" = None,
+    ):
+        self.objective = np.asarray(c_value, dtype=float).reshape(-1, 1)
+        self.lb_constraint = np.asarray(lb_A_value, dtype=float)
+        self.ub_constraint = np.asarray(ub_A_value, dtype=float)
+        self.lb_rhs = np.asarray(lb_b_value, dtype=float).reshape(-1, 1)
+        self.ub_rhs = np.asarray(ub_b_value, dtype=float).reshape(-1, 1)
+        self.variants = list(variants)
+        self.number_of_scenarios = number_of_scenarios
+        self.number_of_clusters = number_of_clusters
+        self.integer_variables = list(integer_variables or [])
+        self.solver_selection = solver_selection
+        self.seed = seed
+        self.control = control if control is not None else RunControl()
+        # Scenario LPs solved as warm re-solves of the previous variant's.
+        self.warm_starts = 0
+
+        self.scenarios = max(self.__scenarios_of(v) for v in self.variants)
+        n_con, n_var = self.lb_constraint.shape
+        # Same stream order (A, then b) as the bucket's own sampling.
+        stream, _ = random_streams(seed)
+        delta_constraint = sample_deltas(self.scenarios, n_con, n_var, random_state=stream)
+        self.__delta_rhs = sample_deltas(self.scenarios, n_con, 1, random_state=stream)
+        # The matrix intervals are the base's for every variant: one copy.
+        self.scenarios_constraint = (
+            self.lb_constraint[None, :, :]
+            + (self.ub_constraint - self.lb_constraint)[None, :, :] * delta_constraint
+        )
+        self.buckets = [self.__bucket(v) for v in self.variants]
+        self.status: "list[str]" = next(
+            (b.status for b in self.buckets if has_errors(b.status)),
+            self.buckets[0].status,
+        )
+
+    def __scenarios_of(self, variant: Variant) -> int:
+        return variant.number_of_scenarios or self.number_of_scenarios
+
+    def __bucket(self, variant: Variant) -> ProblemsBucket:
+        objective = self.objective if variant.objective is None else variant.objective
+        lower = self.lb_rhs if variant.lb_rhs is None else variant.lb_rhs
+        upper = self.ub_rhs if variant.ub_rhs is None else variant.ub_rhs
+        lower = np.asarray(lower, dtype=float).reshape(-1, 1)
+        upper = np.asarray(upper, dtype=float).reshape(-1, 1)
+        # The bucket validates plain lists, as a caller would pass them.
+        return ProblemsBucket(
+            np.asarray(objective, dtype=float).reshape(-1).tolist(),
+            self.lb_constraint.tolist(),
+            self.ub_constraint.tolist(),
+            lower.reshape(-1).tolist(),
+            upper.reshape(-1).tolist(),
+            number_of_scenarios=self.__scenarios_of(variant),
+            number_of_clusters=variant.number_of_clusters or self.number_of_clusters,
+            integer_variables=self.integer_variables,
+            solver_selection=self.solver_selection,
+            seed=self.seed,
+            control=self.control,
+            scenarios=(
+                self.scenarios_constraint,
+                lower[None, :, :] + (upper - lower)[None, :, :] * self.__delta_rhs,
+            ),
+        )
+
+    def solve(self):
+        """Solve every variant's scenarios, each variant warm from the last.
+
+        Afterwards run each bucket's clustering, cluster tree and quality
+        phases as for a plain run.
+        """
+        objectives = [
+            np.asarray(b.coefficient.objective, dtype=float) for b in self.buckets
+        ]
+        solutions: "list[list[UnscoredSolution]]" = [[] for _ in self.buckets]
+        total = sum(b.number_of_scenarios for b in self.buckets)
+        done = 0
+        self.control.report("scenario_solves", 0, total)
+        for scenario in range(self.scenarios):
+            self.control.checkpoint("scenario_solves")
+            solver: "MiniOrtoolsSolver | None" = None
+            for index, bucket in enumerate(self.buckets):
+                if scenario >= bucket.number_of_scenarios:
+                    continue
+                rhs = np.array(bucket.coefficient.scenarios_rhs[scenario])
+                if solver is None:
+                    solver = MiniOrtoolsSolver(
+                        OptimizationProblem(
+                            objectives[index],
+                            np.matrix(self.scenarios_constraint[scenario]),
+                            rhs,
+                            integer_variables=self.integer_variables,
+                        ),
+                        self.solver_selection,
+                        time_limit_seconds=self.control.remaining(),
+                    )
+                    solutions[index].append(solver.solution)
+                else:
+                    solutions[index].append(
+                        solver.resolve(objective=objectives[index], rhs=rhs)
+                    )
+                    self.warm_starts += 1
+                done += 1
+            self.control.report("scenario_solves", done, total)
+        for bucket, solved in zip(self.buckets, solutions):
+            bucket.record_solutions(solved)
@@ -0,0 +1,295 @@
+"""Warm starts for edited resubmissions of an interval LP.
+
+An analyst's loop is edit-and-resubmit: tighten or widen a few intervals and
+run again. Every scenario would otherwise be drawn and solved from scratch,
+although most of the last run's scenarios may still lie inside the new box.
+A :class:`WarmStartIndex` keeps the last run of each problem *structure*
+(:func:`structure_key`: shape, sparsity pattern and integer set) with its
+scenarios, their solutions and its cluster-tree node solutions. A
+:class:`~sirom.batch_solver.ProblemsBucket` given the index plans its
+scenarios from the prior run's (:func:`plan_scenarios`), solves only those
+that are new, one after another on a live model warm-started from its nearest
+neighbour's basis, and re-solves only the tree nodes whose scenarios changed.
+
+Kept scenarios must still form a uniform sample of the new box. A prior
+scenario that falls inside the new box is uniform on the overlap of the two
+boxes, but not on the new box when it was widened. So the plan stratifies on
+the overlap: the fraction of the new box's volume it covers is filled with
+prior scenarios (fresh draws where there are too few), the rest with fresh
+draws from the new box outside it. The design is no longer a Latin Hypercube,
+but an unbiased sample of the new box all the same. Seeded runs must
+reproduce their draws and never warm-start.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .mini_ortools_solver import UnscoredSolution
+
+# Solve statuses of a solve cut short (FEASIBLE, ABNORMAL, NOT_SOLVED): the
+# scenario is kept but solved again, since this run's budget may differ.
+_CUT_SHORT = (1, 4, 6)
+# Dimensions of the scenario sketch the warm-start chain is ordered on.
+_SKETCH_DIMENSIONS = 16
+
+
+def structure_key(
+    lb_constraint: np.ndarray,
+    ub_constraint: np.ndarray,
+    integer_variables: "list[int]",
+) -> str:
+    """What an edit keeps: the matrix shape, its structural zeros (cells
+    whose interval is ``[0, 0]``) and the integer variables."""
+    lower = np.asarray(lb_constraint, dtype=float)
+    upper = np.asarray(ub_constraint, dtype=float)
+    digest = hashlib.sha1(repr(lower.shape).encode())
+    digest.update(np.packbits((lower != 0) | (upper != 0)).tobytes())
+    digest.update(repr(sorted(integer_variables)).encode())
+    return digest.hexdigest()
+
+
+@dataclass
+class PriorRun:
+    """A finished run, as later edits of it reuse it.
+
+    ``lower``/``upper`` are the interval bounds of every cell, the matrix's
+    flattened and then the right-hand side's. ``nodes`` maps the scenarios of
+    each re-solved cluster-tree node to its solution.
+    """
+
+    objective: np.ndarray  # (n_var,)
+    lower: np.ndarray
+    upper: np.ndarray
+    solver_selection: "str | None"
+    scenarios_constraint: np.ndarray  # (N, n_con, n_var)
+    scenarios_rhs: np.ndarray  # (N, n_con, 1)
+    solutions: "list[UnscoredSolution]"
+    nodes: "dict[frozenset[int], UnscoredSolution]" = field(default_factory=dict)
+
+    @property
+    def nbytes(self) -> int:
+        # The scenario arrays, and about as much again for the solutions.
+        arrays = self.scenarios_constraint.nbytes + self.scenarios_rhs.nbytes
+        n_con, n_var = self.scenarios_constraint.shape[1:]
+        solved = len(self.solutions) + len(self.nodes)
+        return arrays + solved * (n_con + n_var) * 8 * 4
+
+
+@dataclass
+class ScenarioPlan:
+    """A new run's scenarios, and which prior solutions it reuses.
+
+    ``reused[i]`` is the prior scenario that scenario ``i`` is, with a
+    solution to reuse, or ``None`` when scenario ``i`` must be solved.
+    """
+
+    prior: PriorRun
+    scenarios_constraint: np.ndarray
+    scenarios_rhs: np.ndarray
+    reused: "list[int | None]"
+
+    def reused_node(self, scenarios: "list[int]") -> "UnscoredSolution | None":
+        """The prior solution of a tree node over exactly these (reused)
+        scenarios, if the prior run re-solved one."""
+        prior = [self.reused[s] for s in scenarios]
+        if any(p is None for p in prior):
+            return None
+        return self.prior.nodes.get(frozenset(prior))  # type: ignore[arg-type]
+
+
+def cell_bounds(
+    lb_constraint: np.ndarray,
+    ub_constraint: np.ndarray,
+    lb_rhs: np.ndarray,
+    ub_rhs: np.ndarray,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Every cell's bounds as two flat vectors (the matrix's, then ``b``'s)."""
+    lower = np.concatenate(
+        [np.asarray(lb_constraint, dtype=float).ravel(), np.asarray(lb_rhs, dtype=float).ravel()]
+    )
+    upper = np.concatenate(
+        [np.asarray(ub_constraint, dtype=float).ravel(), np.asarray(ub_rhs, dtype=float).ravel()]
+    )
+    return lower, upper
+
+
+def plan_scenarios(
+    prior: PriorRun,
+    lower: np.ndarray,
+    upper: np.ndarray,
+    number_of_scenarios: int,
+    random_state: "np.random.Generator | None" = None,
+) -> "ScenarioPlan | None":
+    """``number_of_scenarios`` uniform scenarios of the box ``[lower, upper]``
+    (flat, as :func:`cell_bounds`), reusing what ``prior`` can give.
+
+    Returns ``None`` when nothing would be reused: the boxes do not overlap,
+    the overlap is too small a share of the new box to hold one scenario,
+    or a cell was fixed (zero width) in one box and not the other.
+    """
+    rng = random_state if random_state is not None else np.random.default_rng()
+    n_con, n_var = prior.scenarios_constraint.shape[1:]
+    overlap_lower = np.maximum(prior.lower, lower)
+    overlap_upper = np.minimum(prior.upper, upper)
+    if np.any(overlap_lower > overlap_upper):
+        return None
+    width = upper - lower
+    overlap = overlap_upper - overlap_lower
+    prior_fixed = prior.upper == prior.lower
+    # Share of each cell's new interval the overlap covers. A fixed cell is
+    # covered only if it was fixed (to the same value) before.
+    ratio = np.where(width > 0, overlap / np.where(width > 0, width, 1.0), prior_fixed)
+    if np.any(ratio <= 0):
+        return None
+    inside = int(round(np.exp(np.sum(np.log(ratio))) * number_of_scenarios))
+    if inside == 0:
+        return None
+
+    cells = np.concatenate(
+        [
+            prior.scenarios_constraint.reshape(len(prior.solutions), -1),
+            prior.scenarios_rhs.reshape(len(prior.solutions), -1),
+        ],
+        axis=1,
+    )
+    accepted = np.flatnonzero(np.all((cells >= lower) & (cells <= upper), axis=1))
+    if not len(accepted):
+        return None
+    # At random: a warm-started run's own scenarios are ordered kept first.
+    kept = np.sort(rng.choice(accepted, size=min(inside, len(accepted)), replace=False))
+    fresh_inside = overlap_lower + overlap * rng.random((inside - len(kept), len(lower)))
+    outside = _outside_overlap(
+        lower, upper, overlap_lower, overlap_upper, ratio,
+        number_of_scenarios - inside, rng,
+    )
+    drawn = np.concatenate([cells[kept], fresh_inside, outside])
+    reused: "list[int | None]" = [
+        None if prior.solutions[p]["solve_status"] in _CUT_SHORT else int(p)
+        for p in kept
+    ]
+    reused += [None] * (number_of_scenarios - len(kept))
+    matrix_cells = n_con * n_var
+    return ScenarioPlan(
+        prior,
+        drawn[:, :matrix_cells].reshape(-1, n_con, n_var),
+        drawn[:, matrix_cells:].reshape(-1, n_con, 1),
+        reused,
+    )
+
+
+def _outside_overlap(
+    lower: np.ndarray,
+    upper: np.ndarray,
+    overlap_lower: np.ndarray,
+    overlap_upper: np.ndarray,
+    ratio: np.ndarray,
+    count: int,
+    rng: np.random.Generator,
+) -> np.ndarray:
+    # Uniform draws of the new box outside the overlap, without rejection:
+    # pick the first edited cell to fall outside its overlap interval (with
+    # the probability it is the first), draw the edited cells before it
+    # inside theirs, it outside, and every other cell anywhere.
+    draws = lower + (upper - lower) * rng.random((count, len(lower)))
+    if not count:
+        return draws
+    # Some cell was edited, or the overlap would be the whole box.
+    edited = np.flatnonzero(ratio < 1)
+    share = ratio[edited]
+    first = np.concatenate([[1.0], np.cumprod(share)[:-1]]) * (1 - share)
+    first_outside = rng.choice(len(edited), size=count, p=first / first.sum())
+    position = np.arange(len(edited))[None, :]
+    below = (overlap_lower - lower)[edited]
+    above = (upper - overlap_upper)[edited]
+    u = rng.random((count, len(edited)))
+    in_overlap = overlap_lower[edited] + (overlap_upper - overlap_lower)[edited] * u
+    gap = u * (below + above)
+    out_of_overlap = np.where(
+        gap < below, lower[edited] + gap, overlap_upper[edited] + gap - below
+    )
+    draws[:, edited] = np.where(
+        position < first_outside[:, None],
+        in_overlap,
+        np.where(position == first_outside[:, None], out_of_overlap, draws[:, edited]),
+    )
+    return draws
+
+
+def chain_order(
+    scenarios_constraint: np.ndarray,
+    scenarios_rhs: np.ndarray,
+    scenarios: "list[int]",
+) -> "list[int]":
+    """``scenarios`` in a nearest-neighbour chain, so each one is solved
+    warm from the basis of one that looks like it.
+
+    Scenarios are compared on a sketch: each row's coefficient sum and
+    right-hand side, projected down to a few dimensions.
+    """
+    if len(scenarios) < 3:
+        return list(scenarios)
+    index = np.asarray(scenarios)
+    sketch = np.concatenate(
+        [
+            scenarios_constraint[index].sum(axis=2),
+            scenarios_rhs[index].reshape(len(index), -1),
+        ],
+        axis=1,
+    )
+    if sketch.shape[1] > _SKETCH_DIMENSIONS:
+        projection = np.random.RandomState(0).standard_normal(
+            (sketch.shape[1], _SKETCH_DIMENSIONS)
+        )
+        sketch = sketch @ projection
+    left = np.ones(len(index), dtype=bool)
+    order = [0]
+    left[0] = False
+    for _ in range(len(index) - 1):
+        distance = np.sum((sketch - sketch[order[-1]]) ** 2, axis=1)
+        distance[~left] = np.inf
+        order.append(int(np.argmin(distance)))
+        left[order[-1]] = False
+    return [int(index[i]) for i in order]
+
+
+class WarmStartIndex:
+    """The last run of each problem structure, least recently used out first.
+
+    Args:
+        max_bytes: Most the kept runs may hold (:attr:`PriorRun.nbytes`); the
+            least recently used go first, and a larger run is not kept.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 2**20):
+        self.max_bytes = max_bytes
+        self._runs: "OrderedDict[str, PriorRun]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._runs)
+
+    def lookup(self, key: str) -> "PriorRun | None":
+        with self._lock:
+            run = self._runs.get(key)
+            if run is not None:
+                self._runs.move_to_end(key)
+            return run
+
+    def clear(self) -> None:
+        with self._lock:
+            self._runs.clear()
+
+    def remember(self, key: str, run: PriorRun) -> None:
+        with self._lock:
+            self._runs.pop(key, None)
+            if run.nbytes > self.max_bytes:
+                return
+            self._runs[key] = run
+            while sum(r.nbytes for r in self._runs.values()) > self.max_bytes:
+                self._runs.popitem(last=False)
@@ -0,0 +1,100 @@
+"""Tests for the cost model and the admission controller."""
+
+import math
+
+import pytest
+
+from sirom.api.admission import (
+    AdmissionController,
+    CostModel,
+    JobTooLarge,
+    QueueFull,
+)
+from sirom.api.examples import EXAMPLE_PROBLEM
+from sirom.api.schemas import SolveRequest, SweepRequest
+
+
+def _payload(**options):
+    return SolveRequest(
+        **{**EXAMPLE_PROBLEM, "options": {**EXAMPLE_PROBLEM["options"], **options}}
+    ).model_dump()
+
+
+def test_cost_grows_with_scenarios_integers_and_quality_draws():
+    model = CostModel()
+    base = model.estimate(_payload(number_of_scenarios=100, quality_scenarios=100))
+    larger = model.estimate(_payload(number_of_scenarios=400, quality_scenarios=100))
+    assert larger.cpu_seconds > 3 * base.cpu_seconds
+    milp = model.estimate(
+        {**_payload(number_of_scenarios=100), "integer_variables": [0]}
+    )
+    assert milp.units["scenario_solves"] > 5 * base.units["scenario_solves"]
+    more_draws = model.estimate(
+        _payload(number_of_scenarios=100, quality_scenarios=1000)
+    )
+    assert more_draws.units["quality_scoring"] == 10 * base.units["quality_scoring"]
+    assert more_draws.memory_bytes > base.memory_bytes
+
+
+def test_sweep_costs_less_than_its_variants_run_alone():
+    model = CostModel()
+    base = _payload(number_of_scenarios=100)
+    sweep = SweepRequest(
+        base=base, variants=[{}, {"quality_scenarios": 400}, {"number_of_scenarios": 50}]
+    ).model_dump()
+    cost = model.estimate(sweep)
+    alone = [
+        model.estimate(_payload(number_of_scenarios=100)),
+        model.estimate(_payload(number_of_scenarios=100, quality_scenarios=400)),
+        model.estimate(_payload(number_of_scenarios=50)),
+    ]
+    assert cost.cpu_seconds < sum(c.cpu_seconds for c in alone)
+    assert cost.units["quality_scoring"] == sum(c.units["quality_scoring"] for c in alone)
+    assert cost.memory_bytes == max(c.memory_bytes for c in alone)
+
+
+def test_model_calibrates_toward_measured_phases():
+    model = CostModel(smoothing=0.5)
+    cost = model.estimate(_payload())
+    before = model.coefficients["scenario_solves"]
+    measured = 10 * before * cost.units["scenario_solves"]
+    model.observe(cost, {"scenario_solves": measured})
+    assert model.coefficients["scenario_solves"] == pytest.approx(5.5 * before)
+    assert model.snapshot()["observations"] == 1
+
+
+def test_controller_refuses_past_capacity_with_retry_after():
+    controller = AdmissionController(workers=2, capacity_seconds=1.0)
+    controller.model.coefficients = dict.fromkeys(controller.model.coefficients, 0.0)
+    controller.model.coefficients["scenario_solves"] = 1e-4
+    payload = _payload(number_of_scenarios=1000)
+    cost = controller.admit("a", payload).cpu_seconds
+    # Costly enough that a second one no longer fits; an idle queue took it.
+    assert cost / 2 > 1.0
+    with pytest.raises(QueueFull) as refused:
+        controller.admit("b", payload)
+    # Two jobs' work over two workers, less the capacity.
+    assert refused.value.retry_after == math.ceil(cost - 1.0)
+    assert controller.snapshot()["queued_jobs"] == 1
+    controller.finished("a")
+    controller.admit("b", payload)
+    # Tracking alone (a queue worker) never refuses.
+    controller.admit("c", payload, enforce=False)
+    assert controller.snapshot()["queued_jobs"] == 2
+
+
+def test_controller_refuses_jobs_too_large_for_memory():
+    controller = AdmissionController(workers=1, max_job_memory_bytes=2**20)
+    with pytest.raises(JobTooLarge, match="MB"):
+        controller.admit("big", _payload())
+    assert controller.snapshot()["queued_jobs"] == 0
+
+
+def test_only_calibrating_jobs_move_the_model():
+    controller = AdmissionController(workers=1)
+    controller.admit("sharded", _payload(), calibrate=False)
+    controller.observe("sharded", {"scenario_solves": 100.0})
+    assert controller.model.observations == 0
+    controller.admit("plain", _payload())
+    controller.observe("plain", {"scenario_solves": 0.1})
+    assert controller.model.observations == 1
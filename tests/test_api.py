@@ -4,7 +4,12 @@ Runs jobs with the synchronous ``inline`` executor so a POST is finished by the
 time the test polls for it, and uses tiny scenario counts to stay fast.
 """
 
+import json
 import os
+import subprocess
+import sys
+import threading
+import time
 
 # Must be set before the app's lifespan builds the JobManager.
 os.environ["SIROM_EXECUTOR"] = "inline"
@@ -12,8 +17,11 @@ os.environ["SIROM_EXECUTOR"] = "inline"
 import pytest
 from fastapi.testclient import TestClient
 
-from sirom.api.app import app
+from sirom.api import jobs as jobs_module
+from sirom.api.app import _job_json, app
 from sirom.api.examples import EXAMPLE_PROBLEM
+from sirom.api.jobs import InMemoryJobStore, JobManager
+from sirom.api.schemas import JobStatusResponse, SolveResponse, SweepResponse
 
 # A fast, known-good problem (small scenario counts).
 GOOD_PROBLEM = {
@@ -38,6 +46,28 @@ def _solve(client, body):
     return polled.json()
 
 
+def _wait_finished(client, job_id):
+    """Long-poll a job until it is no longer pending or running."""
+    deadline = time.monotonic() + 10
+    while True:
+        record = client.get(f"/jobs/{job_id}", params={"wait": 5}).json()
+        if record["status"] not in ("pending", "running"):
+            return record
+        assert time.monotonic() < deadline, record
+
+
+def test_importing_the_app_defers_the_solver_stack():
+    # A cold start's health check must not wait for the scientific stack.
+    heavy = ("pandas", "sklearn", "scipy", "smt", "ortools", "threadpoolctl")
+    probe = "import sys, sirom.api.app; print([m for m in {!r} if m in sys.modules])"
+    imported = subprocess.run(
+        [sys.executable, "-c", probe.format(heavy)],
+        capture_output=True, text=True, check=True,
+        env={**os.environ, "PYTHONPATH": os.getcwd()},
+    ).stdout.strip()
+    assert imported == "[]"
+
+
 def test_health(client):
     resp = client.get("/health")
     assert resp.status_code == 200
@@ -137,3 +167,312 @@ def test_infeasible_problem_does_not_crash(client):
         assert job["errors"]
     else:
         assert job["result"]["solutions"] == []
+
+
+def test_importance_scoring_reports_effective_sample_size(client):
+    body = {**GOOD_PROBLEM, "options": {**GOOD_PROBLEM["options"], "scoring": "importance"}}
+    job = _solve(client, body)
+    assert job["status"] == "succeeded", job
+    for sol in job["result"]["solutions"]:
+        assert 0.0 <= sol["feasibility_probability"] <= 1.0
+        assert 0.0 < sol["effective_sample_size"] <= 6
+
+
+def test_unknown_scoring_method_returns_422(client):
+    bad = {**GOOD_PROBLEM, "options": {**GOOD_PROBLEM["options"], "scoring": "bogus"}}
+    assert client.post("/solve", json=bad).status_code == 422
+
+
+def test_frontier_reports_occurrences(client):
+    job = _solve(client, GOOD_PROBLEM)
+    assert all(sol["occurrences"] >= 1 for sol in job["result"]["solutions"])
+
+
+def test_identical_problem_returns_cached_job(client):
+    first = client.post("/solve", json=GOOD_PROBLEM).json()
+    again = client.post("/solve", json=GOOD_PROBLEM).json()
+    assert again["job_id"] == first["job_id"]
+    assert again["status"] == "succeeded"
+
+
+def test_idempotency_key_header(client):
+    headers = {"Idempotency-Key": "order-42"}
+    first = client.post("/solve", json=GOOD_PROBLEM, headers=headers)
+    again = client.post("/solve", json=GOOD_PROBLEM, headers=headers)
+    assert again.json()["job_id"] == first.json()["job_id"]
+    other = {**GOOD_PROBLEM, "objective": [v + 1 for v in GOOD_PROBLEM["objective"]]}
+    conflict = client.post("/solve", json=other, headers=headers)
+    assert conflict.status_code == 422
+    assert "Idempotency-Key" in conflict.json()["detail"]
+
+
+def test_delete_job(client):
+    assert client.delete("/jobs/does-not-exist").status_code == 404
+    job_id = client.post("/solve", json=GOOD_PROBLEM).json()["job_id"]
+    # Inline jobs are finished already: cancelling is a no-op.
+    done = client.delete(f"/jobs/{job_id}")
+    assert done.status_code == 200
+    assert done.json()["status"] == "succeeded"
+
+
+def test_deadline_reports_truncated_phases(client):
+    body = {
+        **GOOD_PROBLEM,
+        "options": {**GOOD_PROBLEM["options"], "number_of_scenarios": 60,
+                    "deadline_seconds": 1e-6},
+    }
+    job = _solve(client, body)
+    assert job["status"] == "succeeded"
+    summary = job["result"]["summary"]
+    assert summary["scenarios_solved"] < 60
+    assert "scenario_solves" in summary["truncated_phases"]
+    assert any("deadline" in w for w in job["result"]["warnings"])
+    assert job["result"]["solutions"]
+
+
+def test_job_reports_progress(client):
+    job = _solve(client, GOOD_PROBLEM)
+    progress = job["progress"]
+    assert progress["phase"] == "quality_scoring"
+    assert progress["phases"]["scenario_solves"]["total"] == 6
+    assert all(p["eta_seconds"] == 0.0 for p in progress["phases"].values())
+
+
+def _events(text):
+    """Parse a server-sent event stream into (event, data) pairs."""
+    parsed = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines()
+                     if not line.startswith(":"))
+        parsed.append((lines["event"], json.loads(lines["data"])))
+    return parsed
+
+
+def test_events_of_a_finished_job(client):
+    assert client.get("/jobs/nope/events").status_code == 404
+    job_id = client.post("/solve", json=GOOD_PROBLEM).json()["job_id"]
+    response = client.get(f"/jobs/{job_id}/events")
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _events(response.text)
+    assert events[0] == ("status", {"job_id": job_id, "status": "succeeded"})
+    assert events[-1][0] == "result"
+    assert events[-1][1] == client.get(f"/jobs/{job_id}").json()
+
+
+@pytest.fixture
+def held_client(client, monkeypatch):
+    """A client whose solves run on a thread and wait for the returned gate."""
+    gate = threading.Event()
+    real = jobs_module.run_solve_job
+
+    def held(payload, *args):
+        gate.wait(30)
+        return real(payload, *args)
+
+    monkeypatch.setattr(jobs_module, "run_solve_job", held)
+    client.app.state.jobs.shutdown()
+    client.app.state.jobs = JobManager(executor_mode="thread", store=InMemoryJobStore())
+    yield client, gate
+    gate.set()
+    # Held jobs finish here, not during the next test (they would leave it a
+    # run to warm-start from).
+    client.app.state.jobs._executor.shutdown(wait=True)
+
+
+def test_events_stream_a_running_job(held_client):
+    client, gate = held_client
+    body = {**GOOD_PROBLEM, "options": {**GOOD_PROBLEM["options"], "scoring": "importance"}}
+    job_id = client.post("/solve", json=body).json()["job_id"]
+    threading.Timer(0.2, gate.set).start()
+    events = _events(client.get(f"/jobs/{job_id}/events").text)
+    statuses = [data["status"] for name, data in events if name == "status"]
+    # Held in its worker thread, the job is running by the time we subscribe.
+    assert statuses == ["running", "succeeded"]
+    assert any(name == "progress" for name, _ in events)
+    # The last partial frontier is the final one.
+    frontier = [data for name, data in events if name == "frontier"][-1]
+    assert frontier["solutions"] == events[-1][1]["result"]["solutions"]
+
+
+def test_finished_job_etag_and_304(client):
+    job_id = client.post("/solve", json=GOOD_PROBLEM).json()["job_id"]
+    first = client.get(f"/jobs/{job_id}")
+    etag = first.headers["etag"]
+    again = client.get(f"/jobs/{job_id}", headers={"If-None-Match": etag})
+    assert again.status_code == 304 and again.content == b""
+    assert again.headers["etag"] == etag
+
+    # A finished job's body is served without touching the store again.
+    def unreachable(_job_id):
+        raise AssertionError("store read for a finished job")
+
+    client.app.state.jobs.get = unreachable
+    assert client.get(f"/jobs/{job_id}").json() == first.json()
+
+
+def test_long_poll_returns_on_the_transition(held_client):
+    client, gate = held_client
+    job_id = client.post("/solve", json=GOOD_PROBLEM).json()["job_id"]
+    threading.Timer(0.2, gate.set).start()
+    started = time.monotonic()
+    polled = client.get(f"/jobs/{job_id}", params={"wait": 10})
+    assert polled.json()["status"] == "succeeded"
+    assert time.monotonic() - started < 5
+
+
+def test_long_poll_times_out_unchanged(held_client):
+    client, _ = held_client
+    job_id = client.post("/solve", json=GOOD_PROBLEM).json()["job_id"]
+    etag = client.get(f"/jobs/{job_id}").headers["etag"]
+    started = time.monotonic()
+    polled = client.get(
+        f"/jobs/{job_id}", params={"wait": 0.2}, headers={"If-None-Match": etag}
+    )
+    assert polled.status_code == 304
+    assert time.monotonic() - started >= 0.2
+    assert client.get(f"/jobs/{job_id}", params={"wait": 60}).status_code == 422
+
+
+def test_callback_url_must_be_http(client):
+    body = {**GOOD_PROBLEM, "callback_url": "ftp://example.com/hook"}
+    assert client.post("/solve", json=body).status_code == 422
+
+
+def test_callback_url_must_not_reach_private_addresses(client):
+    body = {**GOOD_PROBLEM, "callback_url": "http://169.254.169.254/latest"}
+    response = client.post("/solve", json=body)
+    assert response.status_code == 422
+    assert "169.254.169.254" in response.json()["detail"]
+
+
+def test_full_queue_answers_429_with_retry_after(held_client):
+    client, gate = held_client
+    admission = client.app.state.jobs.admission
+    admission.capacity_seconds = 1e-9
+    first = client.post("/solve", json=GOOD_PROBLEM)
+    assert first.status_code == 202
+    other = {**GOOD_PROBLEM, "options": {**GOOD_PROBLEM["options"], "seed": 5}}
+    refused = client.post("/solve", json=other)
+    assert refused.status_code == 429
+    assert int(refused.headers["Retry-After"]) >= 1
+    # Joining the queued identical job costs nothing and is accepted.
+    assert client.post("/solve", json=GOOD_PROBLEM).status_code == 202
+    limits = client.get("/limits").json()
+    assert limits["queued_jobs"] == 1 and limits["queue_cpu_seconds"] > 0
+    assert "seconds_per_unit" in limits["cost_model"]
+    gate.set()
+    job_id = first.json()["job_id"]
+    polled = client.get(f"/jobs/{job_id}", params={"wait": 10}).json()
+    assert polled["status"] == "succeeded"
+    assert client.get("/limits").json()["queued_jobs"] == 0
+    assert client.app.state.jobs.admission.model.observations == 1
+
+
+def test_job_record_reports_client_class_and_queue_wait(held_client):
+    client, gate = held_client
+    first = client.post("/solve", json=GOOD_PROBLEM, headers={"X-API-Key": "secret"})
+    job_id = first.json()["job_id"]
+    schedule = client.get(f"/jobs/{job_id}").json()["schedule"]
+    assert schedule["client"].startswith("key:") and "secret" not in schedule["client"]
+    assert schedule["priority"] == "interactive"
+    other = {**GOOD_PROBLEM, "options": {**GOOD_PROBLEM["options"], "seed": 5}}
+    forwarded = client.post(
+        "/solve", json=other, headers={"X-Forwarded-For": "1.2.3.4, 10.0.0.9"}
+    ).json()["job_id"]
+    gate.set()
+    # Queued behind the first job: it runs before it succeeds.
+    polled = _wait_finished(client, forwarded)
+    assert polled["status"] == "succeeded"
+    assert polled["schedule"]["client"] == "ip:10.0.0.9"
+    assert polled["schedule"]["wait_seconds"] >= 0
+    assert "scheduler" in client.get("/limits").json()
+
+
+def test_batch_submission_and_bulk_status(client):
+    other = {**GOOD_PROBLEM, "options": {**GOOD_PROBLEM["options"], "seed": 7}}
+    created = client.post("/solve/batch", json={"problems": [GOOD_PROBLEM, other, GOOD_PROBLEM]})
+    assert created.status_code == 202, created.text
+    jobs = created.json()["jobs"]
+    assert jobs[0]["job_id"] == jobs[2]["job_id"] != jobs[1]["job_id"]
+    assert all(job["result_url"].endswith(job["job_id"]) for job in jobs)
+    ids = [jobs[0]["job_id"], jobs[1]["job_id"], "missing"]
+    polled = client.post("/jobs/status", json={"job_ids": ids}).json()
+    assert [job["status"] for job in polled["jobs"]] == ["succeeded", "succeeded"]
+    assert all("result" not in job for job in polled["jobs"])
+    assert polled["unknown"] == ["missing"]
+    assert client.post("/solve/batch", json={"problems": []}).status_code == 422
+
+
+def test_sweep_returns_a_frontier_per_variant(client):
+    base = {**GOOD_PROBLEM, "options": {**GOOD_PROBLEM["options"], "seed": 4}}
+    sweep = {
+        "base": base,
+        "variants": [
+            {"label": "base"},
+            {"label": "cheaper", "objective": [v * 0.5 for v in base["objective"]]},
+            {"label": "tighter", "ub_b": base["lb_b"], "quality_scenarios": 12},
+        ],
+    }
+    created = client.post("/sweep", json=sweep)
+    assert created.status_code == 202, created.text
+    record = client.get(created.json()["result_url"]).json()
+    assert record["status"] == "succeeded", record
+    result = record["result"]
+    assert [v["label"] for v in result["variants"]] == ["base", "cheaper", "tighter"]
+    assert all(v["solutions"] for v in result["variants"])
+    assert result["summary"]["scenario_solves"] == 18
+    assert result["summary"]["warm_starts"] == 12
+    # Its first variant is the base problem solved alone.
+    alone = _solve(client, base)["result"]
+    assert [s["variables"] for s in result["variants"][0]["solutions"]] == [
+        s["variables"] for s in alone["solutions"]
+    ]
+
+    bad = {**sweep, "variants": [{"lb_b": [1e9] * len(base["lb_b"])}]}
+    assert client.post("/sweep", json=bad).status_code == 422
+
+
+def test_edited_resubmission_reuses_the_last_runs_scenarios(client):
+    first = _solve(client, GOOD_PROBLEM)
+    assert first["result"]["summary"]["reused_scenarios"] == 0
+    # One interval widened by half: two thirds of the new box is the old one.
+    edited = {**GOOD_PROBLEM, "ub_b": [17, 0, 3, 0, 0]}
+    summary = _solve(client, edited)["result"]["summary"]
+    assert summary["reused_scenarios"] == 4 and summary["scenarios_solved"] == 6
+    cold = {**edited, "options": {**GOOD_PROBLEM["options"], "warm_start": False}}
+    assert _solve(client, cold)["result"]["summary"]["reused_scenarios"] == 0
+
+
+def test_job_body_splices_the_result_as_validation_would_dump_it(client):
+    sweep = {"base": GOOD_PROBLEM, "variants": [{"label": "a"}, {}]}
+    for path, body in (("/solve", GOOD_PROBLEM), ("/sweep", sweep)):
+        job_id = client.post(path, json=body).json()["job_id"]
+        record = client.app.state.jobs.get(job_id)
+        served = client.get(f"/jobs/{job_id}").json()
+        result = record["result"].as_dict()
+        model = SweepResponse if path == "/sweep" else SolveResponse
+        assert served == JobStatusResponse(
+            job_id=job_id,
+            status=record["status"],
+            result=model(**result),
+            progress=record["progress"],
+            schedule=record["schedule"],
+        ).model_dump(mode="json", exclude_none=True)
+        # A result recorded as a plain dict is validated as before.
+        assert json.loads(_job_json(job_id, {**record, "result": result})) == served
+
+
+def test_rescore_reuses_a_finished_jobs_candidates(client):
+    job_id = client.post("/solve", json=GOOD_PROBLEM).json()["job_id"]
+    bounds = {key: GOOD_PROBLEM[key] for key in ("lb_A", "ub_A", "lb_b", "ub_b")}
+    rescored = client.post(f"/jobs/{job_id}/rescore", json=bounds)
+    assert rescored.status_code == 200, rescored.text
+    assert rescored.json()["solutions"]
+    narrower = [row[:-1] for row in bounds["lb_A"]]
+    wrong_shape = {**bounds, "lb_A": narrower, "ub_A": [row[:-1] for row in bounds["ub_A"]]}
+    assert client.post(f"/jobs/{job_id}/rescore", json=wrong_shape).status_code == 422
+    assert client.post("/jobs/missing/rescore", json=bounds).status_code == 404
+    sweep = client.post(
+        "/sweep", json={"base": GOOD_PROBLEM, "variants": [{}]}
+    ).json()["job_id"]
+    assert client.post(f"/jobs/{sweep}/rescore", json=bounds).status_code == 409
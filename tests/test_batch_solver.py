@@ -1,5 +1,6 @@
+import numpy as np
 import pytest
-from sirom.batch_solver import ProblemsBucket
+from sirom.batch_solver import ProblemsBucket, random_streams, sample_deltas
 
 number_of_scenarios = 10
 
@@ -189,3 +190,117 @@ def test_cluster_and_selection_builds_tree():
     bucket.cluster_and_selection()
     assert bucket.cluster_tree is not None
     assert len(bucket.cluster_tree.get_all_nodes()) >= 1
+
+
+def test_batch_solver_quality_measure_importance_sampling():
+    opt_problem_batch = ProblemsBucket(
+        c_value, lb_A_value, ub_A_value, lb_b_value, ub_b_value, number_of_scenarios
+    )
+    opt_problem_batch.results = [
+        {"solve_status": 0, "variable": [0.0, 0.0]},
+        {"solve_status": 0, "variable": [1000.0, 1000.0]},
+        {"solve_status": 2},
+    ]
+    opt_problem_batch.apply_quality_measure(number_of_scenarios=20, method="importance")
+    assert opt_problem_batch.results[0]["feasibility_probability"] == 1.0
+    assert opt_problem_batch.results[1]["feasibility_probability"] == 0.0
+    assert opt_problem_batch.results[2]["feasibility_probability"] == 0.0
+    assert 0.0 < opt_problem_batch.results[0]["effective_sample_size"] <= 20
+
+
+def test_batch_solver_quality_measure_unknown_method():
+    opt_problem_batch = ProblemsBucket(
+        c_value, lb_A_value, ub_A_value, lb_b_value, ub_b_value, number_of_scenarios
+    )
+    opt_problem_batch.apply_quality_measure(number_of_scenarios=5, method="bogus")
+    assert "[ERROR] Unknown scoring method bogus" in opt_problem_batch.status
+
+
+def test_batch_solver_quality_measure_control_variate():
+    opt_problem_batch = ProblemsBucket(
+        c_value, lb_A_value, ub_A_value, lb_b_value, ub_b_value, number_of_scenarios
+    )
+    opt_problem_batch.results = [
+        {"solve_status": 0, "variable": [0.0, 0.0]},
+        {"solve_status": 0, "variable": [0.8, 0.8]},
+    ]
+    opt_problem_batch.apply_quality_measure(
+        number_of_scenarios=20, method="control_variate"
+    )
+    assert opt_problem_batch.results[0]["feasibility_probability"] == 1.0
+    assert 0.0 <= opt_problem_batch.results[1]["feasibility_probability"] <= 1.0
+    assert opt_problem_batch.results[1]["variance_reduction"] >= 0.0
+
+
+def test_batch_solver_quality_measure_interns_duplicate_vectors():
+    # Vectors equal up to float noise share one slot and one score.
+    opt_problem_batch = ProblemsBucket(
+        c_value, lb_A_value, ub_A_value, lb_b_value, ub_b_value, number_of_scenarios
+    )
+    opt_problem_batch.results = [
+        {"solve_status": 0, "variable": [0.5, 0.5]},
+        {"solve_status": 2},
+        {"solve_status": 0, "variable": [0.5 + 1e-12, 0.5]},
+        {"solve_status": 0, "variable": [1.0, 0.0]},
+    ]
+    opt_problem_batch.apply_quality_measure(number_of_scenarios=10)
+    results = opt_problem_batch.results
+    assert opt_problem_batch.decision_counts == [2, 1]
+    assert opt_problem_batch.result_slots == [0, -1, 0, 1]
+    assert (
+        results[0]["feasibility_probability"] == results[2]["feasibility_probability"]
+    )
+    assert results[0]["occurrences"] == 2
+    assert results[3]["occurrences"] == 1
+    assert [r["variable"] for r in opt_problem_batch.unique_results()] == [
+        [0.5, 0.5],
+        [1.0, 0.0],
+    ]
+
+
+def test_batch_solver_pipeline_interns_as_it_solves():
+    bucket = ProblemsBucket(
+        c_value, lb_A_value, ub_A_value, lb_b_value, ub_b_value, number_of_scenarios
+    )
+    bucket.solve()
+    bucket.cluster_and_selection()
+    bucket.solve_cluster_tree()
+    optimal = [r for r in bucket.results if r["solve_status"] == 0]
+    assert sum(bucket.decision_counts) == len(optimal)
+    assert len(bucket.result_slots) == len(bucket.results)
+
+
+def test_batch_solver_reassigned_results_are_interned_afresh():
+    # The solve interned its own results; a new list of at least that length
+    # must not inherit their slots.
+    bucket = ProblemsBucket(
+        c_value, lb_A_value, ub_A_value, lb_b_value, ub_b_value, number_of_scenarios
+    )
+    bucket.solve()
+    solved = len(bucket.results)
+    bucket.results = [{"solve_status": 0, "variable": [1000.0, 1000.0]}] + [
+        {"solve_status": 0, "variable": [0.0, 0.0]}
+    ] * solved
+    bucket.apply_quality_measure(number_of_scenarios=10)
+    assert bucket.decision_counts == [1, solved]
+    assert bucket.result_slots == [0] + [1] * solved
+    assert bucket.results[0]["feasibility_probability"] == 0.0
+    assert bucket.results[-1]["occurrences"] == solved
+    assert [r["variable"] for r in bucket.unique_results()] == [
+        [1000.0, 1000.0],
+        [0.0, 0.0],
+    ]
+
+
+def test_sample_deltas_lays_out_one_design_row_per_scenario():
+    from smt.sampling_methods import LHS
+
+    deltas = sample_deltas(12, 3, 2, random_state=random_streams(4)[0])
+    design = LHS(xlimits=np.array([[0.0, 1.0]] * 6), random_state=random_streams(4)[0])
+    np.testing.assert_array_equal(deltas, design(12).reshape(12, 3, 2))
+    # Each cell takes every one of the 12 strata once across the scenarios.
+    strata = sample_deltas(12, 3, 2, True, random_streams(4)[0])
+    np.testing.assert_array_equal(
+        np.sort(strata, axis=0),
+        np.broadcast_to(np.arange(12)[:, None, None], (12, 3, 2)),
+    )
@@ -5,18 +5,32 @@ server is required.
 """
 
 import os
+import pickle
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import fakeredis
+import numpy as np
 import pytest
 
+from sirom.api import jobs as jobs_module
+from sirom.api.errors import SolveError
 from sirom.api.examples import EXAMPLE_PROBLEM
 from sirom.api.jobs import (
+    IdempotencyConflict,
     InMemoryJobStore,
     JobManager,
     RedisJobStore,
     build_store_from_env,
+    payload_fingerprint,
 )
+from sirom.api.pool import ResourceLimitExceeded, WorkerLimits, WorkerPool
+from sirom.api.results import PackedResult
 from sirom.api.schemas import SolveRequest
+from sirom.api.service import run_solve_job
+from sirom.api.work_queue import RedisWorkQueue
+from sirom.sharding import serial_map
 
 # Small, fast, valid payload (as POSTed and dumped through the schema).
 PAYLOAD = SolveRequest(
@@ -95,6 +109,207 @@ def test_manager_unknown_job(manager):
     assert manager.get("missing") is None
 
 
+def test_store_aliases(store):
+    assert store.get_alias("result:x") is None
+    assert store.set_alias("result:x", "job1")
+    assert not store.set_alias("result:x", "job2", only_if_absent=True)
+    assert store.get_alias("result:x") == "job1"
+    assert store.set_alias("result:x", "job2")
+    assert store.get_alias("result:x") == "job2"
+
+
+def test_fingerprint_is_canonical():
+    reordered = dict(reversed(list(PAYLOAD.items())))
+    assert payload_fingerprint(reordered) == payload_fingerprint(PAYLOAD)
+    seeded = {**PAYLOAD, "options": {**PAYLOAD["options"], "seed": 1}}
+    assert payload_fingerprint(seeded) != payload_fingerprint(PAYLOAD)
+
+
+def test_manager_serves_identical_payloads_from_cache(manager):
+    first = manager.submit(PAYLOAD)
+    assert manager.submit(dict(PAYLOAD)) == first
+    seeded = {**PAYLOAD, "options": {**PAYLOAD["options"], "seed": 1}}
+    assert manager.submit(seeded) != first
+
+
+def test_manager_does_not_cache_failures(manager):
+    bad = {**PAYLOAD, "options": {**PAYLOAD["options"], "solver": "NOPE"}}
+    first = manager.submit(bad)
+    assert manager.get(first)["status"] == "failed"
+    assert manager.submit(bad) != first
+
+
+def test_manager_idempotency_key(manager):
+    bad = {**PAYLOAD, "options": {**PAYLOAD["options"], "solver": "NOPE"}}
+    first = manager.submit(bad, idempotency_key="retry-1")
+    # Retries return the same job even though it failed (no re-run).
+    assert manager.submit(bad, idempotency_key="retry-1") == first
+    with pytest.raises(IdempotencyConflict):
+        manager.submit(PAYLOAD, idempotency_key="retry-1")
+
+
+def test_store_alias_delete_is_conditional(store):
+    store.set_alias("inflight:x", "job1")
+    store.delete_alias("inflight:x", "job2")
+    assert store.get_alias("inflight:x") == "job1"
+    store.delete_alias("inflight:x", "job1")
+    assert store.get_alias("inflight:x") is None
+
+
+@pytest.fixture
+def held_solves(monkeypatch):
+    """Make solves block until the test releases them; counts real runs."""
+    gate, runs = threading.Event(), []
+    real = jobs_module.run_solve_job
+
+    def held(payload, *args):
+        runs.append(payload)
+        gate.wait(30)
+        return real(payload, *args)
+
+    monkeypatch.setattr(jobs_module, "run_solve_job", held)
+    yield gate, runs
+    gate.set()
+
+
+def _wait_done(manager, job_id):
+    deadline = time.monotonic() + 30
+    while manager.get(job_id)["status"] not in ("succeeded", "failed", "cancelled"):
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def test_concurrent_identical_submissions_share_one_job(held_solves):
+    gate, runs = held_solves
+    manager = JobManager(executor_mode="thread", store=InMemoryJobStore())
+    with ThreadPoolExecutor(max_workers=8) as clients:
+        ids = set(clients.map(lambda _: manager.submit(PAYLOAD), range(8)))
+    assert len(ids) == 1 and len(runs) == 1
+    gate.set()
+    (job_id,) = ids
+    _wait_done(manager, job_id)
+    # The lease is gone once the outcome is recorded; the cache takes over.
+    assert manager.submit(PAYLOAD) == job_id and len(runs) == 1
+    manager.shutdown()
+
+
+def test_redis_lease_coalesces_across_workers(held_solves):
+    gate, runs = held_solves
+    server = fakeredis.FakeServer()
+    workers = [
+        JobManager(
+            executor_mode="thread",
+            store=RedisJobStore(
+                client=fakeredis.FakeStrictRedis(server=server, decode_responses=True)
+            ),
+        )
+        for _ in range(2)
+    ]
+    job_id = workers[0].submit(PAYLOAD)
+    assert workers[1].submit(PAYLOAD) == job_id
+    assert len(runs) == 1
+    gate.set()
+    _wait_done(workers[0], job_id)
+    for worker in workers:
+        worker.shutdown()
+
+
+def test_failed_job_releases_its_lease(manager):
+    bad = {**PAYLOAD, "options": {**PAYLOAD["options"], "solver": "NOPE"}}
+    first = manager.submit(bad)
+    assert manager._store.get_alias(f"inflight:{payload_fingerprint(bad)}") is None
+    assert manager.submit(bad) != first
+
+
+def test_cancel_running_job_stops_at_next_checkpoint(held_solves):
+    gate, runs = held_solves
+    manager = JobManager(executor_mode="thread", store=InMemoryJobStore())
+    job_id = manager.submit(PAYLOAD)
+    while not runs:
+        time.sleep(0.01)
+    assert manager.cancel(job_id) == "running"
+    gate.set()
+    _wait_done(manager, job_id)
+    record = manager.get(job_id)
+    assert record["status"] == "cancelled"
+    assert record["errors"] == ["The job was cancelled."]
+    # A cancelled job is neither cached nor joined.
+    assert manager.submit(PAYLOAD) != job_id
+    manager.shutdown()
+
+
+def test_cancel_queued_job_frees_it_before_it_starts(held_solves):
+    gate, runs = held_solves
+    manager = JobManager(
+        executor_mode="thread", store=InMemoryJobStore(), max_workers=1
+    )
+    running = manager.submit(PAYLOAD)
+    queued = manager.submit({**PAYLOAD, "objective": [-2.0, -1.0]})
+    assert manager.cancel(queued) == "cancelled"
+    gate.set()
+    _wait_done(manager, running)
+    assert manager.get(running)["status"] == "succeeded"
+    assert len(runs) == 1
+    manager.shutdown()
+
+
+def test_job_waiting_for_a_slot_reports_the_wait(held_solves):
+    gate, runs = held_solves
+    manager = JobManager(
+        executor_mode="thread", store=InMemoryJobStore(), max_workers=1
+    )
+    running = manager.submit(PAYLOAD, client="ip:1.1.1.1")
+    queued = manager.submit({**PAYLOAD, "objective": [-2.0, -1.0]}, client="ip:2.2.2.2")
+    schedule = manager.get(queued)["schedule"]
+    assert schedule["client"] == "ip:2.2.2.2" and "wait_seconds" not in schedule
+    assert manager.limits()["scheduler"]["waiting_by_client"] == {"ip:2.2.2.2": 1}
+    time.sleep(0.1)
+    gate.set()
+    _wait_done(manager, queued)
+    assert manager.get(running)["schedule"]["wait_seconds"] < 0.1
+    assert manager.get(queued)["schedule"]["wait_seconds"] >= 0.1
+    manager.shutdown()
+
+
+def test_cancel_finished_or_unknown_job(manager):
+    job_id = manager.submit(PAYLOAD)
+    assert manager.cancel(job_id) == "succeeded"
+    assert manager.cancel("missing") is None
+
+
+def test_redis_cancel_reaches_the_running_worker(held_solves, monkeypatch):
+    monkeypatch.setenv("SIROM_CANCEL_POLL_MS", "10")
+    gate, runs = held_solves
+    server = fakeredis.FakeServer()
+    workers = [
+        JobManager(
+            executor_mode="thread",
+            store=RedisJobStore(
+                client=fakeredis.FakeStrictRedis(server=server, decode_responses=True)
+            ),
+        )
+        for _ in range(2)
+    ]
+    job_id = workers[0].submit(PAYLOAD)
+    workers[1].cancel(job_id)
+    time.sleep(0.1)  # let the owner's watcher see the shared flag
+    gate.set()
+    _wait_done(workers[0], job_id)
+    assert workers[1].get(job_id)["status"] == "cancelled"
+    for worker in workers:
+        worker.shutdown()
+
+
+def test_time_limit_fails_with_phase(manager):
+    slow = {
+        **PAYLOAD,
+        "options": {**PAYLOAD["options"], "time_limit_seconds": 1e-9},
+    }
+    record = manager.get(manager.submit(slow))
+    assert record["status"] == "failed"
+    assert "time limit" in record["errors"][0]
+
+
 def test_build_store_from_env(monkeypatch):
     monkeypatch.delenv("SIROM_JOB_STORE", raising=False)
     assert isinstance(build_store_from_env(), InMemoryJobStore)
@@ -106,3 +321,369 @@ def test_build_store_from_env(monkeypatch):
     monkeypatch.setenv("SIROM_JOB_STORE", "bogus")
     with pytest.raises(ValueError):
         build_store_from_env()
+
+
+def test_store_progress_is_kept_apart_from_the_outcome(store):
+    store.create("job")
+    assert store.fetch("job")["progress"] is None
+    store.record_success("job", {"solutions": []})
+    # A snapshot that arrives late never overwrites the outcome.
+    store.record_progress("job", {"phase": "quality_scoring"})
+    record = store.fetch("job")
+    assert record["status"] == "succeeded"
+    assert record["progress"] == {"phase": "quality_scoring"}
+
+
+def test_results_cross_over_packed_and_are_encoded_once(store):
+    packed = run_solve_job(PAYLOAD)
+    assert isinstance(packed, PackedResult)
+    frontier = packed.frontiers[0]
+    assert frontier.dtype == np.float64
+    assert frontier.shape == (len(packed["solutions"]), len(PAYLOAD["objective"]))
+    # The decision vectors travel as arrays, and come back in place.
+    received = pickle.loads(pickle.dumps(packed))
+    assert received == packed and received["solutions"][0]["variables"] == (
+        frontier[0].tolist()
+    )
+    assert isinstance(received.candidates["variables"], np.ndarray)
+    assert received.json() is received.json()
+
+    store.create("job")
+    store.record_success("job", received)
+    stored = store.fetch("job")["result"]
+    assert stored == packed and stored.json() == received.json()
+    assert store.fetch_many(["job"])[0]["result"]["summary"] == packed["summary"]
+
+
+def test_manager_keeps_candidates_apart_and_rescores_them(manager):
+    seeded = {**PAYLOAD, "options": {**PAYLOAD["options"], "seed": 9}}
+    job_id = manager.submit(seeded)
+    record = manager.get(job_id)
+    assert "candidates" not in record["result"]
+    bounds = {key: seeded[key] for key in ("lb_A", "ub_A", "lb_b", "ub_b")}
+    # Same bounds, same seeded draws: the job's own frontier.
+    same = manager.rescore(job_id, bounds)
+    assert same["solutions"] == record["result"]["solutions"]
+    assert same["summary"]["scenarios_solved"] == 6
+    assert same["summary"]["phase_seconds"].keys() == {"quality_scoring"}
+    # Wider intervals can only make the same candidates less robust.
+    wider = manager.rescore(
+        job_id, {**bounds, "lb_b": [v - 1.0 for v in bounds["lb_b"]]}
+    )
+    assert wider["summary"]["best_feasibility"] <= same["summary"]["best_feasibility"]
+    assert manager.rescore("missing", bounds) is None
+    failed = manager.submit(
+        {**PAYLOAD, "options": {**PAYLOAD["options"], "solver": "NOPE"}}
+    )
+    with pytest.raises(jobs_module.RescoreUnavailable):
+        manager.rescore(failed, bounds)
+
+
+@pytest.mark.parametrize("mode", ["thread", "process"])
+def test_manager_records_progress_from_the_executing_worker(mode):
+    manager = JobManager(executor_mode=mode, store=InMemoryJobStore(), max_workers=1)
+    try:
+        job_id = manager.submit(PAYLOAD)
+        _wait_done(manager, job_id)
+        assert manager.get(job_id)["status"] == "succeeded"
+        # The pool child's last snapshot crosses over on the manager's queue.
+        deadline = time.monotonic() + 10
+        while (manager.get(job_id)["progress"] or {}).get("phase") != "quality_scoring":
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        phases = manager.get(job_id)["progress"]["phases"]
+        solves = phases["scenario_solves"]
+        assert (solves["done"], solves["total"]) == (6, 6)
+        assert set(phases) == {
+            "scenario_solves", "clustering", "cluster_resolves", "quality_scoring",
+        }
+    finally:
+        manager.shutdown()
+
+
+def test_progress_marks_a_pending_job_running():
+    store = _redis_store()
+    manager = JobManager(executor_mode="inline", store=store)
+    # As another worker running the job would leave it.
+    store.create("elsewhere")
+    store.record_progress("elsewhere", {"phase": "clustering"})
+    assert manager.get("elsewhere")["status"] == "running"
+    manager.shutdown()
+
+
+def test_store_publishes_status_and_progress_events(store):
+    subscription = store.subscribe("job")
+    store.create("job")
+    store.record_progress("job", {"phase": "scenario_solves"})
+    store.record_success("job", {"solutions": []})
+    events = subscription.drain()
+    assert [e["event"] for e in events] == ["status", "progress", "status"]
+    assert events[-1]["data"] == {"status": "succeeded"}
+    assert subscription.drain() == []
+    subscription.close()
+    store.record_failure("job", ["late"])
+    assert subscription.drain() == []
+
+
+def _queue_manager(server, consume, visibility=60.0, deliveries=3):
+    def client():
+        return fakeredis.FakeStrictRedis(server=server, decode_responses=True)
+
+    queue = RedisWorkQueue(
+        client=client(), visibility_seconds=visibility, max_deliveries=deliveries
+    )
+    return JobManager(
+        executor_mode="queue",
+        store=RedisJobStore(client=client()),
+        max_workers=1,
+        work_queue=queue,
+        consume=consume,
+    )
+
+
+def test_queue_mode_needs_a_shared_store():
+    with pytest.raises(ValueError, match="SIROM_JOB_STORE=redis"):
+        JobManager(executor_mode="queue", store=InMemoryJobStore())
+
+
+def test_queued_job_runs_on_a_consuming_worker():
+    server = fakeredis.FakeServer()
+    frontend = _queue_manager(server, consume=False)
+    job_id = frontend.submit(PAYLOAD)
+    assert frontend.get(job_id)["status"] == "pending"
+    worker = _queue_manager(server, consume=True)
+    try:
+        _wait_done(frontend, job_id)
+        assert frontend.get(job_id)["status"] == "succeeded"
+        assert frontend.get(job_id)["progress"]["phase"] == "quality_scoring"
+        # The wait is measured from the stream entry's enqueue time.
+        assert frontend.get(job_id)["schedule"]["wait_seconds"] >= 0
+        # Acknowledged, and cached for the next identical submission.
+        assert frontend._queue.stats() == {"waiting": 0, "claimed": 0}
+        assert frontend.submit(PAYLOAD) == job_id
+    finally:
+        worker.shutdown()
+        frontend.shutdown()
+
+
+def test_claim_that_fails_to_launch_holds_nothing():
+    server = fakeredis.FakeServer()
+    frontend = _queue_manager(server, consume=False)
+    job_id = frontend.submit(PAYLOAD)
+    (claim,) = frontend._queue.claim(1)
+    # A pool that is shut down refuses the job.
+    frontend._executor = ThreadPoolExecutor(1)
+    frontend._executor.shutdown()
+    with pytest.raises(RuntimeError):
+        frontend._run_claim(claim)
+    assert frontend._flags == {} and frontend._claims == {}
+    assert frontend.scenario_bank._banks == {}
+    assert frontend.admission.snapshot()["queued_jobs"] == 0
+    # Still claimed, so another worker takes it over once it goes quiet.
+    assert frontend.get(job_id)["status"] == "pending"
+    assert frontend._queue.stats() == {"waiting": 0, "claimed": 1}
+    frontend.shutdown()
+
+
+def test_claim_of_a_dead_worker_is_taken_over():
+    server = fakeredis.FakeServer()
+    frontend = _queue_manager(server, consume=False, visibility=0.2)
+    job_id = frontend.submit(PAYLOAD)
+    # A worker that claims the job and dies without heartbeating.
+    RedisWorkQueue(
+        client=fakeredis.FakeStrictRedis(server=server, decode_responses=True)
+    ).claim(1)
+    worker = _queue_manager(server, consume=True, visibility=0.2)
+    try:
+        _wait_done(frontend, job_id)
+        assert frontend.get(job_id)["status"] == "succeeded"
+    finally:
+        worker.shutdown()
+        frontend.shutdown()
+
+
+def test_job_whose_workers_keep_dying_is_failed():
+    server = fakeredis.FakeServer()
+    frontend = _queue_manager(server, consume=False, visibility=0.05, deliveries=1)
+    job_id = frontend.submit(PAYLOAD)
+    RedisWorkQueue(
+        client=fakeredis.FakeStrictRedis(server=server, decode_responses=True)
+    ).claim(1)
+    time.sleep(0.1)
+    worker = _queue_manager(server, consume=True, visibility=0.05, deliveries=1)
+    try:
+        _wait_done(frontend, job_id)
+        record = frontend.get(job_id)
+        assert record["status"] == "failed"
+        assert "stopped responding" in record["errors"][0]
+    finally:
+        worker.shutdown()
+        frontend.shutdown()
+
+
+def test_cancelling_a_queued_job_drops_it():
+    server = fakeredis.FakeServer()
+    frontend = _queue_manager(server, consume=False)
+    job_id = frontend.submit(PAYLOAD)
+    assert frontend.cancel(job_id) == "cancelled"
+    worker = _queue_manager(server, consume=True)
+    try:
+        deadline = time.monotonic() + 10
+        while frontend._queue.stats()["waiting"] or frontend._queue.stats()["claimed"]:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert frontend.get(job_id)["status"] == "cancelled"
+    finally:
+        worker.shutdown()
+        frontend.shutdown()
+
+
+def test_large_job_is_sharded_over_the_pool(monkeypatch):
+    monkeypatch.setenv("SIROM_SHARD_SCENARIOS", "6")
+    seeded = {**PAYLOAD, "options": {**PAYLOAD["options"], "seed": 3}}
+    manager = JobManager(executor_mode="process", store=InMemoryJobStore(), max_workers=2)
+    try:
+        assert manager._sharded(seeded)
+        job_id = manager.submit(seeded)
+        _wait_done(manager, job_id)
+        record = manager.get(job_id)
+        assert record["status"] == "succeeded"
+        # Same draws as the shards run in-process: only the dispatch differs.
+        expected = run_solve_job(seeded, shard_map=serial_map, shards=2)
+        assert record["result"]["solutions"] == expected["solutions"]
+    finally:
+        manager.shutdown()
+
+
+def test_process_pool_is_started_and_warmed_up_front():
+    manager = JobManager(executor_mode="process", store=InMemoryJobStore(), max_workers=2)
+    try:
+        pids = [future.result(timeout=60) for future in manager._pool_ready]
+        assert len(pids) == 2
+        assert manager.limits()["pool"] == {
+            "workers": 2,
+            "warm_workers": 2,
+            "recycled_workers": 0,
+            "replaced_workers": 0,
+        }
+    finally:
+        manager.shutdown()
+    lazy = JobManager(executor_mode="thread", store=InMemoryJobStore())
+    assert "pool" not in lazy.limits()
+    lazy.shutdown()
+
+
+def _pid(delay=0.0):
+    time.sleep(delay)
+    return os.getpid()
+
+
+def _spin():
+    while True:
+        pass
+
+
+def _allocate(megabytes):
+    return float(np.ones(megabytes * 2**20 // 8).sum())
+
+
+def test_pool_replaces_only_the_worker_a_job_overran():
+    pool = WorkerPool(2, limits=WorkerLimits(job_cpu_seconds=1))
+    try:
+        runaway = pool.submit(_spin)
+        neighbour = pool.submit(_pid, 0.5)
+        with pytest.raises(SolveError) as stopped:
+            runaway.result(timeout=30)
+        assert stopped.value.messages == [
+            "The job was stopped after 1 s of CPU time, the most one job may use."
+        ]
+        # The other worker kept running, beside a replacement of the first.
+        survivor = neighbour.result(timeout=30)
+        assert pool.replaced == 1
+        both = [pool.submit(_pid, 0.5) for _ in range(2)]
+        pids = {future.result(timeout=30) for future in both}
+        assert len(pids) == 2 and survivor in pids
+    finally:
+        pool.shutdown()
+
+
+def test_pool_recycles_workers_and_fails_jobs_over_their_memory_limit():
+    pool = WorkerPool(
+        1, limits=WorkerLimits(max_tasks=2, job_memory_bytes=200 * 2**20)
+    )
+    try:
+        pids = [pool.submit(_pid).result(timeout=30) for _ in range(4)]
+        assert pids[0] == pids[1] != pids[2] == pids[3]
+        assert pool.submit(_allocate, 50).result(timeout=30) > 0
+        with pytest.raises(ResourceLimitExceeded, match="more than 200 MB"):
+            pool.submit(_allocate, 400).result(timeout=30)
+        assert pool.recycled == 3 and pool.replaced == 0
+        assert pool.submit(_allocate, 50).result(timeout=30) > 0
+    finally:
+        pool.shutdown()
+
+    recycled = WorkerPool(1, limits=WorkerLimits(max_rss_bytes=1))
+    try:
+        assert len({recycled.submit(_pid).result(timeout=30) for _ in range(3)}) == 3
+    finally:
+        recycled.shutdown()
+
+
+def test_store_batched_reads_and_writes(store):
+    store.create_many({"a": {"client": "c"}, "b": {"client": "c"}})
+    store.record_progress("b", {"phase": "clustering"})
+    a, b, missing = store.fetch_many(["a", "b", "nope"])
+    assert a["status"] == "pending" and a["schedule"] == {"client": "c"}
+    assert b["progress"] == {"phase": "clustering"} and missing is None
+    assert store.set_aliases({"x": "1", "y": "2"}, only_if_absent=True) == [True, True]
+    assert store.set_aliases({"x": "3", "z": "4"}, only_if_absent=True) == [False, True]
+    assert store.get_aliases(["x", "z", "w"]) == ["1", "4", None]
+
+
+def _variant(index):
+    return {**PAYLOAD, "objective": [-1.0 - index, -1.0]}
+
+
+@pytest.mark.parametrize("mode", ["inline", "process"])
+def test_batch_submission_packs_small_jobs_and_reuses_known_ones(mode):
+    manager = JobManager(executor_mode=mode, store=InMemoryJobStore(), max_workers=2)
+    try:
+        cached = manager.submit(_variant(0))
+        _wait_done(manager, cached)
+        outcomes = manager.submit_many(
+            [_variant(0), _variant(1), _variant(2), _variant(1), _variant(3)],
+            client="ip:1.1.1.1",
+        )
+        ids = [outcome["job_id"] for outcome in outcomes]
+        assert ids[0] == cached and ids[1] == ids[3] and len(set(ids)) == 4
+        for job_id in ids:
+            _wait_done(manager, job_id)
+        records = manager.get_many(ids + ["nope"])
+        assert [r["status"] for r in records[:-1]] == ["succeeded"] * 5
+        assert records[-1] is None
+        assert records[1]["result"]["solutions"]
+        assert records[1]["schedule"]["wait_seconds"] >= 0
+        # Resubmitting the batch only finds the cached jobs.
+        assert [o["job_id"] for o in manager.submit_many([_variant(2)])] == [ids[2]]
+    finally:
+        manager.shutdown()
+
+
+def test_batch_submission_reports_refused_problems(manager):
+    manager.admission.capacity_seconds = 1e-9
+    manager.admission.admit("busy", PAYLOAD)
+    first, second = manager.submit_many([_variant(5), _variant(6)])
+    assert "queue is full" in first["error"] and first["retry_after"] >= 1
+    assert "job_id" not in second
+
+
+def test_queue_mode_batch_is_enqueued_in_one_call():
+    server = fakeredis.FakeServer()
+    frontend = _queue_manager(server, consume=False)
+    try:
+        outcomes = frontend.submit_many([_variant(1), _variant(2)])
+        assert frontend._queue.stats() == {"waiting": 2, "claimed": 0}
+        statuses = [r["status"] for r in frontend.get_many([o["job_id"] for o in outcomes])]
+        assert statuses == ["pending", "pending"]
+    finally:
+        frontend.shutdown()
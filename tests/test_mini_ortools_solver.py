@@ -106,3 +106,22 @@ def test_integer_problem_solves_with_integer_values():
     assert all(
         abs(v - round(v)) < 1e-6 for v in mini_ortool.solution["variable"]
     )
+
+
+def test_resolve_changes_objective_and_rhs_in_place():
+    solver = MiniOrtoolsSolver(OptimizationProblem(c_value, A_value, b_value))
+    new_c, new_b = np.array([-4, -3]), np.array([10, 0, 3, 0, 0])
+    warm = solver.resolve(objective=new_c, rhs=new_b)
+    cold = MiniOrtoolsSolver(OptimizationProblem(new_c, A_value, new_b)).solution
+    assert warm["objective_value"] == pytest.approx(cold["objective_value"])
+    np.testing.assert_allclose(warm["variable"], cold["variable"])
+    np.testing.assert_allclose(warm["constraint"], cold["constraint"])
+
+
+def test_resolve_changes_the_constraint_matrix_in_place():
+    solver = MiniOrtoolsSolver(OptimizationProblem(c_value, A_value, b_value))
+    new_A = np.asarray(A_value, dtype=float) * 1.5
+    warm = solver.resolve(constraint=new_A)
+    cold = MiniOrtoolsSolver(OptimizationProblem(c_value, np.matrix(new_A), b_value)).solution
+    assert warm["objective_value"] == pytest.approx(cold["objective_value"])
+    np.testing.assert_allclose(warm["constraint"], cold["constraint"])
@@ -0,0 +1,142 @@
+import threading
+import time
+
+import pytest
+
+from sirom.batch_solver import ProblemsBucket
+from sirom.run_control import RunCancelled, RunControl
+
+C = [-1.0, -1.0]
+LB_A = [[1.0, 0.5], [0.5, 1.0]]
+UB_A = [[1.5, 1.0], [1.0, 1.5]]
+LB_B = [4.0, 4.0]
+UB_B = [5.0, 5.0]
+
+
+def test_unlimited_control_never_stops():
+    control = RunControl()
+    assert control.remaining() is None
+    control.checkpoint("anything")
+
+
+def test_checkpoint_raises_once_cancelled():
+    flag = threading.Event()
+    control = RunControl(cancel_flag=flag, poll_interval=0.0)
+    control.checkpoint("scenario_solves")
+    flag.set()
+    with pytest.raises(RunCancelled) as stop:
+        control.checkpoint("clustering")
+    assert (stop.value.reason, stop.value.phase) == ("cancelled", "clustering")
+
+
+def test_checkpoint_raises_when_time_is_up():
+    control = RunControl(time_limit_seconds=0.01)
+    time.sleep(0.02)
+    assert control.remaining() == 0.0
+    with pytest.raises(RunCancelled) as stop:
+        control.checkpoint("quality_scoring")
+    assert stop.value.reason == "time_limit"
+
+
+def test_cancel_flag_reads_are_throttled():
+    class CountingFlag:
+        reads = 0
+
+        def is_set(self):
+            self.reads += 1
+            return False
+
+    flag = CountingFlag()
+    control = RunControl(cancel_flag=flag, poll_interval=60.0)
+    for _ in range(100):
+        control.checkpoint("scenario_solves")
+    assert flag.reads == 1
+
+
+def test_bucket_stops_between_scenario_solves():
+    flag = threading.Event()
+    flag.set()
+    bucket = ProblemsBucket(
+        C, LB_A, UB_A, LB_B, UB_B, number_of_scenarios=5,
+        control=RunControl(cancel_flag=flag),
+    )
+    with pytest.raises(RunCancelled) as stop:
+        bucket.solve()
+    assert stop.value.phase == "scenario_solves"
+    assert bucket.results == []
+
+
+def test_bucket_stops_in_scoring_chunks():
+    flag = threading.Event()
+    bucket = ProblemsBucket(
+        C, LB_A, UB_A, LB_B, UB_B, number_of_scenarios=5,
+        control=RunControl(cancel_flag=flag, poll_interval=0.0),
+    )
+    bucket.solve()
+    flag.set()
+    with pytest.raises(RunCancelled) as stop:
+        bucket.apply_quality_measure(number_of_scenarios=10)
+    assert stop.value.phase == "quality_scoring"
+
+
+def test_anytime_phase_shares():
+    control = RunControl(deadline_seconds=10.0)
+    assert control.anytime
+    assert 3.9 < control.phase_remaining("scenario_solves") <= 4.0
+    assert 9.4 < control.phase_remaining("quality_scoring") <= 9.5
+    assert not control.phase_expired("scenario_solves")
+    assert RunControl().phase_remaining("scenario_solves") is None
+
+
+def test_anytime_deadline_truncates_instead_of_failing():
+    control = RunControl(deadline_seconds=1e-6)
+    bucket = ProblemsBucket(
+        C, LB_A, UB_A, LB_B, UB_B, number_of_scenarios=50,
+        number_of_clusters=2, control=control,
+    )
+    bucket.solve()
+    bucket.cluster_and_selection()
+    bucket.solve_cluster_tree()
+    bucket.apply_quality_measure(number_of_scenarios=200)
+    # The minimum work still runs: enough scenarios to cluster, the most
+    # promising node, and a pilot-sized quality sample.
+    assert bucket.scenarios_solved == 3
+    assert len(bucket.results) == 4
+    assert control.truncated["scenario_solves"] == "3 of 50 scenarios"
+    assert control.truncated["quality_scoring"] == "16 of 200 quality scenarios"
+    assert all("feasibility_probability" in r for r in bucket.results)
+
+
+def test_progress_reports_every_phase_and_throttles():
+    snapshots = []
+    control = RunControl(progress=snapshots.append, progress_interval=60.0)
+    bucket = ProblemsBucket(
+        C, LB_A, UB_A, LB_B, UB_B, number_of_scenarios=20,
+        number_of_clusters=2, control=control,
+    )
+    bucket.solve()
+    bucket.cluster_and_selection()
+    bucket.solve_cluster_tree()
+    bucket.apply_quality_measure(number_of_scenarios=10)
+    # Only the first report and each phase's last get through a long interval.
+    assert len(snapshots) == 5
+    final = snapshots[-1]
+    assert final["phase"] == "quality_scoring" and final["eta_seconds"] == 0.0
+    assert list(final["phases"]) == [
+        "scenario_solves", "clustering", "cluster_resolves", "quality_scoring",
+    ]
+    assert final["phases"]["scenario_solves"]["done"] == 20
+    for phase in final["phases"].values():
+        assert phase["done"] == phase["total"]
+
+
+def test_progress_eta_follows_the_phase_rate():
+    snapshots = []
+    control = RunControl(progress=snapshots.append, progress_interval=0.0)
+    control.report("scenario_solves", 0, 4)
+    time.sleep(0.05)
+    control.report("scenario_solves", 1, 4)
+    phase = snapshots[-1]["phases"]["scenario_solves"]
+    assert snapshots[0]["eta_seconds"] is None
+    # Three more scenarios at the rate of the first.
+    assert phase["eta_seconds"] == pytest.approx(3 * phase["elapsed_seconds"], rel=0.05)
@@ -0,0 +1,100 @@
+"""Tests for the shared-memory quality-scenario banks."""
+
+import time
+
+import numpy as np
+import pytest
+
+from sirom.api.examples import EXAMPLE_PROBLEM
+from sirom.api.jobs import InMemoryJobStore, JobManager
+from sirom.api.scenario_bank import ScenarioBank, attach, bank_key
+from sirom.api.schemas import SolveRequest, SweepRequest
+from sirom.api.service import run_solve_job
+
+
+def _payload(**options):
+    return SolveRequest(
+        **{
+            **EXAMPLE_PROBLEM,
+            "options": {
+                "number_of_scenarios": 6,
+                "quality_scenarios": 40,
+                "clusters": 3,
+                **options,
+            },
+        }
+    ).model_dump()
+
+
+def test_bank_key_depends_on_shape_draws_and_seed_only():
+    n_con, n_var = len(EXAMPLE_PROBLEM["lb_A"]), len(EXAMPLE_PROBLEM["objective"])
+    assert bank_key(_payload(seed=3)) == (n_con, n_var, 40, 3)
+    # Control variates take half the base draws for the same M.
+    assert bank_key(_payload(scoring="control_variate")) == (n_con, n_var, 20, None)
+    shifted = _payload(seed=3)
+    shifted["ub_b"] = [v + 1.0 for v in shifted["ub_b"]]
+    assert bank_key(shifted) == bank_key(_payload(seed=3))
+    # A sweep's variants share the bank of the most draws any of them needs.
+    sweep = SweepRequest(
+        base=_payload(seed=3), variants=[{}, {"quality_scenarios": 90}]
+    ).model_dump()
+    assert bank_key(sweep) == (n_con, n_var, 90, 3)
+
+
+def test_concurrent_jobs_share_one_bank_and_unseeded_banks_are_unlinked():
+    bank = ScenarioBank()
+    first, second = bank.acquire(_payload()), bank.acquire(_payload())
+    assert first == second
+    assert bank.stats()["banks"] == 1 and bank.stats()["references"] == 2
+    with attach(first) as (constraint, rhs):
+        assert constraint.dtype == np.uint16 and not constraint.flags.writeable
+        assert rhs.shape == (40, len(EXAMPLE_PROBLEM["lb_A"]), 1)
+        # Centered LHS: each column visits every stratum exactly once.
+        assert sorted(constraint[:, 0, 0]) == list(range(40))
+    bank.release(first)
+    assert bank.stats()["banks"] == 1
+    bank.release(second)
+    assert bank.stats() == {"banks": 0, "references": 0, "bytes": 0}
+
+
+def test_seeded_banks_stay_idle_within_budget():
+    bank = ScenarioBank(max_idle_bytes=10**6)
+    handle = bank.acquire(_payload(seed=1))
+    bank.release(handle)
+    assert bank.stats()["banks"] == 1
+    assert bank.acquire(_payload(seed=1)) == handle
+    bank.release(handle)
+
+    tight = ScenarioBank(max_idle_bytes=0)
+    tight.release(tight.acquire(_payload(seed=1)))
+    assert tight.stats()["banks"] == 0
+    bank.close()
+
+
+def test_bank_reproduces_the_seeded_bucket_draws():
+    for scoring in ("monte_carlo", "control_variate"):
+        payload = _payload(seed=11, scoring=scoring)
+        bank = ScenarioBank()
+        handle = bank.acquire(payload)
+        shared = run_solve_job(payload, handle)
+        own = run_solve_job(payload)
+        bank.release(handle)
+        assert len(shared["solutions"]) == len(own["solutions"])
+        for a, b in zip(shared["solutions"], own["solutions"]):
+            # Dequantized strata match the float draws up to rounding.
+            assert a == {k: pytest.approx(v) for k, v in b.items()}
+
+
+def test_manager_releases_banks_when_jobs_finish():
+    for mode in ("inline", "thread"):
+        bank = ScenarioBank()
+        manager = JobManager(
+            executor_mode=mode, store=InMemoryJobStore(), scenario_bank=bank
+        )
+        job_id = manager.submit(_payload())
+        deadline = time.monotonic() + 30
+        while manager.get(job_id)["status"] != "succeeded":
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert bank.stats()["references"] == 0
+        manager.shutdown()
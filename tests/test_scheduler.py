@@ -0,0 +1,138 @@
+"""Tests for the fair-share scheduler, with jobs completed by hand."""
+
+from concurrent.futures import Future
+
+from sirom.api.scheduler import FairScheduler, parse_weights
+
+
+class _Jobs:
+    """Launches jobs as futures the test finishes itself, in launch order."""
+
+    def __init__(self):
+        self.started = []
+
+    def starter(self, name):
+        def start(wait_seconds):
+            future = Future()
+            self.started.append((name, future, wait_seconds))
+            return future
+
+        return start
+
+    def names(self):
+        return [name for name, _, _ in self.started]
+
+    def finish(self, name):
+        for started, future, _ in self.started:
+            if started == name:
+                future.set_result(name)
+
+
+def _run_all(jobs):
+    finished = 0
+    while finished < len(jobs.started):
+        jobs.finish(jobs.started[finished][0])
+        finished += 1
+
+
+def test_clients_take_turns_however_many_jobs_they_queue():
+    scheduler, jobs = FairScheduler(slots=1), _Jobs()
+    for index in range(4):
+        scheduler.submit("batch", 1.0, jobs.starter(f"a{index}"))
+    for index in range(2):
+        scheduler.submit("other", 1.0, jobs.starter(f"b{index}"))
+    assert jobs.names() == ["a0"]
+    _run_all(jobs)
+    assert jobs.names() == ["a0", "b0", "a1", "b1", "a2", "a3"]
+
+
+def test_weights_set_each_clients_share():
+    scheduler = FairScheduler(slots=1, weights={"heavy": 2.0})
+    jobs = _Jobs()
+    scheduler.submit("light", 1.0, jobs.starter("first"))
+    for index in range(4):
+        scheduler.submit("heavy", 1.0, jobs.starter(f"h{index}"))
+        scheduler.submit("light", 1.0, jobs.starter(f"l{index}"))
+    _run_all(jobs)
+    # Twice the work for the heavier client while both have jobs waiting.
+    assert jobs.names()[1:7] == ["h0", "h1", "l0", "h2", "h3", "l1"]
+
+
+def test_small_jobs_go_first_and_batch_jobs_keep_to_their_slots():
+    scheduler, jobs = FairScheduler(slots=2), _Jobs()
+    assert scheduler.classify(0.5) == "interactive"
+    assert scheduler.classify(10.0) == "standard"
+    assert scheduler.classify(600.0) == "batch"
+    for index in range(3):
+        scheduler.submit("bulk", 600.0, jobs.starter(f"big{index}"))
+    # Half of two slots for batch: the other stays free for small jobs.
+    assert jobs.names() == ["big0"]
+    scheduler.submit("someone", 0.5, jobs.starter("small"))
+    assert jobs.names() == ["big0", "small"]
+    snapshot = scheduler.snapshot()
+    assert snapshot["classes"]["batch"] == {"waiting": 2, "running": 1, "max_running": 1}
+    assert snapshot["waiting_by_client"] == {"bulk": 2}
+    jobs.finish("small")
+    assert jobs.names() == ["big0", "small"]
+    jobs.finish("big0")
+    assert jobs.names()[-1] == "big1"
+    # The wait each job had for a slot is handed to its launcher.
+    waits = {name: wait for name, _, wait in jobs.started}
+    assert waits["big1"] > 0.0 and waits["big0"] >= 0.0
+
+
+def test_cancelled_waiting_job_never_starts():
+    scheduler, jobs = FairScheduler(slots=1), _Jobs()
+    running = scheduler.submit("c", 1.0, jobs.starter("running"))
+    waiting = scheduler.submit("c", 1.0, jobs.starter("waiting"))
+    after = scheduler.submit("c", 1.0, jobs.starter("after"))
+    assert waiting.cancel()
+    jobs.finish("running")
+    assert running.result() == "running"
+    assert jobs.names() == ["running", "after"]
+    jobs.finish("after")
+    assert after.result() == "after"
+    scheduler.close()
+    late = scheduler.submit("c", 1.0, jobs.starter("late"))
+    assert late.cancelled() and jobs.names() == ["running", "after"]
+
+
+def test_a_job_on_many_slots_counts_them_all():
+    scheduler, jobs = FairScheduler(slots=4), _Jobs()
+    # Batch may hold half the slots, so a sharded batch job gets two.
+    assert scheduler.slots_for(600.0, 4) == 2
+    assert scheduler.slots_for(0.5, 8) == 4
+    scheduler.submit("bulk", 600.0, jobs.starter("sharded"), slots=4)
+    scheduler.submit("bulk", 600.0, jobs.starter("batch"))
+    assert jobs.names() == ["sharded"]
+    assert scheduler.snapshot()["classes"]["batch"]["running"] == 2
+    scheduler.submit("user", 10.0, jobs.starter("standard"))
+    scheduler.submit("user", 0.5, jobs.starter("wide"), slots=2)
+    scheduler.submit("user", 10.0, jobs.starter("later"))
+    # One slot left: too few for the wide job, which keeps it from the next.
+    assert jobs.names() == ["sharded", "standard"]
+    jobs.finish("standard")
+    assert jobs.names() == ["sharded", "standard", "wide"]
+    jobs.finish("sharded")
+    assert jobs.names() == ["sharded", "standard", "wide", "later", "batch"]
+
+
+def test_a_wide_job_is_not_starved_by_narrower_ones():
+    scheduler, jobs = FairScheduler(slots=2), _Jobs()
+    scheduler.submit("a", 0.5, jobs.starter("first"))
+    scheduler.submit("b", 0.5, jobs.starter("wide"), slots=2)
+    scheduler.submit("c", 10.0, jobs.starter("narrow"))
+    # One slot is free, but it is kept for the wide job waiting ahead.
+    assert jobs.names() == ["first"]
+    jobs.finish("first")
+    assert jobs.names() == ["first", "wide"]
+    jobs.finish("wide")
+    assert jobs.names() == ["first", "wide", "narrow"]
+
+
+def test_parse_weights_ignores_malformed_entries():
+    assert parse_weights("key:abc=4, ip:10.0.0.1=0.5,bad,neg=-1,=3") == {
+        "key:abc": 4.0,
+        "ip:10.0.0.1": 0.5,
+    }
+    assert parse_weights(None) == {}
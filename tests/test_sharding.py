@@ -0,0 +1,89 @@
+import numpy as np
+
+from sirom import sharding
+from sirom.batch_solver import ProblemsBucket
+from sirom.run_control import RunControl
+from sirom.sharding import block_deltas, scenario_ranges, serial_map
+
+c_value = [3, 1]  # [x,y]
+lb_A_value = [[1, 1], [1, 0], [0, 1], [-1, 0], [0, -1]]  # [x,y]
+ub_A_value = [[2, 2], [2, 1], [1, 2], [-1, 0], [0, -1]]  # [x,y]
+lb_b_value = [2, 1, 2, 0, 0]
+ub_b_value = [3, 2, 3, 0, 0]
+
+
+def _pipeline(**kwargs):
+    bucket = ProblemsBucket(
+        c_value,
+        lb_A_value,
+        ub_A_value,
+        lb_b_value,
+        ub_b_value,
+        number_of_scenarios=23,
+        seed=11,
+        **kwargs,
+    )
+    bucket.solve()
+    bucket.cluster_and_selection()
+    bucket.solve_cluster_tree()
+    bucket.apply_quality_measure(number_of_scenarios=37)
+    return bucket
+
+
+def _outcome(bucket):
+    return [
+        (r["variable"], r["objective_value"], r["feasibility_probability"])
+        for r in bucket.results
+    ]
+
+
+def test_scenario_ranges_cover_the_scenarios_in_whole_blocks(monkeypatch):
+    monkeypatch.setattr(sharding, "SHARD_BLOCK", 4)
+    assert scenario_ranges(10, 3) == [range(0, 4), range(4, 8), range(8, 10)]
+    assert scenario_ranges(23, 4) == [
+        range(0, 4),
+        range(4, 12),
+        range(12, 16),
+        range(16, 23),
+    ]
+    assert scenario_ranges(2, 5) == [range(0, 2)]
+
+
+def test_a_shard_draws_only_its_own_blocks(monkeypatch):
+    monkeypatch.setattr(sharding, "SHARD_BLOCK", 4)
+    whole = list(block_deltas(5, 0, 0, 10, (3, 2)))
+    part = list(block_deltas(5, 0, 4, 10, (3, 2)))
+    assert [size for size, _, _ in whole] == [4, 4, 2]
+    for (_, *drawn), (_, *again) in zip(whole[1:], part):
+        for a, b in zip(drawn, again):
+            np.testing.assert_array_equal(a, b)
+
+
+def test_sharded_runs_agree_whatever_the_shard_count(monkeypatch):
+    monkeypatch.setattr(sharding, "SHARD_BLOCK", 5)
+    calls = []
+
+    def counting_map(function, arguments):
+        calls.append((function.__name__, len(arguments)))
+        return serial_map(function, arguments)
+
+    sharded = _pipeline(shard_map=counting_map, shards=4)
+    assert calls == [("solve_scenarios", 4), ("count_feasible", 4)]
+    assert sharded.scenarios_solved == 23
+    assert _outcome(sharded) == _outcome(_pipeline(shard_map=serial_map, shards=2))
+    assert _outcome(sharded) == _outcome(_pipeline(shard_map=serial_map, shards=1))
+
+
+def test_anytime_and_unseeded_runs_are_not_sharded():
+    def refusing_map(function, arguments):
+        raise AssertionError("should not shard")
+
+    _pipeline(
+        shard_map=refusing_map, shards=4, control=RunControl(deadline_seconds=60)
+    )
+    bucket = ProblemsBucket(
+        c_value, lb_A_value, ub_A_value, lb_b_value, ub_b_value,
+        number_of_scenarios=5, shard_map=refusing_map, shards=4,
+    )
+    bucket.solve()
+    assert bucket.scenarios_solved == 5
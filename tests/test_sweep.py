@@ -0,0 +1,91 @@
+import numpy as np
+
+from sirom.batch_solver import ProblemsBucket
+from sirom.mini_ortools_solver import MiniOrtoolsSolver
+from sirom.optimization_problem import OptimizationProblem
+from sirom.sweep import Sweep, Variant
+
+c_value = [3, 1]  # [x,y]
+lb_A_value = [[1, 1], [1, 0], [0, 1], [-1, 0], [0, -1]]  # [x,y]
+ub_A_value = [[2, 2], [2, 1], [1, 2], [-1, 0], [0, -1]]  # [x,y]
+lb_b_value = [2, 1, 2, 0, 0]
+ub_b_value = [3, 2, 3, 0, 0]
+
+
+def _sweep(variants, **kwargs):
+    return Sweep(
+        c_value,
+        lb_A_value,
+        ub_A_value,
+        lb_b_value,
+        ub_b_value,
+        variants,
+        number_of_scenarios=17,
+        seed=5,
+        **kwargs,
+    )
+
+
+def _finish(bucket):
+    bucket.cluster_and_selection()
+    bucket.solve_cluster_tree()
+    bucket.apply_quality_measure(number_of_scenarios=29)
+    return [
+        (r["variable"], r["objective_value"], r["feasibility_probability"])
+        for r in bucket.results
+    ]
+
+
+def test_single_variant_sweep_reproduces_the_plain_run():
+    sweep = _sweep([Variant()])
+    sweep.solve()
+    plain = ProblemsBucket(
+        c_value,
+        lb_A_value,
+        ub_A_value,
+        lb_b_value,
+        ub_b_value,
+        number_of_scenarios=17,
+        seed=5,
+    )
+    plain.solve()
+    assert sweep.warm_starts == 0
+    assert _finish(sweep.buckets[0]) == _finish(plain)
+
+
+def test_variants_share_scenarios_and_warm_start_from_each_other():
+    variants = [
+        Variant(),
+        Variant(objective=np.array([1.0, 3.0])),
+        Variant(lb_rhs=np.array([3, 1, 2, 0, 0]), ub_rhs=np.array([4, 2, 3, 0, 0])),
+        Variant(number_of_scenarios=9, number_of_clusters=2),
+    ]
+    sweep = _sweep(variants)
+    sweep.solve()
+    assert sweep.status[-1] == "[OK] Optimization batch creation succeeded"
+    assert [b.scenarios_solved for b in sweep.buckets] == [17, 17, 17, 9]
+    # Every scenario LP after the first variant's is a re-solve.
+    assert sweep.warm_starts == 17 * 2 + 9
+    first, shorter = sweep.buckets[0], sweep.buckets[3]
+    assert np.shares_memory(
+        first.coefficient.scenarios_constraint, shorter.coefficient.scenarios_constraint
+    )
+    np.testing.assert_array_equal(
+        shorter.coefficient.scenarios_constraint, first.coefficient.scenarios_constraint[:9]
+    )
+    # Warm re-solves land where cold solves of the same LPs do.
+    for index in (1, 2):
+        bucket = sweep.buckets[index]
+        for scenario in (0, 8, 16):
+            cold = MiniOrtoolsSolver(
+                OptimizationProblem(
+                    np.asarray(bucket.coefficient.objective, dtype=float),
+                    np.matrix(bucket.coefficient.scenarios_constraint[scenario]),
+                    np.array(bucket.coefficient.scenarios_rhs[scenario]),
+                )
+            ).solution
+            warm = bucket.results[scenario]
+            assert warm["objective_value"] == cold["objective_value"]
+            np.testing.assert_allclose(warm["constraint"], cold["constraint"])
+    for bucket in sweep.buckets:
+        assert _finish(bucket)
@@ -0,0 +1,97 @@
+"""Tests for warm-started edits of a finished run."""
+
+import contextlib
+import io
+
+import numpy as np
+
+from sirom.batch_solver import ProblemsBucket
+from sirom.mini_ortools_solver import MiniOrtoolsSolver
+from sirom.optimization_problem import OptimizationProblem
+from sirom.warm_start import PriorRun, WarmStartIndex, plan_scenarios
+
+rng = np.random.default_rng(3)
+NOMINAL_A = rng.uniform(1.0, 3.0, (6, 8))
+NOMINAL_B = rng.uniform(20.0, 40.0, 6)
+OBJECTIVE = (-rng.uniform(1.0, 2.0, 8)).tolist()
+LB_A, UB_A = (NOMINAL_A * 0.95).tolist(), (NOMINAL_A * 1.05).tolist()
+
+
+def _run(lb_b, ub_b, index, seed=None):
+    with contextlib.redirect_stdout(io.StringIO()):
+        bucket = ProblemsBucket(
+            OBJECTIVE, LB_A, UB_A, lb_b, ub_b,
+            number_of_scenarios=60, seed=seed, warm_start=index,
+        )
+        bucket.solve()
+        bucket.cluster_and_selection()
+        bucket.solve_cluster_tree()
+    return bucket
+
+
+def test_plan_keeps_the_sample_uniform_when_a_cell_is_widened():
+    # One cell, prior box [0, 1] widened to [0, 2]: half the new box is the
+    # old one, so half the new scenarios come from the prior run.
+    prior_values = np.linspace(0.0, 1.0, 2000).reshape(-1, 1, 1)
+    prior = PriorRun(
+        objective=np.zeros(1),
+        lower=np.array([0.0, 5.0]),
+        upper=np.array([1.0, 5.0]),
+        solver_selection=None,
+        scenarios_constraint=prior_values,
+        scenarios_rhs=np.full((2000, 1, 1), 5.0),
+        solutions=[{"solve_status": 0}] * 2000,
+    )
+    plan = plan_scenarios(
+        prior, np.array([0.0, 5.0]), np.array([2.0, 5.0]), 2000,
+        np.random.default_rng(0),
+    )
+    assert plan is not None
+    assert sum(r is not None for r in plan.reused) == 1000
+    values = plan.scenarios_constraint.reshape(-1)
+    assert values.min() >= 0.0 and values.max() <= 2.0
+    assert abs(values.mean() - 1.0) < 0.05
+    assert abs(np.mean(values > 1.0) - 0.5) < 1e-9
+    # Disjoint boxes have nothing to give.
+    assert plan_scenarios(prior, np.array([3.0, 5.0]), np.array([4.0, 5.0]), 10) is None
+
+
+def test_edit_reuses_scenarios_inside_the_new_box_and_solves_the_rest_warm():
+    index = WarmStartIndex()
+    lb_b, ub_b = (NOMINAL_B * 0.9).tolist(), (NOMINAL_B * 1.1).tolist()
+    first = _run(lb_b, ub_b, index)
+    assert first.reused_scenarios == 0 and len(index) == 1
+
+    lb_b[2] = NOMINAL_B[2] * 0.95  # tightened
+    ub_b[4] = NOMINAL_B[4] * 1.2  # widened
+    edited = _run(lb_b, ub_b, index)
+    assert 0 < edited.reused_scenarios < 60
+    assert edited.warm_starts == 60 - edited.reused_scenarios - 1
+    rhs = np.asarray(edited.coefficient.scenarios_rhs)[:, :, 0]
+    assert np.all(rhs >= np.array(lb_b)) and np.all(rhs <= np.array(ub_b))
+    # Reused and warm-solved scenarios alike match a cold solve.
+    for scenario in (0, 59):
+        cold = MiniOrtoolsSolver(
+            OptimizationProblem(
+                np.array(OBJECTIVE),
+                np.matrix(edited.coefficient.scenarios_constraint[scenario]),
+                np.array(edited.coefficient.scenarios_rhs[scenario]),
+            )
+        ).solution
+        assert np.isclose(
+            edited.results[scenario]["objective_value"], cold["objective_value"]
+        )
+
+    # Resubmitted unchanged, nothing is solved again.
+    again = _run(lb_b, ub_b, index)
+    assert again.reused_scenarios == 60 and again.warm_starts == 0
+    assert again.reused_cluster_nodes == len(again.cluster_tree.get_all_nodes())
+
+
+def test_seeded_runs_neither_use_nor_fill_the_index():
+    index = WarmStartIndex()
+    lb_b, ub_b = (NOMINAL_B * 0.9).tolist(), (NOMINAL_B * 1.1).tolist()
+    _run(lb_b, ub_b, index, seed=4)
+    assert len(index) == 0
+    _run(lb_b, ub_b, index)
+    assert _run(lb_b, ub_b, index, seed=4).reused_scenarios == 0
@@ -0,0 +1,203 @@
+"""Tests for completion webhooks, against a local stand-in HTTP receiver."""
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import fakeredis
+import pytest
+
+from sirom.api.examples import EXAMPLE_PROBLEM
+from sirom.api.jobs import InMemoryJobStore, JobManager, RedisJobStore
+from sirom.api.schemas import SolveRequest
+from sirom.api.webhooks import UnsafeCallback, WebhookSender, urllib_poster
+
+PAYLOAD = SolveRequest(
+    **{
+        **EXAMPLE_PROBLEM,
+        "options": {"number_of_scenarios": 6, "quality_scenarios": 6, "clusters": 3},
+    }
+).model_dump()
+
+
+@pytest.fixture
+def receiver():
+    """A local HTTP server answering POSTs with queued status codes (then 200)."""
+    received, answers = [], []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received.append((self.path, dict(self.headers), json.loads(body)))
+            code = answers.pop(0) if answers else 200
+            self.send_response(code)
+            if 300 <= code < 400:
+                self.send_header("Location", "/redirected")
+            self.end_headers()
+
+        def do_GET(self):
+            # Where a followed redirect would land.
+            received.append((self.path, dict(self.headers), None))
+            self.send_response(200)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(
+        target=server.serve_forever, kwargs={"poll_interval": 0.01}, daemon=True
+    ).start()
+    yield f"http://127.0.0.1:{server.server_port}", received, answers
+    server.shutdown()
+
+
+def _sender(**kwargs):
+    # The stand-in receiver listens on loopback.
+    kwargs.setdefault("allow_private", True)
+    return WebhookSender(backoff_seconds=0.01, timeout_seconds=5, **kwargs)
+
+
+def test_sender_retries_server_errors_with_backoff(receiver):
+    url, received, answers = receiver
+    answers.extend([503, 500])
+    sender = _sender()
+    assert sender.send(f"{url}/hook", "job1", {"status": "succeeded"})
+    assert sender.join(10)
+    assert len(received) == 3
+    path, headers, body = received[-1]
+    assert (path, body) == ("/hook", {"status": "succeeded"})
+    assert headers["Idempotency-Key"] == "job1"
+    assert sender.stats() == {"pending": 0, "delivered": 1, "failed": 0, "dropped": 0}
+    sender.close()
+
+
+def test_sender_gives_up_on_client_errors_and_after_max_attempts(receiver):
+    url, received, answers = receiver
+    answers.extend([400, 502, 502])
+    sender = _sender(max_attempts=2)
+    sender.send(url, "rejected", {})
+    assert sender.join(10)
+    sender.send(url, "down", {})
+    assert sender.join(10)
+    assert len(received) == 3
+    assert sender.stats()["failed"] == 2
+    sender.close()
+
+
+def test_sender_is_bounded():
+    gate = threading.Event()
+
+    def blocked(url, body, headers, timeout):
+        gate.wait(10)
+        return 200
+
+    sender = _sender(max_pending=2, threads=1, post=blocked)
+    assert sender.send("http://x", "a", {}) and sender.send("http://x", "b", {})
+    assert not sender.send("http://x", "c", {})
+    assert sender.stats()["dropped"] == 1
+    gate.set()
+    assert sender.join(10)
+    sender.close()
+
+
+@pytest.mark.parametrize("backing", ["memory", "redis"])
+def test_manager_notifies_every_callback_of_a_job(receiver, backing):
+    url, received, _ = receiver
+    store = (
+        InMemoryJobStore()
+        if backing == "memory"
+        else RedisJobStore(client=fakeredis.FakeStrictRedis(decode_responses=True))
+    )
+    manager = JobManager(executor_mode="inline", store=store, webhooks=_sender())
+    job_id = manager.submit({**PAYLOAD, "callback_url": f"{url}/first"})
+    # The callback is not part of the problem: this is a cache hit, notified
+    # at once because the job has already finished.
+    assert manager.submit({**PAYLOAD, "callback_url": f"{url}/second"}) == job_id
+    assert manager.submit(PAYLOAD) == job_id
+    assert manager.webhooks.join(10)
+    assert sorted(path for path, _, _ in received) == ["/first", "/second"]
+    body = received[0][2]
+    assert body["job_id"] == job_id and body["status"] == "succeeded"
+    assert body["result"]["solutions"]
+    # Compact: empty fields are left out.
+    assert "log" not in body["result"] and "errors" not in body
+    manager.shutdown()
+
+
+def test_failed_job_notifies_errors(receiver):
+    url, received, _ = receiver
+    manager = JobManager(
+        executor_mode="inline", store=InMemoryJobStore(), webhooks=_sender()
+    )
+    bad = {
+        **PAYLOAD,
+        "options": {**PAYLOAD["options"], "solver": "NOPE"},
+        "callback_url": url,
+    }
+    manager.submit(bad)
+    assert manager.webhooks.join(10)
+    assert received[0][2]["status"] == "failed" and received[0][2]["errors"]
+    manager.shutdown()
+
+
+def test_sender_refuses_private_addresses(receiver):
+    url, received, _ = receiver
+    sender = _sender(allow_private=False)
+    for private in (
+        url,
+        "http://localhost/hook",
+        "http://10.0.0.1/hook",
+        "http://169.254.169.254/latest/meta-data",
+        "http://[::1]/hook",
+    ):
+        with pytest.raises(UnsafeCallback):
+            sender.check(private)
+        assert not sender.send(private, "job", {})
+    # A name is checked against what it resolves to, when connecting.
+    with pytest.raises(UnsafeCallback):
+        urllib_poster()(f"{url}/hook", b"{}", {}, 5)
+    assert received == []
+    assert sender.stats()["failed"] == 5
+    sender.check("https://hooks.example.com/done")
+    sender.close()
+
+
+def test_sender_keeps_to_allowed_hosts():
+    sender = _sender(allowed_hosts=["ci.example.com", ".hooks.example.org"])
+    sender.check("https://ci.example.com/done")
+    sender.check("https://a.hooks.example.org/done")
+    for url in (
+        "https://example.com/done",
+        "https://ci.example.com.attacker.net/done",
+        "https://hooks.example.org.attacker.net/done",
+    ):
+        with pytest.raises(UnsafeCallback):
+            sender.check(url)
+    sender.close()
+
+
+def test_sender_does_not_follow_redirects(receiver):
+    url, received, answers = receiver
+    answers.append(302)
+    sender = _sender()
+    sender.send(f"{url}/hook", "moved", {})
+    assert sender.join(10)
+    assert [path for path, _, _ in received] == ["/hook"]
+    assert sender.stats()["failed"] == 1
+    sender.close()
+
+
+def test_manager_refuses_unsafe_callbacks_before_solving():
+    manager = JobManager(
+        executor_mode="inline",
+        store=InMemoryJobStore(),
+        webhooks=_sender(allow_private=False),
+    )
+    metadata = {**PAYLOAD, "callback_url": "http://169.254.169.254/latest"}
+    with pytest.raises(UnsafeCallback):
+        manager.submit(metadata)
+    refused, accepted = manager.submit_many([metadata, PAYLOAD])
+    assert refused["retry_after"] is None and "169.254.169.254" in refused["error"]
+    assert manager.get(accepted["job_id"])["status"] == "succeeded"
+    manager.shutdown()
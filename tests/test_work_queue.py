@@ -0,0 +1,51 @@
+"""Tests for the Redis-stream work queue, against fakeredis."""
+
+import time
+
+import fakeredis
+
+from sirom.api.work_queue import RedisWorkQueue
+
+
+def _queue(server, **kwargs):
+    client = fakeredis.FakeStrictRedis(server=server, decode_responses=True)
+    return RedisWorkQueue(client=client, **kwargs)
+
+
+def test_enqueue_claim_ack():
+    server = fakeredis.FakeServer()
+    queue = _queue(server)
+    queue.enqueue("job1", "fp1", {"x": [1.0]})
+    queue.enqueue("job2", "fp2", {})
+    assert queue.stats() == {"waiting": 2, "claimed": 0}
+
+    first, = queue.claim(1)
+    assert (first.job_id, first.fingerprint, first.payload) == ("job1", "fp1", {"x": [1.0]})
+    assert first.deliveries == 1
+    # A second worker gets the next job, not the claimed one.
+    assert [c.job_id for c in _queue(server).claim(5)] == ["job2"]
+    assert queue.stats() == {"waiting": 0, "claimed": 2}
+    queue.ack(first.entry_id)
+    assert queue.stats() == {"waiting": 0, "claimed": 1}
+    assert queue.claim(1) == []
+
+
+def test_silent_claims_are_taken_over_and_heartbeats_keep_them():
+    server = fakeredis.FakeServer()
+    dead = _queue(server, visibility_seconds=0.1)
+    alive = _queue(server, visibility_seconds=0.1)
+    other = _queue(server, visibility_seconds=0.1)
+    dead.enqueue("lost", "fp", {})
+    dead.enqueue("kept", "fp", {})
+    lost, = dead.claim(1)
+    kept, = alive.claim(1)
+    for _ in range(3):
+        time.sleep(0.05)
+        alive.heartbeat([kept.entry_id])
+    taken = other.claim(5)
+    assert [(c.job_id, c.deliveries) for c in taken] == [("lost", 2)]
+    # The dead worker's heartbeat must not take the job back.
+    dead.heartbeat([lost.entry_id])
+    time.sleep(0.15)
+    alive.heartbeat([kept.entry_id])
+    assert [c.job_id for c in dead.claim(5)] == ["lost"]